@@ -0,0 +1,119 @@
+'''
+Benchmark the responsiveness of an Axon to other clients while large files are uploaded.
+
+A "probe" client repeatedly calls a cheap telepath API on the Axon and records the
+round trip latency.  The probe runs once against an idle Axon and then again while
+several large uploads are streamed in parallel.  The difference between the two
+latency distributions shows how much the uploads stall the ioloop for other clients.
+'''
+import os
+import sys
+import time
+import asyncio
+import logging
+import argparse
+import statistics
+
+import synapse.axon as s_axon
+import synapse.common as s_common
+
+import synapse.lib.const as s_const
+
+logger = logging.getLogger(__name__)
+if __debug__:
+    logger.warning('Running benchmark without -O.  Performance will be slower.')
+
+s_common.setlogging(logger, 'ERROR')
+
+def latencyStats(ticks):
+    '''
+    Return a dictionary of latency statistics (in milliseconds) for a list of durations in seconds.
+    '''
+    ticks = sorted(ticks)
+    size = len(ticks)
+    return {
+        'count': size,
+        'mean': statistics.mean(ticks) * 1000,
+        'p50': ticks[size // 2] * 1000,
+        'p99': ticks[min(size - 1, int(size * 0.99))] * 1000,
+        'max': ticks[-1] * 1000,
+    }
+
+async def probe(prox, done, ticks, delay=0.001):
+    '''
+    Repeatedly measure the round trip time of a cheap Axon API until done is set.
+    '''
+    sha256 = s_common.buid()
+    while not done.is_set():
+        tick = time.perf_counter()
+        await prox.has(sha256)
+        ticks.append(time.perf_counter() - tick)
+        await asyncio.sleep(delay)
+
+async def upload(prox, size, chunksize):
+    '''
+    Stream size random bytes into the Axon via an upload.
+    '''
+    byts = os.urandom(chunksize)
+    async with await prox.upload() as fd:
+        for _ in range(size // chunksize):
+            await fd.write(byts)
+        # make each upload unique so none of them are short circuited
+        await fd.write(s_common.buid())
+        return await fd.save()
+
+async def benchmark(opts):
+
+    size = opts.size * s_const.mebibyte
+    chunksize = opts.chunksize * s_const.kibibyte
+
+    with s_common.getTempDir() as dirn:
+
+        async with await s_axon.Axon.anit(dirn) as axon:
+
+            async with axon.getLocalProxy() as prox:
+
+                done = asyncio.Event()
+                idle = []
+
+                task = asyncio.create_task(probe(prox, done, idle))
+                await asyncio.sleep(opts.idle)
+                done.set()
+                await task
+
+                done = asyncio.Event()
+                busy = []
+
+                task = asyncio.create_task(probe(prox, done, busy))
+
+                tick = time.perf_counter()
+                await asyncio.gather(*[upload(prox, size, chunksize) for _ in range(opts.uploads)])
+                took = time.perf_counter() - tick
+
+                done.set()
+                await task
+
+    totl = opts.uploads * size / s_const.mebibyte
+
+    print(f'uploaded {opts.uploads} x {opts.size} MiB in {took:.2f}s ({totl / took:.2f} MiB/s)')
+    print(f'{"":8}{"count":>10}{"mean":>10}{"p50":>10}{"p99":>10}{"max":>10}')
+    for name, ticks in (('idle', idle), ('busy', busy)):
+        stats = latencyStats(ticks)
+        print(f'{name:8}{stats["count"]:>10}{stats["mean"]:>10.2f}{stats["p50"]:>10.2f}{stats["p99"]:>10.2f}{stats["max"]:>10.2f}')
+    print('(latencies in milliseconds)')
+
+def getParser():
+    parser = argparse.ArgumentParser(description='Measure Axon client latency during parallel uploads.')
+    parser.add_argument('--uploads', type=int, default=4, help='The number of parallel uploads.')
+    parser.add_argument('--size', type=int, default=256, help='The size of each upload in MiB.')
+    parser.add_argument('--chunksize', type=int, default=1024, help='The size of each upload write in KiB.')
+    parser.add_argument('--idle', type=float, default=2.0, help='Seconds to probe the idle Axon for a baseline.')
+    return parser
+
+async def main(argv):
+    opts = getParser().parse_args(argv)
+    await benchmark(opts)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(asyncio.run(main(sys.argv[1:])))
@@ -1,3 +1,9 @@
+'''
+Benchmark cortex operations
+
+TODO:  separate client process, multiple clients
+TODO:  tagprops, regex, control flow, node data, multiple layers, spawn option
+'''
 import os
 import gc
 import sys
@@ -58,13 +64,6 @@ Configs: Dict[str, Dict] = {
     'dedicatedasynclogging': DedicatedAsyncLogConf,
 }
 
-'''
-Benchmark cortex operations
-
-TODO:  separate client process, multiple clients
-TODO:  tagprops, regex, control flow, node data, multiple layers, spawn option
-'''
-
 logger = logging.getLogger(__name__)
 if __debug__:
     logger.warning('Running benchmark without -O.  Performance will be slower.')
@@ -135,6 +134,13 @@ class TestData(s_base.Base):
 
         self.asns2prop: FeedT = [(asn[0], {'props': {'name': 'x'}}) for asn in self.asns]
 
+        # new nodes which also set tags, node data and an edge to an existing node
+        self.asns2full: FeedT = [(asn[0], {'props': {'name': 'x'},
+                                           'tags': {'bench.all': (None, None), oe(asn[0][1] // 2): (None, None)},
+                                           'nodedata': {'bench': {'asn': asn[0][1]}},
+                                           'edges': (('refs', ('inet:asn', asn[0][1] - 1)),)})
+                                 for asn in self.asns2]
+
         fredguid = self.myguid()
         self.asns2formexist: FeedT = [(asn[0], {'props': {'owner': fredguid}}) for asn in self.asns]
         self.asns2formnoexist: FeedT = [(asn[0], {'props': {'owner': self.myguid()}}) for asn in self.asns]
@@ -464,6 +470,47 @@ class Benchmarker:
         assert count == self.workfactor
         return count
 
+    @benchmark({'addnodes'})
+    async def do08BLocalAddNodesFull(self, core: s_cortex.Cortex, prox: s_telepath.Proxy) -> int:
+        '''
+        Add new nodes with props, tags, node data and an edge in one nodedef each
+        '''
+        count = await acount(core.addNodes(self.testdata.asns2full, view=core.getView(self.viewiden)))
+        assert count == self.workfactor
+        return count
+
+    @benchmark({'addnodes'})
+    async def do08CLocalAddNodeDefs(self, core: s_cortex.Cortex, prox: s_telepath.Proxy) -> int:
+        '''
+        The same as do08BLocalAddNodesFull without joining the nodes
+        '''
+        count = 0
+        async with await core.snap(view=core.getView(self.viewiden)) as snap:
+            for chunk in s_common.chunks(self.testdata.asns2full, 100):
+                count += await snap.addNodeDefs(chunk, retnodes=False)
+        assert count == self.workfactor
+        return count
+
+    @benchmark({'addnodes'})
+    async def do08DLocalAddNodesPerEdit(self, core: s_cortex.Cortex, prox: s_telepath.Proxy) -> int:
+        '''
+        The same as do08BLocalAddNodesFull with a separate set of node edits for each prop, tag, data and edge
+        '''
+        count = 0
+        async with await core.snap(view=core.getView(self.viewiden)) as snap:
+            for (formname, formvalu), forminfo in self.testdata.asns2full:
+                node = await snap.addNode(formname, formvalu, props=forminfo.get('props'))
+                for tag, asof in forminfo.get('tags', {}).items():
+                    await node.addTag(tag, valu=asof)
+                for name, data in forminfo.get('nodedata', {}).items():
+                    await node.setData(name, data)
+                for verb, (n2form, n2valu) in forminfo.get('edges', ()):
+                    n2node = await snap.addNode(n2form, n2valu)
+                    await node.addEdge(verb, n2node.iden())
+                count += 1
+        assert count == self.workfactor
+        return count
+
     @benchmark({'official', 'remote'})
     async def do09DelNodes(self, core: s_cortex.Cortex, prox: s_telepath.Proxy) -> int:
         count = await acount(prox.eval('inet:url | delnode', opts=self.opts))
@@ -494,6 +541,43 @@ class Benchmarker:
         assert count == self.workfactor
         return self.workfactor
 
+    @benchmark({'filters', 'remote'})
+    async def do11FilterTag(self, core: s_cortex.Cortex, prox: s_telepath.Proxy) -> int:
+        count = await prox.count('inet:ipv4#all +#even', opts=self.opts)
+        assert count == self.workfactor // 2
+        return self.workfactor
+
+    @benchmark({'filters', 'remote'})
+    async def do11FilterTagGlob(self, core: s_cortex.Cortex, prox: s_telepath.Proxy) -> int:
+        count = await prox.count('inet:ipv4#all +#ev*', opts=self.opts)
+        assert count == self.workfactor // 2
+        return self.workfactor
+
+    @benchmark({'filters', 'remote'})
+    async def do11FilterProp(self, core: s_cortex.Cortex, prox: s_telepath.Proxy) -> int:
+        count = await prox.count('inet:ipv4#all +:type=private', opts=self.opts)
+        assert count == self.workfactor
+        return self.workfactor
+
+    @benchmark({'filters', 'remote'})
+    async def do11FilterOr(self, core: s_cortex.Cortex, prox: s_telepath.Proxy) -> int:
+        count = await prox.count('inet:ipv4#all +(:type=newp or #even)', opts=self.opts)
+        assert count == self.workfactor // 2
+        return self.workfactor
+
+    @benchmark({'filters', 'remote'})
+    async def do11FilterNotAnd(self, core: s_cortex.Cortex, prox: s_telepath.Proxy) -> int:
+        count = await prox.count('inet:ipv4#all -(#odd and :type=private)', opts=self.opts)
+        assert count == self.workfactor // 2
+        return self.workfactor
+
+    @benchmark({'filters', 'remote'})
+    async def do11FilterExpr(self, core: s_cortex.Cortex, prox: s_telepath.Proxy) -> int:
+        count = await prox.count('inet:ipv4#all +$($node.value() < $maxval)',
+                                 opts={**self.opts, 'vars': {'maxval': self.workfactor // 2}})
+        assert count == self.workfactor // 2
+        return self.workfactor
+
     async def run(self, name: str, testdirn: str, coro, do_profiling=False) -> None:
         for _ in range(self.num_iters):
             # We set up the cortex each time to avoid intra-cortex caching
@@ -0,0 +1,111 @@
+'''
+Benchmark the throughput of synapse.lib.scrape against the previous per-regex implementation.
+
+The previous implementation refangs the whole text and then runs a findall() over
+the text for each of the scrape_types regexes.  This is reproduced here using the
+regexes which are still exposed by the scrape module.
+'''
+import sys
+import time
+import random
+import argparse
+import collections
+
+import synapse.lib.scrape as s_scrape
+
+words = (
+    'the', 'threat', 'actor', 'used', 'a', 'backdoor', 'which', 'beacons', 'to', 'its', 'c2', 'server',
+    'over', 'https', 'and', 'drops', 'additional', 'payloads', 'e.g.', 'version', '1.2', 'report', '(see',
+    'appendix)', 'IOC:',
+)
+
+def legacyScrape(text, ptype=None, refang=True):
+
+    if refang:
+        text = s_scrape.refang_text(text)
+
+    for ruletype, _, _ in s_scrape.scrape_types:
+        if ptype and ptype != ruletype:
+            continue
+        regx = s_scrape.regexes.get(ruletype)
+        for valu in regx.findall(text):
+            yield (ruletype, valu)
+
+def getIndicator(rnd):
+    fqdn = f'{rnd.choice(words)}{rnd.randint(0, 1000)}.{rnd.choice(("com", "net", "io", "ru", "link"))}'
+    choices = (
+        lambda: '%032x' % rnd.getrandbits(128),
+        lambda: '%064x' % rnd.getrandbits(256),
+        lambda: f'{rnd.randint(1, 254)}.{rnd.randint(0, 255)}.{rnd.randint(0, 255)}.{rnd.randint(1, 254)}',
+        lambda: f'{rnd.randint(1, 254)}[.]{rnd.randint(0, 255)}[.]{rnd.randint(0, 255)}[.]{rnd.randint(1, 254)}:443',
+        lambda: f'hxxps://{fqdn.replace(".", "[.]")}/path/{rnd.randint(0, 1000)}',
+        lambda: f'user{rnd.randint(0, 100)}@{fqdn}',
+        lambda: fqdn,
+    )
+    return rnd.choice(choices)()
+
+def getText(size, density):
+    '''
+    Generate approximately size characters of report-like text.
+    '''
+    rnd = random.Random(4)
+    parts = []
+    totl = 0
+    while totl < size:
+        if rnd.random() < density:
+            part = getIndicator(rnd)
+        else:
+            part = rnd.choice(words)
+        parts.append(part)
+        totl += len(part) + 1
+    return ' '.join(parts)
+
+def timeit(func, count):
+    ticks = []
+    for _ in range(count):
+        tick = time.perf_counter()
+        retn = func()
+        ticks.append(time.perf_counter() - tick)
+    return min(ticks), retn
+
+def main(argv):
+
+    pars = argparse.ArgumentParser(description='Measure scrape throughput.')
+    pars.add_argument('--size', type=int, default=4, help='The size of the text to scrape in MiB.')
+    pars.add_argument('--density', type=float, default=0.05, help='The fraction of words which are indicators.')
+    pars.add_argument('--chunksize', type=int, default=65536, help='The chunk size used for the streaming scraper.')
+    pars.add_argument('--count', type=int, default=3, help='The number of runs to take the best time from.')
+    opts = pars.parse_args(argv)
+
+    text = getText(opts.size * 1024 * 1024, opts.density)
+    mibs = len(text) / (1024 * 1024)
+
+    def chunked():
+        retn = []
+        scraper = s_scrape.Scraper()
+        for offs in range(0, len(text), opts.chunksize):
+            retn.extend((form, valu) for (form, valu, _) in scraper.feed(text[offs:offs + opts.chunksize]))
+        retn.extend((form, valu) for (form, valu, _) in scraper.feed('', final=True))
+        return retn
+
+    tests = (
+        ('legacy', lambda: list(legacyScrape(text))),
+        ('scrape', lambda: list(s_scrape.scrape(text))),
+        ('chunked', chunked),
+    )
+
+    results = {}
+    print(f'scraping {mibs:.2f} MiB of text (best of {opts.count})')
+    for name, func in tests:
+        took, retn = timeit(func, opts.count)
+        results[name] = collections.Counter(retn)
+        print(f'{name:10}{took:>10.3f}s{mibs / took:>10.2f} MiB/s{len(retn):>10} results')
+
+    if len(set(map(tuple, (sorted(r.items()) for r in results.values())))) != 1:
+        print('WARNING: the results do not match!')
+        return 1
+
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -4,17 +4,18 @@ import logging
 import tempfile
 
 import aiohttp
-import aiohttp_socks
 
 import synapse.exc as s_exc
 import synapse.common as s_common
 
 import synapse.lib.cell as s_cell
 import synapse.lib.base as s_base
+import synapse.lib.coro as s_coro
 import synapse.lib.const as s_const
 import synapse.lib.share as s_share
 import synapse.lib.hashset as s_hashset
 import synapse.lib.httpapi as s_httpapi
+import synapse.lib.httppool as s_httppool
 import synapse.lib.msgpack as s_msgpack
 import synapse.lib.lmdbslab as s_lmdbslab
 import synapse.lib.slabseqn as s_slabseqn
@@ -25,6 +26,11 @@ CHUNK_SIZE = 16 * s_const.mebibyte
 MAX_SPOOL_SIZE = CHUNK_SIZE * 32  # 512 mebibytes
 MAX_HTTP_UPLOAD_SIZE = 4 * s_const.tebibyte
 
+# writes of at least this many bytes are hashed and spooled in a worker thread
+OFFLOAD_SIZE = 64 * s_const.kibibyte
+# the HTTP upload handler buffers this many bytes before hashing them
+HTTP_BUFFER_SIZE = s_const.mebibyte
+
 class AxonHttpUploadV1(s_httpapi.StreamHandler):
 
     async def prepare(self):
@@ -39,12 +45,27 @@ class AxonHttpUploadV1(s_httpapi.StreamHandler):
         self.upfd = await self.cell.upload()
         self.hashset = s_hashset.HashSet()
 
+        self.chunks = []
+        self.chunksize = 0
+
     async def data_received(self, chunk):
         if chunk is not None:
-            await self.upfd.write(chunk)
-            self.hashset.update(chunk)
+            self.chunks.append(chunk)
+            self.chunksize += len(chunk)
+            if self.chunksize >= HTTP_BUFFER_SIZE:
+                await self._flushChunks()
             await asyncio.sleep(0)
 
+    async def _flushChunks(self):
+        # tornado will not read more of the request body until this returns
+        # which provides back-pressure to the client while we hash and spool
+        byts = b''.join(self.chunks)
+
+        self.chunks.clear()
+        self.chunksize = 0
+
+        await self.upfd.write(byts, hashset=self.hashset)
+
     def on_finish(self):
         if self.upfd is not None and not self.upfd.isfini:
             self.cell.schedCoroSafe(self.upfd.fini())
@@ -53,6 +74,8 @@ class AxonHttpUploadV1(s_httpapi.StreamHandler):
         self.on_finish()
 
     async def _save(self):
+        await self._flushChunks()
+
         size, sha256b = await self.upfd.save()
 
         fhashes = {htyp: hasher.hexdigest() for htyp, hasher in self.hashset.hashes}
@@ -85,6 +108,49 @@ class AxonHttpHasV1(s_httpapi.Handler):
 
 class AxonHttpDownloadV1(s_httpapi.Handler):
 
+    def _getRange(self, size):
+        '''
+        Parse a single "bytes=" Range header into an (offs, length) tuple.
+
+        Returns None if the header is missing or not supported, and
+        raises BadArg if the range can not be satisfied.
+        '''
+        text = self.request.headers.get('Range')
+        if text is None:
+            return None
+
+        unit, _, spec = text.strip().partition('=')
+        if unit.strip() != 'bytes' or ',' in spec:
+            return None
+
+        first, _, last = spec.strip().partition('-')
+
+        try:
+
+            if not first:
+                # a suffix range of the last N bytes
+                suffix = int(last)
+                if suffix <= 0:
+                    raise s_exc.BadArg(mesg='Invalid suffix range.')
+                offs = max(size - suffix, 0)
+                return offs, size - offs
+
+            offs = int(first)
+            if offs >= size:
+                raise s_exc.BadArg(mesg='Range start is beyond the end of the file.')
+
+            if not last:
+                return offs, size - offs
+
+            last = min(int(last), size - 1)
+            if last < offs:
+                raise s_exc.BadArg(mesg='Range end is before range start.')
+
+            return offs, last - offs + 1
+
+        except ValueError:
+            return None
+
     async def get(self, sha256):
 
         if not await self.reqAuthAllowed(('axon', 'get')):
@@ -92,11 +158,37 @@ class AxonHttpDownloadV1(s_httpapi.Handler):
 
         sha256b = s_common.uhex(sha256)
 
+        size = await self.cell.size(sha256b)
+        if size is None:
+            self.set_status(404)
+            self.sendRestErr('NoSuchFile', 'Axon does not contain the requested file.')
+            return
+
+        self.set_header('Accept-Ranges', 'bytes')
+
+        try:
+            rang = self._getRange(size)
+        except s_exc.BadArg as e:
+            self.set_status(416)
+            self.set_header('Content-Range', f'bytes */{size}')
+            self.sendRestErr('BadArg', e.get('mesg'))
+            return
+
         self.set_header('Content-Type', 'application/octet-stream')
         self.set_header('Content-Disposition', 'attachment')
 
+        offs = 0
+        length = size
+
+        if rang is not None:
+            offs, length = rang
+            self.set_status(206)
+            self.set_header('Content-Range', f'bytes {offs}-{offs + length - 1}/{size}')
+
+        self.set_header('Content-Length', str(length))
+
         try:
-            async for byts in self.cell.get(sha256b):
+            async for byts in self.cell.get(sha256b, offs=offs, size=length):
                 self.write(byts)
                 await self.flush()
                 await asyncio.sleep(0)
@@ -117,10 +209,13 @@ class UpLoad(s_base.Base):
         self.fd = tempfile.SpooledTemporaryFile(max_size=MAX_SPOOL_SIZE)
         self.size = 0
         self.sha256 = hashlib.sha256()
+        self.lock = asyncio.Lock()
         self.onfini(self._uploadFini)
 
-    def _uploadFini(self):
-        self.fd.close()
+    async def _uploadFini(self):
+        # wait for any write or save running in a worker thread
+        async with self.lock:
+            self.fd.close()
 
     def _reset(self):
         if self.fd._rolled or self.fd.closed:
@@ -133,13 +228,40 @@ class UpLoad(s_base.Base):
         self.size = 0
         self.sha256 = hashlib.sha256()
 
-    async def write(self, byts):
+    def _write(self, byts, hashset=None):
         self.size += len(byts)
         self.sha256.update(byts)
         self.fd.write(byts)
+        if hashset is not None:
+            hashset.update(byts)
+
+    async def write(self, byts, hashset=None):
+        '''
+        Write bytes to the upload.
+
+        Args:
+            byts (bytes): The bytes to write.
+            hashset (s_hashset.HashSet): An optional HashSet to also update with the bytes.
+
+        Notes:
+            Large writes are hashed and spooled in a worker thread to avoid
+            blocking the ioloop.
+        '''
+        async with self.lock:
+
+            if len(byts) < OFFLOAD_SIZE:
+                self._write(byts, hashset=hashset)
+                return
+
+            await s_coro.executor(self._write, byts, hashset=hashset)
 
     async def save(self):
 
+        async with self.lock:
+            return await self._save()
+
+    async def _save(self):
+
         sha256 = self.sha256.digest()
         rsize = self.size
 
@@ -147,16 +269,16 @@ class UpLoad(s_base.Base):
             self._reset()
             return rsize, sha256
 
-        def genr():
+        async def genr():
 
-            self.fd.seek(0)
+            await s_coro.executor(self.fd.seek, 0)
 
             while True:
 
                 if self.isfini:
                     raise s_exc.IsFini()
 
-                byts = self.fd.read(CHUNK_SIZE)
+                byts = await s_coro.executor(self.fd.read, CHUNK_SIZE)
                 if not byts:
                     return
 
@@ -180,11 +302,15 @@ class AxonApi(s_cell.CellApi, s_share.Share):  # type: ignore
         await s_cell.CellApi.__anit__(self, cell, link, user)
         await s_share.Share.__anit__(self, link, None)
 
-    async def get(self, sha256):
+    async def get(self, sha256, offs=None, size=None):
         await self._reqUserAllowed(('axon', 'get'))
-        async for byts in self.cell.get(sha256):
+        async for byts in self.cell.get(sha256, offs=offs, size=size):
             yield byts
 
+    async def read(self, sha256, offs, size):
+        await self._reqUserAllowed(('axon', 'get'))
+        return await self.cell.read(sha256, offs, size)
+
     async def has(self, sha256):
         await self._reqUserAllowed(('axon', 'has'))
         return await self.cell.has(sha256)
@@ -281,6 +407,10 @@ class Axon(s_cell.Cell):
 
         self.addHealthFunc(self._axonHealth)
 
+        # pooled http client sessions for wget()
+        self.httppool = await s_httppool.HttpPool.anit()
+        self.onfini(self.httppool)
+
         # modularize blob storage
         await self._initBlobStor()
 
@@ -324,19 +454,80 @@ class Axon(s_cell.Cell):
         for item in self.axonseqn.iter(offs):
             yield item
 
-    async def get(self, sha256):
+    async def get(self, sha256, offs=None, size=None):
+        '''
+        Yield the bytes of a file in the Axon.
+
+        Args:
+            sha256 (bytes): The sha256 hash of the file in bytes.
+            offs (int): An optional offset to begin reading from.
+            size (int): An optional maximum number of bytes to read.
 
+        Yields:
+            bytes: Chunks of the file.
+        '''
         if not await self.has(sha256):
             raise s_exc.NoSuchFile(mesg='Axon does not contain the requested file.', sha256=s_common.ehex(sha256))
 
-        async for byts in self._get(sha256):
+        if offs is None and size is None:
+            async for byts in self._get(sha256):
+                yield byts
+            return
+
+        if offs is None:
+            offs = 0
+
+        if offs < 0 or (size is not None and size < 0):
+            raise s_exc.BadArg(mesg='Axon.get() offs and size must be positive integers.', offs=offs, size=size)
+
+        async for byts in self._getRange(sha256, offs, size):
             yield byts
 
+    async def read(self, sha256, offs, size):
+        '''
+        Read a range of bytes from a file in the Axon.
+
+        Args:
+            sha256 (bytes): The sha256 hash of the file in bytes.
+            offs (int): The offset to begin reading from.
+            size (int): The maximum number of bytes to read.
+
+        Returns:
+            bytes: The bytes read, which may be less than size at the end of the file.
+        '''
+        return b''.join([byts async for byts in self.get(sha256, offs=offs, size=size)])
+
     async def _get(self, sha256):
 
         for _, byts in self.blobslab.scanByPref(sha256, db=self.blobs):
             yield byts
 
+    async def _getRange(self, sha256, offs, size):
+
+        # blobs are saved in CHUNK_SIZE chunks so the offset maps directly to a chunk index
+        indx, skip = divmod(offs, CHUNK_SIZE)
+
+        lmin = sha256 + indx.to_bytes(8, 'big')
+        lmax = sha256 + b'\xff' * 8
+
+        for _, byts in self.blobslab.scanByRange(lmin, lmax, db=self.blobs):
+
+            if skip:
+                byts = byts[skip:]
+                skip = 0
+
+            if size is not None:
+
+                if len(byts) >= size:
+                    if size:
+                        yield byts[:size]
+                    return
+
+                size -= len(byts)
+
+            yield byts
+            await asyncio.sleep(0)
+
     async def put(self, byts):
         # Use a UpLoad context manager so that we can
         # ensure that a one-shot set of bytes is chunked
@@ -360,7 +551,10 @@ class Axon(s_cell.Cell):
             return int.from_bytes(byts, 'big')
 
     async def metrics(self):
-        return dict(self.axonmetrics.items())
+        retn = dict(self.axonmetrics.items())
+        for name, valu in self.httppool.getPoolInfo().items():
+            retn[f'http:{name}'] = valu
+        return retn
 
     async def save(self, sha256, genr):
 
@@ -382,10 +576,12 @@ class Axon(s_cell.Cell):
 
     async def _saveFileGenr(self, sha256, genr):
         size = 0
-        for i, byts in enumerate(genr):
+        i = 0
+        async for byts in s_coro.agen(genr):
             size += len(byts)
             lkey = sha256 + i.to_bytes(8, 'big')
             self.blobslab.put(lkey, byts, db=self.blobs)
+            i += 1
             await asyncio.sleep(0)
         return size
 
@@ -408,18 +604,15 @@ class Axon(s_cell.Cell):
         '''
         Stream a file download directly into the axon.
         '''
-        connector = None
         proxyurl = self.conf.get('http:proxy')
-        if proxyurl is not None:
-            connector = aiohttp_socks.ProxyConnector.from_url(proxyurl)
-
         atimeout = aiohttp.ClientTimeout(total=timeout)
 
-        async with aiohttp.ClientSession(connector=connector, timeout=atimeout) as sess:
+        try:
 
-            try:
+            async with self.httppool.getSess(proxyurl=proxyurl, ssl=ssl) as sess:
 
-                async with sess.request(method, url, headers=headers, params=params, json=json, data=body, ssl=ssl) as resp:
+                async with sess.request(method, url, headers=headers, params=params, json=json, data=body, ssl=ssl,
+                                        timeout=atimeout) as resp:
 
                     info = {
                         'ok': True,
@@ -433,8 +626,7 @@ class Axon(s_cell.Cell):
                     async with await self.upload() as upload:
 
                         async for byts in resp.content.iter_chunked(CHUNK_SIZE):
-                            await upload.write(byts)
-                            hashset.update(byts)
+                            await upload.write(byts, hashset=hashset)
 
                         size, _ = await upload.save()
 
@@ -443,16 +635,16 @@ class Axon(s_cell.Cell):
 
                     return info
 
-            except asyncio.CancelledError:
-                raise
+        except asyncio.CancelledError:
+            raise
 
-            except Exception as e:
-                exc = s_common.excinfo(e)
-                mesg = exc.get('errmsg')
-                if not mesg:
-                    mesg = exc.get('err')
+        except Exception as e:
+            exc = s_common.excinfo(e)
+            mesg = exc.get('errmsg')
+            if not mesg:
+                mesg = exc.get('err')
 
-                return {
-                    'ok': False,
-                    'mesg': mesg,
-                }
+            return {
+                'ok': False,
+                'mesg': mesg,
+            }
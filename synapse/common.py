@@ -6,6 +6,7 @@ import time
 import fcntl
 import types
 import base64
+import heapq
 import shutil
 import struct
 import decimal
@@ -41,6 +42,7 @@ majmin = (major, minor)
 version = (major, minor, micro)
 
 guidre = regex.compile('^[0-9a-f]{32}$')
+buidre = regex.compile('^[0-9a-f]{64}$')
 
 novalu = NoValu()
 
@@ -128,6 +130,9 @@ def uhex(text):
 def isguid(text):
     return guidre.match(text) is not None
 
+def isbuidhex(text):
+    return buidre.match(text) is not None
+
 def intify(x):
     '''
     Ensure ( or coerce ) a value into being an integer or None.
@@ -850,3 +855,42 @@ async def merggenr(genrs, cmprkey):
         yield nextvalu
 
         curvs[nextindx] = await genrnext(genrs[nextindx])
+
+async def merggenr2(genrs, cmprkey=None):
+    '''
+    Iterate multiple sorted async generators and yield their results in order using a heap.
+
+    Args:
+        genrs (Sequence[AsyncGenerator[T]]):  a sequence of async generator that each yield sorted items
+        cmprkey(Callable[T, Any]):  an optional function which returns the sort key for an item
+
+    Note:
+        Items with equal sort keys are yielded in the order of the genrs which produced them.  Each genr
+        is only advanced when its current item is consumed, so callers may stop iterating at any time.
+    '''
+    if cmprkey is None:
+        cmprkey = lambda x: x
+
+    heap = []
+    for indx, genr in enumerate(genrs):
+        try:
+            item = await genr.__anext__()
+        except StopAsyncIteration:
+            continue
+        heap.append((cmprkey(item), indx, item, genr))
+
+    heapq.heapify(heap)
+
+    while heap:
+
+        _, indx, item, genr = heap[0]
+
+        yield item
+
+        try:
+            item = await genr.__anext__()
+        except StopAsyncIteration:
+            heapq.heappop(heap)
+            continue
+
+        heapq.heapreplace(heap, (cmprkey(item), indx, item, genr))
@@ -1,5 +1,6 @@
 import os
 import copy
+import shutil
 import regex
 import asyncio
 import logging
@@ -33,6 +34,7 @@ import synapse.lib.parser as s_parser
 import synapse.lib.dyndeps as s_dyndeps
 import synapse.lib.grammar as s_grammar
 import synapse.lib.httpapi as s_httpapi
+import synapse.lib.httppool as s_httppool
 import synapse.lib.modules as s_modules
 import synapse.lib.spooled as s_spooled
 import synapse.lib.version as s_version
@@ -56,6 +58,9 @@ import synapse.lib.stormlib.modelext as s_stormlib_modelext  # NOQA
 
 logger = logging.getLogger(__name__)
 
+# the maximum number of parsed storm queries to keep in the cache
+QUERY_CACHE_SIZE = 10000
+
 '''
 A Cortex implements the synapse hypergraph object.
 '''
@@ -595,6 +600,13 @@ class CoreApi(s_cell.CellApi):
         async for item in self.cell.syncLayerNodeEdits(layr.iden, offs, wait=wait):
             yield item
 
+    @s_cell.adminapi()
+    async def flattenLayers(self, layers, ldef=None):
+        '''
+        Replace a stack of read-only layers with a single new layer containing their combined contents.
+        '''
+        return await self.cell.flattenLayers(layers, ldef=ldef)
+
     @s_cell.adminapi()
     async def splices(self, offs=None, size=None, layriden=None):
         '''
@@ -958,6 +970,13 @@ class Cortex(s_cell.Cell):  # type: ignore
             'description': 'Enable cron jobs running.',
             'type': 'boolean'
         },
+        'cron:max:concurrent': {
+            'default': 16,
+            'description': 'The maximum number of cron jobs which may run at the same time. Runs beyond this '
+                           'limit wait in a queue ordered by cron job priority.',
+            'type': 'integer',
+            'minimum': 1,
+        },
         'trigger:enable': {
             'default': True,
             'description': 'Enable triggers running.',
@@ -994,6 +1013,13 @@ class Cortex(s_cell.Cell):  # type: ignore
             'description': 'A list of module classes to load.',
             'type': 'array'
         },
+        'model:normcache': {
+            'default': {},
+            'description': 'A dictionary of type names and the number of normalized values to cache for each. '
+                           'Only types whose normalization is deterministic may be cached.',
+            'type': 'object',
+            'additionalProperties': {'type': 'integer', 'minimum': 0},
+        },
         'spawn:poolsize': {
             'default': 8,
             'description': 'The max number of spare processes to keep around in the storm spawn pool.',
@@ -1039,6 +1065,7 @@ class Cortex(s_cell.Cell):  # type: ignore
         self.views = {}
         self.layers = {}
         self.modules = {}
+        self.flattasks = {}
         self.splicers = {}
         self.feedfuncs = {}
         self.stormcmds = {}
@@ -1070,6 +1097,8 @@ class Cortex(s_cell.Cell):  # type: ignore
 
         self.tagvalid = s_cache.FixedCache(self._isTagValid, size=1000)
 
+        self._initStormQueryCache()
+
         self.libroot = (None, {}, {})
         self.bldgbuids = {} # buid -> (Node, Event)  Nodes under construction
 
@@ -1098,6 +1127,7 @@ class Cortex(s_cell.Cell):  # type: ignore
         # Perform module loading
         await self._loadCoreMods()
         await self._loadExtModel()
+        self._initNormCache()
         await self._initStormCmds()
 
         # Initialize our storage and views
@@ -1105,14 +1135,19 @@ class Cortex(s_cell.Cell):  # type: ignore
 
         await self._initCoreLayers()
         await self._initCoreViews()
+        await self._initFlatLayers()
         self.onfini(self._finiStor)
         await self._initCoreQueues()
 
         self.addHealthFunc(self._cortexHealth)
 
+        # pooled http client sessions for $lib.inet.http
+        self.httppool = await s_httppool.HttpPool.anit()
+        self.onfini(self.httppool)
+
         self.stormdmons = await s_storm.DmonManager.anit(self)
         self.onfini(self.stormdmons)
-        self.agenda = await s_agenda.Agenda.anit(self)
+        self.agenda = await s_agenda.Agenda.anit(self, maxruns=self.conf.get('cron:max:concurrent'))
         self.onfini(self.agenda)
         await self._initStormDmons()
 
@@ -1154,6 +1189,10 @@ class Cortex(s_cell.Cell):  # type: ignore
         self.onfini(self.spawnpool)
         self.on('user:mod', self._onEvtBumpSpawnPool)
 
+        self.on('core:module:load', self._onEvtClearQueryCache)
+        self.on('core:tagprop:change', self._onEvtClearQueryCache)
+        self.on('core:extmodel:change', self._onEvtClearQueryCache)
+
         self.dynitems.update({
             'cron': self.agenda,
             'cortex': self,
@@ -1191,13 +1230,33 @@ class Cortex(s_cell.Cell):  # type: ignore
             await self.agenda.start()
         await self.stormdmons.start()
 
+        for view in self.views.values():
+            await view.initTrigQueue()
+            await view.initMergeTask()
+
+        # layers which were being built for a flatten that was never swapped in are abandoned
+        for iden, info in list(self.flathive.items()):
+            if info.get('nexsoffs') is None:
+                await self._push('layer:flatten:del', iden)
+
     async def initServicePassive(self):
         await self.agenda.stop()
         await self.stormdmons.stop()
 
+        for view in self.views.values():
+            await view.stopTrigQueue()
+
+        # mirrors which were restarted while building a flattened layer resume the build
+        for iden, info in self.flathive.items():
+            if iden not in self.flattasks:
+                self.flattasks[iden] = self.schedCoro(self._buildFlatLayer(info.get('ldef'), info.get('layers')))
+
     async def _onEvtBumpSpawnPool(self, evnt):
         await self.bumpSpawnPool()
 
+    async def _onEvtClearQueryCache(self, evnt):
+        self.querycache.clear()
+
     async def bumpSpawnPool(self):
         if self.spawnpool is not None:
             await self.spawnpool.bump()
@@ -1321,6 +1380,88 @@ class Cortex(s_cell.Cell):  # type: ignore
     async def coreQueueSize(self, name):
         return self.multiqueue.size(name)
 
+    def _hasCoreQueueGroup(self, name, group):
+        return self.multiqueue.hasGroup(name, group)
+
+    def _reqCoreQueueGroup(self, name, group):
+        if not self._hasCoreQueueGroup(name, group):
+            mesg = f'No consumer group named {group} for queue {name}.'
+            raise s_exc.NoSuchName(mesg=mesg, name=group)
+
+    async def addCoreQueueGroup(self, name, group):
+
+        if self._hasCoreQueueGroup(name, group):
+            mesg = f'Consumer group named {group} already exists for queue {name}!'
+            raise s_exc.DupName(mesg=mesg)
+
+        await self._push('queue:group:add', name, group)
+
+    @s_nexus.Pusher.onPush('queue:group:add')
+    async def _addCoreQueueGroup(self, name, group):
+        if self._hasCoreQueueGroup(name, group):
+            return
+        await self.multiqueue.addGroup(name, group)
+
+    async def delCoreQueueGroup(self, name, group):
+        self._reqCoreQueueGroup(name, group)
+        await self._push('queue:group:del', name, group)
+
+    @s_nexus.Pusher.onPush('queue:group:del')
+    async def _delCoreQueueGroup(self, name, group):
+        if not self._hasCoreQueueGroup(name, group):
+            return
+        await self.multiqueue.delGroup(name, group)
+
+    async def getCoreQueueGroups(self, name):
+        return self.multiqueue.getGroups(name)
+
+    async def coreQueueLease(self, name, group, size=1, timeout=60, consumer=None, wait=False):
+        '''
+        Lease items from a queue to a consumer within a consumer group.
+
+        Leased items which are not acknowledged with coreQueueAck() within
+        timeout seconds are redelivered to the next consumer in the group.
+
+        Notes:
+            A lease is only pushed to the nexus when there are items to lease, so an
+            idle consumer which is waiting does not grow the nexus log.
+        '''
+        duration = int(timeout * 1000)
+
+        while True:
+
+            self._reqCoreQueueGroup(name, group)
+
+            evnt = self.multiqueue.waiters[name]
+            evnt.clear()
+
+            if self.multiqueue.hasLeasable(name, group, s_common.now()):
+                items = await self._push('queue:lease', name, group, consumer, size, s_common.now(), duration)
+                if items:
+                    return items
+
+            if not wait:
+                return []
+
+            # wake periodically to check for expired leases
+            await s_coro.event_wait(evnt, timeout=1)
+
+    @s_nexus.Pusher.onPush('queue:lease')
+    async def _coreQueueLease(self, name, group, consumer, size, tick, duration):
+        if not self._hasCoreQueueGroup(name, group):
+            return []
+        return await self.multiqueue.lease(name, group, consumer, size, tick, duration)
+
+    async def coreQueueAck(self, name, group, offsets):
+        self._reqCoreQueueGroup(name, group)
+        return await self._push('queue:ack', name, group, offsets)
+
+    @s_nexus.Pusher.onPush('queue:ack')
+    async def _coreQueueAck(self, name, group, offsets):
+        if not self._hasCoreQueueGroup(name, group):
+            return 0
+        return await self.multiqueue.ack(name, group, offsets)
+
     @s_nexus.Pusher.onPushAuto('tag:model:set')
     async def setTagModel(self, tagname, name, valu):
         '''
@@ -2069,6 +2210,10 @@ class Cortex(s_cell.Cell):  # type: ignore
     async def _cortexHealth(self, health):
         health.update('cortex', 'nominal')
 
+    def _initNormCache(self):
+        for name, size in self.conf.get('model:normcache').items():
+            self.model.setNormCache(name, size)
+
     async def _loadExtModel(self):
 
         self.extforms = await (await self.hive.open(('cortex', 'model', 'forms'))).dict()
@@ -3142,6 +3287,241 @@ class Cortex(s_cell.Cell):  # type: ignore
         await view.setLayers(layers)
         await self.bumpSpawnPool()
 
+    async def flattenLayers(self, layers, ldef=None):
+        '''
+        Replace a stack of read-only layers with a single new layer containing their combined contents.
+
+        Every view which uses the layers (as a contiguous stack in the same order) is updated
+        to use the new layer in their place.  The original layers are not deleted.
+
+        Args:
+            layers ([str]): A top-down list of read-only layer idens.
+            ldef (Optional[Dict]): The layer configuration for the new layer.
+
+        Notes:
+            The new layer is built in the background by the Cortex and each of its mirrors from
+            their own copies of the read-only layers and a single nexus entry swaps it in once
+            it has been built (mirrors which are still building swap it in when they finish).
+            If the build fails the partially built layer is removed.  The new layer is read-only
+            and its node edit log is empty, since the edits of the original layers are not copied.
+            Consumers which sync node edits by offset (such as layer push and pull) must be seeded
+            from iterLayerNodeEdits() instead.
+
+        Returns:
+            dict: The layer definition of the new layer.
+        '''
+        layers = list(layers)
+        if len(layers) < 2 or len(set(layers)) != len(layers):
+            mesg = 'Flattening requires a list of at least two distinct layers.'
+            raise s_exc.BadArg(mesg=mesg)
+
+        for iden in layers:
+
+            layr = self.layers.get(iden)
+            if layr is None:
+                raise s_exc.NoSuchLayer(iden=iden)
+
+            if not layr.readonly:
+                mesg = f'Layer {iden} must be read-only to be flattened.'
+                raise s_exc.BadArg(mesg=mesg, iden=iden)
+
+        self._getFlatViews(layers)
+
+        ldef = dict(ldef or {})
+        ldef['iden'] = s_common.guid()
+        ldef.setdefault('creator', self.auth.rootuser.iden)
+        ldef.setdefault('lockmemory', self.conf.get('layers:lockmemory'))
+        ldef.setdefault('logedits', self.conf.get('layers:logedits'))
+        ldef['readonly'] = True
+
+        s_layer.reqValidLdef(ldef)
+
+        await self._push('layer:flatten:init', ldef, layers)
+
+        try:
+            await self._waitFlatLayer(ldef, layers)
+
+            # the views may have changed while the layer was being built
+            self._getFlatViews(layers)
+
+            await self._push('layer:flatten', ldef, layers)
+
+        except Exception:
+            # remove the partially built layer from the Cortex and its mirrors
+            await self._push('layer:flatten:del', ldef.get('iden'))
+            raise
+
+        return await self.getLayerDef(ldef.get('iden'))
+
+    def _getFlatViews(self, layers):
+
+        size = len(layers)
+
+        views = []
+        for view in self.views.values():
+
+            idens = [layr.iden for layr in view.layers]
+            if not any(iden in layers for iden in idens):
+                continue
+
+            indx = idens.index(layers[0]) if layers[0] in idens else -1
+            if indx == -1 or idens[indx:indx + size] != layers:
+                mesg = f'View {view.iden} does not use the layers as a stack in the same order.'
+                raise s_exc.BadArg(mesg=mesg, iden=view.iden)
+
+            if indx == 0:
+                mesg = f'The flattened layer is read-only and may not be the write layer of view {view.iden}.'
+                raise s_exc.BadArg(mesg=mesg, iden=view.iden)
+
+            if view.parent is not None or any(v.parent is view for v in self.views.values()):
+                mesg = f'May not flatten the layers of view {view.iden} which is forked or has been forked from.'
+                raise s_exc.ReadOnlyLayer(mesg=mesg)
+
+            views.append((view, indx))
+
+        return views
+
+    async def _initFlatLayers(self):
+
+        node = await self.hive.open(('cortex', 'flatten'))
+        self.flathive = await node.dict()
+
+        # layers which were swapped in before they were built are finished in the background
+        for iden, info in self.flathive.items():
+            if info.get('nexsoffs') is not None:
+                self.flattasks[iden] = self.schedCoro(self._finiFlatLayer(iden))
+
+    @s_nexus.Pusher.onPush('layer:flatten:init')
+    async def _initFlatLayer(self, ldef, layers):
+
+        iden = ldef.get('iden')
+        if iden in self.layers or iden in self.flattasks:
+            return
+
+        await self.flathive.set(iden, {'ldef': ldef, 'layers': layers})
+
+        self.flattasks[iden] = self.schedCoro(self._buildFlatLayer(ldef, layers))
+
+    @s_nexus.Pusher.onPush('layer:flatten:del')
+    async def _delFlatLayer(self, iden):
+
+        task = self.flattasks.pop(iden, None)
+        if task is not None:
+            task.cancel()
+            await asyncio.wait([task])
+
+        await self.flathive.pop(iden)
+
+        if iden in self.layers:
+            return
+
+        for name in (iden, f'{iden}.flatten'):
+            path = s_common.genpath(self.dirn, 'layers', name)
+            if os.path.isdir(path):
+                shutil.rmtree(path)
+
+    async def _waitFlatLayer(self, ldef, layers):
+
+        task = self.flattasks.pop(ldef.get('iden'), None)
+        if task is not None:
+            await task
+
+        # the build is skipped if it has completed (or restarted if it was interrupted)
+        await self._buildFlatLayer(ldef, layers)
+
+    async def _buildFlatLayer(self, ldef, layers):
+
+        iden = ldef.get('iden')
+
+        path = s_common.genpath(self.dirn, 'layers', iden)
+        if os.path.isdir(path):
+            return
+
+        # the layer is built in a temporary directory which is moved into place once complete
+        tmppath = s_common.genpath(self.dirn, 'layers', f'{iden}.flatten')
+        if os.path.isdir(tmppath):
+            shutil.rmtree(tmppath)
+
+        layrinfo = dict(ldef)
+        layrinfo['readonly'] = False
+
+        try:
+            layr = await s_layer.Layer.anit(layrinfo, s_common.gendir(tmppath))
+            try:
+                layr.refprops = self.model.refprops
+                count = await layr.flattenLayers([self.getLayer(lidn) for lidn in layers])
+
+            finally:
+                await layr.fini()
+
+        except Exception:
+            shutil.rmtree(tmppath, ignore_errors=True)
+            raise
+
+        os.replace(tmppath, path)
+
+        logger.info(f'Flattened {len(layers)} layers into layer {iden} ({count} storage nodes).')
+
+    @s_nexus.Pusher.onPush('layer:flatten', passitem=True)
+    async def _flattenLayers(self, ldef, layers, nexsitem):
+
+        iden = ldef.get('iden')
+        if iden in self.layers:
+            return
+
+        self._getFlatViews(layers)
+
+        await self.flathive.set(iden, {'ldef': ldef, 'layers': layers, 'nexsoffs': nexsitem[0]})
+
+        task = self.flattasks.get(iden)
+        if (task is None or task.done()) and os.path.isdir(s_common.genpath(self.dirn, 'layers', iden)):
+            self.flattasks.pop(iden, None)
+            await self._swapFlatLayer(iden)
+            return
+
+        # mirrors which have not finished the build swap the layer in once it is complete
+        # rather than blocking the nexus.  The views read the same data until then.
+        self.flattasks[iden] = self.schedCoro(self._finiFlatLayer(iden, task=task))
+
+    async def _finiFlatLayer(self, iden, task=None):
+
+        info = self.flathive.get(iden)
+
+        try:
+            if task is not None:
+                await task
+
+            await self._buildFlatLayer(info.get('ldef'), info.get('layers'))
+            await self._swapFlatLayer(iden)
+
+        except asyncio.CancelledError:  # pragma: no cover
+            raise
+
+        except Exception:
+            logger.exception(f'Failed to swap in flattened layer {iden}.')
+
+        finally:
+            if self.flattasks.get(iden) is asyncio.current_task():
+                self.flattasks.pop(iden, None)
+
+    async def _swapFlatLayer(self, iden):
+
+        info = self.flathive.get(iden)
+
+        layers = list(info.get('layers'))
+        views = self._getFlatViews(layers)
+
+        await self._addLayer(dict(info.get('ldef')), (info.get('nexsoffs'), None))
+
+        size = len(layers)
+        for view, indx in views:
+            idens = [layr.iden for layr in view.layers]
+            idens[indx:indx + size] = [iden]
+            await view._hndlsetLayers(idens)
+
+        await self.flathive.pop(iden)
+        await self.bumpSpawnPool()
+
     def getLayer(self, iden=None):
         '''
         Get a Layer object.
@@ -3165,6 +3545,12 @@ class Cortex(s_cell.Cell):  # type: ignore
     def listLayers(self):
         return self.layers.values()
 
+    def _reqLayerNotMerging(self, layr):
+        # a fork layer may only be written by its merge until the merge completes
+        for view in self.views.values():
+            if view.layers and view.layers[0] is layr:
+                view._reqNotMerging()
+
     async def getLayerDef(self, iden=None):
         layr = self.getLayer(iden)
         if layr is not None:
@@ -3215,6 +3601,20 @@ class Cortex(s_cell.Cell):  # type: ignore
     async def getViewDefs(self):
         return [await v.pack() for v in self.views.values()]
 
+    async def addTrigQueue(self, viewiden, item):
+        '''
+        Add an item to the async trigger queue of a view.
+
+        Args:
+            viewiden (str): The iden of the view which owns the trigger.
+            item (tuple): A (trigiden, viewiden, buid, vars, depth) tuple.
+        '''
+        view = self.views.get(viewiden)
+        if view is None:
+            raise s_exc.NoSuchView(iden=viewiden)
+
+        await view.addTrigQueue(item)
+
     async def addLayer(self, ldef=None, nexs=True):
         '''
         Add a Layer to the cortex.
@@ -3274,6 +3674,7 @@ class Cortex(s_cell.Cell):  # type: ignore
         '''
         layr = await self._ctorLayr(layrinfo)
         layr.addoffs = nexsoffs
+        layr.refprops = self.model.refprops
 
         self.layers[layr.iden] = layr
         self.dynitems[layr.iden] = layr
@@ -3468,11 +3869,13 @@ class Cortex(s_cell.Cell):  # type: ignore
                     # prevent push->push->push nodeedits growth
                     alledits.extend(edits)
                     if len(alledits) > 1000:
+                        self._reqLayerNotMerging(layr1)
                         await layr1.storNodeEdits(alledits, meta)
                         await self.setStormVar(gvar, offs)
                         alledits.clear()
 
                 if alledits:
+                    self._reqLayerNotMerging(layr1)
                     await layr1.storNodeEdits(alledits, meta)
                     await self.setStormVar(gvar, offs)
 
@@ -3991,8 +4394,7 @@ class Cortex(s_cell.Cell):  # type: ignore
 
                 # feed the items directly to syn.nodes
                 async for items in q.slices(size=100):
-                    async for node in self._addSynNodes(snap, items):
-                        count += 1
+                    count += await snap.addNodeDefs(items, retnodes=False)
 
                 if feedexc is not None:
                     raise feedexc
@@ -4026,15 +4428,42 @@ class Cortex(s_cell.Cell):  # type: ignore
     async def stormlist(self, text, opts=None):
         return [m async for m in self.storm(text, opts=opts)]
 
-    @s_cache.memoize(size=10000)
+    def _initStormQueryCache(self):
+        self.querycache = s_cache.LruDict(size=QUERY_CACHE_SIZE)
+        self.querycachestats = {'hits': 0, 'misses': 0}
+
     def getStormQuery(self, text, mode='storm'):
         '''
         Parse storm query text and return a Query object.
+
+        Notes:
+            The returned Query is cached and shared by every runtime which
+            executes the same text. All per-run state is kept in the Runtime
+            so the Query must not be modified by the caller.
         '''
-        query = copy.deepcopy(s_parser.parseQuery(text, mode=mode))
-        query.init(self)
+        key = (text, mode)
+
+        query = self.querycache.get(key)
+        if query is not None:
+            self.querycachestats['hits'] += 1
+            return query
+
+        self.querycachestats['misses'] += 1
+
+        query = s_parser.parseQuery(text, mode=mode)
+        self.querycache[key] = query
         return query
 
+    def getStormQueryCacheInfo(self):
+        '''
+        Return a dictionary of statistics about the storm query cache.
+        '''
+        return {
+            'size': len(self.querycache),
+            'maxsize': self.querycache.maxsize,
+            **self.querycachestats,
+        }
+
     @contextlib.asynccontextmanager
     async def getStormRuntime(self, query, opts=None):
 
@@ -4303,6 +4732,8 @@ class Cortex(s_cell.Cell):  # type: ignore
             'iden': self.iden,
             'layer': await self.getLayer().stat(),
             'formcounts': await self.getFormCounts(),
+            'querycache': self.getStormQueryCacheInfo(),
+            'normcache': self.model.getNormCacheInfo(),
         }
         return stats
 
@@ -4488,6 +4919,7 @@ class Cortex(s_cell.Cell):  # type: ignore
 
             user = self.auth.user(cron.creator)
             info['username'] = user.name
+            info['stats'] = self.agenda.getRunStats(cron.iden)
 
             crons.append(info)
 
@@ -4509,6 +4941,20 @@ class Cortex(s_cell.Cell):  # type: ignore
             await appt.setDoc(str(valu))
             return appt.pack()
 
+        if name in ('priority', 'jitter'):
+            try:
+                valu = int(valu)
+            except (TypeError, ValueError):
+                mesg = f'editCronJob {name} must be an integer.'
+                raise s_exc.BadArg(mesg=mesg, name=name, valu=valu) from None
+
+            if name == 'priority':
+                await appt.setPriority(valu)
+            else:
+                await appt.setJitter(valu)
+
+            return appt.pack()
+
         mesg = f'editCronJob name {name} is not supported for editing.'
         raise s_exc.BadArg(mesg=mesg)
 
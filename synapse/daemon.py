@@ -13,6 +13,7 @@ import synapse.lib.coro as s_coro
 import synapse.lib.link as s_link
 import synapse.lib.scope as s_scope
 import synapse.lib.share as s_share
+import synapse.lib.msgpack as s_msgpack
 import synapse.lib.certdir as s_certdir
 import synapse.lib.urlhelp as s_urlhelp
 import synapse.lib.reflect as s_reflect
@@ -119,10 +120,77 @@ dmonwrap = (
     (types.GeneratorType, Genr),
 )
 
-async def t2call(link, meth, args, kwargs):
+T2_BATCH_COUNT = 1000
+T2_BATCH_BYTES = 1024 * 1024
+T2_BATCH_TIMEOUT = 0.005
+
+class T2Yield:
+    '''
+    Transmit the t2:yield messages for a generator over a link.
+
+    If batch is True, the msgpack encoded results are packed into a single
+    t2:yield message which is sent when it reaches T2_BATCH_COUNT items or
+    T2_BATCH_BYTES bytes, or T2_BATCH_TIMEOUT seconds after the first item.
+    '''
+    def __init__(self, link, batch=False):
+        self.link = link
+        self.batch = batch
+
+        self.size = 0
+        self.items = []
+        self.timer = None
+
+    async def put(self, retn):
+
+        if not self.batch:
+            await self.link.tx(('t2:yield', {'retn': retn}))
+            return
+
+        byts = s_msgpack.en(retn)
+
+        self.items.append(byts)
+        self.size += len(byts)
+
+        if len(self.items) >= T2_BATCH_COUNT or self.size >= T2_BATCH_BYTES:
+            await self.flush()
+            return
+
+        if self.timer is None:
+            self.timer = self.link.schedCoro(self._flushLater())
+
+    async def _flushLater(self):
+        await asyncio.sleep(T2_BATCH_TIMEOUT)
+        self.timer = None
+        if not self.link.isfini:
+            await self.flush()
+
+    async def flush(self):
+
+        # the timer clears itself before flushing so this only cancels a sleeping timer
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+
+        if not self.items:
+            return
+
+        items = self.items
+
+        self.size = 0
+        self.items = []
+
+        await self.link.tx(('t2:yield', {'retns': items}))
+
+    async def fini(self, retn):
+        await self.put(retn)
+        await self.flush()
+
+async def t2call(link, meth, args, kwargs, batch=False):
     '''
     Call the given ``meth(*args, **kwargs)`` and handle the response to provide
     telepath task v2 events to the given link.
+
+    If batch is True, generator results are sent in batched t2:yield messages.
     '''
     try:
 
@@ -131,6 +199,8 @@ async def t2call(link, meth, args, kwargs):
         if s_coro.iscoro(valu):
             valu = await valu
 
+        t2yield = T2Yield(link, batch=batch)
+
         try:
 
             first = True
@@ -142,12 +212,12 @@ async def t2call(link, meth, args, kwargs):
                         await link.tx(('t2:genr', {}))
                         first = False
 
-                    await link.tx(('t2:yield', {'retn': (True, item)}))
+                    await t2yield.put((True, item))
 
                 if first:
                     await link.tx(('t2:genr', {}))
 
-                await link.tx(('t2:yield', {'retn': None}))
+                await t2yield.fini(None)
                 return
 
             elif isinstance(valu, types.GeneratorType):
@@ -158,12 +228,12 @@ async def t2call(link, meth, args, kwargs):
                         await link.tx(('t2:genr', {}))
                         first = False
 
-                    await link.tx(('t2:yield', {'retn': (True, item)}))
+                    await t2yield.put((True, item))
 
                 if first:
                     await link.tx(('t2:genr', {}))
 
-                await link.tx(('t2:yield', {'retn': None}))
+                await t2yield.fini(None)
                 return
 
         except s_exc.DmonSpawn as e:
@@ -187,7 +257,7 @@ async def t2call(link, meth, args, kwargs):
                     await link.tx(('t2:genr', {}))
 
                 retn = s_common.retnexc(e)
-                await link.tx(('t2:yield', {'retn': retn}))
+                await t2yield.fini(retn)
 
             return
 
@@ -491,6 +561,7 @@ class Daemon(s_base.Base):
         name = mesg[1].get('name')
         sidn = mesg[1].get('sess')
         todo = mesg[1].get('todo')
+        batch = mesg[1].get('batch', False)
 
         try:
 
@@ -518,7 +589,7 @@ class Daemon(s_base.Base):
                 logger.warning('%r has no method: %r', item, methname)
                 raise s_exc.NoSuchMeth(name=methname)
 
-            sessitem = await t2call(link, meth, args, kwargs)
+            sessitem = await t2call(link, meth, args, kwargs, batch=batch)
             if sessitem is not None:
                 sess.onfini(sessitem)
 
@@ -3,6 +3,7 @@ An API to assist with the creation and enforcement of cortex data models.
 '''
 import asyncio
 import logging
+import itertools
 import collections
 
 import regex
@@ -428,6 +429,8 @@ class Model:
         self.propsbytype = collections.defaultdict(list) # name: Prop()
         self.arraysbytype = collections.defaultdict(list)
 
+        self.refprops = {} # (formname, propname): (refform, isarray)
+
         self._type_pends = collections.defaultdict(list)
         self._modeldef = {
             'ctors': [],
@@ -541,7 +544,11 @@ class Model:
         if base is None:
             raise s_exc.NoSuchType(name=typedef[0])
 
-        return base.clone(typedef[1])
+        tobj = base.clone(typedef[1])
+        if base.normcache is not None and tobj.opts == base.opts:
+            tobj.shareNormCache(base)
+
+        return tobj
 
     def getModelDefs(self):
         '''
@@ -675,6 +682,17 @@ class Model:
 
         if isinstance(form.type, s_types.Array):
             self.arraysbytype[form.type.arraytype.name].append(form)
+            self._setRefProp(formname, None, form.type)
+
+        # props which were added before their type became a form
+        for prop in self.propsbytype.get(formname, ()):
+            self.refprops[(prop.form.name, prop.name)] = (formname, False)
+
+        for prop in self.arraysbytype.get(formname, ()):
+            if prop.isform:
+                self.refprops[(prop.name, None)] = (formname, True)
+            else:
+                self.refprops[(prop.form.name, prop.name)] = (formname, True)
 
         for univname, typedef, univinfo in (u.getPropDef() for u in self.univs.values()):
             self._addFormUniv(form, univname, typedef, univinfo)
@@ -701,6 +719,10 @@ class Model:
         self.forms.pop(formname, None)
         self.props.pop(formname, None)
 
+        for key, (refform, _) in list(self.refprops.items()):
+            if key[0] == formname or refform == formname:
+                self.refprops.pop(key, None)
+
     def delType(self, typename):
 
         _type = self.types.get(typename)
@@ -722,6 +744,8 @@ class Model:
         self.props[full] = prop
         self.props[(form.name, name)] = prop
 
+        self._setRefProp(form.name, name, prop.type)
+
     def addUnivProp(self, name, tdef, info):
 
         base = '.' + name
@@ -752,9 +776,24 @@ class Model:
         if isinstance(prop.type, s_types.Array):
             self.arraysbytype[prop.type.arraytype.name].append(prop)
 
+        self._setRefProp(form.name, name, prop.type)
+
         self.props[prop.full] = prop
         return prop
 
+    def _setRefProp(self, formname, propname, _type):
+        '''
+        Track props whose values (or array items) are the primary values of another form.
+        '''
+        isarray = isinstance(_type, s_types.Array)
+        if isarray:
+            _type = _type.arraytype
+
+        if self.forms.get(_type.name) is None:
+            return
+
+        self.refprops[(formname, propname)] = (_type.name, isarray)
+
     def delTagProp(self, name):
         return self.tagprops.pop(name)
 
@@ -790,6 +829,7 @@ class Model:
 
         self.props.pop(prop.full, None)
         self.props.pop((form.name, prop.name), None)
+        self.refprops.pop((form.name, prop.name), None)
 
         self.propsbytype[prop.type.name].remove(prop)
 
@@ -820,6 +860,39 @@ class Model:
         '''
         return self.types.get(name)
 
+    def setNormCache(self, name, size):
+        '''
+        Set the size of the LRU cache of norm() results for a type.
+
+        Args:
+            name (str): The name of the type.
+            size (int): The max number of values to cache (or 0 to disable the cache).
+
+        Notes:
+            Props whose type is a clone of the type with the same options share the cache,
+            and continue to follow it when it is resized or disabled.
+        '''
+        _type = self.types.get(name)
+        if _type is None:
+            raise s_exc.NoSuchType(name=name)
+
+        _type.setNormCache(size)
+
+        for prop in itertools.chain(self.props.values(), self.tagprops.values()):
+            if prop.type is not _type and prop.type.name == name and prop.type.opts == _type.opts:
+                prop.type.shareNormCache(_type)
+
+    def getNormCacheInfo(self):
+        '''
+        Return a dictionary of norm cache statistics for each type which has a norm cache.
+        '''
+        retn = {}
+        for tobj in self.types.values():
+            info = tobj.getNormCacheInfo()
+            if info is not None:
+                retn[tobj.name] = info
+        return retn
+
     def prop(self, name):
         return self.props.get(name)
 
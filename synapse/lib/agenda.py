@@ -1,6 +1,8 @@
 import enum
 import time
 import heapq
+import bisect
+import random
 import asyncio
 import logging
 import calendar
@@ -15,12 +17,16 @@ import synapse.common as s_common
 
 import synapse.lib.base as s_base
 import synapse.lib.config as s_config
+import synapse.lib.lmdbslab as s_lmdbslab
 import synapse.lib.provenance as s_provenance
 
 # Agenda: manages running one-shot and periodic tasks in the future ("appointments")
 
 logger = logging.getLogger(__name__)
 
+# The upper bounds ( in seconds ) of the cron job run duration histogram buckets
+RUN_HIST_BUCKETS = (1, 10, 60, 300, 900, 3600)
+
 reqValidCdef = s_config.getJsValidator({
     'type': 'object',
     'properties': {
@@ -28,6 +34,8 @@ reqValidCdef = s_config.getJsValidator({
         'creator': {'type': 'string', 'pattern': s_config.re_iden},
         'name': {'type': 'string'},
         'doc': {'type': 'string'},
+        'priority': {'type': 'integer'},
+        'jitter': {'type': 'integer', 'minimum': 0},
         'incunit': {
             'oneOf': [
                 {'type': 'null'},
@@ -306,6 +314,8 @@ class _Appt:
     def __init__(self, stor, iden, recur, indx, query, creator, recs, nexttime=None):
         self.doc = ''
         self.name = ''
+        self.priority = 0  # higher priority runs are started first when the run queue is backed up
+        self.jitter = 0  # max number of seconds to randomly delay each run by
         self.stor = stor
         self.iden = iden
         self.recur = recur # does this appointment repeat
@@ -327,6 +337,7 @@ class _Appt:
         else:
             self.nexttime = nexttime
         self.isrunning = False  # whether it is currently running
+        self.ispending = False  # whether it is waiting on jitter or in the run queue
         self.startcount = 0  # how many times query has started
         self.laststarttime = None
         self.lastfinishtime = None
@@ -367,6 +378,8 @@ class _Appt:
             'ver': 1,
             'doc': self.doc,
             'name': self.name,
+            'priority': self.priority,
+            'jitter': self.jitter,
             'enabled': self.enabled,
             'recur': self.recur,
             'iden': self.iden,
@@ -390,6 +403,8 @@ class _Appt:
         appt = cls(stor, val['iden'], val['recur'], val['indx'], val['query'], val['creator'], recs, val['nexttime'])
         appt.doc = val.get('doc', '')
         appt.name = val.get('name', '')
+        appt.priority = val.get('priority', 0)
+        appt.jitter = val.get('jitter', 0)
         appt.startcount = val['startcount']
         appt.laststarttime = val['laststarttime']
         appt.lastfinishtime = val['lastfinishtime']
@@ -447,6 +462,22 @@ class _Appt:
         self.name = text
         await self._save()
 
+    async def setPriority(self, valu):
+        '''
+        Set the priority used to order runs which are waiting in the run queue.
+        '''
+        self.priority = valu
+        await self._save()
+
+    async def setJitter(self, valu):
+        '''
+        Set the max number of seconds to randomly delay each run of the appointment.
+        '''
+        if valu < 0:
+            raise s_exc.BadArg(mesg='Cron job jitter must be greater than or equal to 0.')
+        self.jitter = valu
+        await self._save()
+
     async def _save(self):
         await self.stor._storeAppt(self)
 
@@ -455,11 +486,12 @@ class Agenda(s_base.Base):
     Organize and execute all the scheduled storm queries in a cortex.
     '''
 
-    async def __anit__(self, core):
+    async def __anit__(self, core, maxruns=16):
 
         await s_base.Base.__anit__(self)
 
         self.core = core
+        self.maxruns = maxruns  # The max number of cron jobs which may run at the same time
         self.apptheap = []  # Stores the appointments in a heap such that the first element is the next appt to run
         self.appts = {}  # Dict[bytes: Appt]
         self._next_indx = 0  # index a new appt gets assigned
@@ -475,6 +507,12 @@ class Agenda(s_base.Base):
         self._schedtask = None  # The task of the scheduler loop.  Doesn't run until we're enabled
 
         self._running_tasks = []  # The actively running cron job tasks
+        self._runqueue = []  # A heap of (-priority, queuetime, indx, appt) runs waiting for a free slot
+        self._runcount = 0
+
+        # Per-run statistics are local to this cortex and are not replicated via the hive
+        self._runstats = s_lmdbslab.SlabDict(self.core.slab, db=self.core.slab.initdb('cron:stats'))
+
         await self._load_all()
 
     async def start(self):
@@ -502,7 +540,12 @@ class Agenda(s_base.Base):
         if not self.enabled:
             return
         self._schedtask.cancel()
-        for task in self._running_tasks:
+
+        for _, _, _, appt in self._runqueue:
+            appt.ispending = False
+        self._runqueue.clear()
+
+        for task in list(self._running_tasks):
             await task.fini()
 
         self.enabled = False
@@ -517,6 +560,7 @@ class Agenda(s_base.Base):
                 appt = _Appt.unpack(self, val)
                 if appt.iden != iden:
                     raise s_exc.InconsistentStorage(mesg='iden inconsistency')
+                self._loadRunStats(appt)
                 self._addappt(iden, appt)
                 self._next_indx = max(self._next_indx, appt.indx + 1)
             except (s_exc.InconsistentStorage, s_exc.BadStorageVersion, s_exc.BadTime, TypeError, KeyError,
@@ -547,6 +591,90 @@ class Agenda(s_base.Base):
         ''' Store a single appointment '''
         await self._hivedict.set(appt.iden, appt.pack())
 
+    def _initRunStats(self):
+        return {
+            'startcount': 0,
+            'errcount': 0,
+            'laststarttime': None,
+            'lastfinishtime': None,
+            'lastresult': None,
+            'lastnodes': None,
+            'totalnodes': 0,
+            'lastduration': None,
+            'totalduration': 0.0,
+            'lastlate': None,
+            'maxlate': 0.0,
+            'hist': [0] * (len(RUN_HIST_BUCKETS) + 1),
+        }
+
+    def _loadRunStats(self, appt):
+        '''
+        Update the run fields of an appointment from the local run statistics.
+        '''
+        stats = self._runstats.get(appt.iden)
+        if stats is None:
+            return
+
+        appt.startcount = stats['startcount']
+        appt.laststarttime = stats['laststarttime']
+        appt.lastfinishtime = stats['lastfinishtime']
+        appt.lastresult = stats['lastresult']
+
+    def _storeRunStats(self, appt, nodes=None, late=None, iserr=False):
+        '''
+        Store the run fields of an appointment and update the run statistics for a finished run.
+        '''
+        stats = self._runstats.get(appt.iden)
+        if stats is None:
+            stats = self._initRunStats()
+
+        stats['startcount'] = appt.startcount
+        stats['laststarttime'] = appt.laststarttime
+        stats['lastfinishtime'] = appt.lastfinishtime
+        stats['lastresult'] = appt.lastresult
+
+        if iserr:
+            stats['errcount'] += 1
+
+        if late is not None:
+            stats['lastlate'] = late
+            stats['maxlate'] = max(stats['maxlate'], late)
+
+        if nodes is not None:
+            took = appt.lastfinishtime - appt.laststarttime
+            stats['lastnodes'] = nodes
+            stats['totalnodes'] += nodes
+            stats['lastduration'] = took
+            stats['totalduration'] += took
+            stats['hist'][bisect.bisect_left(RUN_HIST_BUCKETS, took)] += 1
+
+        self._runstats.set(appt.iden, stats)
+
+    def getRunStats(self, iden):
+        '''
+        Get the local run statistics for an appointment.
+
+        Args:
+            iden (str): The iden of the appointment.
+
+        Returns:
+            dict: The run statistics, with the duration histogram as a list of (maxsecs, count) tuples.
+        '''
+        stats = self._runstats.get(iden)
+        if stats is None:
+            stats = self._initRunStats()
+
+        retn = dict(stats)
+        bounds = RUN_HIST_BUCKETS + (None,)
+        retn['hist'] = list(zip(bounds, stats['hist']))
+        return retn
+
+    def getRunQueue(self):
+        '''
+        Get a list of (iden, queuetime) tuples for the runs waiting on a free slot, in the order they will run.
+        '''
+        return [(appt.iden, queued) for (_, queued, _, appt) in sorted(self._runqueue)]
+
     @staticmethod
     def _dictproduct(rdict):
         '''
@@ -639,6 +767,8 @@ class Agenda(s_base.Base):
         self._addappt(iden, appt)
 
         appt.doc = cdef.get('doc', '')
+        appt.priority = cdef.get('priority', 0)
+        appt.jitter = cdef.get('jitter', 0)
 
         await self._storeAppt(appt)
 
@@ -708,8 +838,15 @@ class Agenda(s_base.Base):
                 self.apptheap[heappos] = self.apptheap.pop()
                 heapq.heapify(self.apptheap)
 
+        # Drop any run of the appointment which is waiting on a free slot
+        runqueue = [item for item in self._runqueue if item[3] is not appt]
+        if len(runqueue) != len(self._runqueue):
+            heapq.heapify(runqueue)
+            self._runqueue = runqueue
+
         del self.appts[iden]
         await self._hivedict.pop(iden)
+        self._runstats.pop(iden)
 
     async def _scheduleLoop(self):
         '''
@@ -742,23 +879,75 @@ class Agenda(s_base.Base):
                     logger.warning(
                         'Appointment %s is still running from previous time when scheduled to run.  Skipping.',
                         appt.iden)
+                elif appt.ispending:
+                    logger.warning(
+                        'Appointment %s is still waiting to run from previous time when scheduled to run.  Skipping.',
+                        appt.iden)
                 else:
                     await self._execute(appt)
 
     async def _execute(self, appt):
         '''
-        Fire off the task to make the storm query
+        Queue a run of the storm query, after a random delay if the appointment has jitter
         '''
-        user = self.core.auth.user(appt.creator)
-        if user is None:
-            logger.warning('Unknown user %s in stored appointment', appt.creator)
-            await self._markfailed(appt)
+        appt.ispending = True
+
+        if appt.jitter:
+            self.schedCoro(self._jitterRun(appt, random.random() * appt.jitter))
+            return
+
+        await self._queueRun(appt)
+
+    async def _jitterRun(self, appt, delay):
+
+        await asyncio.sleep(delay)
+
+        if self.isfini or not self.enabled or self.appts.get(appt.iden) is not appt:
+            appt.ispending = False
             return
-        info = {'iden': appt.iden, 'query': appt.query}
-        task = await self.core.boss.execute(self._runJob(user, appt), f'Cron {appt.iden}', user, info=info)
-        self._running_tasks.append(task)
 
-        task.onfini(functools.partial(self._running_tasks.remove, task))
+        await self._queueRun(appt)
+
+    async def _queueRun(self, appt):
+        heapq.heappush(self._runqueue, (-appt.priority, time.time(), appt.indx, appt))
+        await self._runQueued()
+
+    async def _runQueued(self):
+        '''
+        Fire off the tasks to make the storm queries for queued runs while there are free slots
+        '''
+        while self._runqueue and self._runcount < self.maxruns:
+
+            if self.isfini:
+                return
+
+            _, queued, _, appt = heapq.heappop(self._runqueue)
+
+            user = self.core.auth.user(appt.creator)
+            if user is None:
+                logger.warning('Unknown user %s in stored appointment', appt.creator)
+                appt.ispending = False
+                await self._markfailed(appt)
+                continue
+
+            self._runcount += 1
+
+            info = {'iden': appt.iden, 'query': appt.query}
+            try:
+                task = await self.core.boss.execute(self._runJob(user, appt, queued=queued), f'Cron {appt.iden}',
+                                                    user, info=info)
+            except Exception:
+                self._runcount -= 1
+                appt.ispending = False
+                raise
+
+            self._running_tasks.append(task)
+            task.onfini(functools.partial(self._onRunFini, task))
+
+    async def _onRunFini(self, task):
+        self._running_tasks.remove(task)
+        self._runcount -= 1
+        await self._runQueued()
 
     async def _markfailed(self, appt):
         appt.lastfinishtime = appt.laststarttime = time.time()
@@ -766,17 +955,24 @@ class Agenda(s_base.Base):
         appt.isrunning = False
         appt.lastresult = 'Failed due to unknown user'
         if not self.isfini:
-            await self._storeAppt(appt)
+            self._storeRunStats(appt, iserr=True)
 
-    async def _runJob(self, user, appt):
+    async def _runJob(self, user, appt, queued=None):
         '''
         Actually run the storm query, updating the appropriate statistics and results
         '''
         count = 0
+        iserr = False
         appt.isrunning = True
+        appt.ispending = False
         appt.laststarttime = time.time()
         appt.startcount += 1
-        await self._storeAppt(appt)
+
+        late = None
+        if queued is not None:
+            late = max(0.0, appt.laststarttime - queued)
+
+        self._storeRunStats(appt, late=late)
 
         with s_provenance.claim('cron', iden=appt.iden):
             logger.info('Agenda executing for iden=%s, user=%s, query={%s}', appt.iden, user.name, appt.query)
@@ -789,6 +985,7 @@ class Agenda(s_base.Base):
                 result = 'cancelled'
                 raise
             except Exception as e:
+                iserr = True
                 result = f'raised exception {e}'
                 logger.exception('Agenda job %s raised exception', appt.iden)
             else:
@@ -801,4 +998,4 @@ class Agenda(s_base.Base):
                 appt.isrunning = False
                 appt.lastresult = result
                 if not self.isfini:
-                    await self._storeAppt(appt)
+                    self._storeRunStats(appt, nodes=count, iserr=iserr)
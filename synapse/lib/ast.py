@@ -3,6 +3,7 @@ import asyncio
 import fnmatch
 import logging
 import binascii
+import functools
 import itertools
 import contextlib
 import collections
@@ -15,6 +16,7 @@ import synapse.common as s_common
 import synapse.lib.base as s_base
 import synapse.lib.coro as s_coro
 import synapse.lib.node as s_node
+import synapse.lib.snap as s_snap
 import synapse.lib.cache as s_cache
 import synapse.lib.scope as s_scope
 import synapse.lib.types as s_types
@@ -89,9 +91,8 @@ class AstNode:
             for item in kid.format(depth=depth + 1):
                 yield item
 
-    def init(self, core):
-        self.core = core
-        [k.init(core) for k in self.kids]
+    def init(self):
+        [k.init() for k in self.kids]
         self.prepare()
 
     def validate(self, runt):
@@ -161,7 +162,6 @@ class Query(AstNode):
 
             subgraph = SubGraph(rules)
 
-        self.optimize()
         self.validate(runt)
 
         # turtles all the way down...
@@ -937,6 +937,30 @@ class SwitchCase(Oper):
 class CaseEntry(AstNode):
     pass
 
+# comparators whose index lift and filter both compare the normalized value, so nodes
+# lifted by another plan may be checked against the lift as written using the filter.
+simplecmprs = {
+    '=': (s_types.Type._storLiftNorm, s_types.Type._ctorCmprEq),
+    '<': (s_types.Type._storLiftNorm, s_types.IntBase._ctorCmprLt),
+    '>': (s_types.Type._storLiftNorm, s_types.IntBase._ctorCmprGt),
+    '<=': (s_types.Type._storLiftNorm, s_types.IntBase._ctorCmprLe),
+    '>=': (s_types.Type._storLiftNorm, s_types.IntBase._ctorCmprGe),
+    'range=': (s_types.IntBase._storLiftRange, s_types.Type._ctorCmprRange),
+}
+
+def isSimpleCmpr(ptype, cmpr):
+
+    funcs = simplecmprs.get(cmpr)
+    if funcs is None:
+        return False
+
+    liftfunc = ptype.storlifts.get(cmpr)
+    cmprfunc = ptype.getCmprCtor(cmpr)
+    if liftfunc is None or cmprfunc is None:
+        return False
+
+    return (getattr(liftfunc, '__func__', None), getattr(cmprfunc, '__func__', None)) == funcs
+
 class LiftOper(Oper):
 
     async def run(self, runt, genr):
@@ -959,6 +983,142 @@ class LiftOper(Oper):
             async for subn in self.lift(runt, path):
                 yield subn, path.fork(subn)
 
+    async def getRightHints(self, runt, path):
+
+        for oper in self.iterright():
+
+            # we can skip other lifts but that's it...
+            if isinstance(oper, LiftOper):
+                continue
+
+            if isinstance(oper, FiltOper):
+                for hint in await oper.getLiftHints(runt, path):
+                    yield hint
+                continue
+
+            return
+
+    async def getHintPlans(self, runt, path, formname):
+        '''
+        Return (desc, estfunc, liftfunc, isprobe) lift plans for nodes of a form using hints from the filters to the right.
+        '''
+        plans = []
+
+        async for hint in self.getRightHints(runt, path):
+
+            if hint[0] == 'tag':
+                tagname = hint[1].get('name')
+                plans.append((
+                    f'{formname}#{tagname}',
+                    functools.partial(runt.snap.getTagEstimate, tagname, form=formname),
+                    functools.partial(runt.snap.nodesByTag, tagname, form=formname),
+                    False,
+                ))
+                continue
+
+            if hint[0] == 'relprop':
+
+                relpropname = hint[1].get('name')
+                if hint[1].get('univ'):
+                    fullname = ''.join([formname, relpropname])
+                else:
+                    fullname = ':'.join([formname, relpropname])
+
+                if runt.model.prop(fullname) is None:
+                    continue
+
+                cmpr = hint[1].get('cmpr')
+                valu = hint[1].get('valu')
+
+                # a value plan which may not be estimated falls back to the prop plan
+                if cmpr is not None and valu is not None:
+                    plans.append((
+                        f'{fullname}{cmpr}{valu}',
+                        functools.partial(runt.snap.getPropEstimate, fullname, cmpr=cmpr, valu=valu),
+                        functools.partial(runt.snap.nodesByPropValu, fullname, cmpr, valu),
+                        True,
+                    ))
+
+                plans.append((
+                    fullname,
+                    functools.partial(runt.snap.getPropEstimate, fullname),
+                    functools.partial(runt.snap.nodesByProp, fullname),
+                    False,
+                ))
+
+        return plans
+
+    async def planLift(self, runt, plan, alts):
+        '''
+        Yield nodes from the lift plan with the lowest estimated row count.
+
+        Args:
+            runt (Runtime): The storm runtime.
+            plan (tuple): The (desc, estfunc, liftfunc, isprobe) plan for the lift as written.
+            alts (list): Alternate plans which yield a superset of the nodes that pass the filters.
+
+        Notes:
+            Each estfunc is called with a maxsize and returns a row count (or None if it may
+            not be estimated).  The alternate plans with row counters are estimated first,
+            followed by those which probe a value index, and each is bounded by the best
+            estimate so far, so a probe costs no more than reading the best plan.  The lift as
+            written is then estimated only up to the best alternate, which is chosen if its
+            estimate is no larger.  No plans are estimated unless the row counters of every
+            layer are valid, since the estimates would otherwise scan the indexes.
+        '''
+        plans = (plan,) + tuple(alts)
+        counts = [None for _ in plans]
+
+        async def estimate(estfunc, maxsize):
+            try:
+                return await estfunc(maxsize=maxsize)
+            except asyncio.CancelledError: # pragma: no cover
+                raise
+            except Exception:
+                # the plan may not be estimated (or executed) by index
+                return None
+
+        if runt.snap.hasRowCounts():
+
+            best = None
+            for probes in (False, True):
+
+                for i, (desc, estfunc, liftfunc, isprobe) in enumerate(plans):
+
+                    if i == 0 or isprobe != probes:
+                        continue
+
+                    maxsize = None
+                    if best is not None:
+                        maxsize = best + 1
+
+                    count = counts[i] = await estimate(estfunc, maxsize)
+                    if count is not None and (best is None or count < best):
+                        best = count
+
+            # the lift as written only needs to be counted until it ties the best alternate
+            if best is not None:
+                counts[0] = await estimate(plan[1], best)
+
+        choice = 0
+
+        altcounts = [(count, i) for (i, count) in enumerate(counts) if i > 0 and count is not None]
+        if altcounts:
+            count, i = min(altcounts)
+            if counts[0] is None or count <= counts[0]:
+                choice = i
+
+        desc, estfunc, liftfunc, isprobe = plans[choice]
+
+        rows = 0
+        async for node in liftfunc():
+            rows += 1
+            yield node
+
+        if runt.getOpt('explain'):
+            estimates = [(p[0], c) for (p, c) in zip(plans, counts)]
+            await runt.snap.fire('storm:explain', plan=desc, estimate=counts[choice], rows=rows, plans=estimates)
+
 class YieldValu(Oper):
 
     async def run(self, runt, genr):
@@ -1057,6 +1217,29 @@ class LiftTag(LiftOper):
 
             return
 
+        # a form filter limits the tag lift to the tag rows of that form
+        alts = []
+        async for hint in self.getRightHints(runt, path):
+            if hint[0] == 'form':
+                formname = hint[1].get('name')
+                alts.append((
+                    f'{formname}#{tag}',
+                    functools.partial(runt.snap.getTagEstimate, tag, form=formname),
+                    functools.partial(runt.snap.nodesByTag, tag, form=formname),
+                    False,
+                ))
+
+        if alts:
+            plan = (
+                f'#{tag}',
+                functools.partial(runt.snap.getTagEstimate, tag),
+                functools.partial(runt.snap.nodesByTag, tag),
+                False,
+            )
+            async for node in self.planLift(runt, plan, alts):
+                yield node
+            return
+
         async for node in runt.snap.nodesByTag(tag):
             yield node
 
@@ -1197,62 +1380,21 @@ class LiftProp(LiftOper):
 
         # check if we can optimize a form lift
         if prop.isform:
-            async for hint in self.getRightHints(runt, path):
-                if hint[0] == 'tag':
-                    tagname = hint[1].get('name')
-                    async for node in runt.snap.nodesByTag(tagname, form=name):
-                        yield node
-                    return
-
-                if hint[0] == 'relprop':
-                    relpropname = hint[1].get('name')
-                    isuniv = hint[1].get('univ')
-
-                    if isuniv:
-                        fullname = ''.join([name, relpropname])
-                    else:
-                        fullname = ':'.join([name, relpropname])
-
-                    prop = runt.model.prop(fullname)
-                    if prop is None:
-                        continue
-
-                    cmpr = hint[1].get('cmpr')
-                    valu = hint[1].get('valu')
-
-                    if cmpr is not None and valu is not None:
-                        try:
-                            # try lifting by valu but no guarantee a cmpr is available
-                            async for node in runt.snap.nodesByPropValu(fullname, cmpr, valu):
-                                yield node
-                            return
-                        except asyncio.CancelledError: # pragma: no cover
-                            raise
-                        except:
-                            pass
-
-                    async for node in runt.snap.nodesByProp(fullname):
-                        yield node
-                    return
+            alts = await self.getHintPlans(runt, path, name)
+            if alts:
+                plan = (
+                    name,
+                    functools.partial(runt.snap.getPropEstimate, name),
+                    functools.partial(runt.snap.nodesByProp, name),
+                    False,
+                )
+                async for node in self.planLift(runt, plan, alts):
+                    yield node
+                return
 
         async for node in runt.snap.nodesByProp(name):
             yield node
 
-    async def getRightHints(self, runt, path):
-
-        for oper in self.iterright():
-
-            # we can skip other lifts but that's it...
-            if isinstance(oper, LiftOper):
-                continue
-
-            if isinstance(oper, FiltOper):
-                for hint in await oper.getLiftHints(runt, path):
-                    yield hint
-                continue
-
-            return
-
 class LiftPropBy(LiftOper):
 
     async def lift(self, runt, path):
@@ -1261,6 +1403,43 @@ class LiftPropBy(LiftOper):
         cmpr = await self.kids[1].compute(runt, path)
         valu = await self.kids[2].compute(runt, path)
 
+        # check if a filter provides a cheaper lift for a simple value comparison
+        prop = runt.model.prop(name)
+        if prop is not None and (prop.isform or prop.form is not None) and isSimpleCmpr(prop.type, cmpr):
+
+            formname = prop.name if prop.isform else prop.form.name
+
+            alts = await self.getHintPlans(runt, path, formname)
+            if alts:
+                plan = (
+                    f'{name}{cmpr}{valu}',
+                    functools.partial(runt.snap.getPropEstimate, name, cmpr=cmpr, valu=valu),
+                    functools.partial(runt.snap.nodesByPropValu, name, cmpr, valu),
+                    True,
+                )
+
+                # nodes from the alternate plans must also match the lift as written
+                filt = prop.type.getCmprCtor(cmpr)(valu)
+
+                def getvalu(node):
+                    if prop.isform:
+                        return node.ndef[1]
+                    return node.get(prop.name)
+
+                def wrap(liftfunc):
+                    async def genr():
+                        async for node in liftfunc():
+                            nval = getvalu(node)
+                            if nval is not None and filt(nval):
+                                yield node
+                    return genr
+
+                alts = [(desc, estfunc, wrap(liftfunc), isprobe) for (desc, estfunc, liftfunc, isprobe) in alts]
+
+                async for node in self.planLift(runt, plan, alts):
+                    yield node
+                return
+
         async for node in runt.snap.nodesByPropValu(name, cmpr, valu):
             yield node
 
@@ -1372,9 +1551,9 @@ class N1WalkNPivo(PivotOut):
             async for item in self.getPivsOut(runt, node, path):
                 yield item
 
-            async for (verb, iden) in node.iterEdgesN1():
-                wnode = await runt.snap.getNodeByBuid(s_common.uhex(iden))
-                if wnode is not None:
+            async for edges in s_coro.chunks(node.iterEdgesN1(), size=s_snap.WALK_CHUNKSIZE):
+                buids = [s_common.uhex(iden) for _, iden in edges]
+                async for wnode in runt.snap.iterNodesByBuids(buids):
                     yield wnode, path.fork(wnode)
 
 class PivotToTags(PivotOper):
@@ -1472,15 +1651,8 @@ class PivotIn(PivotOper):
 
             return
 
-        name, valu = node.ndef
-
-        for prop in runt.model.propsbytype.get(name, ()):
-            async for pivo in runt.snap.nodesByPropValu(prop.full, '=', valu):
-                yield pivo, path.fork(pivo)
-
-        for prop in runt.model.arraysbytype.get(name, ()):
-            async for pivo in runt.snap.nodesByPropArray(prop.full, '=', valu):
-                yield pivo, path.fork(pivo)
+        async for pivo in runt.snap.nodesByRefs(node.ndef):
+            yield pivo, path.fork(pivo)
 
 class N2WalkNPivo(PivotIn):
 
@@ -1491,9 +1663,9 @@ class N2WalkNPivo(PivotIn):
             async for item in self.getPivsIn(runt, node, path):
                 yield item
 
-            async for (verb, iden) in node.iterEdgesN2():
-                wnode = await runt.snap.getNodeByBuid(s_common.uhex(iden))
-                if wnode is not None:
+            async for edges in s_coro.chunks(node.iterEdgesN2(), size=s_snap.WALK_CHUNKSIZE):
+                buids = [s_common.uhex(iden) for _, iden in edges]
+                async for wnode in runt.snap.iterNodesByBuids(buids):
                     yield wnode, path.fork(wnode)
 
 class PivotInFrom(PivotOper):
@@ -1869,6 +2041,107 @@ class Value(AstNode):
 
         return cond
 
+    def getCondCost(self):
+        '''
+        Return the relative cost of evaluating the value as a condition for each node.
+        '''
+        return 2
+
+def isConstValu(valu):
+    '''
+    Returns True if the value AST node always computes the same value.
+    '''
+    if isinstance(valu, EmbedQuery):
+        return False
+
+    if isinstance(valu, Const):
+        return True
+
+    if isinstance(valu, (List, DollarExpr, ExprNode, UnaryExprNode, ExprOrNode, ExprAndNode)):
+        return all(isConstValu(k) for k in valu.kids)
+
+    return False
+
+def isPureCond(cond):
+    '''
+    Returns True if evaluating the condition may not have side effects.
+    '''
+    clss = (SubqCond, FuncCall, EmbedQuery)
+    return not isinstance(cond, clss) and not cond.hasAstClass(clss)
+
+def cmprkey(valu):
+    '''
+    Return a hashable key for a comparison value or None if it may not be cached.
+    '''
+    if valu is None or isinstance(valu, (str, int, float, bytes)):
+        return (type(valu), valu)
+
+    if isinstance(valu, (list, tuple)):
+
+        keys = []
+        for item in valu:
+            key = cmprkey(item)
+            if key is None:
+                return None
+            keys.append(key)
+
+        return (type(valu), tuple(keys))
+
+    return None
+
+class CondValu:
+    '''
+    The right hand side value of a condition, compiled once per filter run.
+
+    Constant values are only computed once and the comparator functions built
+    from the values are cached so the (potentially expensive) comparator ctors
+    are not called for every node.
+    '''
+    def __init__(self, runt, kid, size=1000):
+
+        self.kid = kid
+        self.runt = runt
+        self.isconst = isConstValu(kid)
+
+        self.constval = s_common.novalu
+        self.constfuncs = {}
+
+        self.funcs = s_cache.LruDict(size)
+
+    async def compute(self, path):
+
+        if not self.isconst:
+            return await self.kid.compute(self.runt, path)
+
+        if self.constval is s_common.novalu:
+            self.constval = await self.kid.compute(self.runt, None)
+
+        return self.constval
+
+    async def getCmprFunc(self, ctor, path):
+        '''
+        Return the comparator function built by ctor for the value.
+        '''
+        if self.isconst:
+            func = self.constfuncs.get(ctor)
+            if func is None:
+                func = self.constfuncs[ctor] = ctor(await self.compute(path))
+            return func
+
+        valu = await self.compute(path)
+
+        key = cmprkey(valu)
+        if key is None:
+            return ctor(valu)
+
+        key = (ctor, key)
+
+        func = self.funcs.get(key)
+        if func is None:
+            func = self.funcs[key] = ctor(valu)
+
+        return func
+
 class Cond(Value):
     '''
     A condition that is evaluated to filter nodes.
@@ -1877,6 +2150,31 @@ class Cond(Value):
     # due to the fact that Cond instances may always presume
     # they are being evaluated per node.
 
+    def getCondCost(self):
+        return 1
+
+    def getCondKids(self):
+        '''
+        Yield the operands of a chain of the same boolean condition (a and b and c).
+        '''
+        for kid in self.kids:
+            if type(kid) is type(self):
+                yield from kid.getCondKids()
+            else:
+                yield kid
+
+    def getCondOrder(self):
+        '''
+        Return the operands of a boolean condition with the cheapest to evaluate first.
+
+        Operands which may have side effects (subqueries and function calls) are
+        always evaluated in the order they were written.
+        '''
+        kids = list(self.getCondKids())
+        if all(isPureCond(k) for k in kids):
+            kids.sort(key=lambda k: k.getCondCost())
+        return kids
+
 class SubqCond(Cond):
 
     def __init__(self, kids=()):
@@ -1897,12 +2195,15 @@ class SubqCond(Cond):
             yield size, item
             size += 1
 
-    def _subqCondEq(self, runt):
+    def getCondCost(self):
+        return 4
+
+    def _subqCondEq(self, runt, valukid):
 
         async def cond(node, path):
 
             size = 0
-            valu = s_stormtypes.intify(await self.kids[2].compute(runt, path))
+            valu = s_stormtypes.intify(await valukid.compute(path))
 
             async for size, item in self._runSubQuery(runt, node, path):
                 if size > valu:
@@ -1912,11 +2213,11 @@ class SubqCond(Cond):
 
         return cond
 
-    def _subqCondGt(self, runt):
+    def _subqCondGt(self, runt, valukid):
 
         async def cond(node, path):
 
-            valu = s_stormtypes.intify(await self.kids[2].compute(runt, path))
+            valu = s_stormtypes.intify(await valukid.compute(path))
             async for size, item in self._runSubQuery(runt, node, path):
                 if size > valu:
                     return True
@@ -1925,11 +2226,11 @@ class SubqCond(Cond):
 
         return cond
 
-    def _subqCondLt(self, runt):
+    def _subqCondLt(self, runt, valukid):
 
         async def cond(node, path):
 
-            valu = s_stormtypes.intify(await self.kids[2].compute(runt, path))
+            valu = s_stormtypes.intify(await valukid.compute(path))
             async for size, item in self._runSubQuery(runt, node, path):
                 if size >= valu:
                     return False
@@ -1938,11 +2239,11 @@ class SubqCond(Cond):
 
         return cond
 
-    def _subqCondGe(self, runt):
+    def _subqCondGe(self, runt, valukid):
 
         async def cond(node, path):
 
-            valu = s_stormtypes.intify(await self.kids[2].compute(runt, path))
+            valu = s_stormtypes.intify(await valukid.compute(path))
             async for size, item in self._runSubQuery(runt, node, path):
                 if size >= valu:
                     return True
@@ -1951,11 +2252,11 @@ class SubqCond(Cond):
 
         return cond
 
-    def _subqCondLe(self, runt):
+    def _subqCondLe(self, runt, valukid):
 
         async def cond(node, path):
 
-            valu = s_stormtypes.intify(await self.kids[2].compute(runt, path))
+            valu = s_stormtypes.intify(await valukid.compute(path))
             async for size, item in self._runSubQuery(runt, node, path):
                 if size > valu:
                     return False
@@ -1964,12 +2265,12 @@ class SubqCond(Cond):
 
         return cond
 
-    def _subqCondNe(self, runt):
+    def _subqCondNe(self, runt, valukid):
 
         async def cond(node, path):
 
             size = 0
-            valu = s_stormtypes.intify(await self.kids[2].compute(runt, path))
+            valu = s_stormtypes.intify(await valukid.compute(path))
 
             async for size, item in self._runSubQuery(runt, node, path):
                 if size > valu:
@@ -1987,7 +2288,7 @@ class SubqCond(Cond):
             if ctor is None:
                 raise s_exc.NoSuchCmpr(cmpr=cmpr, type='subquery')
 
-            return ctor(runt)
+            return ctor(runt, CondValu(runt, self.kids[2]))
 
         subq = self.kids[0]
 
@@ -2003,17 +2304,20 @@ class OrCond(Cond):
     '''
     <cond> or <cond>
     '''
+    def getCondCost(self):
+        return max(k.getCondCost() for k in self.kids)
+
     async def getCondEval(self, runt):
 
-        cond0 = await self.kids[0].getCondEval(runt)
-        cond1 = await self.kids[1].getCondEval(runt)
+        conds = [await k.getCondEval(runt) for k in self.getCondOrder()]
 
         async def cond(node, path):
 
-            if await cond0(node, path):
-                return True
+            for func in conds:
+                if await func(node, path):
+                    return True
 
-            return await cond1(node, path)
+            return False
 
         return cond
 
@@ -2023,20 +2327,23 @@ class AndCond(Cond):
     '''
     async def getLiftHints(self, runt, path):
         h0 = await self.kids[0].getLiftHints(runt, path)
-        h1 = await self.kids[0].getLiftHints(runt, path)
-        return h0 + h1
+        h1 = await self.kids[1].getLiftHints(runt, path)
+        return tuple(h0) + tuple(h1)
+
+    def getCondCost(self):
+        return max(k.getCondCost() for k in self.kids)
 
     async def getCondEval(self, runt):
 
-        cond0 = await self.kids[0].getCondEval(runt)
-        cond1 = await self.kids[1].getCondEval(runt)
+        conds = [await k.getCondEval(runt) for k in self.getCondOrder()]
 
         async def cond(node, path):
 
-            if not await cond0(node, path):
-                return False
+            for func in conds:
+                if not await func(node, path):
+                    return False
 
-            return await cond1(node, path)
+            return True
 
         return cond
 
@@ -2044,6 +2351,8 @@ class NotCond(Cond):
     '''
     not <cond>
     '''
+    def getCondCost(self):
+        return self.kids[0].getCondCost()
 
     async def getCondEval(self, runt):
 
@@ -2073,10 +2382,36 @@ class TagCond(Cond):
             ('tag', {'name': await kid.compute(None, None)}),
         )
 
+    def getCondCost(self):
+        kid = self.kids[0]
+        if isinstance(kid, TagMatch) and kid.isconst and not kid.hasglob():
+            return 0
+        return 1
+
     async def getCondEval(self, runt):
 
         assert len(self.kids) == 1
 
+        kid = self.kids[0]
+        if isinstance(kid, TagMatch) and kid.isconst:
+
+            name = await kid.compute(runt, None)
+            if name == '*':
+                async def cond(node, path):
+                    return bool(node.tags)
+                return cond
+
+            if '*' in name:
+                reobj = s_cache.getTagGlobRegx(name)
+
+                async def cond(node, path):
+                    return any(reobj.fullmatch(p) for p in node.tags)
+                return cond
+
+            async def cond(node, path):
+                return node.tags.get(name) is not None
+            return cond
+
         # kid is a non-runtsafe VarValue: dynamically evaluate value of variable for each node
         async def cond(node, path):
             name = await self.kids[0].compute(runt, path)
@@ -2093,6 +2428,12 @@ class TagCond(Cond):
 
 class HasRelPropCond(Cond):
 
+    def getCondCost(self):
+        relprop = self.kids[0]
+        if not relprop.isconst or '::' in relprop.kids[0].value():
+            return 3
+        return 0
+
     async def getCondEval(self, runt):
 
         relprop = self.kids[0]
@@ -2167,6 +2508,9 @@ class HasRelPropCond(Cond):
 
 class HasTagPropCond(Cond):
 
+    def getCondCost(self):
+        return 0
+
     async def getCondEval(self, runt):
 
         async def cond(node, path):
@@ -2177,6 +2521,29 @@ class HasTagPropCond(Cond):
 
 class HasAbsPropCond(Cond):
 
+    def getCondCost(self):
+        return 0
+
+    async def getLiftHints(self, runt, path):
+
+        name = await self.kids[0].compute(runt, None)
+
+        prop = runt.model.props.get(name)
+        if prop is None:
+            return []
+
+        if prop.isform:
+            return (
+                ('form', {'name': prop.name}),
+            )
+
+        if prop.form is None:
+            return []
+
+        return (
+            ('form', {'name': prop.form.name}),
+        )
+
     async def getCondEval(self, runt):
 
         name = await self.kids[0].compute(runt, None)
@@ -2208,6 +2575,8 @@ class ArrayCond(Cond):
         name = await self.kids[0].compute(runt, None)
         cmpr = await self.kids[1].compute(runt, None)
 
+        valukid = CondValu(runt, self.kids[2])
+
         async def cond(node, path):
 
             prop = node.form.props.get(name)
@@ -2225,9 +2594,9 @@ class ArrayCond(Cond):
             if items is None:
                 return False
 
-            val2 = await self.kids[2].compute(runt, path)
+            func = await valukid.getCmprFunc(ctor, path)
             for item in items:
-                if ctor(val2)(item):
+                if func(item):
                     return True
 
             return False
@@ -2249,6 +2618,8 @@ class AbsPropCond(Cond):
         if ctor is None:
             raise s_exc.NoSuchCmpr(cmpr=cmpr, name=prop.type.name)
 
+        valukid = CondValu(runt, self.kids[2])
+
         if prop.isform:
 
             async def cond(node, path):
@@ -2256,10 +2627,8 @@ class AbsPropCond(Cond):
                 if node.ndef[0] != name:
                     return False
 
-                val1 = node.ndef[1]
-                val2 = await self.kids[2].compute(runt, path)
-
-                return ctor(val2)(val1)
+                func = await valukid.getCmprFunc(ctor, path)
+                return func(node.ndef[1])
 
             return cond
 
@@ -2268,8 +2637,8 @@ class AbsPropCond(Cond):
             if val1 is None:
                 return False
 
-            val2 = await self.kids[2].compute(runt, path)
-            return ctor(val2)(val1)
+            func = await valukid.getCmprFunc(ctor, path)
+            return func(val1)
 
         return cond
 
@@ -2286,11 +2655,13 @@ class TagValuCond(Cond):
         if cmprctor is None:
             raise s_exc.NoSuchCmpr(cmpr=cmpr, name=ival.name)
 
+        valukid = CondValu(runt, rnode)
+
         if isinstance(lnode, VarValue) or not lnode.isconst:
             async def cond(node, path):
                 name = await lnode.compute(runt, path)
-                valu = await rnode.compute(runt, path)
-                return cmprctor(valu)(node.tags.get(name))
+                func = await valukid.getCmprFunc(cmprctor, path)
+                return func(node.tags.get(name))
 
             return cond
 
@@ -2309,8 +2680,8 @@ class TagValuCond(Cond):
 
         # it's a runtime value...
         async def cond(node, path):
-            valu = await self.kids[2].compute(runt, path)
-            return cmprctor(valu)(node.tags.get(name))
+            func = await valukid.getCmprFunc(cmprctor, path)
+            return func(node.tags.get(name))
 
         return cond
 
@@ -2318,22 +2689,29 @@ class RelPropCond(Cond):
     '''
     :foo:bar <cmpr> <value>
     '''
+    def getCondCost(self):
+        relprop = self.kids[0].kids[0]
+        if not relprop.isconst or '::' in relprop.kids[0].value():
+            return 3
+        return 1
+
     async def getCondEval(self, runt):
 
         cmpr = await self.kids[1].compute(runt, None)
 
+        valukid = CondValu(runt, self.kids[2])
+
         async def cond(node, path):
 
             prop, valu = await self.kids[0].getPropAndValu(runt, path)
             if valu is None:
                 return False
 
-            xval = await self.kids[2].compute(runt, path)
             ctor = prop.type.getCmprCtor(cmpr)
             if ctor is None:
                 raise s_exc.NoSuchCmpr(cmpr=cmpr, name=prop.type.name)
-            func = ctor(xval)
 
+            func = await valukid.getCmprFunc(ctor, path)
             return func(valu)
 
         return cond
@@ -2366,6 +2744,8 @@ class TagPropCond(Cond):
 
         cmpr = await self.kids[1].compute(runt, None)
 
+        valukid = CondValu(runt, self.kids[2])
+
         async def cond(node, path):
 
             tag, name = await self.kids[0].compute(runt, path)
@@ -2375,9 +2755,6 @@ class TagPropCond(Cond):
                 mesg = f'No such tag property: {name}'
                 raise s_exc.NoSuchTagProp(name=name, mesg=mesg)
 
-            # TODO cache on (cmpr, valu) for perf?
-            valu = await self.kids[2].compute(runt, path)
-
             ctor = prop.type.getCmprCtor(cmpr)
             if ctor is None:
                 raise s_exc.NoSuchCmpr(cmpr=cmpr, name=prop.type.name)
@@ -2385,7 +2762,9 @@ class TagPropCond(Cond):
             curv = node.getTagProp(tag, name)
             if curv is None:
                 return False
-            return ctor(valu)(curv)
+
+            func = await valukid.getCmprFunc(ctor, path)
+            return func(curv)
 
         return cond
 
@@ -3057,10 +3436,9 @@ class EditUnivDel(Edit):
 class N1Walk(Oper):
 
     async def walkNodeEdges(self, runt, node, verb=None):
-        async for _, iden in node.iterEdgesN1(verb=verb):
-            buid = s_common.uhex(iden)
-            walknode = await runt.snap.getNodeByBuid(buid)
-            if walknode is not None:
+        async for edges in s_coro.chunks(node.iterEdgesN1(verb=verb), size=s_snap.WALK_CHUNKSIZE):
+            buids = [s_common.uhex(iden) for _, iden in edges]
+            async for walknode in runt.snap.iterNodesByBuids(buids):
                 yield walknode
 
     async def run(self, runt, genr):
@@ -3125,10 +3503,9 @@ class N1Walk(Oper):
 class N2Walk(N1Walk):
 
     async def walkNodeEdges(self, runt, node, verb=None):
-        async for _, iden in node.iterEdgesN2(verb=verb):
-            buid = s_common.uhex(iden)
-            walknode = await runt.snap.getNodeByBuid(buid)
-            if walknode is not None:
+        async for edges in s_coro.chunks(node.iterEdgesN2(verb=verb), size=s_snap.WALK_CHUNKSIZE):
+            buids = [s_common.uhex(iden) for _, iden in edges]
+            async for walknode in runt.snap.iterNodesByBuids(buids):
                 yield walknode
 
 class EditEdgeAdd(Edit):
@@ -32,6 +32,22 @@ async def agen(item):
     for x in item:
         yield x
 
+async def chunks(genr, size=100):
+    '''
+    Yield lists of up to size items from an async generator.
+    '''
+    retn = []
+    async for item in genr:
+
+        retn.append(item)
+
+        if len(retn) >= size:
+            yield retn
+            retn = []
+
+    if retn:
+        yield retn
+
 def executor(func, *args, **kwargs):
     '''
     Execute a non-coroutine function in the ioloop executor pool.
@@ -1,4 +1,5 @@
 import json
+import zlib
 import base64
 import asyncio
 import logging
@@ -17,6 +18,138 @@ import synapse.lib.hiveauth as s_hiveauth
 
 logger = logging.getLogger(__name__)
 
+STREAM_MAXSIZE = 256 * 1024 # bytes of buffered messages which trigger a flush
+STREAM_MAXWAIT = 0.25 # seconds a buffered message may wait for a flush
+
+streamformats = {
+    # the legacy format sends each message as a json object in its own chunk
+    'json': (None, lambda mesg: json.dumps(mesg).encode()),
+    'ndjson': ('application/x-ndjson', lambda mesg: json.dumps(mesg).encode() + b'\n'),
+    'msgpack': ('application/x-msgpack', s_msgpack.en),
+}
+
+class StreamWriter:
+    '''
+    Buffer encoded messages for a streaming HTTP response and write them in chunks.
+
+    Buffered messages are written once they total maxsize bytes or once the
+    oldest of them has waited maxwait seconds.  Each write waits for the
+    data to be flushed to the client, so a slow client slows the producer
+    rather than growing the buffer.
+    '''
+    def __init__(self, handler, fmt, gzip=False, ctype=None, maxsize=STREAM_MAXSIZE, maxwait=STREAM_MAXWAIT):
+
+        self.handler = handler
+        self.maxsize = maxsize
+        self.maxwait = maxwait
+
+        deftype, self.encode = streamformats[fmt]
+        if ctype is None:
+            ctype = deftype
+
+        self.bufs = []
+        self.size = 0
+        self.timer = None
+        self.written = False
+
+        self.zlib = None
+        if gzip:
+            self.zlib = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)
+            handler.set_header('Content-Encoding', 'gzip')
+
+        if ctype is not None:
+            handler.set_header('Content-Type', ctype)
+
+    async def put(self, mesg):
+
+        byts = self.encode(mesg)
+
+        self.bufs.append(byts)
+        self.size += len(byts)
+
+        if self.size >= self.maxsize:
+            await self.flush()
+            return
+
+        if self.timer is None:
+            self.timer = asyncio.get_running_loop().create_task(self._flushAfter())
+
+    async def flush(self):
+
+        self.cancel()
+
+        self._write()
+        await self.handler.flush()
+
+    async def close(self):
+        '''
+        Write any buffered messages and the end of the gzip stream.
+        '''
+        self.cancel()
+
+        self._write()
+
+        if self.zlib is not None:
+            self.handler.write(self.zlib.flush())
+            self.zlib = None
+
+    def discard(self):
+        '''
+        Drop any buffered messages and headers so the handler may send a different response.
+
+        Returns:
+            bool: False if data has already been written to the client.
+        '''
+        if self.written:
+            return False
+
+        self.cancel()
+
+        self.bufs.clear()
+        self.size = 0
+
+        self.zlib = None
+        self.handler.clear_header('Content-Encoding')
+        return True
+
+    def cancel(self):
+        '''
+        Cancel a pending timed flush of the buffered messages.
+        '''
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+
+    async def _flushAfter(self):
+
+        await asyncio.sleep(self.maxwait)
+
+        # once the timer fires, flush() must not cancel it mid-write
+        self.timer = None
+
+        try:
+            self._write()
+            await self.handler.flush()
+        except Exception as e:
+            # the next put() or close() will raise for a closed stream
+            logger.debug(f'StreamWriter timed flush failed: {e}')
+
+    def _write(self):
+
+        if not self.bufs:
+            return
+
+        byts = b''.join(self.bufs)
+
+        self.bufs.clear()
+        self.size = 0
+
+        if self.zlib is not None:
+            byts = self.zlib.compress(byts) + self.zlib.flush(zlib.Z_SYNC_FLUSH)
+
+        self.written = True
+        self.handler.write(byts)
+
 class Sess(s_base.Base):
 
     async def __anit__(self, cell, iden):
@@ -107,6 +240,32 @@ class HandlerBase:
             self.sendRestErr('SchemaViolation', 'Invalid JSON content.')
             return None
 
+    def getStreamWriter(self, body, fmt, ctype=None):
+        '''
+        Get a StreamWriter using the "stream" and "gzip" options from a request body.
+
+        Args:
+            body (dict): The request body.
+            fmt (str): The default stream format.
+            ctype (str): Override the Content-Type for the default stream format.
+
+        Returns:
+            StreamWriter: The writer, or None if the options were invalid and an error was sent.
+        '''
+        name = body.get('stream', fmt)
+        if name not in streamformats:
+            self.sendRestErr('BadArg', f'Invalid stream format: {name}. Use one of: {", ".join(streamformats)}')
+            return None
+
+        if name != fmt:
+            ctype = None
+
+        maxsize = STREAM_MAXSIZE
+        if name == 'json':
+            maxsize = 0
+
+        return StreamWriter(self, name, gzip=bool(body.get('gzip')), ctype=ctype, maxsize=maxsize)
+
     def sendAuthReqired(self):
         self.set_header('WWW-Authenticate', 'Basic realm=synapse')
         self.set_status(401)
@@ -329,9 +488,19 @@ class StormNodesV1(Handler):
         opts = await self._reqValidOpts(opts)
 
         view = self.cell._viewFromOpts(opts)
-        async for pode in view.iterStormPodes(query, opts=opts):
-            self.write(json.dumps(pode))
-            await self.flush()
+
+        stream = self.getStreamWriter(body, 'json')
+        if stream is None:
+            return
+
+        try:
+            async for pode in view.iterStormPodes(query, opts=opts):
+                await stream.put(pode)
+
+            await stream.close()
+
+        finally:
+            stream.cancel()
 
 class StormV1(Handler):
 
@@ -354,9 +523,18 @@ class StormV1(Handler):
 
         await self.cell.boss.promote('storm', user=user, info={'query': query})
 
-        async for mesg in self.cell.storm(query, opts=opts):
-            self.write(json.dumps(mesg))
-            await self.flush()
+        stream = self.getStreamWriter(body, 'json')
+        if stream is None:
+            return
+
+        try:
+            async for mesg in self.cell.storm(query, opts=opts):
+                await stream.put(mesg)
+
+            await stream.close()
+
+        finally:
+            stream.cancel()
 
 class StormCallV1(Handler):
 
@@ -406,14 +584,26 @@ class StormExportV1(Handler):
         # Maintain backwards compatibility with 0.1.x output
         opts = await self._reqValidOpts(opts)
 
+        stream = self.getStreamWriter(body, 'msgpack', ctype='application/x-synapse-nodes')
+        if stream is None:
+            return
+
         try:
-            self.set_header('Content-Type', 'application/x-synapse-nodes')
             async for pode in self.cell.exportStorm(query, opts=opts):
-                self.write(s_msgpack.en(pode))
+                await stream.put(pode)
 
         except Exception as e:
+            # once part of the export is sent, the client sees a truncated stream
+            if not stream.discard():
+                raise
             return self.sendRestExc(e)
 
+        else:
+            await stream.close()
+
+        finally:
+            stream.cancel()
+
 class ReqValidStormV1(Handler):
 
     async def post(self):
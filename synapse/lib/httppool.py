@@ -0,0 +1,120 @@
+import logging
+import collections
+
+import aiohttp
+import aiohttp_socks
+
+import synapse.lib.base as s_base
+
+logger = logging.getLogger(__name__)
+
+POOL_LIMIT = 100            # max open connections per connector
+POOL_LIMIT_PER_HOST = 8     # max open connections per (host, port, ssl)
+POOL_KEEPALIVE = 15.0       # seconds an idle connection is kept open
+POOL_DNSTTL = 300           # seconds a DNS lookup is cached
+
+class HttpPool(s_base.Base):
+    '''
+    A set of long lived aiohttp connectors shared by the HTTP clients of a cell.
+
+    Connectors are keyed by proxy URL and SSL verification setting so that
+    connections, keep-alive and cached DNS lookups are reused across requests.
+    Each request uses its own short lived session (and cookie jar) on top of
+    the shared connector, so cookies set during a redirect chain are kept for
+    that request but never leak between requests made on behalf of different
+    users.
+    '''
+    async def __anit__(self, limit=POOL_LIMIT, limit_per_host=POOL_LIMIT_PER_HOST,
+                       keepalive=POOL_KEEPALIVE, dnsttl=POOL_DNSTTL):
+
+        await s_base.Base.__anit__(self)
+
+        self.connectors = {}
+        self.stats = collections.defaultdict(int)
+
+        self.connopts = {
+            'limit': limit,
+            'limit_per_host': limit_per_host,
+            'keepalive_timeout': keepalive,
+            'ttl_dns_cache': dnsttl,
+        }
+
+        self.trace = aiohttp.TraceConfig()
+        self.trace.on_request_start.append(self._onTraceStat('requests'))
+        self.trace.on_request_exception.append(self._onTraceStat('errors'))
+        self.trace.on_connection_create_end.append(self._onTraceStat('conns:created'))
+        self.trace.on_connection_reuseconn.append(self._onTraceStat('conns:reused'))
+        self.trace.on_dns_cache_hit.append(self._onTraceStat('dns:hits'))
+        self.trace.on_dns_cache_miss.append(self._onTraceStat('dns:misses'))
+
+        async def fini():
+            for connector in self.connectors.values():
+                await connector.close()
+            self.connectors.clear()
+
+        self.onfini(fini)
+
+    def _onTraceStat(self, name):
+        async def func(sess, ctx, params):
+            self.stats[name] += 1
+        return func
+
+    def _getConnector(self, proxyurl, ssl):
+
+        key = (proxyurl, ssl)
+        connector = self.connectors.get(key)
+        if connector is not None and not connector.closed:
+            return connector
+
+        opts = dict(self.connopts)
+        if not ssl:
+            opts['ssl'] = False
+
+        if proxyurl is not None:
+            connector = aiohttp_socks.ProxyConnector.from_url(proxyurl, **opts)
+        else:
+            connector = aiohttp.TCPConnector(**opts)
+
+        self.connectors[key] = connector
+        return connector
+
+    def getSess(self, proxyurl=None, ssl=True):
+        '''
+        Get a new aiohttp.ClientSession which uses the pooled connector for a proxy URL and SSL verification setting.
+
+        Args:
+            proxyurl (str): An aiohttp-socks compatible proxy URL (or None).
+            ssl (bool): Set to False to disable SSL/TLS verification.
+
+        Notes:
+            The session has its own cookie jar (which also accepts cookies from IP
+            address hosts) and should be used for a single request.
+            Callers must close the session (for example using "async with"), which
+            leaves the pooled connector open.
+
+        Returns:
+            aiohttp.ClientSession: The session.
+        '''
+        connector = self._getConnector(proxyurl, bool(ssl))
+        cookies = aiohttp.CookieJar(unsafe=True)
+        return aiohttp.ClientSession(connector=connector, connector_owner=False, cookie_jar=cookies,
+                                     trace_configs=[self.trace])
+
+    def getPoolInfo(self):
+        '''
+        Get statistics about the pooled connectors.
+
+        Returns:
+            dict: The number of connectors and the request, connection and DNS cache counters.
+        '''
+        info = {
+            'connectors': len(self.connectors),
+            'requests': 0,
+            'errors': 0,
+            'conns:created': 0,
+            'conns:reused': 0,
+            'dns:hits': 0,
+            'dns:misses': 0,
+        }
+        info.update(self.stats)
+        return info
@@ -58,11 +58,15 @@ Storage Node (<sode>)
 '''
 import os
 import math
+import heapq
+import types
 import shutil
 import struct
 import asyncio
 import logging
+import tempfile
 import ipaddress
+import itertools
 import contextlib
 import collections
 
@@ -97,6 +101,9 @@ reqValidLdef = s_config.getJsValidator({
         'creator': {'type': 'string', 'pattern': s_config.re_iden},
         'lockmemory': {'type': 'boolean'},
         'logedits': {'type': 'boolean', 'default': True},
+        'logedits:maxage': {'type': ['integer', 'null'], 'minimum': 1},
+        'logedits:maxsize': {'type': ['integer', 'null'], 'minimum': 1},
+        'logedits:consumers': {'type': 'boolean'},
         'name': {'type': 'string'},
     },
     'additionalProperties': True,
@@ -125,17 +132,20 @@ class LayerApi(s_cell.CellApi):
     async def storNodeEdits(self, nodeedits, meta=None):
 
         await self._reqUserAllowed(self.writeperm)
+        self.cell._reqLayerNotMerging(self.layr)
 
         if meta is None:
             meta = {'time': s_common.now(),
                     'user': self.user.iden
                     }
 
-        return await self.layr.storNodeEdits(nodeedits, meta)
+        results = await self.layr.storNodeEditsNoLift(nodeedits, meta)
+        return [(buid, await self.layr.getStorNode(buid), edits) for buid, _, edits in results]
 
     async def storNodeEditsNoLift(self, nodeedits, meta=None):
 
         await self._reqUserAllowed(self.writeperm)
+        self.cell._reqLayerNotMerging(self.layr)
 
         if meta is None:
             meta = {'time': s_common.now(),
@@ -171,11 +181,47 @@ class LayerApi(s_cell.CellApi):
         await self._reqUserAllowed(self.liftperm)
         return await self.layr.getEditIndx()
 
+    async def getEditStartIndx(self):
+        '''
+        Returns the first nodeedit log index which has not been culled by the retention policy.
+        '''
+        await self._reqUserAllowed(self.liftperm)
+        return await self.layr.getEditStartIndx()
+
+    @s_cell.adminapi(log=True)
+    async def setNodeEditConsumer(self, name, offs):
+        '''
+        Record the next nodeedit log index needed by a named consumer.
+        '''
+        return await self.layr.setNodeEditConsumer(name, offs)
+
+    @s_cell.adminapi(log=True)
+    async def delNodeEditConsumer(self, name):
+        '''
+        Remove a named nodeedit log consumer.
+        '''
+        return await self.layr.delNodeEditConsumer(name)
+
     async def getIden(self):
         await self._reqUserAllowed(self.liftperm)
         return self.layr.iden
 
+    @s_cell.adminapi(log=True)
+    async def rebuildRowCounts(self):
+        '''
+        Rebuild the tag and prop row counters of the layer.
+        '''
+        return await self.layr.rebuildRowCounts()
+
+    @s_cell.adminapi(log=True)
+    async def rebuildRefIndex(self):
+        '''
+        Rebuild the reverse reference index of the layer.
+        '''
+        return await self.layr.rebuildRefIndex()
+
 BUID_CACHE_SIZE = 10000
+NODEEDIT_CULL_PERIOD = 60  # seconds between applying the nodeedit log retention policy
 
 STOR_TYPE_UTF8 = 1
 
@@ -230,6 +276,15 @@ EDIT_EDGE_DEL = 11    # (<etyp>, (<verb>, <destnodeiden>), ())
 
 EDIT_PROGRESS = 100   # (used by syncIndexEvents) (<etyp>, (), ())
 
+def getSodeView(sode):
+    '''
+    Return a read-only view of a storage node dict without copying it.
+
+    NOTE: The view reflects later changes to the nested props/tags/etc dicts.
+    '''
+    return types.MappingProxyType({k: types.MappingProxyType(v) if isinstance(v, dict) else v
+                                   for k, v in sode.items()})
+
 class IndxBy:
     '''
     IndxBy sub-classes encapsulate access methods and encoding details for
@@ -253,8 +308,17 @@ class IndxBy:
         for _, buid in self.layr.layrslab.scanByPref(self.abrv + indx, db=self.db):
             yield buid
 
+    def keyBuidsByDups(self, indx):
+        for _, buid in self.layr.layrslab.scanByDups(self.abrv + indx, db=self.db):
+            yield indx, buid
+
+    def keyBuidsByPref(self, indx=b''):
+        for lkey, buid in self.layr.layrslab.scanByPref(self.abrv + indx, db=self.db):
+            yield lkey[self.abrvlen:], buid
+
     def keyBuidsByRange(self, minindx, maxindx):
-        yield from self.layr.layrslab.scanByRange(self.abrv + minindx, self.abrv + maxindx, db=self.db)
+        for lkey, buid in self.layr.layrslab.scanByRange(self.abrv + minindx, self.abrv + maxindx, db=self.db):
+            yield lkey[self.abrvlen:], buid
 
     def buidsByRange(self, minindx, maxindx):
         yield from (x[1] for x in self.keyBuidsByRange(minindx, maxindx))
@@ -262,8 +326,21 @@ class IndxBy:
     def keyBuidsByRangeBack(self, minindx, maxindx):
         '''
         Yields backwards from maxindx to minindx
+
+        Notes:
+            The buids for each index value are yielded in ascending order so the rows may be merge sorted.
         '''
-        yield from self.layr.layrslab.scanByRangeBack(self.abrv + maxindx, lmin=self.abrv + minindx, db=self.db)
+        lastkey = None
+        for lkey, _ in self.layr.layrslab.scanByRangeBack(self.abrv + maxindx, lmin=self.abrv + minindx, db=self.db):
+
+            if lkey == lastkey:
+                continue
+
+            lastkey = lkey
+
+            indx = lkey[self.abrvlen:]
+            for _, buid in self.layr.layrslab.scanByDups(lkey, db=self.db):
+                yield indx, buid
 
     def buidsByRangeBack(self, minindx, maxindx):
         yield from (x[1] for x in self.keyBuidsByRangeBack(minindx, maxindx))
@@ -385,6 +462,13 @@ class StorType:
         self.lifters = {}
 
     async def indxBy(self, liftby, cmpr, valu):
+        async for _, buid in self.keyIndxBy(liftby, cmpr, valu):
+            yield buid
+
+    async def keyIndxBy(self, liftby, cmpr, valu):
+        '''
+        Yield (indx, buid) tuples in index order where indx is the index bytes without the layer specific abrv.
+        '''
         func = self.lifters.get(cmpr)
         if func is None:
             raise s_exc.NoSuchCmpr(cmpr=cmpr)
@@ -399,7 +483,7 @@ class StorType:
         except s_exc.NoSuchAbrv:
             return
 
-        async for item in self.indxBy(indxby, cmpr, valu):
+        async for item in self.keyIndxBy(indxby, cmpr, valu):
             yield item
 
     async def indxByProp(self, form, prop, cmpr, valu):
@@ -409,7 +493,7 @@ class StorType:
         except s_exc.NoSuchAbrv:
             return
 
-        async for item in self.indxBy(indxby, cmpr, valu):
+        async for item in self.keyIndxBy(indxby, cmpr, valu):
             yield item
 
     async def indxByPropArray(self, form, prop, cmpr, valu):
@@ -419,7 +503,7 @@ class StorType:
         except s_exc.NoSuchAbrv:
             return
 
-        async for item in self.indxBy(indxby, cmpr, valu):
+        async for item in self.keyIndxBy(indxby, cmpr, valu):
             yield item
 
     async def indxByTagProp(self, form, tag, prop, cmpr, valu):
@@ -429,7 +513,7 @@ class StorType:
         except s_exc.NoSuchAbrv:
             return
 
-        async for item in self.indxBy(indxby, cmpr, valu):
+        async for item in self.keyIndxBy(indxby, cmpr, valu):
             yield item
 
     def indx(self, valu):  # pragma: no cover
@@ -443,7 +527,7 @@ class StorType:
         regx = regex.compile(valu)
         lastbuid = None
 
-        for buid in liftby.buidsByPref():
+        for indx, buid in liftby.keyBuidsByPref():
             if buid == lastbuid:
                 continue
 
@@ -463,7 +547,7 @@ class StorType:
                 return False
 
             if regexin(regx, storvalu):
-                yield buid
+                yield indx, buid
 
 class StorTypeUtf8(StorType):
 
@@ -479,18 +563,18 @@ class StorTypeUtf8(StorType):
 
     async def _liftUtf8Eq(self, liftby, valu):
         indx = self._getIndxByts(valu)
-        for item in liftby.buidsByDups(indx):
+        for item in liftby.keyBuidsByDups(indx):
             yield item
 
     async def _liftUtf8Range(self, liftby, valu):
         minindx = self._getIndxByts(valu[0])
         maxindx = self._getIndxByts(valu[1])
-        for item in liftby.buidsByRange(minindx, maxindx):
+        for item in liftby.keyBuidsByRange(minindx, maxindx):
             yield item
 
     async def _liftUtf8Prefix(self, liftby, valu):
         indx = self._getIndxByts(valu)
-        for item in liftby.buidsByPref(indx):
+        for item in liftby.keyBuidsByPref(indx):
             yield item
 
     def _getIndxByts(self, valu):
@@ -537,12 +621,12 @@ class StorTypeHier(StorType):
 
     async def _liftHierEq(self, liftby, valu):
         indx = self.getHierIndx(valu)
-        for item in liftby.buidsByDups(indx):
+        for item in liftby.keyBuidsByDups(indx):
             yield item
 
     async def _liftHierPref(self, liftby, valu):
         indx = self.getHierIndx(valu)
-        for item in liftby.buidsByPref(indx):
+        for item in liftby.keyBuidsByPref(indx):
             yield item
 
 class StorTypeLoc(StorTypeHier):
@@ -600,7 +684,7 @@ class StorTypeFqdn(StorTypeUtf8):
 
         if valu[0] == '*':
             indx = self._getIndxByts(valu[1:][::-1])
-            for item in liftby.buidsByPref(indx):
+            for item in liftby.keyBuidsByPref(indx):
                 yield item
             return
 
@@ -630,13 +714,13 @@ class StorTypeIpv6(StorType):
 
     async def _liftIPv6Eq(self, liftby, valu):
         indx = self.getIPv6Indx(valu)
-        for item in liftby.buidsByDups(indx):
+        for item in liftby.keyBuidsByDups(indx):
             yield item
 
     async def _liftIPv6Range(self, liftby, valu):
         minindx = self.getIPv6Indx(valu[0])
         maxindx = self.getIPv6Indx(valu[1])
-        for item in liftby.buidsByRange(minindx, maxindx):
+        for item in liftby.keyBuidsByRange(minindx, maxindx):
             yield item
 
 class StorTypeInt(StorType):
@@ -681,7 +765,7 @@ class StorTypeInt(StorType):
             return
 
         pkey = indx.to_bytes(self.size, 'big')
-        for item in liftby.buidsByDups(pkey):
+        for item in liftby.keyBuidsByDups(pkey):
             yield item
 
     async def _liftIntGt(self, liftby, valu):
@@ -697,7 +781,7 @@ class StorTypeInt(StorType):
 
         pkeymin = minv.to_bytes(self.size, 'big')
         pkeymax = self.fullbyts
-        for item in liftby.buidsByRange(pkeymin, pkeymax):
+        for item in liftby.keyBuidsByRange(pkeymin, pkeymax):
             yield item
 
     async def _liftIntLt(self, liftby, valu):
@@ -713,7 +797,7 @@ class StorTypeInt(StorType):
 
         pkeymin = self.zerobyts
         pkeymax = maxv.to_bytes(self.size, 'big')
-        for item in liftby.buidsByRange(pkeymin, pkeymax):
+        for item in liftby.keyBuidsByRange(pkeymin, pkeymax):
             yield item
 
     async def _liftIntRange(self, liftby, valu):
@@ -727,7 +811,7 @@ class StorTypeInt(StorType):
 
         pkeymin = minv.to_bytes(self.size, 'big')
         pkeymax = maxv.to_bytes(self.size, 'big')
-        for item in liftby.buidsByRange(pkeymin, pkeymax):
+        for item in liftby.keyBuidsByRange(pkeymin, pkeymax):
             yield item
 
 class StorTypeHugeNum(StorType):
@@ -762,7 +846,7 @@ class StorTypeHugeNum(StorType):
 
     async def _liftHugeEq(self, liftby, valu):
         byts = self.getHugeIndx(valu)
-        for item in liftby.buidsByDups(byts):
+        for item in liftby.keyBuidsByDups(byts):
             yield item
 
     async def _liftHugeGt(self, liftby, valu):
@@ -778,19 +862,19 @@ class StorTypeHugeNum(StorType):
     async def _liftHugeGe(self, liftby, valu):
         pkeymin = self.getHugeIndx(valu)
         pkeymax = self.fullbyts
-        for item in liftby.buidsByRange(pkeymin, pkeymax):
+        for item in liftby.keyBuidsByRange(pkeymin, pkeymax):
             yield item
 
     async def _liftHugeLe(self, liftby, valu):
         pkeymin = self.zerobyts
         pkeymax = self.getHugeIndx(valu)
-        for item in liftby.buidsByRange(pkeymin, pkeymax):
+        for item in liftby.keyBuidsByRange(pkeymin, pkeymax):
             yield item
 
     async def _liftHugeRange(self, liftby, valu):
         pkeymin = self.getHugeIndx(valu[0])
         pkeymax = self.getHugeIndx(valu[1])
-        for item in liftby.buidsByRange(pkeymin, pkeymax):
+        for item in liftby.keyBuidsByRange(pkeymin, pkeymax):
             yield item
 
 class StorTypeFloat(StorType):
@@ -824,9 +908,17 @@ class StorTypeFloat(StorType):
     def decodeIndx(self, bytz):
         return self.FloatPacker.unpack(bytz)[0]
 
+    def _getSortIndx(self, indx):
+        '''
+        Negative floats pack into descending byte order, so flip them to allow merging lifts by index bytes.
+        '''
+        if indx[0] & 0x80:
+            return bytes(b ^ 0xff for b in indx)
+        return bytes((indx[0] | 0x80,)) + indx[1:]
+
     async def _liftFloatEq(self, liftby, valu):
-        for item in liftby.buidsByDups(self.fpack(valu)):
-            yield item
+        for indx, buid in liftby.keyBuidsByDups(self.fpack(valu)):
+            yield self._getSortIndx(indx), buid
 
     async def _liftFloatGeCommon(self, liftby, valu):
         if math.isnan(valu):
@@ -843,15 +935,15 @@ class StorTypeFloat(StorType):
             yield item
 
     async def _liftFloatGe(self, liftby, valu):
-        async for item in self._liftFloatGeCommon(liftby, valu):
-            yield item[1]
+        async for indx, buid in self._liftFloatGeCommon(liftby, valu):
+            yield self._getSortIndx(indx), buid
 
     async def _liftFloatGt(self, liftby, valu):
         valupack = self.fpack(valu)
-        async for item in self._liftFloatGeCommon(liftby, valu):
-            if item[0] == valupack:
+        async for indx, buid in self._liftFloatGeCommon(liftby, valu):
+            if indx == valupack:
                 continue
-            yield item[1]
+            yield self._getSortIndx(indx), buid
 
     async def _liftFloatLeCommon(self, liftby, valu):
         if math.isnan(valu):
@@ -869,15 +961,15 @@ class StorTypeFloat(StorType):
                 yield item
 
     async def _liftFloatLe(self, liftby, valu):
-        async for item in self._liftFloatLeCommon(liftby, valu):
-            yield item[1]
+        async for indx, buid in self._liftFloatLeCommon(liftby, valu):
+            yield self._getSortIndx(indx), buid
 
     async def _liftFloatLt(self, liftby, valu):
         valupack = self.fpack(valu)
-        async for item in self._liftFloatLeCommon(liftby, valu):
-            if item[0] == valupack:
+        async for indx, buid in self._liftFloatLeCommon(liftby, valu):
+            if indx == valupack:
                 continue
-            yield item[1]
+            yield self._getSortIndx(indx), buid
 
     async def _liftFloatRange(self, liftby, valu):
         valumin, valumax = valu
@@ -891,23 +983,23 @@ class StorTypeFloat(StorType):
 
         if math.copysign(1.0, valumin) > 0.0:
             # Entire range is nonnegative
-            for item in liftby.buidsByRange(pkeymin, pkeymax):
-                yield item
+            for indx, buid in liftby.keyBuidsByRange(pkeymin, pkeymax):
+                yield self._getSortIndx(indx), buid
             return
 
         if math.copysign(1.0, valumax) < 0.0:  # negative values and -0.0
             # Entire range is negative
-            for item in liftby.buidsByRangeBack(pkeymax, pkeymin):
-                yield item
+            for indx, buid in liftby.keyBuidsByRangeBack(pkeymax, pkeymin):
+                yield self._getSortIndx(indx), buid
             return
 
         # Yield all values between min and -0
-        for item in liftby.buidsByRangeBack(self.FloatPackNegMax, pkeymin):
-            yield item
+        for indx, buid in liftby.keyBuidsByRangeBack(self.FloatPackNegMax, pkeymin):
+            yield self._getSortIndx(indx), buid
 
         # Yield all values between 0 and max
-        for item in liftby.buidsByRange(self.FloatPackPosMin, pkeymax):
-            yield item
+        for indx, buid in liftby.keyBuidsByRange(self.FloatPackPosMin, pkeymax):
+            yield self._getSortIndx(indx), buid
 
 class StorTypeGuid(StorType):
 
@@ -919,7 +1011,7 @@ class StorTypeGuid(StorType):
 
     async def _liftGuidEq(self, liftby, valu):
         indx = s_common.uhex(valu)
-        for item in liftby.buidsByDups(indx):
+        for item in liftby.keyBuidsByDups(indx):
             yield item
 
     def indx(self, valu):
@@ -939,8 +1031,8 @@ class StorTypeTime(StorTypeInt):
     async def _liftAtIval(self, liftby, valu):
         minindx = self.getIntIndx(valu[0])
         maxindx = self.getIntIndx(valu[1] - 1)
-        for _, buid in liftby.scanByRange(minindx, maxindx):
-            yield buid
+        for item in liftby.keyBuidsByRange(minindx, maxindx):
+            yield item
 
 class StorTypeIval(StorType):
 
@@ -954,7 +1046,7 @@ class StorTypeIval(StorType):
 
     async def _liftIvalEq(self, liftby, valu):
         indx = self.timetype.getIntIndx(valu[0]) + self.timetype.getIntIndx(valu[1])
-        for item in liftby.buidsByDups(indx):
+        for item in liftby.keyBuidsByDups(indx):
             yield item
 
     async def _liftIvalAt(self, liftby, valu):
@@ -962,10 +1054,10 @@ class StorTypeIval(StorType):
         minindx = self.timetype.getIntIndx(valu[0])
         maxindx = self.timetype.getIntIndx(valu[1])
 
-        for lkey, buid in liftby.scanByPref():
+        for indx, buid in liftby.keyBuidsByPref():
 
-            tick = lkey[-16:-8]
-            tock = lkey[-8:]
+            tick = indx[-16:-8]
+            tock = indx[-8:]
 
             # check for non-ovelap left and right
             if tick >= maxindx:
@@ -974,7 +1066,7 @@ class StorTypeIval(StorType):
             if tock <= minindx:
                 continue
 
-            yield buid
+            yield indx, buid
 
     def indx(self, valu):
         return (self.timetype.getIntIndx(valu[0]) + self.timetype.getIntIndx(valu[1]),)
@@ -993,7 +1085,7 @@ class StorTypeMsgp(StorType):
 
     async def _liftMsgpEq(self, liftby, valu):
         indx = s_common.buid(valu)
-        for item in liftby.buidsByDups(indx):
+        for item in liftby.keyBuidsByDups(indx):
             yield item
 
     def indx(self, valu):
@@ -1015,7 +1107,7 @@ class StorTypeLatLon(StorType):
 
     async def _liftLatLonEq(self, liftby, valu):
         indx = self._getLatLonIndx(valu)
-        for item in liftby.buidsByDups(indx):
+        for item in liftby.keyBuidsByDups(indx):
             yield item
 
     async def _liftLatLonNear(self, liftby, valu):
@@ -1034,12 +1126,12 @@ class StorTypeLatLon(StorType):
         latmaxindx = (round(latmax * self.scale) + self.latspace).to_bytes(5, 'big')
 
         # scan by lon range and down-select the results to matches.
-        for lkey, buid in liftby.scanByRange(lonminindx, lonmaxindx):
+        for indx, buid in liftby.keyBuidsByRange(lonminindx, lonmaxindx):
 
-            # lkey = <abrv> <lonindx> <latindx>
+            # indx = <lonindx> <latindx>
 
             # limit results to the bounding box before unpacking...
-            latbyts = lkey[13:18]
+            latbyts = indx[5:10]
 
             if latbyts > latmaxindx:
                 continue
@@ -1047,13 +1139,13 @@ class StorTypeLatLon(StorType):
             if latbyts < latminindx:
                 continue
 
-            lonbyts = lkey[8:13]
+            lonbyts = indx[:5]
 
             latvalu = (int.from_bytes(latbyts, 'big') - self.latspace) / self.scale
             lonvalu = (int.from_bytes(lonbyts, 'big') - self.lonspace) / self.scale
 
             if s_gis.haversine((lat, lon), (latvalu, lonvalu)) <= dist:
-                yield buid
+                yield indx, buid
 
     def _getLatLonIndx(self, latlong):
         # yield index bytes in lon/lat order to allow cheap optimal indexing
@@ -1103,6 +1195,9 @@ class Layer(s_nexus.Pusher):
         self.nodeAddHook = None
         self.nodeDelHook = None
 
+        # (form, prop): (refform, isarray) for props which reference nodes (set by the cortex)
+        self.refprops = {}
+
         path = s_common.genpath(self.dirn, 'layer_v2.lmdb')
 
         self.fresh = not os.path.exists(path)
@@ -1178,6 +1273,9 @@ class Layer(s_nexus.Pusher):
             else:
                 await self.initUpstreamSync(uplayr)
 
+        if not self.readonly:
+            self.schedCoro(self._cullNodeEditLoop())
+
         self.onfini(self._onLayrFini)
 
     async def pack(self):
@@ -1342,10 +1440,13 @@ class Layer(s_nexus.Pusher):
             self.meta.set('version', 3)
 
         self.formcounts = await self.layrslab.getHotCount('count:forms')
+        self.tagcounts = await self.layrslab.getHotCount('count:tags')
+        self.propcounts = await self.layrslab.getHotCount('count:props')
 
         path = s_common.genpath(self.dirn, 'nodeedits.lmdb')
         self.nodeeditslab = await s_lmdbslab.Slab.anit(path, readonly=self.readonly)
         self.offsets = await self.layrslab.getHotCount('offsets')
+        self.editconsumers = await self.layrslab.getHotCount('nodeedits:consumers')
 
         self.tagabrv = self.layrslab.getNameAbrv('tagabrv')
         self.propabrv = self.layrslab.getNameAbrv('propabrv')
@@ -1365,6 +1466,7 @@ class Layer(s_nexus.Pusher):
         self.byprop = self.layrslab.initdb('byprop', dupsort=True)
         self.byarray = self.layrslab.initdb('byarray', dupsort=True)
         self.bytagprop = self.layrslab.initdb('bytagprop', dupsort=True)
+        self.byref = self.layrslab.initdb('byref', dupsort=True)
 
         self.countdb = self.layrslab.initdb('counters')
         self.nodedata = self.dataslab.initdb('nodedata')
@@ -1372,6 +1474,17 @@ class Layer(s_nexus.Pusher):
 
         self.nodeeditlog = self.nodeeditctor(self.nodeeditslab, 'nodeedits')
 
+        # the tag and prop counters and the reverse reference index are valid from creation,
+        # or once rebuilt for older layers.  read-only layers may not record (or rebuild) them,
+        # but those which are empty are valid regardless.
+        self.emptyreadonly = False
+        if self.layrslab.firstkey(db=self.byprop) is None and self.layrslab.firstkey(db=self.bytag) is None:
+            if self.readonly:
+                self.emptyreadonly = True
+            else:
+                self.meta.set('rowcounts', True)
+                self.meta.set('refindex', True)
+
         self.layrslab.on('commit', self._onLayrSlabCommit)
 
         self.layrvers = self.meta.get('version', 2)
@@ -1385,6 +1498,13 @@ class Layer(s_nexus.Pusher):
         info['ctor'] = self.ctorname
         return info
 
+    async def getStorNodeCount(self):
+        '''
+        Get the number of storage nodes in the layer.
+        '''
+        await self._saveDirtySodes()
+        return self.layrslab.stat(db=self.bybuidv3)['entries']
+
     async def getLayerSize(self):
         '''
         Get the total storage size for the layer.
@@ -1406,7 +1526,7 @@ class Layer(s_nexus.Pusher):
         '''
         Set a mutable layer property.
         '''
-        if name not in ('name', 'logedits'):
+        if name not in ('name', 'logedits', 'logedits:maxage', 'logedits:maxsize', 'logedits:consumers'):
             mesg = f'{name} is not a valid layer info key'
             raise s_exc.BadOptValu(mesg=mesg)
 
@@ -1414,6 +1534,14 @@ class Layer(s_nexus.Pusher):
             valu = bool(valu)
             self.logedits = valu
 
+        elif name == 'logedits:consumers':
+            valu = bool(valu)
+
+        elif name in ('logedits:maxage', 'logedits:maxsize') and valu is not None:
+            if not isinstance(valu, int) or isinstance(valu, bool) or valu < 1:
+                mesg = f'{name} must be a positive integer or None.'
+                raise s_exc.BadOptValu(mesg=mesg, name=name, valu=valu)
+
         # TODO when we can set more props, we may need to parse values.
         await self.layrinfo.set(name, valu)
 
@@ -1491,8 +1619,17 @@ class Layer(s_nexus.Pusher):
         self.dirty.clear()
 
     async def getStorNode(self, buid):
+        '''
+        Return a copy of the storage node for the given buid.
+        '''
         return deepcopy(self._getStorNode(buid))
 
+    async def getStorNodeView(self, buid):
+        '''
+        Return a read-only view of the storage node for the given buid.
+        '''
+        return getSodeView(self._getStorNode(buid))
+
     def _getStorNode(self, buid):
         '''
         Return the storage node for the given buid.
@@ -1521,7 +1658,46 @@ class Layer(s_nexus.Pusher):
 
         return sode
 
-    async def getTagCount(self, tagname, formname=None):
+    async def getStorNodesByBuids(self, buids):
+        '''
+        Return a list of storage nodes for the given list of buids.
+
+        Storage nodes which are not dirty or cached are read from the slab
+        in a single sorted pass and added to the cache.
+
+        NOTE: This API returns read-only views of the storage nodes.
+        '''
+        sodes = {}
+        todo = []
+
+        for buid in buids:
+
+            if buid in sodes:
+                continue
+
+            sode = self.dirty.get(buid)
+            if sode is None:
+                sode = self.buidcache.get(buid)
+
+            if sode is None:
+                todo.append(buid)
+
+            sodes[buid] = sode
+
+        if todo:
+
+            for buid, byts in zip(todo, self.layrslab.getmulti(todo, db=self.bybuidv3)):
+
+                sode = collections.defaultdict(dict)
+                if byts is not None:
+                    sode.update(s_msgpack.un(byts))
+
+                self.buidcache[buid] = sode
+                sodes[buid] = sode
+
+        return [getSodeView(sodes[buid]) for buid in buids]
+
+    async def getTagCount(self, tagname, formname=None, maxsize=None):
         '''
         Return the number of tag rows in the layer for the given tag/form.
         '''
@@ -1533,21 +1709,433 @@ class Layer(s_nexus.Pusher):
         except s_exc.NoSuchAbrv:
             return 0
 
-        return await self.layrslab.countByPref(abrv, db=self.bytag)
+        if self.hasRowCounts():
+            count = self.tagcounts.get(s_common.ehex(abrv))
+            if maxsize is not None:
+                return min(count, maxsize)
+            return count
+
+        return await self.layrslab.countByPref(abrv, db=self.bytag, maxsize=maxsize)
 
     async def getPropCount(self, formname, propname=None, maxsize=None):
         '''
         Return the number of property rows in the layer for the given form/prop.
         '''
+        if propname is None:
+            # the form counters are always maintained and there is one row per node
+            count = self.formcounts.get(formname)
+            if maxsize is not None:
+                return min(count, maxsize)
+            return count
+
         try:
             abrv = self.getPropAbrv(formname, propname)
         except s_exc.NoSuchAbrv:
             return 0
 
+        if self.hasRowCounts():
+            count = self.propcounts.get(s_common.ehex(abrv))
+            if maxsize is not None:
+                return min(count, maxsize)
+            return count
+
         return await self.layrslab.countByPref(abrv, db=self.byprop, maxsize=maxsize)
 
+    async def getPropValuCount(self, formname, propname, cmprvals, maxsize=None):
+        '''
+        Return the number of property index rows in the layer which match the given cmprvals.
+
+        Args:
+            formname (str): The form name (or None for universal props).
+            propname (str): The prop name (or None for the primary property of the form).
+            cmprvals (list): A list of (cmpr, valu, stortype) tuples from Type.getStorCmprs().
+            maxsize (int): Stop counting once this many rows have been found.
+        '''
+        count = 0
+        for cmpr, valu, kind in cmprvals:
+
+            if propname is None:
+                genr = self.stortypes[kind].indxByForm(formname, cmpr, valu)
+
+            else:
+                if kind & 0x8000:
+                    kind = STOR_TYPE_MSGP
+                genr = self.stortypes[kind].indxByProp(formname, propname, cmpr, valu)
+
+            async for _ in genr:
+                count += 1
+                if maxsize is not None and count >= maxsize:
+                    return count
+
+        return count
+
+    async def rebuildRowCounts(self):
+        '''
+        Rebuild the tag and prop row counters from the indexes of the layer.
+
+        This only needs to be run once for layers which were created before the counters
+        were maintained.  Each prefix is counted without yielding, so edits made while the
+        rebuild is running are counted correctly.  The rebuild is a nexus event so mirrors
+        rebuild (and mark valid) their own counters as well.
+
+        Returns:
+            dict: The number of counters rebuilt by type.
+        '''
+        self._reqRebuildable()
+        return await self._push('layer:rowcounts:rebuild')
+
+    def _reqRebuildable(self):
+        if self.readonly:
+            mesg = f'Layer {self.iden} is read-only and may not be rebuilt.'
+            raise s_exc.IsReadOnly(mesg=mesg)
+
+    @s_nexus.Pusher.onPush('layer:rowcounts:rebuild')
+    async def _rebuildRowCounts(self):
+
+        retn = {'tags': 0, 'props': 0}
+
+        # reset any counts which were maintained before the rebuild
+        for name in self.tagcounts.pack().keys():
+            self.tagcounts.set(name, 0)
+
+        for name in self.propcounts.pack().keys():
+            self.propcounts.set(name, 0)
+
+        for lkey, _ in self.layrslab.scanByFull(db=self.propabrv.abrv2name):
+            count = self.layrslab.countRowsByPref(lkey, db=self.byprop)
+            self.propcounts.set(s_common.ehex(lkey), count)
+            retn['props'] += 1
+            await asyncio.sleep(0)
+
+        for tagabrv, _ in self.layrslab.scanByFull(db=self.tagabrv.abrv2name):
+
+            # bytag keys are the tag abrv followed by the form abrv
+            count = 0
+            for lkey, valu in self.layrslab.countDupsByPref(tagabrv, db=self.bytag):
+                self.tagcounts.set(s_common.ehex(lkey), valu)
+                count += valu
+                retn['tags'] += 1
+
+            self.tagcounts.set(s_common.ehex(tagabrv), count)
+            retn['tags'] += 1
+
+            await asyncio.sleep(0)
+
+        self.meta.set('rowcounts', True)
+        return retn
+
+    def hasRowCounts(self):
+        '''
+        Return True if the tag and prop row counters of the layer may be used for estimates.
+        '''
+        return bool(self.meta.get('rowcounts', self.emptyreadonly))
+
+    def hasRefIndex(self):
+        '''
+        Return True if the reverse reference index of the layer may be used for lifts.
+        '''
+        return bool(self.meta.get('refindex', self.emptyreadonly))
+
+    async def rebuildRefIndex(self):
+        '''
+        Rebuild the reverse reference index from the nodes stored in the layer.
+
+        This only needs to be run once for layers which were created before the index
+        was maintained.  Node edits made during the rebuild maintain the index themselves.
+        The rebuild is a nexus event so mirrors rebuild (and mark valid) their own index
+        and any abbreviations it adds are created in the same order on every mirror.
+
+        Returns:
+            int: The number of references which were indexed.
+        '''
+        self._reqRebuildable()
+        return await self._push('layer:refindex:rebuild')
+
+    @s_nexus.Pusher.onPush('layer:refindex:rebuild')
+    async def _rebuildRefIndex(self):
+
+        self.meta.set('refindex', False)
+
+        self.layrslab.dropdb('byref')
+        self.byref = self.layrslab.initdb('byref', dupsort=True)
+
+        count = 0
+        async for buid, sode in self.getStorNodes():
+
+            form = sode.get('form')
+            if form is None:
+                continue
+
+            valt = sode.get('valu')
+            if valt is not None:
+                ref = self.refprops.get((form, None))
+                if ref is not None:
+                    count += self._putRefIndx(ref, self.setPropAbrv(form, None), valt[0], buid)
+
+            for prop, (valu, _) in sode.get('props', {}).items():
+                ref = self.refprops.get((form, prop))
+                if ref is not None:
+                    count += self._putRefIndx(ref, self.setPropAbrv(form, prop), valu, buid)
+
+        self.meta.set('refindex', True)
+        return count
+
+    async def flattenLayers(self, layrs, chunksize=10000):
+        '''
+        Fill this (empty) layer with the combined contents of a stack of layers.
+
+        The storage nodes of the layers are merged in buid order the same way a view joins
+        them and the indexes are rebuilt with key sorted bulk appends.
+
+        Args:
+            layrs (list): A top-down list of Layer objects (the first layer takes precedence).
+            chunksize (int): The number of rows to write per bulk append.
+
+        Returns:
+            int: The number of storage nodes in the flattened layer.
+        '''
+        if self.layrslab.firstkey(db=self.bybuidv3) is not None:
+            mesg = f'Layer {self.iden} must be empty to flatten layers into it.'
+            raise s_exc.BadArg(mesg=mesg)
+
+        for layr in layrs:
+            await layr._saveDirtySodes()
+
+        indexes = {
+            'byprop': (self.layrslab, self.byprop),
+            'byarray': (self.layrslab, self.byarray),
+            'bytag': (self.layrslab, self.bytag),
+            'bytagprop': (self.layrslab, self.bytagprop),
+            'byref': (self.layrslab, self.byref),
+            'byverb': (self.layrslab, self.byverb),
+            'edgesn2': (self.layrslab, self.edgesn2),
+            'dataname': (self.dataslab, self.dataname),
+        }
+
+        # index rows are spooled to a temporary slab so they may be appended in key order
+        tmpdirn = s_common.gendir(self.dirn, 'tmp')
+        tmpslab = await s_lmdbslab.Slab.anit(tempfile.mkdtemp(dir=tmpdirn, prefix='flatten_', suffix='.lmdb'))
+
+        try:
+            tmpdbs = {name: tmpslab.initdb(name, dupsort=True) for name in indexes}
+
+            def scan(prio, layr):
+                for buid, byts in layr.layrslab.scanByFull(db=layr.bybuidv3):
+                    yield buid, prio, layr, byts
+
+            # the bottom layer sorts first for each buid so the layers above it take precedence
+            merged = heapq.merge(*[scan(-i, layr) for (i, layr) in enumerate(layrs)])
+
+            count = 0
+            rows = collections.defaultdict(list)
+            formcounts = collections.Counter()
+
+            for buid, items in itertools.groupby(merged, key=lambda x: x[0]):
+
+                items = list(items)
+
+                sode = self._getFlatSode(items)
+
+                form = sode.get('form')
+                if form is not None:
+                    self._getFlatSodeRows(buid, form, sode, rows)
+                    if sode.get('valu') is not None:
+                        formcounts[form] += 1
+
+                self._getFlatDataRows(buid, items, rows)
+                self._getFlatEdgeRows(buid, items, rows)
+
+                rows['bybuidv3'].append((buid, s_msgpack.en(sode)))
+
+                count += 1
+                if len(rows['bybuidv3']) >= chunksize:
+                    self._putFlatRows(rows, tmpslab, tmpdbs)
+                    await asyncio.sleep(0)
+
+            self._putFlatRows(rows, tmpslab, tmpdbs)
+
+            propcounts = collections.Counter()
+            tagcounts = collections.Counter()
+
+            for name, (slab, db) in indexes.items():
+
+                for chunk in s_common.chunks(tmpslab.scanByFull(db=tmpdbs[name]), chunksize):
+
+                    slab.putmulti(chunk, dupdata=True, append=True, db=db)
+
+                    if name == 'byprop':
+                        propcounts.update(lkey[:8] for (lkey, _) in chunk)
+
+                    elif name == 'bytag':
+                        tagcounts.update(lkey[:8] for (lkey, _) in chunk)
+                        tagcounts.update(lkey for (lkey, _) in chunk)
+
+                    await asyncio.sleep(0)
+
+            for form, valu in formcounts.items():
+                self.formcounts.set(form, valu)
+
+            for abrv, valu in propcounts.items():
+                self.propcounts.set(s_common.ehex(abrv), valu)
+
+            for abrv, valu in tagcounts.items():
+                self.tagcounts.set(s_common.ehex(abrv), valu)
+
+        finally:
+            await tmpslab.trash()
+
+        return count
+
+    def _getFlatSode(self, items):
+
+        sode = {}
+
+        props = {}
+        tags = {}
+        tagprops = {}
+
+        for (_, _, layr, byts) in items:
+
+            layrsode = s_msgpack.un(byts)
+
+            form = layrsode.get('form')
+            if form is not None:
+                sode['form'] = form
+
+            valt = layrsode.get('valu')
+            if valt is not None:
+                sode['valu'] = valt
+
+            props.update(layrsode.get('props', {}))
+            tags.update(layrsode.get('tags', {}))
+            tagprops.update(layrsode.get('tagprops', {}))
+
+        if props:
+            sode['props'] = props
+
+        if tags:
+            sode['tags'] = tags
+
+        if tagprops:
+            sode['tagprops'] = tagprops
+
+        return sode
+
+    def _getFlatSodeRows(self, buid, form, sode, rows):
+
+        formabrv = self.setPropAbrv(form, None)
+
+        valt = sode.get('valu')
+        if valt is not None:
+
+            valu, stortype = valt
+
+            if stortype & STOR_FLAG_ARRAY:
+
+                rows['byarray'].extend((formabrv + indx, buid) for indx in self.getStorIndx(stortype, valu))
+                rows['byprop'].extend((formabrv + indx, buid) for indx in self.getStorIndx(STOR_TYPE_MSGP, valu))
+
+                ref = self.refprops.get((form, None))
+                if ref is not None:
+                    rows['byref'].extend((lkey, buid + formabrv) for lkey in self._getRefKeys(ref, valu))
+
+            else:
+                rows['byprop'].extend((formabrv + indx, buid) for indx in self.getStorIndx(stortype, valu))
+
+        for prop, (valu, stortype) in sode.get('props', {}).items():
+
+            abrvs = [self.setPropAbrv(form, prop)]
+            if prop[0] == '.':
+                abrvs.append(self.setPropAbrv(None, prop))
+
+            for abrv in abrvs:
+
+                if stortype & STOR_FLAG_ARRAY:
+                    rows['byarray'].extend((abrv + indx, buid) for indx in self.getStorIndx(stortype, valu))
+                    rows['byprop'].extend((abrv + indx, buid) for indx in self.getStorIndx(STOR_TYPE_MSGP, valu))
+
+                else:
+                    rows['byprop'].extend((abrv + indx, buid) for indx in self.getStorIndx(stortype, valu))
+
+            ref = self.refprops.get((form, prop))
+            if ref is not None:
+                rows['byref'].extend((lkey, buid + abrvs[0]) for lkey in self._getRefKeys(ref, valu))
+
+        for tag in sode.get('tags', {}).keys():
+            tagabrv = self.tagabrv.setBytsToAbrv(tag.encode())
+            rows['bytag'].append((tagabrv + formabrv, buid))
+
+        for (tag, prop), (valu, stortype) in sode.get('tagprops', {}).items():
+
+            tp_abrv = self.setTagPropAbrv(None, tag, prop)
+            ftp_abrv = self.setTagPropAbrv(form, tag, prop)
+
+            for indx in self.getStorIndx(stortype, valu):
+                rows['bytagprop'].append((tp_abrv + indx, buid))
+                rows['bytagprop'].append((ftp_abrv + indx, buid))
+
+    def _getFlatDataRows(self, buid, items, rows):
+
+        # node data abbreviations are specific to each layer
+        datas = {}
+        for (_, _, layr, _) in items:
+            for lkey, byts in layr.dataslab.scanByPref(buid, db=layr.nodedata):
+                name = layr.getAbrvProp(lkey[32:])[0]
+                datas[name] = byts
+
+        datarows = []
+        for name, byts in datas.items():
+            abrv = self.setPropAbrv(name, None)
+            datarows.append((buid + abrv, byts))
+            rows['dataname'].append((abrv, buid))
+
+        datarows.sort()
+        rows['nodedata'].extend(datarows)
+
+    def _getFlatEdgeRows(self, buid, items, rows):
+
+        edges = set()
+        for (_, _, layr, _) in items:
+            for lkey, n2buid in layr.layrslab.scanByPref(buid, db=layr.edgesn1):
+                edges.add((lkey[32:], n2buid))
+
+        for venc, n2buid in sorted(edges):
+            rows['edgesn1'].append((buid + venc, n2buid))
+            rows['byverb'].append((venc, buid + n2buid))
+            rows['edgesn2'].append((n2buid + venc, buid))
+
+    def _putFlatRows(self, rows, tmpslab, tmpdbs):
+
+        # storage nodes, node data and n1 edges are generated in buid order
+        self.layrslab.putmulti(rows.pop('bybuidv3', []), append=True, db=self.bybuidv3)
+        self.dataslab.putmulti(rows.pop('nodedata', []), append=True, db=self.nodedata)
+        self.layrslab.putmulti(rows.pop('edgesn1', []), dupdata=True, append=True, db=self.edgesn1)
+
+        for name, items in rows.items():
+            tmpslab.putmulti(items, dupdata=True, db=tmpdbs[name])
+
+        rows.clear()
+
+    async def liftByRefs(self, buid):
+        '''
+        Yield (refbuid, form, prop, sode) tuples for nodes which reference the node with the given buid.
+
+        Note:
+            The prop is None for array forms whose primary value references the node.
+        '''
+        for _, lval in self.layrslab.scanByDups(buid, db=self.byref):
+            form, prop = self.getAbrvProp(lval[32:])
+            refbuid = lval[:32]
+            yield refbuid, form, prop, getSodeView(self._getStorNode(refbuid))
+
     async def liftByTag(self, tag, form=None):
+        '''
+        Yield (indx, buid, sode) tuples for nodes with the given tag.
 
+        Note:
+            The indx bytes are empty when a form is specified, otherwise they contain the
+            layer specific form abrv.  Only lifts with a form are merged in index order across layers.
+        '''
         try:
             abrv = self.tagabrv.bytsToAbrv(tag.encode())
             if form is not None:
@@ -1556,8 +2144,9 @@ class Layer(s_nexus.Pusher):
         except s_exc.NoSuchAbrv:
             return
 
-        for _, buid in self.layrslab.scanByPref(abrv, db=self.bytag):
-            yield buid, deepcopy(self._getStorNode(buid))
+        abrvlen = len(abrv)
+        for lkey, buid in self.layrslab.scanByPref(abrv, db=self.bytag):
+            yield lkey[abrvlen:], buid, getSodeView(self._getStorNode(buid))
 
     async def liftByTagValu(self, tag, cmpr, valu, form=None):
 
@@ -1573,11 +2162,12 @@ class Layer(s_nexus.Pusher):
         if filt is None:
             raise s_exc.NoSuchCmpr(cmpr=cmpr)
 
-        for _, buid in self.layrslab.scanByPref(abrv, db=self.bytag):
+        abrvlen = len(abrv)
+        for lkey, buid in self.layrslab.scanByPref(abrv, db=self.bytag):
             # filter based on the ival value before lifting the node...
             valu = await self.getNodeTag(buid, tag)
             if filt(valu):
-                yield buid, deepcopy(self._getStorNode(buid))
+                yield lkey[abrvlen:], buid, getSodeView(self._getStorNode(buid))
 
     async def hasTagProp(self, name):
         async for _ in self.liftTagProp(name):
@@ -1607,8 +2197,9 @@ class Layer(s_nexus.Pusher):
         except s_exc.NoSuchAbrv:
             return
 
-        for _, buid in self.layrslab.scanByPref(abrv, db=self.bytagprop):
-            yield buid, deepcopy(self._getStorNode(buid))
+        abrvlen = len(abrv)
+        for lkey, buid in self.layrslab.scanByPref(abrv, db=self.bytagprop):
+            yield lkey[abrvlen:], buid, getSodeView(self._getStorNode(buid))
 
     async def liftByTagPropValu(self, form, tag, prop, cmprvals):
         '''
@@ -1616,8 +2207,8 @@ class Layer(s_nexus.Pusher):
         '''
         for cmpr, valu, kind in cmprvals:
 
-            async for buid in self.stortypes[kind].indxByTagProp(form, tag, prop, cmpr, valu):
-                yield buid, deepcopy(self._getStorNode(buid))
+            async for indx, buid in self.stortypes[kind].indxByTagProp(form, tag, prop, cmpr, valu):
+                yield indx, buid, getSodeView(self._getStorNode(buid))
 
     async def liftByProp(self, form, prop):
 
@@ -1627,26 +2218,27 @@ class Layer(s_nexus.Pusher):
         except s_exc.NoSuchAbrv:
             return
 
-        for _, buid in self.layrslab.scanByPref(abrv, db=self.byprop):
-            yield buid, deepcopy(self._getStorNode(buid))
+        abrvlen = len(abrv)
+        for lkey, buid in self.layrslab.scanByPref(abrv, db=self.byprop):
+            yield lkey[abrvlen:], buid, getSodeView(self._getStorNode(buid))
 
     # NOTE: form vs prop valu lifting is differentiated to allow merge sort
     async def liftByFormValu(self, form, cmprvals):
         for cmpr, valu, kind in cmprvals:
-            async for buid in self.stortypes[kind].indxByForm(form, cmpr, valu):
-                yield buid, deepcopy(self._getStorNode(buid))
+            async for indx, buid in self.stortypes[kind].indxByForm(form, cmpr, valu):
+                yield indx, buid, getSodeView(self._getStorNode(buid))
 
     async def liftByPropValu(self, form, prop, cmprvals):
         for cmpr, valu, kind in cmprvals:
             if kind & 0x8000:
                 kind = STOR_TYPE_MSGP
-            async for buid in self.stortypes[kind].indxByProp(form, prop, cmpr, valu):
-                yield buid, deepcopy(self._getStorNode(buid))
+            async for indx, buid in self.stortypes[kind].indxByProp(form, prop, cmpr, valu):
+                yield indx, buid, getSodeView(self._getStorNode(buid))
 
     async def liftByPropArray(self, form, prop, cmprvals):
         for cmpr, valu, kind in cmprvals:
-            async for buid in self.stortypes[kind].indxByPropArray(form, prop, cmpr, valu):
-                yield buid, deepcopy(self._getStorNode(buid))
+            async for indx, buid in self.stortypes[kind].indxByPropArray(form, prop, cmpr, valu):
+                yield indx, buid, getSodeView(self._getStorNode(buid))
 
     async def liftByDataName(self, name):
         try:
@@ -1657,25 +2249,25 @@ class Layer(s_nexus.Pusher):
 
         for abrv, buid in self.dataslab.scanByDups(abrv, db=self.dataname):
 
-            sode = self._getStorNode(buid).copy()
+            sode = dict(self._getStorNode(buid))
 
             byts = self.dataslab.get(buid + abrv, db=self.nodedata)
             if byts is not None:
-                item = s_msgpack.un(byts)
-                sode['nodedata'][name] = item
+                sode['nodedata'] = {name: s_msgpack.un(byts)}
 
-            yield buid, deepcopy(sode)
+            yield b'', buid, getSodeView(sode)
 
     async def storNodeEdits(self, nodeedits, meta):
 
-        results = await self._push('edits', nodeedits, meta)
-
-        retn = []
-        for buid, _, edits in results:
-            sode = deepcopy(self._getStorNode(buid))
-            retn.append((buid, sode, edits))
+        '''
+        Execute a series of node edit operations, returning the updated nodes.
 
-        return retn
+        Returns:
+            List[Tuple(buid, sode, edits)]: A read-only storage node view and
+            the actual edits for each edited node.
+        '''
+        results = await self._push('edits', nodeedits, meta)
+        return [(buid, getSodeView(self._getStorNode(buid)), edits) for buid, _, edits in results]
 
     @s_nexus.Pusher.onPush('edits', passitem=True)
     async def _storNodeEdits(self, nodeedits, meta, nexsitem):
@@ -1762,8 +2354,45 @@ class Layer(s_nexus.Pusher):
         Execute a series of node edit operations.
 
         Does not return the updated nodes.
+
+        Returns:
+            List[Tuple(buid, form, edits)]: The actual edits for each edited node.
         '''
-        await self._push('edits', nodeedits, meta)
+        return await self._push('edits', nodeedits, meta)
+
+    def _putPropIndx(self, abrv, indx, buid):
+        if self.layrslab.put(abrv + indx, buid, db=self.byprop):
+            self.propcounts.inc(s_common.ehex(abrv))
+
+    def _delPropIndx(self, abrv, indx, buid):
+        if self.layrslab.delete(abrv + indx, buid, db=self.byprop):
+            self.propcounts.inc(s_common.ehex(abrv), valu=-1)
+
+    def _putTagIndx(self, tagabrv, formabrv, buid):
+        if self.layrslab.put(tagabrv + formabrv, buid, db=self.bytag):
+            self.tagcounts.inc(s_common.ehex(tagabrv))
+            self.tagcounts.inc(s_common.ehex(tagabrv + formabrv))
+
+    def _delTagIndx(self, tagabrv, formabrv, buid):
+        if self.layrslab.delete(tagabrv + formabrv, buid, db=self.bytag):
+            self.tagcounts.inc(s_common.ehex(tagabrv), valu=-1)
+            self.tagcounts.inc(s_common.ehex(tagabrv + formabrv), valu=-1)
+
+    def _getRefKeys(self, ref, valu):
+        refform, isarray = ref
+        if isarray:
+            return [s_common.buid((refform, item)) for item in valu]
+        return (s_common.buid((refform, valu)),)
+
+    def _putRefIndx(self, ref, abrv, valu, buid):
+        count = 0
+        for lkey in self._getRefKeys(ref, valu):
+            count += self.layrslab.put(lkey, buid + abrv, db=self.byref)
+        return count
+
+    def _delRefIndx(self, ref, abrv, valu, buid):
+        for lkey in self._getRefKeys(ref, valu):
+            self.layrslab.delete(lkey, buid + abrv, db=self.byref)
 
     def _editNodeAdd(self, buid, form, edit, sode, meta):
 
@@ -1783,12 +2412,16 @@ class Layer(s_nexus.Pusher):
                 self.layrslab.put(abrv + indx, buid, db=self.byarray)
 
             for indx in self.getStorIndx(STOR_TYPE_MSGP, valu):
-                self.layrslab.put(abrv + indx, buid, db=self.byprop)
+                self._putPropIndx(abrv, indx, buid)
+
+            ref = self.refprops.get((form, None))
+            if ref is not None:
+                self._putRefIndx(ref, abrv, valu, buid)
 
         else:
 
             for indx in self.getStorIndx(stortype, valu):
-                self.layrslab.put(abrv + indx, buid, db=self.byprop)
+                self._putPropIndx(abrv, indx, buid)
 
         self.formcounts.inc(form)
         if self.nodeAddHook is not None:
@@ -1827,12 +2460,16 @@ class Layer(s_nexus.Pusher):
                 self.layrslab.delete(abrv + indx, buid, db=self.byarray)
 
             for indx in self.getStorIndx(STOR_TYPE_MSGP, valu):
-                self.layrslab.delete(abrv + indx, buid, db=self.byprop)
+                self._delPropIndx(abrv, indx, buid)
+
+            ref = self.refprops.get((form, None))
+            if ref is not None:
+                self._delRefIndx(ref, abrv, valu, buid)
 
         else:
 
             for indx in self.getStorIndx(stortype, valu):
-                self.layrslab.delete(abrv + indx, buid, db=self.byprop)
+                self._delPropIndx(abrv, indx, buid)
 
         self.formcounts.inc(form, valu=-1)
         if self.nodeDelHook is not None:
@@ -1862,6 +2499,8 @@ class Layer(s_nexus.Pusher):
         if prop[0] == '.': # '.' to detect universal props (as quickly as possible)
             univabrv = self.setPropAbrv(None, prop)
 
+        ref = self.refprops.get((form, prop))
+
         if oldv is not None:
 
             # merge intervals and min times
@@ -1882,16 +2521,19 @@ class Layer(s_nexus.Pusher):
                         self.layrslab.delete(univabrv + oldi, buid, db=self.byarray)
 
                 for indx in self.getStorIndx(STOR_TYPE_MSGP, oldv):
-                    self.layrslab.delete(abrv + indx, buid, db=self.byprop)
+                    self._delPropIndx(abrv, indx, buid)
                     if univabrv is not None:
-                        self.layrslab.delete(univabrv + indx, buid, db=self.byprop)
+                        self._delPropIndx(univabrv, indx, buid)
 
             else:
 
                 for oldi in self.getStorIndx(oldt, oldv):
-                    self.layrslab.delete(abrv + oldi, buid, db=self.byprop)
+                    self._delPropIndx(abrv, oldi, buid)
                     if univabrv is not None:
-                        self.layrslab.delete(univabrv + oldi, buid, db=self.byprop)
+                        self._delPropIndx(univabrv, oldi, buid)
+
+            if ref is not None:
+                self._delRefIndx(ref, abrv, oldv, buid)
 
         sode['props'][prop] = (valu, stortype)
         self.setSodeDirty(buid, sode, form)
@@ -1904,16 +2546,19 @@ class Layer(s_nexus.Pusher):
                     self.layrslab.put(univabrv + indx, buid, db=self.byarray)
 
             for indx in self.getStorIndx(STOR_TYPE_MSGP, valu):
-                self.layrslab.put(abrv + indx, buid, db=self.byprop)
+                self._putPropIndx(abrv, indx, buid)
                 if univabrv is not None:
-                    self.layrslab.put(univabrv + indx, buid, db=self.byprop)
+                    self._putPropIndx(univabrv, indx, buid)
 
         else:
 
             for indx in self.getStorIndx(stortype, valu):
-                self.layrslab.put(abrv + indx, buid, db=self.byprop)
+                self._putPropIndx(abrv, indx, buid)
                 if univabrv is not None:
-                    self.layrslab.put(univabrv + indx, buid, db=self.byprop)
+                    self._putPropIndx(univabrv, indx, buid)
+
+        if ref is not None:
+            self._putRefIndx(ref, abrv, valu, buid)
 
         return (
             (EDIT_PROP_SET, (prop, valu, oldv, stortype), ()),
@@ -1950,16 +2595,20 @@ class Layer(s_nexus.Pusher):
                         self.layrslab.delete(univabrv + indx, buid, db=self.byarray)
 
             for indx in self.getStorIndx(STOR_TYPE_MSGP, valu):
-                self.layrslab.delete(abrv + indx, buid, db=self.byprop)
+                self._delPropIndx(abrv, indx, buid)
                 if univabrv is not None:
-                    self.layrslab.delete(univabrv + indx, buid, db=self.byprop)
+                    self._delPropIndx(univabrv, indx, buid)
 
         else:
 
             for indx in self.getStorIndx(stortype, valu):
-                self.layrslab.delete(abrv + indx, buid, db=self.byprop)
+                self._delPropIndx(abrv, indx, buid)
                 if univabrv is not None:
-                    self.layrslab.delete(univabrv + indx, buid, db=self.byprop)
+                    self._delPropIndx(univabrv, indx, buid)
+
+        ref = self.refprops.get((form, prop))
+        if ref is not None:
+            self._delRefIndx(ref, abrv, valu, buid)
 
         self.mayDelBuid(buid, sode)
         return (
@@ -1990,7 +2639,7 @@ class Layer(s_nexus.Pusher):
         sode['tags'][tag] = valu
         self.setSodeDirty(buid, sode, form)
 
-        self.layrslab.put(tagabrv + formabrv, buid, db=self.bytag)
+        self._putTagIndx(tagabrv, formabrv, buid)
 
         return (
             (EDIT_TAG_SET, (tag, valu, oldv), ()),
@@ -2011,7 +2660,7 @@ class Layer(s_nexus.Pusher):
 
         tagabrv = self.tagabrv.bytsToAbrv(tag.encode())
 
-        self.layrslab.delete(tagabrv + formabrv, buid, db=self.bytag)
+        self._delTagIndx(tagabrv, formabrv, buid)
 
         self.mayDelBuid(buid, sode)
         return (
@@ -2429,13 +3078,21 @@ class Layer(s_nexus.Pusher):
             prop = self.getAbrvProp(abrv)
             yield prop[0], valu
 
-    async def iterLayerNodeEdits(self):
+    async def iterLayerNodeEdits(self, startbuid=None):
         '''
         Scan the full layer and yield artificial sets of nodeedits.
+
+        Args:
+            startbuid (bytes): Only yield nodes with a buid greater than or equal to startbuid.
         '''
         await self._saveDirtySodes()
 
-        for buid, byts in self.layrslab.scanByFull(db=self.bybuidv3):
+        if startbuid is None:
+            rows = self.layrslab.scanByFull(db=self.bybuidv3)
+        else:
+            rows = self.layrslab.scanByRange(startbuid, db=self.bybuidv3)
+
+        for buid, byts in rows:
 
             sode = s_msgpack.un(byts)
 
@@ -2490,7 +3147,7 @@ class Layer(s_nexus.Pusher):
                     offs = self.offsets.get(iden)
                     logger.warning(f'upstream sync connected ({s_urlhelp.sanitizeUrl(url)} offset={offs})')
 
-                    if offs == 0:
+                    if offs == 0 or offs < await proxy.getEditStartIndx():
                         offs = await proxy.getEditIndx()
                         meta = {'time': s_common.now(),
                                 'user': creator,
@@ -2600,7 +3257,9 @@ class Layer(s_nexus.Pusher):
             return
 
         if offs is None:
-            offs = (0, 0, 0)
+            offs = (self._getEditStartIndx(), 0, 0)
+        else:
+            self._reqEditOffs(offs[0])
 
         if size is not None:
 
@@ -2676,10 +3335,15 @@ class Layer(s_nexus.Pusher):
 
         Returns:
             Tuple of offset(int), nodeedits, meta(dict)
+
+        Raises:
+            NoSuchIndx: If the offset is before the first entry kept by the retention policy.
         '''
         if not self.logedits:
             return
 
+        self._reqEditOffs(offs)
+
         for offi, (nodeedits, meta) in self.nodeeditlog.iter(offs):
             yield (offi, nodeedits, meta)
 
@@ -2896,6 +3560,184 @@ class Layer(s_nexus.Pusher):
 
         return -1
 
+    async def getEditStartIndx(self):
+        '''
+        Returns the first nodeedit log index which has not been culled by the retention policy.
+
+        Notes:
+            A consumer which needs edits from before this index must instead record the
+            current index from getEditIndx(), apply the layer snapshot from
+            iterLayerNodeEdits(), and then sync nodeedits from the recorded index.
+        '''
+        return self._getEditStartIndx()
+
+    def _getEditStartIndx(self):
+        if not self.logedits:
+            return 0
+
+        return self.meta.get('nodeedits:startindx', 0)
+
+    def _reqEditOffs(self, offs):
+        '''
+        Raise NoSuchIndx if the nodeedit log entries from offs have been culled.
+        '''
+        startindx = self._getEditStartIndx()
+        if offs < startindx:
+            mesg = f'Nodeedit log offset {offs} has been culled, the first available offset is {startindx}.'
+            raise s_exc.NoSuchIndx(mesg=mesg, offs=offs, startindx=startindx, layer=self.iden)
+
+    async def setNodeEditConsumer(self, name, offs):
+        '''
+        Record the next nodeedit log index needed by a named consumer.
+
+        When the logedits:consumers retention option is enabled, entries are culled
+        once every registered consumer has moved past them.  Offsets beyond the
+        next nodeedit log index are clamped to it.
+        '''
+        offs = min(offs, await self.getEditIndx())
+        await self._push('layer:edits:consumer:set', name, offs)
+        return offs
+
+    @s_nexus.Pusher.onPush('layer:edits:consumer:set')
+    async def _setNodeEditConsumer(self, name, offs):
+        self.editconsumers.set(name, offs)
+
+    @s_nexus.Pusher.onPushAuto('layer:edits:consumer:del')
+    async def delNodeEditConsumer(self, name):
+        '''
+        Remove a named nodeedit log consumer.
+        '''
+        self.editconsumers.delete(name)
+
+    def getNodeEditConsumers(self):
+        return self.editconsumers.pack()
+
+    async def _cullNodeEditLoop(self):
+
+        while not self.isfini:
+
+            try:
+                await self.cullNodeEditLog()
+
+            except asyncio.CancelledError:  # pragma: no cover
+                raise
+
+            except Exception:  # pragma: no cover
+                logger.exception(f'Error culling the nodeedit log for layer {self.iden}')
+
+            await self.waitfini(timeout=NODEEDIT_CULL_PERIOD)
+
+    async def cullNodeEditLog(self):
+        '''
+        Remove the nodeedit log entries which fall outside of the layer retention policy.
+
+        Returns:
+            int: The number of entries removed.
+        '''
+        if not self.logedits or self.readonly:
+            return 0
+
+        count = 0
+
+        # the log size is measured in pages, so culling for size may take more than one pass
+        while not self.isfini:
+
+            offs = self._getNodeEditCullOffs()
+            if offs is None or offs < 0:
+                break
+
+            culled = await self.nodeeditlog.cull(offs)
+
+            if offs + 1 > self.meta.get('nodeedits:startindx', 0):
+                self.meta.set('nodeedits:startindx', offs + 1)
+
+            if not culled:
+                break
+
+            count += culled
+            logger.info(f'Culled {culled} nodeedit log entries up to offset {offs} for layer {self.iden}')
+
+        return count
+
+    def _getNodeEditCullOffs(self):
+        '''
+        Return the last nodeedit log offset which may be culled by the retention policy or None.
+
+        Each of the logedits:maxage, logedits:maxsize and logedits:consumers options selects
+        entries to cull and the entries selected by any of them are removed.
+        '''
+        retn = None
+
+        maxage = self.layrinfo.get('logedits:maxage')
+        if maxage is not None:
+            offs = self._getEditOffsBefore(s_common.now() - maxage)
+            if offs is not None:
+                retn = offs
+
+        maxsize = self.layrinfo.get('logedits:maxsize')
+        if maxsize is not None:
+            size = self.nodeeditlog.size()
+            if size > maxsize:
+                entries = self.nodeeditlog.stat()['entries']
+                count = math.ceil(entries * (size - maxsize) / size)
+                offs = self._getEditOffsByCount(count)
+                if offs is not None and (retn is None or offs > retn):
+                    retn = offs
+
+        if self.layrinfo.get('logedits:consumers'):
+            consumers = self.editconsumers.pack()
+            if consumers:
+                offs = min(consumers.values()) - 1
+                if retn is None or offs > retn:
+                    retn = offs
+
+        return retn
+
+    def _getEditOffsByCount(self, count):
+        '''
+        Return the offset of the count-th nodeedit log entry.
+        '''
+        offs = None
+        for lkey in itertools.islice(self.nodeeditslab.scanKeys(db=self.nodeeditlog.db), count):
+            offs = s_common.int64un(lkey)
+        return offs
+
+    def _getEditOffsBefore(self, tick):
+        '''
+        Return the offset of the last nodeedit log entry with a time before tick or None.
+
+        Notes:
+            The log is bisected by the meta time of the entries, which assumes that the times
+            increase with the offset.  If the clock steps backwards, entries may be culled
+            before they reach logedits:maxage (or kept after it).
+        '''
+        first = self.nodeeditlog.first()
+        last = self.nodeeditlog.last()
+        if first is None:
+            return None
+
+        retn = None
+
+        # the log is in time order, so bisect the offset range for the last entry before tick
+        lo = first[0]
+        hi = last[0]
+        while lo <= hi:
+
+            mid = (lo + hi) // 2
+
+            offs, (edits, meta) = self.nodeeditlog.first(mid)
+            if offs > hi:
+                hi = mid - 1
+                continue
+
+            if meta is None or meta.get('time', 0) < tick:
+                retn = offs
+                lo = offs + 1
+            else:
+                hi = mid - 1
+
+        return retn
+
     async def waitEditOffs(self, offs, timeout=None):
         '''
         Wait for the node edit log to write an entry at/past the given offset.
@@ -1,8 +1,11 @@
 import os
+import time
+import bisect
 import shutil
 import asyncio
 import threading
 import collections
+import concurrent.futures
 
 import logging
 logger = logging.getLogger(__name__)
@@ -24,14 +27,36 @@ import synapse.lib.thisplat as s_thisplat
 import synapse.lib.slabseqn as s_slabseqn
 
 COPY_CHUNKSIZE = 512
+CULL_CHUNKSIZE = 10000  # the maximum number of MultiQueue rows deleted before yielding the loop
 PROGRESS_PERIOD = COPY_CHUNKSIZE * 1024
 
 # By default, double the map size each time we run out of space, until this amount, and then we only increase by that
 MAX_DOUBLE_SIZE = 100 * s_const.gibibyte
 
+# The upper bounds (in milliseconds) of the commit latency histogram buckets
+COMMIT_HIST_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
 int64min = s_common.int64en(0)
 int64max = s_common.int64en(0xffffffffffffffff)
 
+def _delXactRange(xact, lmin, lmax, limit=None, db=None):
+    count = 0
+    with xact.cursor(db=db) as curs:
+
+        if not curs.set_range(lmin):
+            return 0
+
+        while limit is None or count < limit:
+
+            lkey = curs.key()
+            if not lkey or lkey > lmax:
+                break
+
+            curs.delete()
+            count += 1
+
+    return count
+
 class Hist:
     '''
     A class for storing items in a slab by time.
@@ -291,6 +316,8 @@ class MultiQueue(s_base.Base):
         self.sizes = SlabDict(self.slab, db=self.slab.initdb(f'{name}:sizes'))
         self.queues = SlabDict(self.slab, db=self.slab.initdb(f'{name}:meta'))
         self.offsets = SlabDict(self.slab, db=self.slab.initdb(f'{name}:offs'))
+        self.groups = SlabDict(self.slab, db=self.slab.initdb(f'{name}:groups'))
+        self.qleases = self.slab.initdb(f'{name}:leases')
         self.lastreqid = await HotKeyVal.anit(self.slab, 'reqid')
         self.onfini(self.lastreqid)
 
@@ -342,6 +369,10 @@ class MultiQueue(s_base.Base):
 
         await self.cull(name, 0xffffffffffffffff)
 
+        if self.groups.pop(name) is not None:
+            abrv = self.abrv.nameToAbrv(name)
+            self.slab.delrange(abrv + int64min + int64min, abrv + int64max + int64max, db=self.qleases)
+
         self.queues.pop(name)
         self.offsets.pop(name)
 
@@ -385,13 +416,18 @@ class MultiQueue(s_base.Base):
 
         self.lastreqid.set(name, reqid)
 
-        for item in items:
+        rows = [(abrv + s_common.int64en(indx), s_msgpack.en(item)) for (indx, item) in enumerate(items, start=offs)]
+        if rows:
+
+            # appending is only possible when the queue owns the end of the db
+            lastkey = self.slab.lastkey(db=self.qdata)
+            append = lastkey is None or lastkey < rows[0][0]
 
-            putv = self.slab.put(abrv + s_common.int64en(offs), s_msgpack.en(item), db=self.qdata)
-            assert putv, 'Put failed'
+            _, added = self.slab.putmulti(rows, append=append, db=self.qdata)
+            assert added == len(rows), 'Put failed'
 
-            self.sizes.inc(name, 1)
-            offs = self.offsets.inc(name, 1)
+            self.sizes.inc(name, len(rows))
+            self.offsets.set(name, offs + len(rows))
 
         # wake the sleepers
         evnt = self.waiters.get(name)
@@ -455,10 +491,7 @@ class MultiQueue(s_base.Base):
 
         abrv = self.abrv.nameToAbrv(name)
 
-        for lkey, _ in self.slab.scanByRange(abrv + int64min, abrv + indx, db=self.qdata):
-            self.slab.delete(lkey, db=self.qdata)
-            self.sizes.set(name, self.sizes.get(name) - 1)
-            await asyncio.sleep(0)
+        await self._delRange(name, abrv + int64min, abrv + indx)
 
     async def dele(self, name, minoffs, maxoffs):
         '''
@@ -476,9 +509,19 @@ class MultiQueue(s_base.Base):
 
         abrv = self.abrv.nameToAbrv(name)
 
-        for lkey, _ in self.slab.scanByRange(abrv + minindx, abrv + maxindx, db=self.qdata):
-            self.slab.delete(lkey, db=self.qdata)
-            self.sizes.set(name, self.sizes.get(name) - 1)
+        await self._delRange(name, abrv + minindx, abrv + maxindx)
+
+    async def _delRange(self, name, lmin, lmax):
+
+        while True:
+
+            count = self.slab.delrange(lmin, lmax, limit=CULL_CHUNKSIZE, db=self.qdata)
+            if count:
+                self.sizes.set(name, self.sizes.get(name) - count)
+
+            if count < CULL_CHUNKSIZE:
+                return
+
             await asyncio.sleep(0)
 
     async def sets(self, name, offs, items):
@@ -519,6 +562,197 @@ class MultiQueue(s_base.Base):
             if evnt is not None:
                 evnt.set()
 
+    def _reqGroup(self, name, group):
+
+        if self.queues.get(name) is None:
+            mesg = f'No queue named {name}.'
+            raise s_exc.NoSuchName(mesg=mesg, name=name)
+
+        groups = self.groups.get(name, {})
+
+        info = groups.get(group)
+        if info is None:
+            mesg = f'No consumer group named {group} for queue {name}.'
+            raise s_exc.NoSuchName(mesg=mesg, name=group)
+
+        return groups, info
+
+    def hasGroup(self, name, group):
+        return self.groups.get(name, {}).get(group) is not None
+
+    def _getGroupPref(self, name, group):
+        return self.abrv.nameToAbrv(name) + self.abrv.setBytsToAbrv(group.encode())
+
+    async def addGroup(self, name, group):
+        '''
+        Add a consumer group which leases items from the start of the named queue.
+        '''
+        if self.queues.get(name) is None:
+            mesg = f'No queue named {name}.'
+            raise s_exc.NoSuchName(mesg=mesg, name=name)
+
+        groups = self.groups.get(name, {})
+        if groups.get(group) is not None:
+            mesg = f'A consumer group named {group} already exists for queue {name}.'
+            raise s_exc.DupName(mesg=mesg, name=group)
+
+        groups[group] = {'offs': 0}
+        self.groups.set(name, groups)
+
+    async def delGroup(self, name, group):
+        '''
+        Remove a consumer group and all of its outstanding leases.
+        '''
+        groups, info = self._reqGroup(name, group)
+
+        pref = self._getGroupPref(name, group)
+        self.slab.delrange(pref + int64min, pref + int64max, db=self.qleases)
+
+        groups.pop(group)
+        self.groups.set(name, groups)
+
+    def getGroups(self, name):
+        '''
+        Return a list of status dictionaries for the consumer groups of the named queue.
+
+        Notes:
+            The "low" value is the lowest offset which has not been acknowledged by the
+            group.  Once every group has moved past an offset, it may be culled.
+        '''
+        if self.queues.get(name) is None:
+            mesg = f'No queue named {name}.'
+            raise s_exc.NoSuchName(mesg=mesg, name=name)
+
+        retn = []
+        for group, info in self.groups.get(name, {}).items():
+
+            pref = self._getGroupPref(name, group)
+
+            low = info['offs']
+            leased = 0
+
+            for lkey, _ in self.slab.scanByPref(pref, db=self.qleases):
+                low = min(low, s_common.int64un(lkey[16:]))
+                leased += 1
+
+            retn.append({'name': group, 'offs': info['offs'], 'low': low, 'leased': leased})
+
+        return retn
+
+    def hasLeasable(self, name, group, tick):
+        '''
+        Return True if a lease() by the consumer group at the given time would return any items.
+
+        Args:
+            name (str): The name of the queue.
+            group (str): The name of the consumer group.
+            tick (int): The current epoch time in milliseconds.
+        '''
+        groups, info = self._reqGroup(name, group)
+
+        abrv = self.abrv.nameToAbrv(name)
+        pref = self._getGroupPref(name, group)
+
+        for lkey, lval in self.slab.scanByPref(pref, db=self.qleases):
+            _, expires = s_msgpack.un(lval)
+            if expires <= tick:
+                return True
+
+        for lkey, lval in self.slab.scanByRange(abrv + s_common.int64en(info['offs']), abrv + int64max, db=self.qdata):
+            return True
+
+        return False
+
+    async def lease(self, name, group, consumer, size, tick, duration):
+        '''
+        Lease up to size items from the named queue to a consumer in a group.
+
+        Args:
+            name (str): The name of the queue.
+            group (str): The name of the consumer group.
+            consumer (str): The name of the consumer taking the lease.
+            size (int): The maximum number of items to lease.
+            tick (int): The current epoch time in milliseconds.
+            duration (int): The number of milliseconds until the lease expires.
+
+        Notes:
+            Items whose lease has expired without being acknowledged are redelivered
+            before any new items are leased.
+
+        Returns:
+            list: A list of (offs, item) tuples.
+        '''
+        groups, info = self._reqGroup(name, group)
+
+        abrv = self.abrv.nameToAbrv(name)
+        pref = self._getGroupPref(name, group)
+
+        retn = []
+        gone = []
+
+        for lkey, lval in self.slab.scanByPref(pref, db=self.qleases):
+
+            if len(retn) >= size:
+                break
+
+            _, expires = s_msgpack.un(lval)
+            if expires > tick:
+                continue
+
+            indx = lkey[16:]
+
+            byts = self.slab.get(abrv + indx, db=self.qdata)
+            if byts is None:
+                # the item was removed from the queue while leased
+                gone.append(lkey)
+                continue
+
+            retn.append((s_common.int64un(indx), s_msgpack.un(byts)))
+
+        for lkey in gone:
+            self.slab.delete(lkey, db=self.qleases)
+
+        if len(retn) < size:
+
+            offs = info['offs']
+
+            for lkey, lval in self.slab.scanByRange(abrv + s_common.int64en(offs), abrv + int64max, db=self.qdata):
+
+                offs = s_common.int64un(lkey[8:])
+                retn.append((offs, s_msgpack.un(lval)))
+
+                offs += 1
+                if len(retn) >= size:
+                    break
+
+            if offs != info['offs']:
+                info['offs'] = offs
+                self.groups.set(name, groups)
+
+        if retn:
+            lval = s_msgpack.en((consumer, tick + duration))
+            self.slab.putmulti([(pref + s_common.int64en(offs), lval) for (offs, _) in retn], db=self.qleases)
+
+        return retn
+
+    async def ack(self, name, group, offsets):
+        '''
+        Acknowledge the processing of leased items by offset.
+
+        Returns:
+            int: The number of leases which were removed.
+        '''
+        self._reqGroup(name, group)
+
+        pref = self._getGroupPref(name, group)
+
+        count = 0
+        for offs in offsets:
+            if self.slab.delete(pref + s_common.int64en(offs), db=self.qleases):
+                count += 1
+
+        return count
+
 class GuidStor:
 
     def __init__(self, slab, name):
@@ -599,9 +833,17 @@ class Slab(s_base.Base):
 
         clas.synctask = loop.create_task(coro)
 
+    @classmethod
+    def _onForkChild(clas):
+        # the flush threads do not survive a fork
+        for slab in clas.allslabs.values():
+            slab.flushpool = None
+
     @classmethod
     async def syncLoopTask(clas):
-        while True:
+        # asyncio.wait_for() may swallow our cancellation if the event is set at the same time
+        task = asyncio.current_task()
+        while clas.synctask is task:
             try:
                 await s_coro.event_wait(clas.syncevnt, timeout=clas.COMMIT_PERIOD)
 
@@ -636,7 +878,7 @@ class Slab(s_base.Base):
                 'maxsize': slab.maxsize,
                 'growsize': slab.growsize,
                 'mapasync': slab.mapasync,
-
+                'commits': slab.getCommitHist(),
             })
         return retn
 
@@ -703,6 +945,11 @@ class Slab(s_base.Base):
 
         self.scans = set()
 
+        self.flushpool = None  # the thread which flushes committed transactions of the slab to disk
+        self.commitstats = collections.deque(maxlen=1000)  # stores Tuple[time, replayloglen, commit time delta]
+        self.commithist = [0] * (len(COMMIT_HIST_BUCKETS) + 1)
+        self.flushhist = [0] * (len(COMMIT_HIST_BUCKETS) + 1)
+
         self.dirty = False
         if self.readonly:
             self.xact = None
@@ -734,14 +981,44 @@ class Slab(s_base.Base):
 
         self.onfini(self._onSlabFini)
 
-        self.commitstats = collections.deque(maxlen=1000)  # stores Tuple[time, replayloglen, commit time delta]
-
         if not self.readonly:
             await Slab.initSyncLoop(self)
 
     def __repr__(self):
         return 'Slab: %r' % (self.path,)
 
+    def _getFlushPool(self):
+        '''
+        Return the single thread executor used to flush the committed transactions of the slab to disk.
+
+        Notes:
+            LMDB requires that a write transaction is only used by the thread which began it, so
+            write transactions are begun, used, and committed by the loop thread.  With map_async
+            set, a commit does not wait for the pages to be written to disk, and flushing them is
+            left to this thread.  Each slab has its own thread so a slow flush of one slab does not
+            hold up the others.
+        '''
+        if self.flushpool is None:
+            self.flushpool = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix='SlabFlush')
+        return self.flushpool
+
+    def getCommitHist(self):
+        '''
+        Return the commit and flush latency histograms for the slab.
+
+        Returns:
+            (dict): The commit count and a list of (upper bound in milliseconds, count) tuples for
+            the commits on the loop, along with the same for the flushes in the flush thread.
+            The final bound is None.
+        '''
+        bounds = COMMIT_HIST_BUCKETS + (None,)
+        return {
+            'count': sum(self.commithist),
+            'hist': list(zip(bounds, self.commithist)),
+            'flushes': sum(self.flushhist),
+            'flushhist': list(zip(bounds, self.flushhist)),
+        }
+
     async def trash(self):
         '''
         Deletes underlying storage
@@ -811,15 +1088,36 @@ class Slab(s_base.Base):
         s_common.yamlmod(opts, self.optspath)
 
     async def sync(self):
+        '''
+        Commit the current write transaction and wait for it to be flushed to disk without blocking the loop.
+
+        Notes:
+            The commit runs on the loop thread, but when map_async is set the pages it wrote
+            are flushed to disk by the flush thread of the slab.
+        '''
         try:
             # do this from the loop thread only to avoid recursion
             await self.fire('commit')
-            self.forcecommit()
+            if not self.forcecommit():
+                return
 
         except lmdb.MapFullError:
             self._handle_mapfull()
             # There's no need to re-try self.forcecommit as _growMapSize does it
 
+        if self.mapasync:
+            await asyncio.shield(self._flush())
+
+    async def _flush(self):
+        took = await asyncio.wrap_future(self._getFlushPool().submit(self._flushEnv))
+        self.flushhist[bisect.bisect_left(COMMIT_HIST_BUCKETS, took * 1000)] += 1
+
+    def _flushEnv(self):
+        # runs in the flush thread and does not touch any transaction
+        tick = time.perf_counter()
+        self.lenv.sync(True)
+        return time.perf_counter() - tick
+
     async def fini(self):
         await self.fire('commit')
         return await s_base.Base.fini(self)
@@ -827,6 +1125,10 @@ class Slab(s_base.Base):
     async def _onSlabFini(self):
         assert s_glob.iAmLoop()
 
+        if self.flushpool is not None:
+            # wait for any pending flush before the environment is closed
+            await asyncio.wrap_future(self.flushpool.submit(lambda: None))
+
         while True:
             try:
                 self._finiCoXact()
@@ -840,6 +1142,10 @@ class Slab(s_base.Base):
         self.allslabs.pop(self.path, None)
         del self.lenv
 
+        if self.flushpool is not None:
+            self.flushpool.shutdown(wait=False)
+            self.flushpool = None
+
         if not self.allslabs:
             if self.synctask:
                 self.synctask.cancel()
@@ -1068,6 +1374,34 @@ class Slab(s_base.Base):
         finally:
             self._relXactForReading()
 
+    def getmulti(self, lkeys, db=None):
+        '''
+        Return the values for a list of keys using a single cursor.
+
+        Args:
+            lkeys (list): A list of keys to retrieve.
+            db: The db to read from.
+
+        Notes:
+            The keys are visited in sorted order to keep the cursor walk local.
+
+        Returns:
+            list: The values (or None if missing) in the same order as lkeys.
+        '''
+        self._acqXactForReading()
+        realdb, dupsort = self.dbnames[db]
+        try:
+            vals = {}
+            with self.xact.cursor(db=realdb) as curs:
+                for lkey in sorted(set(lkeys)):
+                    if curs.set_key(lkey):
+                        vals[lkey] = curs.value()
+
+            return [vals.get(lkey) for lkey in lkeys]
+
+        finally:
+            self._relXactForReading()
+
     def last(self, db=None):
         '''
         Return the last key/value pair from the given db.
@@ -1193,6 +1527,71 @@ class Slab(s_base.Base):
 
             return count
 
+    def countRowsByPref(self, byts, db=None):
+        '''
+        Return the number of rows in the given db with the matching prefix bytes without yielding.
+
+        Notes:
+            For dupsort databases the rows for each key are counted by LMDB, so this is
+            much faster than countByPref() for keys with many values.
+        '''
+        count = 0
+        size = len(byts)
+
+        self._acqXactForReading()
+        realdb, dupsort = self.dbnames[db]
+        try:
+            with self.xact.cursor(db=realdb) as curs:
+
+                if not curs.set_range(byts):
+                    return 0
+
+                while True:
+
+                    lkey = curs.key()
+                    if lkey[:size] != byts:
+                        return count
+
+                    if dupsort:
+                        count += curs.count()
+                        if not curs.next_nodup():
+                            return count
+                        continue
+
+                    count += 1
+                    if not curs.next():
+                        return count
+        finally:
+            self._relXactForReading()
+
+    def countDupsByPref(self, byts, db=None):
+        '''
+        Return a list of (lkey, count) tuples for the keys in a dupsort db with the matching prefix bytes.
+        '''
+        retn = []
+        size = len(byts)
+
+        self._acqXactForReading()
+        realdb, _ = self.dbnames[db]
+        try:
+            with self.xact.cursor(db=realdb) as curs:
+
+                if not curs.set_range(byts):
+                    return retn
+
+                while True:
+
+                    lkey = curs.key()
+                    if lkey[:size] != byts:
+                        return retn
+
+                    retn.append((lkey, curs.count()))
+
+                    if not curs.next_nodup():
+                        return retn
+        finally:
+            self._relXactForReading()
+
     def scanByDups(self, lkey, db=None):
 
         with Scan(self, db) as scan:
@@ -1481,6 +1880,21 @@ class Slab(s_base.Base):
     def delete(self, lkey, val=None, db=None):
         return self._xact_action(self.delete, lmdb.Transaction.delete, lkey, val, db=db)
 
+    def delrange(self, lmin, lmax, limit=None, db=None):
+        '''
+        Delete the rows with keys from lmin up to (and including) lmax.
+
+        Args:
+            lmin (bytes): The first key in the range.
+            lmax (bytes): The last key in the range.
+            limit (int): The maximum number of rows to delete.
+            db (str): The name of the database.
+
+        Returns:
+            (int): The number of rows deleted.
+        '''
+        return self._xact_action(self.delrange, _delXactRange, lmin, lmax, limit=limit, db=db)
+
     def put(self, lkey, lval, dupdata=False, overwrite=True, append=False, db=None):
         return self._xact_action(self.put, lmdb.Transaction.put, lkey, lval, dupdata=dupdata, overwrite=overwrite,
                                  append=append, db=db)
@@ -1503,14 +1917,18 @@ class Slab(s_base.Base):
 
         # ok... lets commit and re-open
         starttime = s_common.now()
+        tick = time.perf_counter()
         self._finiCoXact()
-        donetime = s_common.now()
+        took = time.perf_counter() - tick
 
-        self.commitstats.append((starttime, xactopslen, donetime - starttime))
+        self.commitstats.append((starttime, xactopslen, int(took * 1000)))
+        self.commithist[bisect.bisect_left(COMMIT_HIST_BUCKETS, took * 1000)] += 1
 
         self._initCoXact()
         return True
 
+os.register_at_fork(after_in_child=Slab._onForkChild)
+
 class Scan:
     '''
     A state-object used by Slab.  Not to be instantiated directly.
@@ -29,7 +29,7 @@ class ModelRev:
                 return tuple({v: True for v in valu}.keys())
 
             async def save():
-                await layr.storNodeEdits(nodeedits, meta)
+                await layr.storNodeEditsNoLift(nodeedits, meta)
                 nodeedits.clear()
 
             stortype = s_layer.STOR_TYPE_GUID | s_layer.STOR_FLAG_ARRAY
@@ -406,20 +406,28 @@ class Parser:
             raise self._larkToSynExc(e) from None
         return AstConverter(self.text).transform(tree)
 
-@s_cache.memoize(size=100)
+@s_cache.memoize(size=1000)
 def parseQuery(text, mode='storm'):
     '''
-    Parse a storm query and return the Lark AST.  Cached here to speed up unit tests
+    Parse a storm query and return a prepared Query.
+
+    Notes:
+        The returned Query does not contain any per-run state and is cached
+        and shared between callers (and Cortexes), so it must not be modified.
     '''
     if mode == 'lookup':
-        return Parser(text).lookup()
+        query = Parser(text).lookup()
 
-    if mode == 'autoadd':
-        look = Parser(text).lookup()
-        look.autoadd = True
-        return look
+    elif mode == 'autoadd':
+        query = Parser(text).lookup()
+        query.autoadd = True
+
+    else:
+        query = Parser(text).query()
 
-    return Parser(text).query()
+    query.init()
+    query.optimize()
+    return query
 
 def massage_vartokn(x):
     return s_ast.Const('' if not x else (x[1:-1] if x[0] == "'" else (unescape(x) if x[0] == '"' else x)))
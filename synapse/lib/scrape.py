@@ -1,3 +1,5 @@
+import bisect
+
 import regex
 
 import synapse.data as s_data
@@ -7,6 +9,8 @@ tldlist = list(s_data.get('iana.tlds'))
 tldlist.sort(key=lambda x: len(x))
 tldlist.reverse()
 
+tldset = frozenset(tldlist)
+
 tldcat = '|'.join(tldlist)
 fqdn_re = regex.compile(r'((?:[a-z0-9_-]{1,63}\.){1,10}(?:%s))' % tldcat)
 
@@ -55,6 +59,219 @@ def refang_text(txt):
     '''
     return re_fang.sub(lambda match: FANGS[match.group(0).lower()], txt)
 
+# characters which may not appear in any scraped value and therefore separate tokens
+tokn_chars = ' \'"\t\n\r\f\v'
+tokn_class = '[^%s]' % regex.escape(tokn_chars)
+
+# only tokens which contain one of these characters or are long enough to be a hash can match
+tokn_re = regex.compile(r'(?<!%s)(?:%s*[.:@]%s*|%s{32,})' % ((tokn_class,) * 4))
+
+word_re = regex.compile(r'[A-Za-z0-9]+', regex.IGNORECASE)
+hex_re = regex.compile(r'[A-Fa-f0-9]+', regex.IGNORECASE)
+fqdn_run_re = regex.compile(r'(?<![a-z0-9_.-])[a-z0-9_.-]+', regex.IGNORECASE)
+email_user_re = regex.compile(r'(?<![a-z0-9_.+-])[a-z0-9_.+-]{1,256}(?=@)', regex.IGNORECASE)
+email_fqdn_re = regex.compile(r'[a-z0-9_.-]+', regex.IGNORECASE)
+
+hash_types = {32: 'hash:md5', 40: 'hash:sha1', 64: 'hash:sha256'}
+
+def _getFqdn(text):
+    '''
+    Return the longest valid FQDN prefix of a run of [a-z0-9_.-] characters or None.
+
+    This matches the same value as the TLD alternation in the inet:fqdn regex by
+    checking the label which follows each candidate suffix against a set of TLDs.
+    '''
+    labels = text.split('.')
+
+    # every label before the TLD must be 1-63 characters
+    maxlabels = 0
+    for label in labels[:10]:
+        if not 0 < len(label) < 64:
+            break
+        maxlabels += 1
+
+    for size in range(min(maxlabels, len(labels) - 1), 0, -1):
+        if labels[size].casefold() in tldset:
+            return '.'.join(labels[:size + 1])
+
+    return None
+
+class Scraper:
+    '''
+    A streaming scraper which finds all scrape types in a single pass over text.
+
+    Text may be fed in chunks of any size and results are returned as
+    (form, valu, offs) tuples where offs is the offset of the value within
+    all of the (original, not refanged) text fed to the scraper.
+
+    Example:
+
+        Scrape a file from the Axon without loading it into memory::
+
+            decoder = codecs.getincrementaldecoder('utf8')(errors='replace')
+            scraper = s_scrape.Scraper()
+
+            async for byts in axon.get(sha256):
+                for form, valu, offs in scraper.feed(decoder.decode(byts)):
+                    dostuff(form, valu)
+
+            for form, valu, offs in scraper.feed(decoder.decode(b'', final=True), final=True):
+                dostuff(form, valu)
+
+    Notes:
+        Results are returned in the order they occur in the text.
+    '''
+    def __init__(self, ptype=None, refang=True):
+        self.ptype = ptype
+        self.refang = refang
+
+        self.offs = 0
+        self.tail = ''
+
+    def _want(self, form):
+        return self.ptype is None or self.ptype == form
+
+    def feed(self, text, final=False):
+        '''
+        Feed text into the scraper and return a list of (form, valu, offs) tuples.
+
+        Args:
+            text (str): The next chunk of text.
+            final (bool): Set to True when this is the last chunk of text.
+
+        Returns:
+            list: A list of (form, valu, offs) tuples.
+        '''
+        if self.tail:
+            text = self.tail + text
+
+        # only scrape up to the last separator since a token may continue in the next chunk
+        if final:
+            size = len(text)
+        else:
+            size = max(text.rfind(c) for c in tokn_chars) + 1
+
+        base = self.offs
+
+        self.tail = text[size:]
+        self.offs += size
+
+        retn = []
+        if not size:
+            return retn
+
+        fangs = ()
+        if self.refang:
+            fangs = [(m.start(), m.end(), FANGS[m.group(0).lower()]) for m in re_fang.finditer(text, 0, size)]
+
+        fangindx = 0
+        fangsize = len(fangs)
+
+        for match in tokn_re.finditer(text, 0, size):
+
+            toknoffs, toknend = match.span()
+            tokn = match.group()
+
+            offsmap = None
+
+            # skip any fangs which were in tokens with nothing to scrape
+            while fangindx < fangsize and fangs[fangindx][0] < toknoffs:
+                fangindx += 1
+
+            if fangindx < fangsize and fangs[fangindx][0] < toknend:
+                tokn, offsmap, fangindx = self._refang(text, toknoffs, toknend, fangs, fangindx)
+
+            for form, valu, offs in self._scrapeTokn(tokn):
+
+                if offsmap is not None:
+                    indx = bisect.bisect_right(offsmap[0], offs) - 1
+                    offs = offsmap[1][indx] + min(offs - offsmap[0][indx], offsmap[2][indx])
+
+                retn.append((form, valu, base + toknoffs + offs))
+
+        return retn
+
+    def _refang(self, text, toknoffs, toknend, fangs, fangindx):
+        '''
+        Refang a token and return a mapping of refanged offsets to token offsets.
+        '''
+        parts = []
+
+        newoffs = []
+        oldoffs = []
+        sizes = []
+
+        last = toknoffs
+        newsize = 0
+
+        while fangindx < len(fangs) and fangs[fangindx][0] < toknend:
+
+            fangoffs, fangend, repl = fangs[fangindx]
+
+            # the unchanged text before the fang
+            parts.append(text[last:fangoffs])
+            newoffs.append(newsize)
+            oldoffs.append(last - toknoffs)
+            sizes.append(fangoffs - last)
+            newsize += fangoffs - last
+
+            # offsets within a replacement map to the start of the fang
+            parts.append(repl)
+            newoffs.append(newsize)
+            oldoffs.append(fangoffs - toknoffs)
+            sizes.append(0)
+            newsize += len(repl)
+
+            last = fangend
+            fangindx += 1
+
+        parts.append(text[last:toknend])
+        newoffs.append(newsize)
+        oldoffs.append(last - toknoffs)
+        sizes.append(toknend - last)
+
+        return ''.join(parts), (newoffs, oldoffs, sizes), fangindx
+
+    def _scrapeTokn(self, tokn):
+        '''
+        Yield (form, valu, offs) tuples from a single token in scrape_types order.
+        '''
+        if len(tokn) >= 32 and (self.ptype is None or self.ptype.startswith('hash:')):
+            for match in word_re.finditer(tokn):
+                form = hash_types.get(len(match.group()))
+                if form is not None and self._want(form) and hex_re.fullmatch(match.group()):
+                    yield form, match.group(), match.start()
+
+        if '://' in tokn and self._want('inet:url'):
+            for match in regexes['inet:url'].finditer(tokn):
+                yield 'inet:url', match.group(), match.start()
+
+        if '.' not in tokn:
+            return
+
+        if self._want('inet:ipv4'):
+            for match in regexes['inet:ipv4'].finditer(tokn):
+                yield 'inet:ipv4', match.group(), match.start()
+
+        if ':' in tokn and self._want('inet:server'):
+            for match in regexes['inet:server'].finditer(tokn):
+                yield 'inet:server', match.group(), match.start()
+
+        if self._want('inet:fqdn'):
+            for match in fqdn_run_re.finditer(tokn):
+                fqdn = _getFqdn(match.group())
+                if fqdn is not None:
+                    yield 'inet:fqdn', fqdn, match.start()
+
+        if '@' in tokn and self._want('inet:email'):
+            for match in email_user_re.finditer(tokn):
+                fqdnmatch = email_fqdn_re.match(tokn, match.end() + 1)
+                if fqdnmatch is None:
+                    continue
+                fqdn = _getFqdn(fqdnmatch.group())
+                if fqdn is not None:
+                    yield 'inet:email', f'{match.group()}@{fqdn}', match.start()
+
 def scrape(text, ptype=None, refang=True):
     '''
     Scrape types from a blob of text and return node tuples.
@@ -67,13 +284,20 @@ def scrape(text, ptype=None, refang=True):
     Returns:
         (str, str): Yield tuples of type, valu strings.
     '''
+    for form, valu, _ in contextScrape(text, ptype=ptype, refang=refang):
+        yield (form, valu)
 
-    if refang:
-        text = refang_text(text)
+def contextScrape(text, ptype=None, refang=True):
+    '''
+    Scrape types from a blob of text and return node tuples with their offsets.
+
+    Args:
+        text (str): Text to scrape.
+        ptype (str): Optional ptype to scrape. If present, only scrape rules which match the provided type.
+        refang (bool): Whether to remove de-fanging schemes from text before scraping.
 
-    for ruletype, _, _ in scrape_types:
-        if ptype and ptype != ruletype:
-            continue
-        regx = regexes.get(ruletype)
-        for valu in regx.findall(text):
-            yield (ruletype, valu)
+    Returns:
+        (str, str, int): Yield tuples of type, valu strings and the offset of the valu in text.
+    '''
+    scraper = Scraper(ptype=ptype, refang=refang)
+    yield from scraper.feed(text, final=True)
@@ -6,6 +6,8 @@ import synapse.common as s_common
 import synapse.lib.coro as s_coro
 import synapse.lib.msgpack as s_msgpack
 
+CULL_CHUNKSIZE = 10000  # the maximum number of rows deleted before yielding the loop
+
 class SlabSeqn:
     '''
     An append optimized sequence of byte blobs.
@@ -39,13 +41,25 @@ class SlabSeqn:
     async def cull(self, offs):
         '''
         Remove entries up to (and including) the given offset.
+
+        Returns:
+            int: The number of entries removed.
         '''
-        for itemoffs, valu in self.iter(0):
+        if offs < 0:
+            return 0
 
-            if itemoffs > offs:
-                return
+        lmin = s_common.int64en(0)
+        lmax = s_common.int64en(offs)
+
+        count = 0
+        while True:
+
+            deleted = self.slab.delrange(lmin, lmax, limit=CULL_CHUNKSIZE, db=self.db)
+            count += deleted
+
+            if deleted < CULL_CHUNKSIZE:
+                return count
 
-            self.slab.delete(s_common.int64en(itemoffs), db=self.db)
             await asyncio.sleep(0)
 
     def add(self, item, indx=None):
@@ -69,6 +83,13 @@ class SlabSeqn:
 
         return indx
 
+    def first(self, offs=0):
+        '''
+        Return the (indx, valu) tuple for the first entry at or after the given offset or None.
+        '''
+        for item in self.iter(offs):
+            return item
+
     def last(self):
 
         last = self.slab.last(db=self.db)
@@ -83,6 +104,14 @@ class SlabSeqn:
     def stat(self):
         return self.slab.stat(db=self.db)
 
+    def size(self):
+        '''
+        Return the number of bytes used by the pages of the sequence.
+        '''
+        stat = self.stat()
+        pages = stat['branch_pages'] + stat['leaf_pages'] + stat['overflow_pages']
+        return pages * stat['psize']
+
     def save(self, items):
         '''
         Save a series of items to a sequence.
@@ -175,13 +204,10 @@ class SlabSeqn:
         '''
         Delete entries starting at offset and moving forward.
         '''
-        retn = False
-
-        startkey = s_common.int64en(offs)
-        for lkey, _ in self.slab.scanByRange(startkey, db=self.db):
-            retn = True
-            self.slab.delete(lkey, db=self.db)
+        lmin = s_common.int64en(offs)
+        lmax = s_common.int64en(0xffffffffffffffff)
 
+        retn = bool(self.slab.delrange(lmin, lmax, db=self.db))
         if retn:
             self.indx = self.nextindx()
 
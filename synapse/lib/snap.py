@@ -12,7 +12,9 @@ import synapse.common as s_common
 
 import synapse.lib.coro as s_coro
 import synapse.lib.base as s_base
+import synapse.lib.chop as s_chop
 import synapse.lib.node as s_node
+import synapse.lib.time as s_time
 import synapse.lib.cache as s_cache
 import synapse.lib.layer as s_layer
 import synapse.lib.storm as s_storm
@@ -21,6 +23,10 @@ import synapse.lib.spooled as s_spooled
 
 logger = logging.getLogger(__name__)
 
+NODEDEFS_CHUNKSIZE = 100  # the number of nodedefs addNodes() applies at once
+LIFT_CHUNKSIZE = 100  # the max number of rows lifted from multiple layers which are joined into nodes at once
+WALK_CHUNKSIZE = 100  # the number of edges walked before their nodes are fetched at once
+
 class Scrubber:
 
     def __init__(self, rules):
@@ -242,6 +248,64 @@ class Snap(s_base.Base):
         '''
         return await self._joinStorNode(buid, {})
 
+    async def getNodesByBuids(self, buids):
+        '''
+        Retrieve a list of nodes by binary id.
+
+        Args:
+            buids (list): A list of binary IDs.
+
+        Returns:
+            list: A list of s_node.Node objects (or None) in the same order as buids.
+        '''
+        return await self._joinStorNodes(buids, {})
+
+    async def iterNodesByBuids(self, buids):
+        '''
+        Yield the nodes for a list of binary ids, skipping any which do not exist.
+
+        Args:
+            buids (list): A list of binary IDs.
+
+        Notes:
+            The storage nodes are fetched from each layer in bulk before any node is yielded.
+        '''
+        for node in await self.getNodesByBuids(buids):
+            node = await self._getLiveNode(node)
+            if node is not None:
+                yield node
+
+    async def _joinStorNodes(self, buids, caches):
+        '''
+        Join a list of nodes using one bulk storage node fetch per layer.
+
+        Args:
+            buids (list): A list of binary IDs.
+            caches (dict): A dict of buid to {layriden: sode} dicts of storage nodes which are already known.
+
+        Returns:
+            list: A list of s_node.Node objects (or None) in the same order as buids.
+        '''
+        todo = [buid for buid in dict.fromkeys(buids) if buid not in self.livenodes]
+
+        for layr in self.layers:
+
+            need = [buid for buid in todo if layr.iden not in caches.get(buid, ())]
+            if not need:
+                continue
+
+            sodes = await layr.getStorNodesByBuids(need)
+            for buid, sode in zip(need, sodes):
+                caches.setdefault(buid, {})[layr.iden] = sode
+
+        return [await self._joinStorNode(buid, caches.get(buid, {})) for buid in buids]
+
+    async def _getLiveNode(self, node):
+        # nodes joined in bulk may be deleted (or the cache cleared) before they are yielded
+        if node is None or self.livenodes.get(node.buid) is node:
+            return node
+        return await self.getNodeByBuid(node.buid)
+
     async def getNodeByNdef(self, ndef):
         '''
         Return a single Node by (form,valu) tuple.
@@ -262,10 +326,9 @@ class Snap(s_base.Base):
             mesg = f'No tag property named {name}'
             raise s_exc.NoSuchTagProp(name=name, mesg=mesg)
 
-        for layr in self.layers:
-            genr = layr.liftByTagProp(form, tag, name)
-            async for node in self._joinStorGenr(layr, genr):
-                yield node
+        genrs = [(layr, layr.liftByTagProp(form, tag, name)) for layr in self.layers]
+        async for node in self._joinStorGenrs(genrs, lambda n, l: n.bylayer['tagprops'].get((tag, name)) == l):
+            yield node
 
     async def nodesByTagPropValu(self, form, tag, name, cmpr, valu):
 
@@ -279,12 +342,11 @@ class Snap(s_base.Base):
         if not cmprvals:
             return
 
-        for layr in self.layers:
-            genr = layr.liftByTagPropValu(form, tag, name, cmprvals)
-            async for node in self._joinStorGenr(layr, genr):
-                if node.bylayer['tagprops'].get((tag, prop.name)) != layr:
-                    continue
-                yield node
+        genrs = [(layr, layr.liftByTagPropValu(form, tag, name, (cmprvalu,)))
+                 for layr in self.layers for cmprvalu in cmprvals]
+
+        async for node in self._joinStorGenrs(genrs, lambda n, l: n.bylayer['tagprops'].get((tag, prop.name)) == l):
+            yield node
 
     async def _joinStorNode(self, buid, cache):
 
@@ -310,7 +372,7 @@ class Snap(s_base.Base):
 
             sode = cache.get(layr.iden)
             if sode is None:
-                sode = await layr.getStorNode(buid)
+                sode = await layr.getStorNodeView(buid)
 
             form = sode.get('form')
             valt = sode.get('valu')
@@ -357,71 +419,193 @@ class Snap(s_base.Base):
         await asyncio.sleep(0)
         return node
 
-    async def _joinStorGenr(self, layr, genr):
-        cache = {}
-        async for buid, sode in genr:
-            cache[layr.iden] = sode
-            node = await self._joinStorNode(buid, cache)
-            if node is not None:
+    async def _joinStorGenrs(self, genrs, isowner=None):
+        '''
+        Join (indx, buid, sode) rows lifted from the layers into Node() objects.
+
+        Args:
+            genrs (list): A list of (layr, genr) tuples in self.layers order.
+            isowner (func): An optional isowner(node, layr) function which returns True if the lifted
+                            row came from the layer which provides the node's value for the lift.
+
+        Notes:
+            Lifts from multiple layers are merge sorted by (indx, buid) so that results are yielded in
+            index order and a node whose row is present in several layers is only joined once.
+        '''
+        if len(self.layers) == 1:
+            for layr, genr in genrs:
+                cache = {}
+                async for _, buid, sode in genr:
+                    cache[layr.iden] = sode
+                    node = await self._joinStorNode(buid, cache)
+                    if node is None:
+                        continue
+
+                    if isowner is not None and not isowner(node, layr):
+                        continue
+
+                    yield node
+            return
+
+        async def layrrows(layr, genr):
+            async for indx, buid, sode in genr:
+                yield indx, buid, sode, layr
+
+        # ties are yielded in genr order, so put the write layer first to make
+        # the first row for a given (indx, buid) the one from the highest layer.
+        mgenrs = [layrrows(layr, genr) for (layr, genr) in reversed(genrs)]
+
+        async def joinrows(rows):
+
+            caches = {}
+            for buid, sode, layr in rows:
+                caches.setdefault(buid, {})[layr.iden] = sode
+
+            nodes = await self._joinStorNodes([row[0] for row in rows], caches)
+            for (buid, sode, layr), node in zip(rows, nodes):
+
+                node = await self._getLiveNode(node)
+                if node is None:
+                    continue
+
+                if isowner is not None and not isowner(node, layr):
+                    continue
+
                 yield node
 
-    async def nodesByDataName(self, name):
-        for layr in self.layers:
-            genr = layr.liftByDataName(name)
-            async for node in self._joinStorGenr(layr, genr):
+        # the chunks grow up to LIFT_CHUNKSIZE so that a lift which is stopped early only reads a few rows
+        size = 1
+        rows = []
+        lastrow = None
+        async for indx, buid, sode, layr in s_common.merggenr2(mgenrs, cmprkey=lambda x: (x[0], x[1])):
+
+            row = (indx, buid)
+            if row == lastrow:
+                continue
+
+            lastrow = row
+
+            rows.append((buid, sode, layr))
+            if len(rows) >= size:
+                async for node in joinrows(rows):
+                    yield node
+                rows = []
+                size = min(size * 2, LIFT_CHUNKSIZE)
+
+        if rows:
+            async for node in joinrows(rows):
                 yield node
 
-    async def nodesByProp(self, full):
+    def hasRowCounts(self):
+        '''
+        Return True if the row counters of every layer in the view may be used for estimates.
+        '''
+        return all(layr.hasRowCounts() for layr in self.layers)
+
+    async def getTagEstimate(self, tag, form=None, maxsize=None):
+        '''
+        Estimate the number of rows a tag lift would read from the layers of the view.
+
+        Notes:
+            Nodes which are present in more than one layer are counted once per layer.
+        '''
+        count = 0
+        for layr in self.layers:
+
+            size = None
+            if maxsize is not None:
+                size = maxsize - count
+
+            count += await layr.getTagCount(tag, formname=form, maxsize=size)
+            if maxsize is not None and count >= maxsize:
+                return count
 
+        return count
+
+    async def getPropEstimate(self, full, cmpr=None, valu=None, maxsize=None):
+        '''
+        Estimate the number of rows a prop (or prop value) lift would read from the layers of the view.
+
+        Returns:
+            int: The estimated row count or None if the prop may not be estimated.
+
+        Notes:
+            Nodes which are present in more than one layer are counted once per layer.
+            Value lifts are estimated by counting the matching index rows, so the maxsize
+            option should be used to bound the work of estimating large ranges.
+        '''
         prop = self.core.model.prop(full)
         if prop is None:
             mesg = f'No property named "{full}".'
             raise s_exc.NoSuchProp(mesg=mesg)
 
         if prop.isrunt:
+            return None
 
-            async for node in self.getRuntNodes(prop.full):
-                yield node
+        if prop.isform:
+            formname, propname = prop.name, None
 
-            return
+        else:
+            formname = None
+            if not prop.isuniv:
+                formname = prop.form.name
+            propname = prop.name
 
-        if prop.isform:
+        cmprvals = None
+        if cmpr is not None:
+            cmprvals = prop.type.getStorCmprs(cmpr, valu)
 
-            for layr in self.layers:
-                genr = layr.liftByProp(prop.name, None)
+        count = 0
+        for layr in self.layers:
 
-                async for node in self._joinStorGenr(layr, genr):
+            size = None
+            if maxsize is not None:
+                size = maxsize - count
 
-                    # TODO merge sort rather than use bylayer
-                    if node.bylayer.get('ndef') != layr:
-                        continue
+            if cmprvals is None:
+                count += await layr.getPropCount(formname, propname, maxsize=size)
+            else:
+                count += await layr.getPropValuCount(formname, propname, cmprvals, maxsize=size)
+
+            if maxsize is not None and count >= maxsize:
+                return count
+
+        return count
+
+    async def nodesByDataName(self, name):
+        genrs = [(layr, layr.liftByDataName(name)) for layr in self.layers]
+        async for node in self._joinStorGenrs(genrs):
+            yield node
+
+    async def nodesByProp(self, full):
+
+        prop = self.core.model.prop(full)
+        if prop is None:
+            mesg = f'No property named "{full}".'
+            raise s_exc.NoSuchProp(mesg=mesg)
+
+        if prop.isrunt:
+
+            async for node in self.getRuntNodes(prop.full):
+                yield node
 
-                    yield node
             return
 
-        if prop.isuniv:
+        if prop.isform:
+
+            genrs = [(layr, layr.liftByProp(prop.name, None)) for layr in self.layers]
+            async for node in self._joinStorGenrs(genrs, lambda n, l: n.bylayer.get('ndef') == l):
+                yield node
 
-            for layr in self.layers:
-                genr = layr.liftByProp(None, prop.name)
-                async for node in self._joinStorGenr(layr, genr):
-                    # TODO should these type of filters yield?
-                    if node.bylayer['props'].get(prop.name) != layr:
-                        continue
-                    yield node
             return
 
         formname = None
         if not prop.isuniv:
             formname = prop.form.name
 
-        # Prop is secondary prop
-
-        for layr in self.layers:
-            genr = layr.liftByProp(formname, prop.name)
-            async for node in self._joinStorGenr(layr, genr):
-                if node.bylayer['props'].get(prop.name) != layr:
-                    continue
-                yield node
+        genrs = [(layr, layr.liftByProp(formname, prop.name)) for layr in self.layers]
+        async for node in self._joinStorGenrs(genrs, lambda n, l: n.bylayer['props'].get(prop.name) == l):
+            yield node
 
     async def nodesByPropValu(self, full, cmpr, valu):
 
@@ -451,53 +635,37 @@ class Snap(s_base.Base):
 
         if prop.isform:
 
-            for layr in self.layers:
-                genr = layr.liftByFormValu(prop.name, cmprvals)
+            genrs = [(layr, layr.liftByFormValu(prop.name, (cmprvalu,)))
+                     for layr in self.layers for cmprvalu in cmprvals]
 
-                async for node in self._joinStorGenr(layr, genr):
-
-                    # TODO merge sort rather than use bylayer
-                    if node.bylayer.get('ndef') != layr:
-                        continue
-
-                    yield node
+            async for node in self._joinStorGenrs(genrs, lambda n, l: n.bylayer.get('ndef') == l):
+                yield node
 
             return
 
-        if prop.isuniv:
-
-            for layr in self.layers:
-                genr = layr.liftByPropValu(None, prop.name, cmprvals)
-                async for node in self._joinStorGenr(layr, genr):
-                    if node.bylayer['props'].get(prop.name) != layr:
-                        continue
-                    yield node
+        formname = None
+        if not prop.isuniv:
+            formname = prop.form.name
 
-            return
+        genrs = [(layr, layr.liftByPropValu(formname, prop.name, (cmprvalu,)))
+                 for layr in self.layers for cmprvalu in cmprvals]
 
-        for layr in self.layers:
-            genr = layr.liftByPropValu(prop.form.name, prop.name, cmprvals)
-            async for node in self._joinStorGenr(layr, genr):
-                if node.bylayer['props'].get(prop.name) != layr:
-                    continue
-                yield node
+        async for node in self._joinStorGenrs(genrs, lambda n, l: n.bylayer['props'].get(prop.name) == l):
+            yield node
 
     async def nodesByTag(self, tag, form=None):
-        for layr in self.layers:
-            genr = layr.liftByTag(tag, form=form)
-            async for node in self._joinStorGenr(layr, genr):
-                if node.bylayer['tags'].get(tag) != layr:
-                    continue
-                yield node
+        # without a form the index rows of each layer are ordered by a layer specific form
+        # abrv, so the merged rows are not in a global order but the owner check still
+        # yields each node only once.
+        genrs = [(layr, layr.liftByTag(tag, form=form)) for layr in self.layers]
+        async for node in self._joinStorGenrs(genrs, lambda n, l: n.bylayer['tags'].get(tag) == l):
+            yield node
 
     async def nodesByTagValu(self, tag, cmpr, valu, form=None):
         norm, info = self.core.model.type('ival').norm(valu)
-        for layr in self.layers:
-            genr = layr.liftByTagValu(tag, cmpr, norm, form=form)
-            async for node in self._joinStorGenr(layr, genr):
-                if node.bylayer['tags'].get(tag) != layr:
-                    continue
-                yield node
+        genrs = [(layr, layr.liftByTagValu(tag, cmpr, norm, form=form)) for layr in self.layers]
+        async for node in self._joinStorGenrs(genrs, lambda n, l: n.bylayer['tags'].get(tag) == l):
+            yield node
 
     async def nodesByPropTypeValu(self, name, valu):
 
@@ -524,12 +692,11 @@ class Snap(s_base.Base):
 
         if prop.isform:
 
-            for layr in self.layers:
-                genr = layr.liftByPropArray(prop.name, None, cmprvals)
-                async for node in self._joinStorGenr(layr, genr):
-                    if node.bylayer['ndef'] != layr:
-                        continue
-                    yield node
+            genrs = [(layr, layr.liftByPropArray(prop.name, None, (cmprvalu,)))
+                     for layr in self.layers for cmprvalu in cmprvals]
+
+            async for node in self._joinStorGenrs(genrs, lambda n, l: n.bylayer['ndef'] == l):
+                yield node
 
             return
 
@@ -537,14 +704,105 @@ class Snap(s_base.Base):
         if prop.form is not None:
             formname = prop.form.name
 
-        for layr in self.layers:
-            genr = layr.liftByPropArray(formname, prop.name, cmprvals)
-            async for node in self._joinStorGenr(layr, genr):
-                if node.bylayer['props'].get(prop.name) != layr:
-                    continue
+        genrs = [(layr, layr.liftByPropArray(formname, prop.name, (cmprvalu,)))
+                 for layr in self.layers for cmprvalu in cmprvals]
+
+        async for node in self._joinStorGenrs(genrs, lambda n, l: n.bylayer['props'].get(prop.name) == l):
+            yield node
+
+    async def nodesByRefs(self, ndef):
+        '''
+        Yield nodes which reference the given ndef by a prop value or array prop item.
+
+        Notes:
+            A node is yielded once for each of its props which references the ndef.  When every
+            layer has a reverse reference index, the refs are lifted with one scan per layer.
+        '''
+        formname, valu = ndef
+
+        props = self.core.model.propsbytype.get(formname, ())
+        arrays = self.core.model.arraysbytype.get(formname, ())
+
+        if not all(layr.hasRefIndex() for layr in self.layers):
+
+            for prop in props:
+                async for node in self.nodesByPropValu(prop.full, '=', valu):
+                    yield node
+
+            for prop in arrays:
+                async for node in self.nodesByPropArray(prop.full, '=', valu):
+                    yield node
+
+            return
+
+        # runt nodes are not stored in the layers
+        for prop in props:
+            if prop.isrunt:
+                async for node in self.nodesByPropValu(prop.full, '=', valu):
+                    yield node
+
+        async def layrrows(layr):
+            async for row in layr.liftByRefs(s_common.buid(ndef)):
+                yield (*row, layr)
+
+        # rows are merged by buid so that each referencing node is only joined once
+        mgenrs = [layrrows(layr) for layr in reversed(self.layers)]
+
+        # rows for the same buid are grouped and the groups are joined in growing chunks
+        size = 1
+        groups = []
+        async for row in s_common.merggenr2(mgenrs, cmprkey=lambda x: x[0]):
+
+            if groups and groups[-1][0][0] == row[0]:
+                groups[-1].append(row)
+                continue
+
+            if len(groups) >= size:
+                async for node in self._joinRefGroups(groups):
+                    yield node
+                groups = []
+                size = min(size * 2, LIFT_CHUNKSIZE)
+
+            groups.append([row])
+
+        if groups:
+            async for node in self._joinRefGroups(groups):
+                yield node
+
+    async def _joinRefGroups(self, groups):
+
+        caches = {}
+        for rows in groups:
+            for buid, _, _, sode, layr in rows:
+                caches.setdefault(buid, {})[layr.iden] = sode
+
+        nodes = await self._joinStorNodes([rows[0][0] for rows in groups], caches)
+        for rows, node in zip(groups, nodes):
+            async for node in self._joinRefRows(rows, node):
+                yield node
+
+    async def _joinRefRows(self, rows, node):
+
+        owners = collections.defaultdict(set)
+
+        for _, _, prop, sode, layr in rows:
+            owners[prop].add(layr)
+
+        node = await self._getLiveNode(node)
+        if node is None:
+            return
+
+        for prop, layrs in sorted(owners.items(), key=lambda x: x[0] or ''):
+
+            if prop is None:
+                owner = node.bylayer['ndef']
+            else:
+                owner = node.bylayer['props'].get(prop)
+
+            if owner in layrs:
                 yield node
 
-    async def getNodeAdds(self, form, valu, props, addnode=True):
+    async def getNodeAdds(self, form, valu, props, addnode=True, norminfo=None):
 
         async def _getadds(f, p, formnorm, forminfo, doaddnode=True):
 
@@ -654,21 +912,30 @@ class Snap(s_base.Base):
         if props is None:
             props = {}
 
-        norm, info = form.type.norm(valu)
+        if norminfo is None:
+            norminfo = form.type.norm(valu)
+
+        norm, info = norminfo
         return [x async for x in _getadds(form, props, norm, info, doaddnode=addnode)]
 
     async def applyNodeEdit(self, edit):
         nodes = await self.applyNodeEdits((edit,))
         return nodes[0]
 
-    async def applyNodeEdits(self, edits):
+    async def applyNodeEdits(self, edits, retnodes=True):
         '''
         Sends edits to the write layer and evaluates the consequences (triggers, node object updates)
+
+        Args:
+            edits (list): A list of (buid, form, edits) node edits.
+            retnodes (bool): Set to False to only join the nodes which were changed by the edits.
         '''
         if self.readonly:
             mesg = 'The snapshot is in read-only mode.'
             raise s_exc.IsReadOnly(mesg=mesg)
 
+        self.view._reqNotMerging()
+
         meta = await self.getSnapMeta()
 
         todo = s_common.todo('storNodeEdits', edits, meta)
@@ -685,6 +952,9 @@ class Snap(s_base.Base):
 
         for buid, sode, postedits in results:
 
+            if not retnodes and not postedits:
+                continue
+
             cache = {wlyr.iden: sode}
 
             node = await self._joinStorNode(buid, cache)
@@ -896,6 +1166,12 @@ class Snap(s_base.Base):
         return await self.tagcache.aget(name)
 
     async def _addTagNode(self, name):
+
+        # avoid a (no-op) node edit for tags which already exist
+        node = await self.getNodeByNdef(('syn:tag', name))
+        if node is not None:
+            return node
+
         return await self.addNode('syn:tag', name)
 
     async def _raiseOnStrict(self, ctor, mesg, **info):
@@ -916,77 +1192,315 @@ class Snap(s_base.Base):
         Args:
             nodedefs (list): A list of nodedef tuples.
 
+        Notes:
+            The nodedefs are applied in chunks using addNodeDefs().
+
         Returns:
             (list): A list of xact messages.
         '''
-        for (formname, formvalu), forminfo in nodedefs:
-            try:
-                props = forminfo.get('props')
-
-                # remove any universal created props...
-                if props is not None:
-                    props.pop('.created', None)
-
-                oldstrict = self.strict
-                self.strict = True
-                try:
-                    node = await self.addNode(formname, formvalu, props=props)
-                    if node is not None:
-                        tags = forminfo.get('tags')
-                        if tags is not None:
-                            for tag, asof in tags.items():
-                                await node.addTag(tag, valu=asof)
-
-                        tagprops = forminfo.get('tagprops', {})
-                        if tagprops is not None:
-                            for tag, props in tagprops.items():
-                                for prop, valu in props.items():
-                                    try:
-                                        await node.setTagProp(tag, prop, valu)
-                                    except s_exc.NoSuchTagProp:
-                                        mesg = \
-                                            f'Tagprop [{prop}] does not exist, cannot set it on [{formname}={formvalu}]'
-                                        logger.warning(mesg)
-                                        continue
-
-                        nodedata = forminfo.get('nodedata')
-                        if nodedata is not None:
-                            for name, data in nodedata.items():
-                                await node.setData(name, data)
-
-                        for verb, n2iden in forminfo.get('edges', ()):
-                            # check for embedded ndef rather than n2iden
-                            if isinstance(n2iden, (list, tuple)):
-                                n2form, n2valu = n2iden
-                                try:
-                                    n2node = await self.addNode(n2form, n2valu)
-                                except asyncio.CancelledError:  # pragma: no cover  TODO:  remove once >= py 3.8 only
-                                    raise
-                                except:
-                                    logger.warning(f'Failed to make n2 edge node for {n2iden}')
-                                    continue
-                                n2iden = n2node.iden()
-                            await node.addEdge(verb, n2iden)
+        for chunk in s_common.chunks(nodedefs, NODEDEFS_CHUNKSIZE):
+            for node in await self.addNodeDefs(chunk):
+                if node is not None:
+                    yield node
+
+    async def addNodeDefs(self, nodedefs, retnodes=True):
+        '''
+        Add/merge a chunk of nodedefs by applying all of their node edits at once.
+
+        The node edits for the props, tags, tag props, node data and edges of every
+        nodedef are built up front and sent to the write layer in one storNodeEdits call.
+        As with adding them one at a time, a nodedef whose tags, tag props, node data or
+        edges are invalid keeps the edits before the invalid one but is not returned.
+
+        Args:
+            nodedefs (list): A list of nodedef tuples.
+            retnodes (bool): Set to False to skip joining the Node for each nodedef.
+
+        Returns:
+            list|int: A list of Node (or None if it was skipped) for each nodedef, or the
+            number of nodedefs which were applied if retnodes is False.
+        '''
+        if self.readonly:
+            mesg = 'The snapshot is in read-only mode.'
+            raise s_exc.IsReadOnly(mesg=mesg)
+
+        todo = []
+        for nodedef, norminfo in zip(nodedefs, self._normNodeDefs(nodedefs)):
+            todo.append((nodedef, await self._getNodeDefAdds(nodedef, norminfo)))
+            await asyncio.sleep(0)
+
+        # the current tags of the nodes are used to decide which (parent) tags to set
+        buids = [adds[0][0] for (nodedef, adds) in todo
+                 if adds is not None and (nodedef[1].get('tags') or nodedef[1].get('tagprops'))]
+        tagstate = await self._getTagsByBuids(list(set(buids)))
+
+        buids = []
+        nodeedits = []
+        for nodedef, adds in todo:
+
+            if adds is None:
+                buids.append(None)
+                continue
+
+            edits, ok = await self._getNodeDefEdits(nodedef, adds, tagstate)
+            nodeedits.extend(edits)
+
+            buids.append(adds[0][0] if ok else None)
+
+        if nodeedits:
+            await self.applyNodeEdits(nodeedits, retnodes=retnodes)
+
+        if not retnodes:
+            return len([buid for buid in buids if buid is not None])
+
+        return [await self.getNodeByBuid(buid) if buid is not None else None for buid in buids]
+
+    def _normNodeDefs(self, nodedefs):
+        '''
+        Return the (norm, info) tuple of the primary value of each nodedef (or None).
+
+        The values are normalized in one normMany() call per form.
+        '''
+        retn = [None] * len(nodedefs)
+
+        byform = collections.defaultdict(list)
+        for i, ((formname, formvalu), forminfo) in enumerate(nodedefs):
+            byform[formname].append((i, formvalu))
+
+        for formname, items in byform.items():
+
+            form = self.core.model.form(formname)
+            if form is None or form.isrunt:
+                continue
+
+            norms = form.type.normMany([valu for (i, valu) in items])
+            for (i, valu), norminfo in zip(items, norms):
+                retn[i] = norminfo
+
+        return retn
+
+    async def _getNodeDefAdds(self, nodedef, norminfo=None):
+
+        (formname, formvalu), forminfo = nodedef
+
+        try:
+
+            form = self.core.model.form(formname)
+            if form is None:
+                raise s_exc.NoSuchForm(name=formname)
+
+            if form.isrunt:
+                raise s_exc.IsRuntForm(mesg='Cannot make runt nodes.', form=form.full, prop=formvalu)
+
+            props = forminfo.get('props')
+
+            # remove any universal created props...
+            if props is not None:
+                props.pop('.created', None)
+
+            # values which failed to normalize in bulk are normalized again to raise the error
+            if norminfo is None:
+                norminfo = form.type.norm(formvalu)
+
+            if self.buidprefetch:
+                norm, info = norminfo
+                node = await self.getNodeByBuid(s_common.buid((form.name, norm)))
+                if node is not None:
+
+                    # props are set individually to avoid copying existing nodes into the write layer
+                    oldstrict = self.strict
+                    self.strict = True
+                    try:
+                        if props is not None:
+                            for name, valu in props.items():
+                                await node.set(name, valu)
+                    finally:
+                        self.strict = oldstrict
+
+                    return [(node.buid, form.name, [])]
+
+            return await self.getNodeAdds(form, formvalu, props=props, norminfo=norminfo)
+
+        except asyncio.CancelledError:  # pragma: no cover  TODO:  remove once >= py 3.8 only
+            raise
+
+        except Exception as e:
+            await self._warnNodeDef(nodedef, e)
+
+    async def _getNodeDefEdits(self, nodedef, adds, tagstate):
+        '''
+        Return a tuple of the node edits for a nodedef and a bool which is False if it was invalid.
+        '''
+
+        (formname, formvalu), forminfo = nodedef
+
+        buid, _, edits = adds[0]
+        edits = list(edits)
+
+        # any nodes for edges are added before the node itself
+        retn = []
+
+        try:
+
+            curtags = tagstate.setdefault(buid, {})
+
+            tags = forminfo.get('tags')
+            if tags is not None:
+                for tag, asof in tags.items():
+                    edits.extend(await self._getTagSetEdits(curtags, tag, asof))
+
+            tagprops = forminfo.get('tagprops')
+            if tagprops is not None:
+                for tag, props in tagprops.items():
+                    for prop, valu in props.items():
+
+                        if tag not in curtags:
+                            edits.extend(await self._getTagSetEdits(curtags, tag, (None, None)))
+
+                        tagprop = self.core.model.getTagProp(prop)
+                        if tagprop is None:
+                            mesg = f'Tagprop [{prop}] does not exist, cannot set it on [{formname}={formvalu}]'
+                            logger.warning(mesg)
+                            continue
+
+                        try:
+                            norm, info = tagprop.type.norm(valu)
+                        except Exception as e:
+                            mesg = f'Bad property value: #{tag}:{tagprop.name}={valu!r}'
+                            raise s_exc.BadTypeValu(mesg=mesg, name=tagprop.name, valu=valu, emesg=str(e))
+
+                        edits.append((s_layer.EDIT_TAGPROP_SET, (tag, prop, norm, None, tagprop.type.stortype), ()))
+
+            nodedata = forminfo.get('nodedata')
+            if nodedata is not None:
+                for name, data in nodedata.items():
+                    edits.append((s_layer.EDIT_NODEDATA_SET, (name, data, None), ()))
 
-                except asyncio.CancelledError:  # pragma: no cover  TODO:  remove once >= py 3.8 only
-                    raise
+            for verb, n2iden in forminfo.get('edges', ()):
 
-                except Exception as e:
-                    if not oldstrict:
-                        await self.warn(f'addNodes failed on {formname}, {formvalu}, {forminfo}: {e}')
+                # check for embedded ndef rather than n2iden
+                if isinstance(n2iden, (list, tuple)):
+                    n2form, n2valu = n2iden
+                    try:
+                        form = self.core.model.form(n2form)
+                        if form is None:
+                            raise s_exc.NoSuchForm(name=n2form)
+
+                        n2adds = await self.getNodeAdds(form, n2valu, None)
+
+                    except asyncio.CancelledError:  # pragma: no cover  TODO:  remove once >= py 3.8 only
+                        raise
+                    except Exception:
+                        logger.warning(f'Failed to make n2 edge node for {n2iden}')
                         continue
-                    raise
 
-                finally:
-                    self.strict = oldstrict
+                    retn.extend(n2adds)
+                    n2iden = s_common.ehex(n2adds[0][0])
 
-                yield node
+                elif not isinstance(n2iden, str) or not s_common.isbuidhex(n2iden):
+                    mesg = f'Invalid n2 iden for edge: {n2iden!r}'
+                    raise s_exc.BadArg(mesg=mesg, verb=verb, iden=n2iden)
+
+                edits.append((s_layer.EDIT_EDGE_ADD, (verb, n2iden), ()))
+
+        except asyncio.CancelledError:  # pragma: no cover  TODO:  remove once >= py 3.8 only
+            raise
+
+        except Exception as e:
+            await self._warnNodeDef(nodedef, e)
+            ok = False
+
+        else:
+            ok = True
+
+        retn.append((buid, formname, edits))
+        retn.extend(adds[1:])
+        return retn, ok
+
+    async def _warnNodeDef(self, nodedef, exc):
+
+        (formname, formvalu), forminfo = nodedef
+
+        if not self.strict:
+            await self.warn(f'addNodes failed on {formname}, {formvalu}, {forminfo}: {exc}')
+            return
+
+        logger.exception(f'Error making node: [{formname}={formvalu}]')
+
+    async def _getTagsByBuids(self, buids):
+        '''
+        Return a dict of the current {tag: valu} for each of the given buids.
+        '''
+        retn = {buid: {} for buid in buids}
+        if not buids:
+            return retn
+
+        for layr in self.layers:
+            sodes = await layr.getStorNodesByBuids(buids)
+            for buid, sode in zip(buids, sodes):
+                stortags = sode.get('tags')
+                if stortags:
+                    retn[buid].update(stortags)
+
+        return retn
+
+    async def _getTagSetEdits(self, curtags, tag, valu):
+        '''
+        Return the edits to add a tag (and any missing parent tags) given the current tags of a node.
+
+        Note:
+            The curtags dict is updated to include the tags which will be set by the edits.
+        '''
+        path = s_chop.tagpath(tag)
+
+        name = '.'.join(path)
+
+        if not await self.core.isTagValid(name):
+            mesg = f'The tag does not meet the regex for the tree.'
+            raise s_exc.BadTag(mesg=mesg)
+
+        tagnode = await self.addTagNode(name)
+
+        # implement tag renames...
+        isnow = tagnode.get('isnow')
+        if isnow:
+            await self.warn(f'tag {name} is now {isnow}')
+            name = isnow
+
+        if isinstance(valu, list):
+            valu = tuple(valu)
+
+        if valu != (None, None):
+            valu = self.core.model.type('ival').norm(valu)[0]
+
+        curv = curtags.get(name)
+        if curv == valu:
+            return ()
+
+        edits = []
+        if curv is None:
+
+            for parent in s_chop.tags(name)[:-1]:
+
+                if curtags.get(parent) is not None:
+                    continue
+
+                await self.addTagNode(parent)
+
+                curtags[parent] = (None, None)
+                edits.append((s_layer.EDIT_TAG_SET, (parent, (None, None), None), ()))
+
+        else:
+            # merge values into one interval
+            valu = s_time.ival(*valu, *curv)
+
+        if valu == curv:
+            return edits
 
-            except asyncio.CancelledError:  # pragma: no cover  TODO:  remove once >= py 3.8 only
-                raise
+        curtags[name] = valu
+        edits.append((s_layer.EDIT_TAG_SET, (name, valu, None), ()))
 
-            except Exception:
-                logger.exception(f'Error making node: [{formname}={formvalu}]')
+        return edits
 
     async def getRuntNodes(self, full, valu=None, cmpr=None):
 
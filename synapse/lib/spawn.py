@@ -3,6 +3,7 @@ Spawn is mechanism so that a cortex can execute different queries in separate pr
 '''
 
 import os
+import socket
 import asyncio
 import logging
 import threading
@@ -26,6 +27,7 @@ import synapse.lib.hive as s_hive
 import synapse.lib.link as s_link
 import synapse.lib.view as s_view
 import synapse.lib.dyndeps as s_dyndeps
+import synapse.lib.httppool as s_httppool
 import synapse.lib.hiveauth as s_hiveauth
 
 logger = logging.getLogger(__name__)
@@ -211,14 +213,77 @@ class SpawnProc(s_base.Base):
         def doit():
             self.todo.put(mesg)
             try:
-                return self.done.get()
+                retn = self.done.get()
             except (TypeError, OSError) as e:
                 logger.warning('Queue torn out from underneath me. (%s)', e)
                 assert self.isfini
                 return True
 
+            # the queue is closed with None once the process exits (for example if it was killed)
+            # so the link must be shut down by the caller
+            if retn is None:
+                return True
+
+            return retn
+
         return await self.executor(doit)
 
+    async def storm(self, text, opts, user, view):
+        '''
+        Execute a storm query in the spawned process and yield the storm messages.
+
+        Args:
+            text (str): The storm query text.
+            opts (dict): The storm options.
+            user (str): The iden of the user to run the query as.
+            view (str): The iden of the view to run the query in.
+
+        Yields:
+            ((str,dict)): Storm messages.
+
+        Notes:
+            Unlike a spawn storm query made via telepath, the messages are
+            returned to the caller over a local socket pair.
+        '''
+        sock0, sock1 = socket.socketpair()
+
+        item = {
+            'link': {'sock': sock1, 'info': {'unix': True}},
+            'view': view,
+            'user': user,
+            'storm': {
+                'opts': opts,
+                'query': text,
+            }
+        }
+
+        try:
+
+            async with await s_link.fromspawn({'sock': sock0, 'info': {'unix': True}}) as link:
+
+                xact = self.schedCoro(self.xact(item))
+
+                mesg = await link.rx()
+                if mesg is None:
+                    raise s_exc.LinkShut(mesg='Spawn process closed the link.')
+
+                while True:
+
+                    mesg = await link.rx()
+                    if mesg is None:
+                        raise s_exc.LinkShut(mesg='Spawn process closed the link.')
+
+                    retn = mesg[1].get('retn')
+                    if retn is None:
+                        break
+
+                    yield s_common.result(retn)
+
+                await xact
+
+        finally:
+            sock1.close()
+
     def executor(self, func, *args, **kwargs):
         def real():
             return func(*args, **kwargs)
@@ -340,6 +405,8 @@ class SpawnCore(s_base.Base):
         self.model.addDataModels(spawninfo.get('model'))
 
         self.stormpkgs = {}     # name: pkgdef
+
+        self._initStormQueryCache()
         await self._initStormCmds()
 
         for sdef in self.svcinfo:
@@ -359,6 +426,9 @@ class SpawnCore(s_base.Base):
         self.boss = await s_boss.Boss.anit()
         self.onfini(self.boss.fini)
 
+        self.httppool = await s_httppool.HttpPool.anit()
+        self.onfini(self.httppool)
+
         self.prox = await s_telepath.openurl(f'cell://{self.dirn}')
         self.onfini(self.prox.fini)
 
@@ -430,6 +500,11 @@ class SpawnCore(s_base.Base):
         async for item in self.prox.dyniter(iden, todo, gatekeys=gatekeys):
             yield item
 
+    async def addTrigQueue(self, viewiden, item):
+        # the async trigger queues are only opened by the cortex
+        todo = s_common.todo('addTrigQueue', item)
+        return await self.dyncall(viewiden, todo)
+
     def _logStormQuery(self, text, user):
         '''
         Log a storm query.
@@ -527,6 +602,7 @@ class SpawnCore(s_base.Base):
     loadStormPkg = s_cortex.Cortex.loadStormPkg
 
     _initStormCmds = s_cortex.Cortex._initStormCmds
+    _initStormQueryCache = s_cortex.Cortex._initStormQueryCache
     _initStormOpts = s_cortex.Cortex._initStormOpts
 
     _viewFromOpts = s_cortex.Cortex._viewFromOpts
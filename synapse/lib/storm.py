@@ -594,6 +594,8 @@ stormcmds = (
             ('--query', {'help': 'Query for the trigger to execute.', 'required': True}),
             ('--disabled', {'default': False, 'action': 'store_true',
                             'help': 'Create the trigger in disabled state.'}),
+            ('--async', {'default': False, 'action': 'store_true',
+                         'help': 'Queue the trigger to run in the background rather than inline with the edit.'}),
         ),
         'storm': '''
             $trig = $lib.trigger.add($cmdopts)
@@ -704,6 +706,9 @@ stormcmds = (
             ('--minute', {'help': 'Minute value for job or recurrence period.'}),
             ('--name', {'help': 'An optional name for the cron job.'}),
             ('--doc', {'help': 'An optional doc string for the cron job.'}),
+            ('--priority', {'type': 'int',
+                            'help': 'The priority of the cron job when waiting on other running cron jobs.'}),
+            ('--jitter', {'type': 'int', 'help': 'The max number of seconds to randomly delay each run by.'}),
             ('--hour', {'help': 'Hour value for job or recurrence period.'}),
             ('--day', {'help': 'Day value for job or recurrence period.'}),
             ('--month', {'help': 'Month value for job or recurrence period.'}),
@@ -727,6 +732,8 @@ stormcmds = (
 
             if $cmdopts.doc { $cron.set(doc, $cmdopts.doc) }
             if $cmdopts.name { $cron.set(name, $cmdopts.name) }
+            if $cmdopts.priority { $cron.set(priority, $cmdopts.priority) }
+            if $cmdopts.jitter { $cron.set(jitter, $cmdopts.jitter) }
 
             $lib.print("Created cron job: {iden}", iden=$cron.iden)
         ''',
@@ -805,7 +812,7 @@ stormcmds = (
             $crons = $lib.cron.list()
 
             if $crons {
-                $lib.print("user       iden       en? rpt? now? err? # start last start       last end         query")
+                $lib.print("user       iden       en? rpt? now? err? # start pri  last start       last end         last took  query")
 
                 for $cron in $crons {
 
@@ -818,13 +825,15 @@ stormcmds = (
                     $isrunning = $job.isrunning.ljust(4)
                     $iserr = $job.iserr.ljust(4)
                     $startcount = $lib.str.format("{startcount}", startcount=$job.startcount).ljust(7)
+                    $priority = $lib.str.format("{priority}", priority=$job.priority).ljust(4)
                     $laststart = $job.laststart.ljust(16)
                     $lastend = $job.lastend.ljust(16)
+                    $lastduration = $job.lastduration.ljust(10)
 
-       $lib.print("{user} {iden} {enabled} {isrecur} {isrunning} {iserr} {startcount} {laststart} {lastend} {query}",
+       $lib.print("{user} {iden} {enabled} {isrecur} {isrunning} {iserr} {startcount} {priority} {laststart} {lastend} {lastduration} {query}",
                                user=$user, iden=$iden, enabled=$enabled, isrecur=$isrecur,
-                               isrunning=$isrunning, iserr=$iserr, startcount=$startcount,
-                               laststart=$laststart, lastend=$lastend, query=$job.query)
+                               isrunning=$isrunning, iserr=$iserr, startcount=$startcount, priority=$priority,
+                               laststart=$laststart, lastend=$lastend, lastduration=$lastduration, query=$job.query)
                 }
             } else {
                 $lib.print("No cron jobs found")
@@ -851,8 +860,25 @@ stormcmds = (
                 $lib.print('last start time: {laststart}', laststart=$job.laststart)
                 $lib.print('last end time:   {lastend}', lastend=$job.lastend)
                 $lib.print('last result:     {lastresult}', lastresult=$job.lastresult)
+                $lib.print('# errors:        {errcount}', errcount=$job.errcount)
+                $lib.print('priority:        {priority}', priority=$job.priority)
+                $lib.print('jitter:          {jitter}', jitter=$job.jitter)
+                $lib.print('last nodes:      {lastnodes}', lastnodes=$job.lastnodes)
+                $lib.print('total nodes:     {totalnodes}', totalnodes=$job.totalnodes)
+                $lib.print('last duration:   {lastduration}', lastduration=$job.lastduration)
+                $lib.print('avg duration:    {avgduration}', avgduration=$job.avgduration)
+                $lib.print('last queued for: {lastlate}', lastlate=$job.lastlate)
+                $lib.print('max queued for:  {maxlate}', maxlate=$job.maxlate)
                 $lib.print('query:           {query}', query=$job.query)
 
+                if $job.hist {
+                    $lib.print('durations:       count   duration')
+                    for $bucket in $job.hist {
+                        $count = $lib.str.format('{count}', count=$bucket.count).ljust(7)
+                        $lib.print('                 {count} {bound}', count=$count, bound=$bucket.bound)
+                    }
+                }
+
                 if $job.recs {
                     $lib.print('entries:         incunit    incval required')
 
@@ -2061,12 +2087,12 @@ class MergeCmd(Cmd):
 
                 if adds:
                     addedits = [(node.buid, node.form.name, adds)]
-                    await runt.snap.view.layers[1].storNodeEdits(addedits, meta=meta)
+                    await runt.snap.view.layers[1].storNodeEditsNoLift(addedits, meta=meta)
                     adds.clear()
 
                 if subs:
                     subedits = [(node.buid, node.form.name, subs)]
-                    await runt.snap.view.layers[0].storNodeEdits(subedits, meta=meta)
+                    await runt.snap.view.layers[0].storNodeEditsNoLift(subedits, meta=meta)
                     subs.clear()
 
             # check all node perms first
@@ -2809,7 +2835,15 @@ class ParallelCmd(Cmd):
     Examples:
         inet:ipv4#foo | parallel { $place = $lib.import(foobar).lookup(:latlong) [ :place=$place ] }
 
+        // Use 4 processes to run a CPU heavy read-only query
+        inet:fqdn | parallel --procs 4 { +:zone=$lib.regex.replace("^www\\.", "", :zone) }
+
     NOTE: Storm variables set within the parallel query pipelines do not interact.
+
+    When --procs is specified, the inbound nodes are sharded by buid across
+    that many spawned processes which each execute the query in read-only mode.
+    Only primitive variables are passed to the spawned processes and the path
+    variables of the inbound nodes are not available to the query.
     '''
     name = 'parallel'
     readonly = True
@@ -2820,6 +2854,12 @@ class ParallelCmd(Cmd):
         pars.add_argument('--size', default=8,
             help='The number of parallel Storm pipelines to execute.')
 
+        pars.add_argument('--procs', type='int', default=0,
+            help='The number of spawned processes to execute the (read-only) query in.')
+
+        pars.add_argument('--batch', type='int', default=1000,
+            help='The number of inbound nodes to send to a spawned process at a time.')
+
         pars.add_argument('query',
             help='The query to execute in parallel.')
 
@@ -2847,6 +2887,132 @@ class ParallelCmd(Cmd):
         except Exception as e:
             await outq.put(e)
 
+    async def getProcVars(self, runt):
+        '''
+        Return the runtime variables which may be sent to a spawned process.
+        '''
+        varz = {}
+        for name, valu in runt.vars.items():
+            valu = await s_stormtypes.toprim(valu)
+            if s_msgpack.isok(valu):
+                varz[name] = valu
+        return varz
+
+    async def procpipeline(self, runt, proc, text, opts, inq, outq):
+
+        snap = runt.snap
+
+        async for buids in self.nextitem(inq):
+
+            # ensure the spawned process can see any pending edits
+            for layr in snap.view.layers:
+                if layr.layrslab.dirty:
+                    await layr.layrslab.sync()
+
+            opts['idens'] = [s_common.ehex(buid) for buid in buids]
+
+            async for mesg in proc.storm(text, opts, runt.user.iden, snap.view.iden):
+
+                if mesg[0] == 'node':
+                    node = await snap.getNodeByBuid(s_common.uhex(mesg[1][1]['iden']))
+                    if node is not None:
+                        await outq.put((node, runt.initPath(node)))
+                    continue
+
+                if mesg[0] == 'print':
+                    await runt.printf(mesg[1].get('mesg'))
+                    continue
+
+                if mesg[0] == 'warn':
+                    await runt.warn(mesg[1].get('mesg'))
+                    continue
+
+                if mesg[0] == 'err':
+                    s_common.result((False, mesg[1]))
+
+    async def procworker(self, runt, text, opts, inq, outq):
+
+        proc = None
+        spawnpool = runt.snap.core.spawnpool
+
+        try:
+
+            async with spawnpool.get() as proc:
+                await self.procpipeline(runt, proc, text, opts, inq, outq)
+
+            await outq.put(None)
+
+        except (asyncio.CancelledError, Exception) as e:
+
+            # the process may still be executing the query
+            if proc is not None:
+                await proc.fini()
+
+            if isinstance(e, asyncio.CancelledError): # pragma: no cover
+                raise
+
+            await outq.put(e)
+
+    async def execProcs(self, runt, genr, procs):
+
+        batch = await s_stormtypes.toint(self.opts.batch)
+        if batch < 1:
+            mesg = 'parallel --batch must be greater than 0.'
+            raise s_exc.BadArg(mesg=mesg, batch=batch)
+
+        opts = {
+            'readonly': True,
+            'vars': await self.getProcVars(runt),
+        }
+
+        async with await s_base.Base.anit() as base:
+
+            inqs = [asyncio.Queue(maxsize=2) for i in range(procs)]
+            outq = asyncio.Queue(maxsize=batch)
+
+            async def pump():
+                try:
+                    shards = [[] for i in range(procs)]
+                    async for node, path in genr:
+
+                        indx = node.buid[0] % procs
+
+                        shard = shards[indx]
+                        shard.append(node.buid)
+
+                        if len(shard) >= batch:
+                            await inqs[indx].put(shard)
+                            shards[indx] = []
+
+                    for indx, shard in enumerate(shards):
+                        if shard:
+                            await inqs[indx].put(shard)
+                        await inqs[indx].put(None)
+
+                except asyncio.CancelledError: # pragma: no cover
+                    raise
+                except Exception as e:
+                    await outq.put(e)
+
+            base.schedCoro(pump())
+            for inq in inqs:
+                base.schedCoro(self.procworker(runt, self.opts.query, dict(opts), inq, outq))
+
+            exited = 0
+            while True:
+
+                item = await outq.get()
+                if isinstance(item, Exception):
+                    raise item
+
+                if item is None:
+                    exited += 1
+                    if exited == procs:
+                        return
+                    continue
+
+                yield item
+
     async def execStormCmd(self, runt, genr):
 
         size = await s_stormtypes.toint(self.opts.size)
@@ -2854,6 +3020,17 @@ class ParallelCmd(Cmd):
 
         query.validate(runt)
 
+        procs = await s_stormtypes.toint(self.opts.procs)
+        if procs < 0:
+            mesg = 'parallel --procs must be a positive integer.'
+            raise s_exc.BadArg(mesg=mesg, procs=procs)
+
+        # a spawned Cortex can not spawn additional processes
+        if procs and getattr(runt.snap.core, 'spawnpool', None) is not None:
+            async for item in self.execProcs(runt, genr, procs):
+                yield item
+            return
+
         async with await s_base.Base.anit() as base:
 
             inq = asyncio.Queue(maxsize=size)
@@ -1,9 +1,6 @@
 import json
 import asyncio
 
-import aiohttp
-import aiohttp_socks
-
 import synapse.exc as s_exc
 import synapse.common as s_common
 
@@ -97,12 +94,8 @@ class LibHttp(s_stormtypes.Lib):
         todo = s_common.todo('getConfOpt', 'http:proxy')
         proxyurl = await self.runt.dyncall('cortex', todo)
 
-        connector = None
-        if proxyurl is not None:
-            connector = aiohttp_socks.ProxyConnector.from_url(proxyurl)
-
-        async with aiohttp.ClientSession(connector=connector) as sess:
-            try:
+        try:
+            async with self.runt.snap.core.httppool.getSess(proxyurl=proxyurl, ssl=ssl_verify) as sess:
                 async with sess.request(meth, url, headers=headers, json=json, data=body, **kwargs) as resp:
                     info = {
                         'code': resp.status,
@@ -112,11 +105,11 @@ class LibHttp(s_stormtypes.Lib):
                     }
                     return HttpResp(info)
                     # return HttpResp(code=resp.status, body=await resp.content.read())
-            except asyncio.CancelledError:  # pragma: no cover
-                raise
-            except Exception as e:
-                mesg = f'Error during http {meth} - {str(e)}'
-                raise s_exc.StormRuntimeError(mesg=mesg, headers=headers, json=json, body=body, params=params) from None
+        except asyncio.CancelledError:  # pragma: no cover
+            raise
+        except Exception as e:
+            mesg = f'Error during http {meth} - {str(e)}'
+            raise s_exc.StormRuntimeError(mesg=mesg, headers=headers, json=json, body=body, params=params) from None
 
 @s_stormtypes.registry.registerType
 class HttpResp(s_stormtypes.Prim):
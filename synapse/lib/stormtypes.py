@@ -22,6 +22,7 @@ import synapse.telepath as s_telepath
 import synapse.lib.coro as s_coro
 import synapse.lib.node as s_node
 import synapse.lib.time as s_time
+import synapse.lib.const as s_const
 import synapse.lib.cache as s_cache
 import synapse.lib.queue as s_queue
 import synapse.lib.scope as s_scope
@@ -1180,15 +1181,49 @@ class LibAxon(Lib):
                   ),
                   'returns': {'type': ['storm:node', 'null '],
                               'desc': 'The ``inet:urlfile`` node on success,  ``null`` on error.', }}},
+        {'name': 'read', 'desc': '''
+            Read a range of bytes from a file in the Axon.
+
+            Example:
+                Read the first 16 bytes of a file::
+
+                    $byts = $lib.axon.read($sha256, offs=0, size=16)
+            ''',
+         'type': {'type': 'function', '_funcname': 'read',
+                  'args': (
+                      {'name': 'sha256', 'type': 'str', 'desc': 'The SHA256 hash of the file.', },
+                      {'name': 'offs', 'type': 'int', 'desc': 'The offset to begin reading from.', 'default': 0, },
+                      {'name': 'size', 'type': 'int', 'desc': 'The maximum number of bytes to read (up to 16 MiB).',
+                       'default': 1048576, },
+                  ),
+                  'returns': {'type': 'bytes', 'desc': 'The bytes read from the file.', }}},
     )
     _storm_lib_path = ('axon',)
 
     def getObjLocals(self):
         return {
             'wget': self.wget,
+            'read': self.read,
             'urlfile': self.urlfile,
         }
 
+    async def read(self, sha256, offs=0, size=s_const.mebibyte):
+
+        self.runt.confirm(('storm', 'lib', 'axon', 'get'))
+
+        sha256 = await tostr(sha256)
+        offs = await toint(offs)
+        size = await toint(size)
+
+        if size > 16 * s_const.mebibyte:
+            mesg = '$lib.axon.read() size may not exceed 16 MiB.'
+            raise s_exc.BadArg(mesg=mesg, size=size)
+
+        await self.runt.snap.core.getAxon()
+
+        axon = self.runt.snap.core.axon
+        return await axon.read(s_common.uhex(sha256), offs, size)
+
     async def wget(self, url, headers=None, params=None, method='GET', json=None, body=None, ssl=True, timeout=None):
 
         self.runt.confirm(('storm', 'lib', 'axon', 'wget'))
@@ -2085,6 +2120,62 @@ class Queue(StormType):
         {'name': 'size', 'desc': 'Get the number of items in the Queue.',
          'type': {'type': 'function', '_funcname': '_methQueueSize',
                   'returns': {'type': 'int', 'desc': 'The number of items in the Queue.', }}},
+        {'name': 'addGroup', 'desc': 'Add a consumer group which leases items from the start of the Queue.',
+         'type': {'type': 'function', '_funcname': '_methQueueAddGroup',
+                  'args': (
+                      {'name': 'name', 'type': 'str', 'desc': 'The name of the consumer group.', },
+                  ),
+                  'returns': {'type': 'null', }}},
+        {'name': 'delGroup', 'desc': 'Remove a consumer group and its outstanding leases.',
+         'type': {'type': 'function', '_funcname': '_methQueueDelGroup',
+                  'args': (
+                      {'name': 'name', 'type': 'str', 'desc': 'The name of the consumer group.', },
+                  ),
+                  'returns': {'type': 'null', }}},
+        {'name': 'groups', 'desc': '''
+            Get the consumer groups for the Queue.
+
+            Notes:
+                The ``low`` value for each group is the lowest offset which has not been
+                acknowledged by the group.
+            ''',
+         'type': {'type': 'function', '_funcname': '_methQueueGroups',
+                  'returns': {'type': 'list', 'desc': 'A list of consumer group status dictionaries.', }}},
+        {'name': 'lease', 'desc': '''
+            Lease items from the Queue to a consumer in a consumer group.
+
+            Notes:
+                Each item is delivered to a single consumer in the group.  Items which are not
+                acknowledged with ``ack()`` before the lease times out are redelivered.
+
+            Examples:
+                Process items from a queue with several workers::
+
+                    $q = $lib.queue.get(work)
+                    for ($offs, $item) in $q.lease(enrich, size=100, wait=$lib.true) {
+                        $doWork($item)
+                        $q.ack(enrich, ($offs,))
+                    }
+            ''',
+         'type': {'type': 'function', '_funcname': '_methQueueLease',
+                  'args': (
+                      {'name': 'group', 'type': 'str', 'desc': 'The name of the consumer group.', },
+                      {'name': 'size', 'type': 'int', 'desc': 'The maximum number of items to lease.', 'default': 1, },
+                      {'name': 'timeout', 'type': 'int', 'default': 60,
+                       'desc': 'The number of seconds until the lease expires.', },
+                      {'name': 'consumer', 'type': 'str', 'default': None,
+                       'desc': 'The name of the consumer taking the lease.', },
+                      {'name': 'wait', 'type': 'boolean', 'default': False,
+                       'desc': 'Wait for items to be available before returning.', },
+                  ),
+                  'returns': {'type': 'list', 'desc': 'A list of (offset, item) tuples.', }}},
+        {'name': 'ack', 'desc': 'Acknowledge the processing of leased items.',
+         'type': {'type': 'function', '_funcname': '_methQueueAck',
+                  'args': (
+                      {'name': 'group', 'type': 'str', 'desc': 'The name of the consumer group.', },
+                      {'name': 'offsets', 'type': 'list', 'desc': 'The offsets of the items to acknowledge.', },
+                  ),
+                  'returns': {'type': 'int', 'desc': 'The number of leases which were acknowledged.', }}},
     )
     _storm_typename = 'storm:queue'
     def __init__(self, runt, name, info):
@@ -2108,8 +2199,56 @@ class Queue(StormType):
             'gets': self._methQueueGets,
             'cull': self._methQueueCull,
             'size': self._methQueueSize,
+            'addGroup': self._methQueueAddGroup,
+            'delGroup': self._methQueueDelGroup,
+            'groups': self._methQueueGroups,
+            'lease': self._methQueueLease,
+            'ack': self._methQueueAck,
         }
 
+    async def _methQueueAddGroup(self, name):
+        name = await tostr(name)
+        todo = s_common.todo('addCoreQueueGroup', self.name, name)
+        gatekeys = self._getGateKeys('put')
+        await self.runt.dyncall('cortex', todo, gatekeys=gatekeys)
+
+    async def _methQueueDelGroup(self, name):
+        name = await tostr(name)
+        todo = s_common.todo('delCoreQueueGroup', self.name, name)
+        gatekeys = self._getGateKeys('put')
+        await self.runt.dyncall('cortex', todo, gatekeys=gatekeys)
+
+    async def _methQueueGroups(self):
+        todo = s_common.todo('getCoreQueueGroups', self.name)
+        gatekeys = self._getGateKeys('get')
+        return await self.runt.dyncall('cortex', todo, gatekeys=gatekeys)
+
+    async def _methQueueLease(self, group, size=1, timeout=60, consumer=None, wait=False):
+        group = await tostr(group)
+        size = await toint(size)
+        timeout = await toint(timeout)
+        consumer = await tostr(consumer, noneok=True)
+        wait = await tobool(wait)
+
+        if size < 1:
+            raise s_exc.BadArg(mesg='Queue lease size must be greater than 0.', size=size)
+
+        if timeout < 1:
+            raise s_exc.BadArg(mesg='Queue lease timeout must be greater than 0.', timeout=timeout)
+
+        todo = s_common.todo('coreQueueLease', self.name, group, size=size, timeout=timeout, consumer=consumer,
+                             wait=wait)
+        gatekeys = self._getGateKeys('get')
+        return await self.runt.dyncall('cortex', todo, gatekeys=gatekeys)
+
+    async def _methQueueAck(self, group, offsets):
+        group = await tostr(group)
+        offsets = [await toint(offs) for offs in await toiter(offsets)]
+
+        todo = s_common.todo('coreQueueAck', self.name, group, offsets)
+        gatekeys = self._getGateKeys('get')
+        return await self.runt.dyncall('cortex', todo, gatekeys=gatekeys)
+
     async def _methQueueCull(self, offs):
         offs = await toint(offs)
         todo = s_common.todo('coreQueueCull', self.name, offs)
@@ -4155,8 +4294,10 @@ class Layer(Prim):
 
         if name == 'name':
             valu = await tostr(valu)
-        elif name == 'logedits':
+        elif name in ('logedits', 'logedits:consumers'):
             valu = await tobool(valu)
+        elif name in ('logedits:maxage', 'logedits:maxsize'):
+            valu = await toint(valu, noneok=True)
         else:
             mesg = f'Layer does not support setting: {name}'
             raise s_exc.BadOptValu(mesg=mesg)
@@ -5691,6 +5832,12 @@ class CronJob(Prim):
         # but we don't want timezone to print out
         return datetime.datetime.utcfromtimestamp(ts).isoformat(timespec='minutes')
 
+    @staticmethod
+    def _formatStat(valu, fmt='{:.3f}s'):
+        if valu is None:
+            return '<None>'
+        return fmt.format(valu)
+
     async def _methCronJobPprint(self):
         user = self.valu.get('username')
         laststart = self.valu.get('laststarttime')
@@ -5711,9 +5858,32 @@ class CronJob(Prim):
             'lastend': 'Never' if lastend is None else self._formatTimestamp(lastend),
             'lastresult': self.valu.get('lastresult') or '<None>',
             'iserr': 'X' if result is not None and not result.startswith('finished successfully') else ' ',
-            'recs': []
+            'priority': self.valu.get('priority', 0),
+            'jitter': self.valu.get('jitter', 0),
+            'recs': [],
         }
 
+        stats = self.valu.get('stats', {})
+        startcount = stats.get('startcount', 0)
+        totalduration = stats.get('totalduration', 0.0)
+
+        job['errcount'] = stats.get('errcount', 0)
+        job['lastnodes'] = self._formatStat(stats.get('lastnodes'), '{}')
+        job['totalnodes'] = stats.get('totalnodes', 0)
+        job['lastduration'] = self._formatStat(stats.get('lastduration'))
+        job['avgduration'] = self._formatStat(totalduration / startcount if startcount else None)
+        job['lastlate'] = self._formatStat(stats.get('lastlate'))
+        job['maxlate'] = self._formatStat(stats.get('maxlate'))
+        job['hist'] = []
+
+        last = 0
+        for bound, count in stats.get('hist', ()):
+            job['hist'].append({
+                'bound': f'> {last}s' if bound is None else f'<= {bound}s',
+                'count': count,
+            })
+            last = bound
+
         for reqdict, incunit, incval in self.valu.get('recs', []):
             job['recs'].append({
                 'reqdict': reqdict or '<None>',
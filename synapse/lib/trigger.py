@@ -25,6 +25,9 @@ Conditions = set((
 
 RecursionDepth = contextvars.ContextVar('RecursionDepth', default=0)
 
+# the max number of queued async trigger runs executed at once
+AsyncTrigConcurrency = 8
+
 # TODO: standardize locations for form/prop/tags regex
 
 tagrestr = r'((\w+|\*|\*\*)\.)*(\w+|\*|\*\*)'  # tag with optional single or double * as segment
@@ -41,6 +44,7 @@ TrigSchema = {
         'cond': {'enum': ['node:add', 'node:del', 'tag:add', 'tag:del', 'prop:set']},
         'storm': {'type': 'string'},
         'enabled': {'type': 'boolean'},
+        'async': {'type': 'boolean'},
     },
     'additionalProperties': True,
     'required': ['iden', 'user', 'storm', 'enabled'],
@@ -171,6 +175,58 @@ class Triggers:
                 for _, trig in globs.get(tag):
                     await trig.execute(node, vars=vars, view=view)
 
+    async def runQueued(self, items):
+        '''
+        Execute a batch of (trigiden, viewiden, buid, vars, depth) items queued by async triggers.
+
+        Nodes queued for the same trigger, view, and vars are coalesced into a single storm runtime.
+        Errors from each runtime are logged so the batch may always be culled once it has run.
+        '''
+        runs = {}
+        for trigiden, viewiden, buid, vars, depth in items:
+
+            varskey = None
+            if vars is not None:
+                varskey = tuple(sorted(vars.items()))
+
+            info = runs.get((trigiden, viewiden, varskey))
+            if info is None:
+                info = runs[(trigiden, viewiden, varskey)] = {'vars': vars, 'depth': depth, 'buids': {}}
+
+            info['depth'] = max(depth, info['depth'])
+            info['buids'][buid] = True
+
+        sema = asyncio.Semaphore(AsyncTrigConcurrency)
+
+        async def run(trigiden, viewiden, info):
+
+            trig = self.triggers.get(trigiden)
+            if trig is None:
+                return
+
+            async with sema:
+
+                token = RecursionDepth.set(info['depth'])
+
+                try:
+                    with self._recursion_check():
+                        await trig.executeQueued(viewiden, list(info['buids'].keys()), vars=info['vars'])
+
+                except s_exc.RecursionLimitHit:
+                    logger.warning(f'Async trigger {trigiden} hit the recursion limit.')
+
+                except asyncio.CancelledError:  # pragma: no cover  TODO:  remove once >= py 3.8 only
+                    raise
+
+                except Exception:
+                    # a failed run (such as a deleted user or view) must not hold up the rest of the queue
+                    logger.exception(f'Async trigger {trigiden} failed to run.')
+
+                finally:
+                    RecursionDepth.reset(token)
+
+        await asyncio.gather(*[run(trigiden, viewiden, info) for (trigiden, viewiden, _), info in runs.items()])
+
     def load(self, tdef):
 
         trig = Trigger(self.view, tdef)
@@ -197,6 +253,8 @@ class Triggers:
             s_chop.validateTagMatch(tag)
         if prop is not None and cond != 'prop:set':
             raise s_exc.BadOptValu(mesg='prop parameter invalid')
+        if tdef.get('async') and cond == 'node:del':
+            raise s_exc.BadOptValu(mesg='node:del triggers may not be async')
 
         if cond == 'node:add':
             self.nodeadd[form].append(trig)
@@ -315,11 +373,30 @@ class Trigger:
         '''
         Actually execute the query
         '''
-        opts = {}
+        if not self.tdef.get('enabled'):
+            return
+
+        if view is None:
+            view = self.view.iden
+
+        if self.tdef.get('async'):
+            item = (self.iden, view, node.buid, vars, RecursionDepth.get())
+            await self.view.core.addTrigQueue(self.view.iden, item)
+            return
 
+        await self._execute(view, vars=vars, node=node)
+
+    async def executeQueued(self, view, buids, vars=None):
+        '''
+        Execute the query once for a batch of nodes queued by an async trigger.
+        '''
         if not self.tdef.get('enabled'):
             return
 
+        await self._execute(view, vars=vars, idens=[s_common.ehex(buid) for buid in buids])
+
+    async def _execute(self, view, vars=None, node=None, idens=None):
+
         useriden = self.tdef.get('user')
 
         tag = self.tdef.get('tag')
@@ -330,9 +407,6 @@ class Trigger:
 
         query = self.view.core.getStormQuery(storm)
 
-        if view is None:
-            view = self.view.iden
-
         opts = {
             'user': useriden,
             'view': view,
@@ -341,11 +415,15 @@ class Trigger:
         if vars is not None:
             opts['vars'] = vars
 
+        if idens is not None:
+            opts['idens'] = idens
+
         with s_provenance.claim('trig', cond=cond, form=form, tag=tag, prop=prop):
 
             async with self.view.core.getStormRuntime(query, opts=opts) as runt:
 
-                runt.addInput(node)
+                if node is not None:
+                    runt.addInput(node)
 
                 try:
                     await s_common.aspin(runt.execute())
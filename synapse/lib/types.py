@@ -1,5 +1,7 @@
+import time
 import asyncio
 import logging
+import weakref
 import collections
 
 import regex
@@ -18,6 +20,9 @@ import synapse.lib.grammar as s_grammar
 
 logger = logging.getLogger(__name__)
 
+# python types whose values may be used as norm cache keys
+normcachetypes = (str, int)
+
 class Type:
 
     _opt_defs = ()
@@ -27,6 +32,10 @@ class Type:
     # ( due to hot-loop needs in the storm runtime )
     isarray = False
 
+    # set to False if norm() may return different results for the same value
+    # ( such as "now" or "*" ) which prevents caching the results
+    deterministic = True
+
     def __init__(self, modl, name, info, opts):
         '''
         Construct a new Type object.
@@ -73,6 +82,12 @@ class Type:
         self.locked = False
         self.deprecated = bool(self.info.get('deprecated', False))
 
+        self.normcache = None
+        self.normcachestats = {'hits': 0, 'misses': 0, 'misstime': 0.0}
+
+        # instances which share the norm cache of this one
+        self.normclones = weakref.WeakSet()
+
         self.postTypeInit()
 
     def _storLiftSafe(self, cmpr, valu):
@@ -297,6 +312,142 @@ class Type:
 
         return func(valu)
 
+    def normMany(self, values):
+        '''
+        Normalize a list of values for the type.
+
+        Args:
+            values (list): The values to normalize.
+
+        Returns:
+            (list): A (norm, info) tuple for each value, or None if the value could not be normalized.
+
+        Notes:
+            If the type is deterministic, each distinct str or int value is only normalized once.
+        '''
+        retn = []
+        norms = {}
+
+        for valu in values:
+
+            dedup = self.deterministic and type(valu) in normcachetypes
+            if dedup and valu in norms:
+                item = norms[valu]
+                if item is not None:
+                    item = (item[0], dict(item[1]))
+                retn.append(item)
+                continue
+
+            try:
+                item = self.norm(valu)
+            except Exception:
+                item = None
+
+            if dedup:
+                norms[valu] = item
+
+            retn.append(item)
+
+        return retn
+
+    def setNormCache(self, size):
+        '''
+        Set the size of the LRU cache of norm() results for the type.
+
+        Args:
+            size (int): The max number of str or int values to cache (or 0 to disable the cache).
+
+        Notes:
+            Only deterministic types may cache norm() results.  Instances which share the
+            cache of this one are updated to use the new cache (or to disable it).
+        '''
+        if not size:
+            self.normcache = None
+            self.normcachestats = {'hits': 0, 'misses': 0, 'misstime': 0.0}
+            self.__dict__.pop('norm', None)
+
+        else:
+
+            if not self.deterministic:
+                mesg = f'Type ({self.name}) may not cache norm() results.'
+                raise s_exc.BadArg(mesg=mesg, name=self.name)
+
+            self.normcache = s_cache.LruDict(size=size)
+            self.normcachestats = {'hits': 0, 'misses': 0, 'misstime': 0.0}
+
+            # shadow the norm() method of the class for this instance
+            self.norm = self._normCached
+
+        for tobj in tuple(self.normclones):
+            tobj.shareNormCache(self)
+
+    def shareNormCache(self, tobj):
+        '''
+        Use the norm cache (and statistics) of another instance of the type.
+
+        Args:
+            tobj (Type): A Type with the same name and options (such as the base of a clone).
+
+        Notes:
+            This instance follows any later changes to the norm cache of the other instance.
+        '''
+        tobj.normclones.add(self)
+
+        self.normcache = tobj.normcache
+        self.normcachestats = tobj.normcachestats
+
+        if self.normcache is None:
+            self.__dict__.pop('norm', None)
+            return
+
+        self.norm = self._normCached
+
+    def _normCached(self, valu):
+
+        if type(valu) not in normcachetypes:
+            return type(self).norm(self, valu)
+
+        # callers get a shallow copy of the info dict so they may not change the cached value
+        retn = self.normcache.get(valu)
+        if retn is not None:
+            self.normcachestats['hits'] += 1
+            return retn[0], dict(retn[1])
+
+        tick = time.perf_counter()
+        norm, info = type(self).norm(self, valu)
+
+        self.normcachestats['misses'] += 1
+        self.normcachestats['misstime'] += time.perf_counter() - tick
+
+        self.normcache[valu] = (norm, dict(info))
+        return norm, info
+
+    def getNormCacheInfo(self):
+        '''
+        Return a dictionary of statistics about the norm cache for the type (or None if it is disabled).
+
+        Notes:
+            The "saved" value is an estimate of the seconds saved by cache hits based on the average miss time.
+        '''
+        if self.normcache is None:
+            return None
+
+        hits = self.normcachestats['hits']
+        misses = self.normcachestats['misses']
+        misstime = self.normcachestats['misstime']
+
+        saved = 0.0
+        if misses:
+            saved = hits * misstime / misses
+
+        return {
+            'size': len(self.normcache),
+            'maxsize': self.normcache.maxsize,
+            'hits': hits,
+            'misses': misses,
+            'saved': saved,
+        }
+
     def repr(self, norm):
         '''
         Return a printable representation for the value.
@@ -387,6 +538,7 @@ class Bool(Type):
 class Array(Type):
 
     isarray = True
+    deterministic = False
 
     def postTypeInit(self):
 
@@ -458,6 +610,7 @@ class Array(Type):
 class Comp(Type):
 
     stortype = s_layer.STOR_TYPE_MSGP
+    deterministic = False
 
     def getCompOffs(self, name):
         return self.fieldoffs.get(name)
@@ -556,6 +709,7 @@ class FieldHelper(collections.defaultdict):
 class Guid(Type):
 
     stortype = s_layer.STOR_TYPE_GUID
+    deterministic = False
 
     def postTypeInit(self):
         self.setNormFunc(str, self._normPyStr)
@@ -1011,6 +1165,7 @@ class Ival(Type):
     An interval, i.e. a range, of times
     '''
     stortype = s_layer.STOR_TYPE_IVAL
+    deterministic = False
 
     def postTypeInit(self):
         self.futsize = 0x7fffffffffffffff
@@ -1216,6 +1371,7 @@ class Loc(Type):
 class Ndef(Type):
 
     stortype = s_layer.STOR_TYPE_MSGP
+    deterministic = False
 
     def postTypeInit(self):
         self.setNormFunc(list, self._normPyTuple)
@@ -1254,6 +1410,7 @@ class Ndef(Type):
 class Edge(Type):
 
     stortype = s_layer.STOR_TYPE_MSGP
+    deterministic = False
 
     def getCompOffs(self, name):
         return self.fieldoffs.get(name)
@@ -1352,6 +1509,7 @@ class TimeEdge(Edge):
 class Data(Type):
 
     stortype = s_layer.STOR_TYPE_MSGP
+    deterministic = False
 
     def postTypeInit(self):
         self.validator = None
@@ -1372,6 +1530,7 @@ class Data(Type):
 class NodeProp(Type):
 
     stortype = s_layer.STOR_TYPE_MSGP
+    deterministic = False
 
     def postTypeInit(self):
         self.setNormFunc(str, self._normPyStr)
@@ -1398,6 +1557,7 @@ class NodeProp(Type):
 class Range(Type):
 
     stortype = s_layer.STOR_TYPE_MSGP
+    deterministic = False
 
     _opt_defs = (
         ('type', None),  # type: ignore
@@ -1591,6 +1751,7 @@ class Tag(Str):
 class Time(IntBase):
 
     stortype = s_layer.STOR_TYPE_TIME
+    deterministic = False
 
     _opt_defs = (
         ('ismin', False),  # type: ignore
@@ -1,3 +1,5 @@
+import os
+import shutil
 import asyncio
 import logging
 import itertools
@@ -11,6 +13,7 @@ import synapse.lib.coro as s_coro
 import synapse.lib.snap as s_snap
 import synapse.lib.nexus as s_nexus
 import synapse.lib.config as s_config
+import synapse.lib.lmdbslab as s_lmdbslab
 import synapse.lib.spooled as s_spooled
 import synapse.lib.trigger as s_trigger
 import synapse.lib.stormctrl as s_stormctrl
@@ -86,6 +89,8 @@ class View(s_nexus.Pusher):  # type: ignore
         trignode = await node.open(('triggers',))
         self.trigdict = await trignode.dict()
 
+        self.trigqueue = None
+        self.trigtask = None
         self.triggers = s_trigger.Triggers(self)
         for _, tdef in self.trigdict.items():
             try:
@@ -461,9 +466,16 @@ class View(s_nexus.Pusher):  # type: ignore
 
         return await self.core.addView(vdef)
 
-    async def merge(self, useriden=None):
+    async def merge(self, useriden=None, chunksize=1000, resume=False):
         '''
         Merge this view into it's parent. All changes made to this view will be applied to the parent.
+
+        The node edits are applied to the parent layer in chunks of chunksize nodes and each chunk
+        is permission checked before it is applied.  Progress is saved after each chunk so an
+        interrupted merge resumes where it left off when the Cortex restarts and the layer of this
+        view is only truncated once the merge is complete.  Edits to this view are refused until
+        the merge completes (or fails) so that nodes behind the saved progress may not change
+        before the layer is truncated.
         '''
         fromlayr = self.layers[0]
 
@@ -472,19 +484,120 @@ class View(s_nexus.Pusher):  # type: ignore
         else:
             user = await self.core.auth.reqUser(useriden)
 
-        await self.mergeAllowed(user)
+        self._reqMergeable()
 
         parentlayr = self.parent.layers[0]
 
-        await self.core.boss.promote('storm', user=user, info={'merging': self.iden})
+        checkperms = not (user.isAdmin() or user.isAdmin(gateiden=parentlayr.iden))
 
-        async with await self.parent.snap(user=user) as snap:
+        task = await self.core.boss.promote('storm', user=user, info={'merging': self.iden})
+        task.info['merge:total'] = await fromlayr.getStorNodeCount()
+
+        # no awaits between checking and setting the merge state so only one merge may own it
+        merging = self.info.get('merging')
+        if merging is not None and not resume:
+            mesg = f'The view {self.iden} is already being merged.'
+            raise s_exc.CantMergeView(mesg=mesg)
+
+        if merging is None:
+            merging = {'buid': None, 'nodes': 0}
+
+        merging = dict(merging)
+        merging['user'] = user.iden
+
+        startbuid = None
+        if merging.get('buid') is not None:
+            startbuid = s_common.uhex(merging.get('buid'))
+
+        task.info['merging'] = self.iden
+        task.info['merge:nodes'] = merging.get('nodes')
 
-            meta = await snap.getSnapMeta()
-            async for nodeedits in fromlayr.iterLayerNodeEdits():
-                await parentlayr.storNodeEditsNoLift([nodeedits], meta)
+        # block edits to this view before any edits are checked so they cover every edit applied
+        await self.info.set('merging', dict(merging))
+
+        try:
+
+            async with await self.parent.snap(user=user) as snap:
+
+                meta = await snap.getSnapMeta()
+
+                chunk = []
+                async for nodeedit in fromlayr.iterLayerNodeEdits(startbuid=startbuid):
+
+                    # the node at the checkpoint was applied with the previous chunk
+                    if nodeedit[0] == startbuid:
+                        continue
+
+                    if checkperms:
+                        await self._confirmMergeEdit(user, snap, fromlayr, nodeedit)
+
+                    chunk.append(nodeedit)
+                    if len(chunk) >= chunksize:
+                        await self._mergeChunk(parentlayr, chunk, meta, merging, task)
+                        chunk = []
+
+                if chunk:
+                    await self._mergeChunk(parentlayr, chunk, meta, merging, task)
+
+        except asyncio.CancelledError:  # pragma: no cover  TODO:  remove once >= py 3.8 only
+            raise
+
+        except Exception:
+            # only an interrupted merge is resumed
+            await self.info.pop('merging')
+            raise
 
         await fromlayr.truncate()
+        await self.info.pop('merging')
+
+    def isMerging(self):
+        '''
+        Return True if the view is being merged into its parent.
+        '''
+        return self.info.get('merging') is not None
+
+    def _reqNotMerging(self):
+        if self.isMerging():
+            mesg = f'The view {self.iden} may not be edited while it is being merged.'
+            raise s_exc.IsReadOnly(mesg=mesg)
+
+    async def _mergeChunk(self, parentlayr, chunk, meta, merging, task):
+
+        await parentlayr.storNodeEditsNoLift(chunk, meta)
+
+        merging['buid'] = s_common.ehex(chunk[-1][0])
+        merging['nodes'] += len(chunk)
+
+        await self.info.set('merging', dict(merging))
+
+        task.info['merge:nodes'] = merging['nodes']
+
+    async def initMergeTask(self):
+        '''
+        Resume a merge which was interrupted by a restart.
+        '''
+        merging = self.info.get('merging')
+        if merging is None or self.parent is None:
+            return
+
+        user = self.core.auth.user(merging.get('user'))
+        if user is None:
+            await self.info.pop('merging')
+            return
+
+        logger.warning(f'Resuming merge of view {self.iden} after {merging.get("nodes")} nodes.')
+
+        await self.core.boss.execute(self._runMergeTask(user.iden), 'storm', user, info={'merging': self.iden})
+
+    async def _runMergeTask(self, useriden):
+        try:
+            await self.merge(useriden=useriden, resume=True)
+
+        except asyncio.CancelledError:  # pragma: no cover  TODO:  remove once >= py 3.8 only
+            raise
+
+        except Exception:
+            logger.exception(f'Failed to merge view {self.iden}')
 
     def _confirm(self, user, perms):
         layriden = self.layers[0].iden
@@ -516,11 +629,8 @@ class View(s_nexus.Pusher):  # type: ignore
         perms = ('node', 'tag', 'add', *tag.split('.'))
         self.parent._confirm(user, perms)
 
-    async def mergeAllowed(self, user=None):
-        '''
-        Check whether a user can merge a view into its parent.
-        '''
-        fromlayr = self.layers[0]
+    def _reqMergeable(self):
+
         if self.parent is None:
             raise s_exc.CantMergeView(mesg=f'Cannot merge a view {self.iden} than has not been forked')
 
@@ -532,24 +642,37 @@ class View(s_nexus.Pusher):  # type: ignore
             if view.parent == self:
                 raise s_exc.CantMergeView(mesg='Cannot merge a view that has children itself')
 
+    async def _confirmMergeEdit(self, user, snap, fromlayr, nodeedit):
+
+        async for offs, splice in fromlayr.makeSplices(0, [nodeedit], None):
+            check = self.permCheck.get(splice[0])
+            if check is None:
+                raise s_exc.SynErr(mesg='Unknown splice type, cannot safely merge',
+                                   splicetype=splice[0])
+
+            await check(user, snap, splice[1])
+
+    async def mergeAllowed(self, user=None):
+        '''
+        Check whether a user can merge a view into its parent.
+        '''
+        fromlayr = self.layers[0]
+
+        self._reqMergeable()
+
+        parentlayr = self.parent.layers[0]
         if user is None or user.isAdmin() or user.isAdmin(gateiden=parentlayr.iden):
             return
 
         async with await self.parent.snap(user=user) as snap:
-            splicecount = 0
+            nodecount = 0
             async for nodeedit in fromlayr.iterLayerNodeEdits():
-                async for offs, splice in fromlayr.makeSplices(0, [nodeedit], None):
-                    check = self.permCheck.get(splice[0])
-                    if check is None:
-                        raise s_exc.SynErr(mesg='Unknown splice type, cannot safely merge',
-                                           splicetype=splice[0])
-
-                    await check(user, snap, splice[1])
 
-                    splicecount += 1
+                await self._confirmMergeEdit(user, snap, fromlayr, nodeedit)
 
-                    if splicecount % 1000 == 0:
-                        await asyncio.sleep(0)
+                nodecount += 1
+                if nodecount % 1000 == 0:
+                    await asyncio.sleep(0)
 
     async def runTagAdd(self, node, tag, valu, view=None):
 
@@ -711,6 +834,92 @@ class View(s_nexus.Pusher):  # type: ignore
             trigs.extend(await self.parent.listTriggers())
         return trigs
 
+    def _getTrigQueuePath(self):
+        return os.path.join(self.core.dirn, 'slabs', 'views', self.iden, 'trigqueue.lmdb')
+
+    async def _initTrigQueue(self):
+
+        if self.trigqueue is not None:
+            return
+
+        path = self._getTrigQueuePath()
+        s_common.gendir(os.path.dirname(path))
+
+        slab = await s_lmdbslab.Slab.anit(path)
+        self.onfini(slab.fini)
+
+        self.trigqueue = slab.getSeqn('trigqueue')
+
+    async def addTrigQueue(self, item):
+        '''
+        Add a (trigiden, viewiden, buid, vars, depth) item to the async trigger queue.
+
+        Notes:
+            The queue is only opened by the Cortex.  Spawn processes forward items to it
+            using Cortex.addTrigQueue().
+        '''
+        await self._initTrigQueue()
+        self.trigqueue.add(item)
+        self.startTrigQueue()
+
+    async def initTrigQueue(self):
+        '''
+        Open an existing async trigger queue and start processing any items in it.
+        '''
+        # only create the queue once an async trigger fires
+        if os.path.isdir(self._getTrigQueuePath()):
+            await self._initTrigQueue()
+            self.startTrigQueue()
+
+    def startTrigQueue(self):
+        '''
+        Start a task to execute queued async triggers if one is not already running.
+        '''
+        if self.trigqueue is None or self.isfini or not self.core.isactive:
+            return
+
+        if self.trigtask is not None and not self.trigtask.done():
+            return
+
+        self.trigtask = self.schedCoro(self._runTrigQueue())
+
+    async def stopTrigQueue(self):
+        '''
+        Stop executing queued async triggers.
+        '''
+        if self.trigtask is not None:
+            self.trigtask.cancel()
+            self.trigtask = None
+
+    async def _runTrigQueue(self, size=1000):
+
+        # the task exits once the queue is empty and is restarted by addTrigQueue()
+        while not self.isfini:
+
+            rows = list(self.trigqueue.slice(0, size))
+            if not rows:
+                return
+
+            try:
+                await self.triggers.runQueued([item for (_, item) in rows])
+
+            except asyncio.CancelledError:  # pragma: no cover  TODO:  remove once >= py 3.8 only
+                raise
+
+            except Exception:  # pragma: no cover
+                logger.exception(f'Failed to run async triggers for view {self.iden}.')
+
+            # the batch is always culled so a bad item cannot wedge the queue
+            await self.trigqueue.cull(rows[-1][0])
+
+    def getTrigQueueSize(self):
+        '''
+        Return the number of queued async trigger items.
+        '''
+        if self.trigqueue is None:
+            return 0
+        return self.trigqueue.stat()['entries']
+
     async def delete(self):
         '''
         Delete the metadata for this view.
@@ -720,6 +929,9 @@ class View(s_nexus.Pusher):  # type: ignore
         await self.fini()
         await self.node.pop()
 
+        path = self._getTrigQueuePath()
+        shutil.rmtree(os.path.dirname(path), ignore_errors=True)
+
     def getSpawnInfo(self):
         return {
             'iden': self.iden,
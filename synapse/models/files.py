@@ -76,6 +76,8 @@ class FilePath(s_types.Str):
 
 class FileBytes(s_types.Str):
 
+    deterministic = False
+
     def postTypeInit(self):
         s_types.Str.postTypeInit(self)
         self.setNormFunc(str, self._normPyStr)
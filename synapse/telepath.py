@@ -18,6 +18,7 @@ import synapse.lib.coro as s_coro
 import synapse.lib.link as s_link
 import synapse.lib.queue as s_queue
 import synapse.lib.certdir as s_certdir
+import synapse.lib.msgpack as s_msgpack
 import synapse.lib.threads as s_threads
 import synapse.lib.urlhelp as s_urlhelp
 import synapse.lib.hashitem as s_hashitem
@@ -677,7 +678,8 @@ class Proxy(s_base.Base):
         mesg = ('t2:init', {
                 'todo': todo,
                 'name': name,
-                'sess': self.sess})
+                'sess': self.sess,
+                'batch': True})
 
         link = await self.getPoolLink()
 
@@ -708,16 +710,23 @@ class Proxy(s_base.Base):
                             info = 'Telepath protocol violation:  unexpected message received'
                             raise s_exc.BadMesgFormat(mesg=info)
 
-                        retn = mesg[1].get('retn')
-                        if retn is None:
-                            await self._putPoolLink(link)
-                            return
+                        retns = mesg[1].get('retns')
+                        if retns is None:
+                            retns = (mesg[1].get('retn'),)
+                        else:
+                            retns = [s_msgpack.un(byts) for byts in retns]
+
+                        for retn in retns:
+
+                            if retn is None:
+                                await self._putPoolLink(link)
+                                return
 
-                        # if this is an exception, it's the end...
-                        if not retn[0]:
-                            await self._putPoolLink(link)
+                            # if this is an exception, it's the end...
+                            if not retn[0]:
+                                await self._putPoolLink(link)
 
-                        yield s_common.result(retn)
+                            yield s_common.result(retn)
 
                 except GeneratorExit:
                     # if they bail early on the genr, fini the link
@@ -316,3 +316,42 @@ class CommonTest(s_t_utils.SynTest):
 
         retn = s_common.merggenr([asyncl(lt) for lt in (l3, l2, l1)], lambda x, y: x < y)
         self.eq((1, 2, 3, 4, 5, 6, 7, 8, 9), await alist(retn))
+
+    async def test_merggenr2(self):
+        async def asyncl(data):
+            for item in data:
+                yield item
+
+        async def alist(coro):
+            return [x async for x in coro]
+
+        l1 = (1, 4, 7)
+        l2 = (2, 5, 8)
+        l3 = (3, 6, 9)
+
+        retn = s_common.merggenr2([asyncl(lt) for lt in (l1, l2, l3)])
+        self.eq((1, 2, 3, 4, 5, 6, 7, 8, 9), await alist(retn))
+
+        retn = s_common.merggenr2([asyncl(lt) for lt in (l3, (), l1, l2)])
+        self.eq((1, 2, 3, 4, 5, 6, 7, 8, 9), await alist(retn))
+
+        # equal keys are yielded in genr order
+        l1 = ((1, 'a'), (2, 'a'))
+        l2 = ((1, 'b'), (3, 'b'))
+        retn = s_common.merggenr2([asyncl(lt) for lt in (l1, l2)], cmprkey=lambda x: x[0])
+        self.eq(((1, 'a'), (1, 'b'), (2, 'a'), (3, 'b')), await alist(retn))
+
+        retn = s_common.merggenr2([asyncl(lt) for lt in (l2, l1)], cmprkey=lambda x: x[0])
+        self.eq(((1, 'b'), (1, 'a'), (2, 'a'), (3, 'b')), await alist(retn))
+
+        # genrs are consumed lazily
+        seen = []
+        async def track(data):
+            for item in data:
+                seen.append(item)
+                yield item
+
+        genr = s_common.merggenr2([track(range(0, 100, 2)), track(range(1, 100, 2))])
+        self.eq(0, await genr.__anext__())
+        self.eq(1, await genr.__anext__())
+        self.eq([0, 1, 2], seen)
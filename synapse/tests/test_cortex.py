@@ -3237,6 +3237,41 @@ class CortexBasicTest(s_t_utils.SynTest):
             counts = nstat.get('formcounts')
             self.eq(counts.get('test:str'), 1)
 
+    async def test_storm_query_cache(self):
+
+        async with self.getTestCore() as core:
+
+            text = '[ test:str=foo ] | limit 1'
+
+            stat = (await core.stat()).get('querycache')
+            hits = stat.get('hits')
+            misses = stat.get('misses')
+
+            query = core.getStormQuery(text)
+            self.true(query is core.getStormQuery(text))
+            self.false(query is core.getStormQuery(text, mode='lookup'))
+
+            stat = (await core.stat()).get('querycache')
+            self.eq(hits + 1, stat.get('hits'))
+            self.eq(misses + 2, stat.get('misses'))
+            self.eq(s_cortex.QUERY_CACHE_SIZE, stat.get('maxsize'))
+
+            # the shared query may be run concurrently
+            await asyncio.gather(*[core.nodes(text) for _ in range(4)])
+            self.len(1, await core.nodes('test:str=foo'))
+
+            # model changes clear the cache
+            await core.addFormProp('test:str', '_hehe', ('int', {}), {})
+            self.eq(0, core.getStormQueryCacheInfo().get('size'))
+
+            misses = core.getStormQueryCacheInfo().get('misses')
+            core.getStormQuery(text)
+            self.eq(misses + 1, core.getStormQueryCacheInfo().get('misses'))
+
+            core.querycache.clear()
+            await core.addTagProp('score', ('int', {}), {})
+            self.eq(0, core.getStormQueryCacheInfo().get('size'))
+
     async def test_stat_lock(self):
         self.thisHostMust(hasmemlocking=True)
         conf = {'layers:lockmemory': True}
@@ -431,6 +431,7 @@ class AgendaTest(s_t_utils.SynTest):
                 db = slab.initdb('hive')
                 hive = await s_hive.SlabHive.anit(slab, db=db)
                 core.hive = hive
+                core.slab = slab
 
                 async with await s_agenda.Agenda.anit(core) as agenda:
                     await agenda.start()
@@ -551,3 +552,86 @@ class AgendaTest(s_t_utils.SynTest):
             self.eq((0, 99), await core.callStorm('return($lib.queue.get(foo).get())'))
             await core.agenda.stop()
             self.false(core.agenda.enabled)
+
+    async def test_agenda_maxruns(self):
+
+        conf = {'cron:max:concurrent': 1}
+        with self.getTestDir() as dirn:
+
+            async with self.getTestCore(dirn=dirn, conf=conf) as core:
+
+                self.eq(1, core.agenda.maxruns)
+
+                await core.callStorm('$lib.queue.add(foo) $lib.queue.add(gate)')
+
+                q = 'cron.add --minute +10 --name slow { $lib.queue.get(foo).put(slow) $lib.queue.get(gate).get() }'
+                await core.callStorm(q)
+                await core.callStorm('cron.add --minute +10 --name low { $lib.queue.get(foo).put(low) }')
+                q = 'cron.add --minute +10 --name high --priority 10 { $lib.queue.get(foo).put(high) [ inet:ipv4=1.2.3.4 ] }'
+                await core.callStorm(q)
+
+                appts = {appt.name: appt for (_, appt) in core.agenda.list()}
+                slow = appts['slow']
+                low = appts['low']
+                high = appts['high']
+                self.eq(10, high.priority)
+
+                await core.agenda._execute(slow)
+                self.eq((0, 'slow'), await core.callStorm('return($lib.queue.get(foo).get(0))'))
+
+                await core.agenda._execute(low)
+                await core.agenda._execute(high)
+                self.true(low.ispending)
+                self.true(high.ispending)
+                self.eq([high.iden, low.iden], [iden for (iden, _) in core.agenda.getRunQueue()])
+
+                await core.callStorm('$lib.queue.get(gate).put(go)')
+                self.eq((1, 'high'), await core.callStorm('return($lib.queue.get(foo).get(1))'))
+                self.eq((2, 'low'), await core.callStorm('return($lib.queue.get(foo).get(2))'))
+
+                self.len(0, core.agenda.getRunQueue())
+                self.false(low.ispending)
+
+                stats = core.agenda.getRunStats(high.iden)
+                self.eq(1, stats['startcount'])
+                self.eq(1, stats['lastnodes'])
+                self.eq(1, stats['totalnodes'])
+                self.eq(0, stats['errcount'])
+                self.gt(stats['lastlate'], 0.0)
+                self.eq(1, sum(count for (_, count) in stats['hist']))
+                self.eq(None, stats['hist'][-1][0])
+
+                # run statistics are not stored in the hive
+                self.eq(0, core.agenda._hivedict.get(high.iden)['startcount'])
+
+                mesgs = await core.stormlist('cron.list')
+                self.stormIsInPrint('last took', mesgs)
+
+                mesgs = await core.stormlist(f'cron.stat {high.iden}')
+                self.stormIsInPrint('# errors:        0', mesgs)
+                self.stormIsInPrint('priority:        10', mesgs)
+                self.stormIsInPrint('last nodes:      1', mesgs)
+                self.stormIsInPrint('<= 1s', mesgs)
+
+                with self.raises(s_exc.BadArg):
+                    await core.editCronJob(high.iden, 'priority', 'newp')
+
+                with self.raises(s_exc.BadArg):
+                    await core.editCronJob(high.iden, 'jitter', -1)
+
+                await core.editCronJob(low.iden, 'jitter', 10)
+                self.eq(10, low.jitter)
+
+                with mock.patch('random.random', return_value=0.001):
+                    await core.agenda._execute(low)
+                    self.true(low.ispending)
+                    self.eq((3, 'low'), await core.callStorm('return($lib.queue.get(foo).get(3))'))
+
+            async with self.getTestCore(dirn=dirn, conf=conf) as core:
+                appt = await core.agenda.get(high.iden)
+                self.eq(1, appt.startcount)
+                self.eq(10, appt.priority)
+                self.eq(1, core.agenda.getRunStats(high.iden)['lastnodes'])
+
+                await core.delCronJob(high.iden)
+                self.eq(0, core.agenda.getRunStats(high.iden)['startcount'])
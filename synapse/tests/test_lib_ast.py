@@ -1714,16 +1714,10 @@ class AstTest(s_test.SynTest):
                     calls = []
 
                     # Lift by value will fail since stortype is MSGP
-                    # can still optimize a bit though
+                    # the planner finds this while estimating and can still optimize a bit though
                     nodes = await core.nodes('test:str +:bar*range=((test:str, c), (test:str, q))')
                     self.len(1, nodes)
-
-                    exp = [
-                        ('valu', 'test:str:bar', 'range=', [['test:str', 'c'], ['test:str', 'q']]),
-                        ('prop', 'test:str:bar'),
-                    ]
-
-                    self.eq(calls, exp)
+                    self.eq(calls, [('prop', 'test:str:bar')])
                     calls = []
 
                     # Shouldn't optimize this, make sure the edit happens
@@ -1732,6 +1726,98 @@ class AstTest(s_test.SynTest):
                     self.len(0, [m for m in msgs if m[0] == 'node'])
                     self.eq(calls, [('prop', 'inet:ipv4')])
 
+    async def test_ast_lift_planner(self):
+
+        async with self.getTestCore() as core:
+
+            await core.nodes('for $i in (1,2,3,4,5,6,7,8,9,10) { [ inet:ipv4=$i :asn=$i +#common ] }')
+            await core.nodes('for $i in (11,12,13,14,15) { [ inet:ipv4=$i +#common ] }')
+            await core.nodes('inet:ipv4=1 inet:ipv4=11 [ +#cno.mal.foo ]')
+            await core.nodes('[ inet:fqdn=vertex.link +#cno.mal.foo ]')
+
+            async def explain(text):
+                msgs = await core.stormlist(text, opts={'explain': True})
+                nodes = [m[1] for m in msgs if m[0] == 'node']
+                plans = [m[1] for m in msgs if m[0] == 'storm:explain']
+                return nodes, plans
+
+            # a form lift uses the tag index
+            nodes, plans = await explain('inet:ipv4 +#cno.mal.foo')
+            self.len(2, nodes)
+            self.len(1, plans)
+            self.eq('inet:ipv4#cno.mal.foo', plans[0]['plan'])
+            self.eq(2, plans[0]['estimate'])
+            self.eq(2, plans[0]['rows'])
+            # the lift as written is only counted up to the best alternate
+            self.eq(('inet:ipv4', 2), plans[0]['plans'][0])
+
+            # a tag lift uses the form from a filter
+            nodes, plans = await explain('#cno.mal.foo +inet:ipv4')
+            self.len(2, nodes)
+            self.eq('inet:ipv4#cno.mal.foo', plans[0]['plan'])
+            self.eq(('#cno.mal.foo', 2), plans[0]['plans'][0])
+
+            # the lift as written is kept when it is cheaper
+            nodes, plans = await explain('inet:ipv4:asn=3 +#common')
+            self.len(1, nodes)
+            self.eq('inet:ipv4:asn=3', plans[0]['plan'])
+            self.eq(1, plans[0]['estimate'])
+
+            # nodes from the tag index must still match the range lift as written
+            nodes, plans = await explain('inet:ipv4:asn*range=(1, 8) +#cno.mal.foo')
+            self.len(1, nodes)
+            self.eq(('inet:ipv4', 1), nodes[0][0])
+            self.eq('inet:ipv4#cno.mal.foo', plans[0]['plan'])
+            self.eq(2, plans[0]['estimate'])
+            self.eq(1, plans[0]['rows'])
+
+            nodes, plans = await explain('inet:ipv4 +:asn>8')
+            self.len(2, nodes)
+            self.eq('inet:ipv4:asn>8', plans[0]['plan'])
+            self.eq(2, plans[0]['estimate'])
+
+            # value probes are bounded by the best plan
+            nodes, plans = await explain('inet:ipv4 +#cno.mal.foo +:asn>0')
+            self.len(1, nodes)
+            self.eq('inet:ipv4#cno.mal.foo', plans[0]['plan'])
+            self.eq(('inet:ipv4:asn>0', 3), plans[0]['plans'][2])
+
+            # no explain messages unless requested
+            msgs = await core.stormlist('inet:ipv4 +#cno.mal.foo')
+            self.len(0, [m for m in msgs if m[0] == 'storm:explain'])
+
+            async with await core.snap() as snap:
+                self.eq(15, await snap.getPropEstimate('inet:ipv4'))
+                self.eq(10, await snap.getPropEstimate('inet:ipv4:asn'))
+                self.eq(5, await snap.getPropEstimate('inet:ipv4:asn', maxsize=5))
+                self.eq(3, await snap.getPropEstimate('inet:ipv4:asn', cmpr='<=', valu=3))
+                self.eq(4, await snap.getPropEstimate('inet:ipv4.created', cmpr='>', valu=0, maxsize=4))
+                self.eq(3, await snap.getTagEstimate('cno.mal.foo'))
+                self.eq(1, await snap.getTagEstimate('cno.mal.foo', form='inet:fqdn'))
+                self.none(await snap.getPropEstimate('syn:form'))
+
+            # form estimates use the form counters rather than scanning the index
+            layr = core.getLayer()
+            layr.meta.set('rowcounts', False)
+
+            async def countByPref(*args, **kwargs):
+                raise Exception('countByPref called')
+
+            with mock.patch.object(layr.layrslab, 'countByPref', countByPref):
+
+                async with await core.snap() as snap:
+                    self.false(snap.hasRowCounts())
+                    self.eq(15, await snap.getPropEstimate('inet:ipv4'))
+                    self.eq(4, await snap.getPropEstimate('inet:ipv4', maxsize=4))
+
+                # nothing is estimated without valid row counters
+                nodes, plans = await explain('inet:ipv4 +#cno.mal.foo')
+                self.len(2, nodes)
+                self.eq('inet:ipv4', plans[0]['plan'])
+                self.none(plans[0]['estimate'])
+                self.eq(15, plans[0]['rows'])
+                self.eq((('inet:ipv4', None), ('inet:ipv4#cno.mal.foo', None)), plans[0]['plans'])
+
     async def test_ast_cmdoper(self):
 
         async with self.getTestCore() as core:
@@ -1766,3 +1852,56 @@ class AstTest(s_test.SynTest):
             nodes = await core.nodes('[ file:bytes=$asdf ]', opts=opts)
             await core.axon.put(b'asdf')
             self.len(1, await core.nodes('file:bytes +$lib.bytes.has(:sha256)'))
+
+    async def test_ast_condcompile(self):
+
+        async with self.getTestCore() as core:
+
+            await core.nodes('for $i in (1,2,3,4,5,6,7,8,9,10) { [ inet:ipv4=$i :asn=$i +#foo ] }')
+
+            calls = []
+            asntype = core.model.prop('inet:ipv4:asn').type
+            ctor = asntype.getCmprCtor('<=')
+
+            def wrapctor(valu):
+                calls.append(valu)
+                return ctor(valu)
+
+            with mock.patch.dict(asntype._cmpr_ctors, {'<=': wrapctor}):
+
+                # comparators for constant and runtsafe values are only built once
+                self.len(5, await core.nodes('#foo +:asn<=5'))
+                self.eq(calls, ['5'])
+
+                calls.clear()
+                self.len(5, await core.nodes('#foo +inet:ipv4:asn<=5'))
+                self.len(3, await core.nodes('#foo +:asn<=$x', opts={'vars': {'x': 3}}))
+                self.eq(calls, ['5', 3])
+
+                calls.clear()
+                self.len(4, await core.nodes('#foo $x=(4) +:asn<=$x'))
+                self.eq(calls, [4])
+
+                # values computed per node build a comparator per distinct value
+                calls.clear()
+                self.len(10, await core.nodes('#foo $x=$($node.value() / 5 * 5 + 5) +:asn<=$x'))
+                self.len(3, calls)
+
+                calls.clear()
+                self.len(10, await core.nodes('#foo $x=:asn +:asn<=$x'))
+                self.len(10, calls)
+
+            # cheap conditions are evaluated first unless they may have side effects
+            query = core.getStormQuery('inet:ipv4 +(:asn::name=foo and :asn=5 and #foo)')
+            kids = query.kids[1].kids[1].getCondOrder()
+            self.eq([s_ast.TagCond, s_ast.RelPropCond, s_ast.RelPropCond], [type(k) for k in kids])
+            self.eq('asn::name', await kids[2].kids[0].kids[0].compute(None, None))
+
+            query = core.getStormQuery('inet:ipv4 +(:asn::name=foo or { -> inet:asn } or #foo)')
+            kids = query.kids[1].kids[1].getCondOrder()
+            self.eq([s_ast.RelPropCond, s_ast.SubqCond, s_ast.TagCond], [type(k) for k in kids])
+
+            await core.nodes('inet:ipv4=1 [ -#foo ]')
+            self.len(9, await core.nodes('inet:ipv4 +(:asn::name=foo or :asn<0 or #foo)'))
+            self.len(1, await core.nodes('inet:ipv4 +(:asn::name=foo or :asn<=1 or #foo) -#foo'))
+            self.len(2, await core.nodes('inet:ipv4 +(#foo and :asn*range=(2, 3))'))
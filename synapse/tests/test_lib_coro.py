@@ -43,6 +43,21 @@ class CoroTest(s_t_utils.SynTest):
         self.false(s_coro.iscoro(genr()))
         self.false(s_coro.iscoro(agen()))
 
+    async def test_coro_chunks(self):
+
+        async def genr(size):
+            for i in range(size):
+                yield i
+
+        chunks = [c async for c in s_coro.chunks(genr(5), size=2)]
+        self.eq(chunks, [[0, 1], [2, 3], [4]])
+
+        chunks = [c async for c in s_coro.chunks(genr(4), size=2)]
+        self.eq(chunks, [[0, 1], [2, 3]])
+
+        chunks = [c async for c in s_coro.chunks(genr(0))]
+        self.eq(chunks, [])
+
     async def test_coro_genrhelp(self):
 
         @s_coro.genrhelp
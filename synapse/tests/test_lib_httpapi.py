@@ -1,11 +1,16 @@
 import json
+import asyncio
+
+from unittest import mock
 
 import aiohttp
 import aiohttp.client_exceptions as a_exc
 
+import synapse.exc as s_exc
 import synapse.cortex as s_cortex
 
 import synapse.lib.httpapi as s_httpapi
+import synapse.lib.msgpack as s_msgpack
 import synapse.lib.version as s_version
 
 import synapse.tests.utils as s_tests
@@ -931,6 +936,87 @@ class HttpApiTest(s_tests.SynTest):
                     async with sess.post(url, data=b'foo') as resp:
                         pass
 
+    async def test_http_storm_stream(self):
+
+        async with self.getTestCore() as core:
+
+            visi = await core.auth.addUser('visi')
+
+            await visi.setAdmin(True)
+            await visi.setPasswd('secret')
+
+            host, port = await core.addHttpsPort(0, host='127.0.0.1')
+
+            async with await core.snap() as snap:
+                for i in range(100):
+                    await snap.addNode('test:int', i)
+
+            async with self.getHttpSess(auth=('visi', 'secret'), port=port) as sess:
+
+                body = {'query': 'test:int', 'stream': 'ndjson'}
+                async with sess.post(f'https://localhost:{port}/api/v1/storm/nodes', json=body) as resp:
+                    self.eq('application/x-ndjson', resp.headers.get('Content-Type'))
+                    byts = await resp.read()
+                    nodes = [json.loads(line) for line in byts.splitlines()]
+                    self.len(100, nodes)
+                    self.eq(list(range(100)), sorted(n[0][1] for n in nodes))
+
+                body = {'query': 'test:int=10', 'stream': 'msgpack', 'gzip': True}
+                async with sess.post(f'https://localhost:{port}/api/v1/storm', json=body) as resp:
+                    self.eq('gzip', resp.headers.get('Content-Encoding'))
+                    self.eq('application/x-msgpack', resp.headers.get('Content-Type'))
+                    msgs = [m for m in s_msgpack.Unpk().feed(await resp.read())]
+                    self.eq(('init', 'node', 'fini'), tuple(m[1][0] for m in msgs))
+                    self.eq(10, msgs[1][1][1][0][1])
+
+                body = {'query': 'test:int', 'gzip': True}
+                async with sess.post(f'https://localhost:{port}/api/v1/storm/export', json=body) as resp:
+                    self.eq('gzip', resp.headers.get('Content-Encoding'))
+                    self.eq('application/x-synapse-nodes', resp.headers.get('Content-Type'))
+                    podes = [m[1] for m in s_msgpack.Unpk().feed(await resp.read())]
+                    self.len(100, podes)
+
+                body = {'query': 'inet:ipv4=asdfasdf', 'gzip': True}
+                async with sess.post(f'https://localhost:{port}/api/v1/storm/export', json=body) as resp:
+                    self.none(resp.headers.get('Content-Encoding'))
+                    retn = await resp.json()
+                    self.eq('err', retn.get('status'))
+                    self.eq('BadTypeValu', retn.get('code'))
+
+                body = {'query': 'test:int', 'stream': 'newp'}
+                async with sess.post(f'https://localhost:{port}/api/v1/storm', json=body) as resp:
+                    retn = await resp.json()
+                    self.eq('err', retn.get('status'))
+                    self.eq('BadArg', retn.get('code'))
+
+                # slow trickles of messages are flushed on a timer
+                body = {'query': '[ test:int=1000 ] | sleep 10', 'stream': 'ndjson'}
+                async with sess.post(f'https://localhost:{port}/api/v1/storm', json=body) as resp:
+                    line = await asyncio.wait_for(resp.content.readline(), timeout=5)
+                    self.eq('init', json.loads(line)[0])
+
+                # a query which fails mid-stream does not leave a timed flush pending
+                writers = []
+                StreamWriter = s_httpapi.StreamWriter
+
+                class Writer(StreamWriter):
+                    def __init__(self, *args, **kwargs):
+                        StreamWriter.__init__(self, *args, **kwargs)
+                        writers.append(self)
+
+                async def storm(query, opts=None):
+                    yield ('init', {})
+                    raise s_exc.SynErr(mesg='newp')
+
+                with mock.patch.object(s_httpapi, 'StreamWriter', Writer):
+                    with mock.patch.object(core, 'storm', storm):
+                        body = {'query': 'newp', 'stream': 'ndjson'}
+                        async with sess.post(f'https://localhost:{port}/api/v1/storm', json=body) as resp:
+                            self.eq(500, resp.status)
+
+                self.len(1, writers)
+                self.none(writers[0].timer)
+
     async def test_http_storm_vars(self):
 
         async with self.getTestCore() as core:
@@ -0,0 +1,83 @@
+import synapse.lib.httpapi as s_httpapi
+import synapse.lib.httppool as s_httppool
+
+import synapse.tests.utils as s_t_utils
+
+class CookieSetHandler(s_httpapi.Handler):
+
+    async def get(self):
+        self.set_cookie('redir', 'woot')
+        self.redirect('/api/tests/cookie/get')
+
+class CookieGetHandler(s_httpapi.Handler):
+
+    async def get(self):
+        self.sendRestRetn(self.get_cookie('redir'))
+
+class HttpPoolTest(s_t_utils.SynTest):
+
+    async def test_lib_httppool(self):
+
+        async with self.getTestCore() as core:
+
+            core.addHttpApi('/api/tests/cookie/set', CookieSetHandler, {'cell': core})
+            core.addHttpApi('/api/tests/cookie/get', CookieGetHandler, {'cell': core})
+
+            host, port = await core.addHttpsPort(0, host='127.0.0.1')
+            url = f'https://127.0.0.1:{port}/api/v1/active'
+
+            async with await s_httppool.HttpPool.anit(limit_per_host=2) as pool:
+
+                sess00 = pool.getSess(ssl=False)
+                sess01 = pool.getSess(ssl=False)
+                sess02 = pool.getSess()
+                sess03 = pool.getSess(proxyurl='socks5://127.0.0.1:1', ssl=False)
+
+                connector = sess00.connector
+                self.true(sess00 is not sess01)
+                self.true(connector is sess01.connector)
+                self.true(connector is not sess02.connector)
+                self.true(connector is not sess03.connector)
+
+                for sess in (sess00, sess01, sess02, sess03):
+                    await sess.close()
+
+                self.false(connector.closed)
+
+                # connections are reused across the per-request sessions
+                for _ in range(3):
+                    async with pool.getSess(ssl=False) as sess:
+                        async with sess.get(url, ssl=False) as resp:
+                            retn = await resp.json()
+                            self.eq('ok', retn.get('status'))
+
+                info = pool.getPoolInfo()
+                self.eq(3, info['connectors'])
+                self.eq(3, info['requests'])
+                self.eq(0, info['errors'])
+                self.eq(1, info['conns:created'])
+                self.eq(2, info['conns:reused'])
+
+                # cookies set during a redirect chain are kept for that request
+                async with pool.getSess(ssl=False) as sess:
+                    async with sess.get(f'https://127.0.0.1:{port}/api/tests/cookie/set', ssl=False) as resp:
+                        retn = await resp.json()
+                        self.eq('woot', retn.get('result'))
+                        self.len(1, resp.history)
+
+                # session cookies are not kept between requests
+                visi = await core.auth.addUser('visi')
+                await visi.setPasswd('secret')
+
+                body = {'user': 'visi', 'passwd': 'secret'}
+                async with pool.getSess(ssl=False) as sess:
+                    async with sess.post(f'https://127.0.0.1:{port}/api/v1/login', json=body, ssl=False) as resp:
+                        self.nn(resp.cookies.get('sess'))
+
+                async with pool.getSess(ssl=False) as sess:
+                    async with sess.get(f'https://127.0.0.1:{port}/api/v1/auth/users', ssl=False) as resp:
+                        retn = await resp.json()
+                        self.eq('NotAuthenticated', retn.get('code'))
+
+            self.true(connector.closed)
+            self.len(0, pool.connectors)
@@ -2,6 +2,8 @@ import os
 import math
 import asyncio
 
+from unittest import mock
+
 import synapse.exc as s_exc
 import synapse.common as s_common
 import synapse.telepath as s_telepath
@@ -978,7 +980,7 @@ class LayerTest(s_t_utils.SynTest):
             self.len(2, events)
             expectadd = (baseoff, (strnode.buid, 'test:str', s_layer.EDIT_NODE_ADD,
                                    ('foo', s_layer.STOR_TYPE_UTF8), ()))
-            expectdel = (baseoff + 19, (strnode.buid, 'test:str', s_layer.EDIT_NODE_DEL,
+            expectdel = (baseoff + 18, (strnode.buid, 'test:str', s_layer.EDIT_NODE_DEL,
                                         ('foo', s_layer.STOR_TYPE_UTF8), ()))
             self.eq(events, [expectadd, expectdel])
 
@@ -988,7 +990,7 @@ class LayerTest(s_t_utils.SynTest):
             ival = tuple([s_time.parse(x) for x in ('2012', '2014')])
             expectadd = (baseoff + 3, (ipv4node.buid, 'inet:ipv4', s_layer.EDIT_PROP_SET,
                                        ('.seen', ival, None, s_layer.STOR_TYPE_IVAL), ()))
-            expectdel = (baseoff + 16, (ipv4node.buid, 'inet:ipv4', s_layer.EDIT_PROP_DEL,
+            expectdel = (baseoff + 15, (ipv4node.buid, 'inet:ipv4', s_layer.EDIT_PROP_DEL,
                                         ('.seen', ival, s_layer.STOR_TYPE_IVAL), ()))
             self.eq(events, [expectadd, expectdel])
 
@@ -997,16 +999,16 @@ class LayerTest(s_t_utils.SynTest):
             self.len(2, events)
             expectadd = (baseoff + 2, (ipv4node.buid, 'inet:ipv4', s_layer.EDIT_PROP_SET,
                                        ('asn', 42, None, s_layer.STOR_TYPE_I64), ()))
-            expectdel = (baseoff + 15, (ipv4node.buid, 'inet:ipv4', s_layer.EDIT_PROP_DEL,
+            expectdel = (baseoff + 14, (ipv4node.buid, 'inet:ipv4', s_layer.EDIT_PROP_DEL,
                                         ('asn', 42, s_layer.STOR_TYPE_I64), ()))
             self.eq(events, [expectadd, expectdel])
 
             mdef = {'tags': ['foo.bar']}
             events = await alist(layr.syncIndexEvents(baseoff, mdef, wait=False))
             self.len(2, events)
-            expectadd = (baseoff + 9, (ipv4node.buid, 'inet:ipv4', s_layer.EDIT_TAG_SET,
+            expectadd = (baseoff + 8, (ipv4node.buid, 'inet:ipv4', s_layer.EDIT_TAG_SET,
                                        ('foo.bar', ival, None), ()))
-            expectdel = (baseoff + 10, (ipv4node.buid, 'inet:ipv4', s_layer.EDIT_TAG_DEL,
+            expectdel = (baseoff + 9, (ipv4node.buid, 'inet:ipv4', s_layer.EDIT_TAG_DEL,
                                         ('foo.bar', ival), ()))
             self.eq(events, [expectadd, expectdel])
 
@@ -1016,7 +1018,7 @@ class LayerTest(s_t_utils.SynTest):
                 self.len(2, events)
                 expectadd = (baseoff + 6, (ipv4node.buid, 'inet:ipv4', s_layer.EDIT_TAGPROP_SET,
                                            ('mytag', 'score', 99, None, s_layer.STOR_TYPE_I64), ()))
-                expectdel = (baseoff + 11, (ipv4node.buid, 'inet:ipv4', s_layer.EDIT_TAGPROP_DEL,
+                expectdel = (baseoff + 10, (ipv4node.buid, 'inet:ipv4', s_layer.EDIT_TAGPROP_DEL,
                                             ('mytag', 'score', 99, s_layer.STOR_TYPE_I64), ()))
                 self.eq(events, [expectadd, expectdel])
 
@@ -1158,6 +1160,79 @@ class LayerTest(s_t_utils.SynTest):
             nodes = await core.nodes('.created')
             self.len(0, nodes)
 
+    async def test_layer_stornodes_by_buids(self):
+
+        async with self.getTestCore() as core:
+
+            nodes = await core.nodes('[ test:str=foo test:str=bar +#baz ]')
+            layr = core.getLayer()
+
+            buids = [nodes[1].buid, b'\x00' * 32, nodes[0].buid]
+
+            # dirty and cached sodes come back without reading the slab
+            sodes = await layr.getStorNodesByBuids(buids)
+            self.eq(sodes[0]['valu'], ('bar', s_layer.STOR_TYPE_UTF8))
+            self.eq(sodes[1], {})
+            self.eq(sodes[2]['valu'], ('foo', s_layer.STOR_TYPE_UTF8))
+            self.nn(sodes[2]['tags'].get('baz'))
+
+            await layr.layrslab.sync()
+            self.len(0, layr.dirty)
+            layr.buidcache.clear()
+
+            sodes = await layr.getStorNodesByBuids(buids + [nodes[1].buid])
+            self.len(4, sodes)
+            self.eq(sodes[0]['valu'], ('bar', s_layer.STOR_TYPE_UTF8))
+            self.eq(sodes[1], {})
+            self.eq(sodes[2]['valu'], ('foo', s_layer.STOR_TYPE_UTF8))
+            self.eq(sodes[0], sodes[3])
+            self.nn(layr.buidcache.get(nodes[1].buid))
+
+            self.eq(sodes[2], await layr.getStorNode(nodes[0].buid))
+
+    async def test_layer_sode_views(self):
+
+        async with self.getTestCore() as core:
+
+            layr = core.getLayer()
+            nodes = await core.nodes('[ test:str=foo :tick=2020 +#bar ]')
+            buid = nodes[0].buid
+
+            sode = await layr.getStorNodeView(buid)
+            self.eq(sode['valu'], ('foo', s_layer.STOR_TYPE_UTF8))
+
+            with self.raises(TypeError):
+                sode['valu'] = ('bar', s_layer.STOR_TYPE_UTF8)
+
+            with self.raises(TypeError):
+                sode['tags']['baz'] = (None, None)
+
+            # the view reflects later edits without being copied again
+            await core.nodes('test:str=foo [ +#baz ]')
+            self.nn(sode['tags'].get('baz'))
+
+            # getStorNode() still returns a mutable copy
+            copy = await layr.getStorNode(buid)
+            copy['tags'].pop('baz')
+            self.nn(sode['tags'].get('baz'))
+
+            nodeedits = [(buid, 'test:str', [(s_layer.EDIT_TAG_SET, ('hehe', (None, None), None), ())])]
+            results = await layr.storNodeEdits(nodeedits, {})
+            self.len(1, results)
+            self.eq(results[0][0], buid)
+            self.nn(results[0][1]['tags'].get('hehe'))
+            self.len(1, results[0][2])
+
+            nodeedits = [(buid, 'test:str', [(s_layer.EDIT_TAG_DEL, ('hehe', None), ())])]
+            results = await layr.storNodeEditsNoLift(nodeedits, {})
+            self.len(1, results)
+            self.eq(results[0][:2], (buid, 'test:str'))
+            self.eq(results[0][2][0][0], s_layer.EDIT_TAG_DEL)
+
+            async with core.getLocalProxy(f'*/layer/{layr.iden}') as prox:
+                results = await prox.storNodeEdits([(buid, 'test:str', [])])
+                self.eq(results[0][1]['valu'], ('foo', s_layer.STOR_TYPE_UTF8))
+
     async def test_layer_flat_edits(self):
         nodeedits = (
             (b'asdf', 'test:junk', (
@@ -1388,3 +1463,487 @@ class LayerTest(s_t_utils.SynTest):
 
             with self.raises(s_exc.BadOptValu):
                 await core.callStorm('$layer = $lib.layer.get() $layer.set(newp, hehe)')
+
+    async def test_layer_rowcounts(self):
+
+        async with self.getTestCore(conf={'nexslog:en': True}) as core:
+
+            layr = core.getLayer()
+            self.true(layr.meta.get('rowcounts'))
+
+            async def checkCounts():
+                for form, prop in (('inet:ipv4', None), ('inet:ipv4', 'asn'), (None, '.seen'), ('test:arrayprop', 'ints')):
+                    abrv = layr.getPropAbrv(form, prop)
+                    count = await layr.layrslab.countByPref(abrv, db=layr.byprop)
+                    self.eq(count, await layr.getPropCount(form, prop))
+                    self.eq(count, layr.layrslab.countRowsByPref(abrv, db=layr.byprop))
+
+                for tag, form in (('foo', None), ('foo.bar', None), ('foo.bar', 'inet:ipv4'), ('foo.bar', 'inet:asn')):
+                    abrv = layr.tagabrv.bytsToAbrv(tag.encode())
+                    if form is not None:
+                        abrv += layr.getPropAbrv(form, None)
+                    count = await layr.layrslab.countByPref(abrv, db=layr.bytag)
+                    self.eq(count, await layr.getTagCount(tag, formname=form))
+                    self.eq(count, layr.layrslab.countRowsByPref(abrv, db=layr.bytag))
+
+            await core.nodes('[ inet:ipv4=1.2.3.4 inet:ipv4=5.6.7.8 :asn=20 .seen=2020 inet:asn=20 +#foo.bar ]')
+            await core.nodes('[ test:arrayprop=* :ints=(1, 2, 3) ]')
+            self.eq(2, await layr.getPropCount('inet:ipv4', 'asn'))
+            self.eq(3, await layr.getTagCount('foo.bar'))
+            self.eq(2, await layr.getTagCount('foo.bar', formname='inet:ipv4'))
+            self.eq(1, await layr.getPropCount('inet:ipv4', 'asn', maxsize=1))
+            await checkCounts()
+
+            # setting the same values does not change the counts
+            await core.nodes('inet:ipv4=1.2.3.4 [ :asn=20 +#foo.bar ]')
+            await checkCounts()
+
+            await core.nodes('inet:ipv4=1.2.3.4 [ :asn=30 -#foo.bar ]')
+            self.eq(2, await layr.getPropCount('inet:ipv4', 'asn'))
+            self.eq(1, await layr.getTagCount('foo.bar', formname='inet:ipv4'))
+            await checkCounts()
+
+            await core.nodes('inet:ipv4=5.6.7.8 | delnode')
+            await core.nodes('test:arrayprop [ -:ints ]')
+            self.eq(1, await layr.getPropCount('inet:ipv4'))
+            self.eq(1, await layr.getTagCount('foo.bar'))
+            self.eq(0, await layr.getPropCount('test:arrayprop', 'ints'))
+            await checkCounts()
+
+            # an older layer falls back to counting rows until the counters are rebuilt
+            layr.meta.set('rowcounts', False)
+            layr.tagcounts.set(s_common.ehex(layr.tagabrv.bytsToAbrv(b'foo.bar')), 99)
+            layr.propcounts.set(s_common.ehex(layr.getPropAbrv('inet:ipv4', None)), 99)
+            self.eq(1, await layr.getTagCount('foo.bar'))
+            self.eq(1, await layr.getPropCount('inet:ipv4'))
+
+            retn = await layr.rebuildRowCounts()
+            self.gt(retn['tags'], 0)
+            self.gt(retn['props'], 0)
+            self.true(layr.meta.get('rowcounts'))
+            await checkCounts()
+
+            # the rebuild is applied through the nexus so mirrors rebuild their own counters
+            events = [item[1] for item in core.nexsroot.nexslog.iter(0)]
+            self.eq([(layr.iden, 'layer:rowcounts:rebuild')], [e[:2] for e in events if e[1].endswith(':rebuild')])
+
+        # read-only layers may not be rebuilt but are valid while empty
+        with self.getTestDir() as dirn:
+
+            layrinfo = {'iden': s_common.guid(), 'creator': s_common.guid(), 'lockmemory': False}
+            s_layer.reqValidLdef(layrinfo)
+
+            layr = await s_layer.Layer.anit(layrinfo, dirn)
+            layr.meta.pop('rowcounts')
+            layr.meta.pop('refindex')
+            await layr.fini()
+
+            layrinfo['readonly'] = True
+            async with await s_layer.Layer.anit(layrinfo, dirn) as layr:
+                self.none(layr.meta.get('rowcounts'))
+                self.true(layr.hasRowCounts())
+                self.true(layr.hasRefIndex())
+                await self.asyncraises(s_exc.IsReadOnly, layr.rebuildRowCounts())
+                await self.asyncraises(s_exc.IsReadOnly, layr.rebuildRefIndex())
+
+    async def test_layer_refindex(self):
+
+        async with self.getTestCoreAndProxy() as (core, prox):
+
+            await core.addForm('_test:ints', 'array', {'type': 'test:int'}, {})
+            await core.addFormProp('test:str', '_int', ('test:int', {}), {})
+            self.eq(('test:int', True), core.model.refprops.get(('_test:ints', None)))
+            self.eq(('test:int', False), core.model.refprops.get(('test:str', '_int')))
+
+            layr = core.getLayer()
+            self.true(layr.hasRefIndex())
+
+            async def getRefs(valu):
+                nodes = await core.nodes('test:int=$valu <- *', opts={'vars': {'valu': valu}})
+                return list(sorted(n.ndef for n in nodes))
+
+            async def getRefsSlow(valu):
+                retn = []
+                for prop in core.model.propsbytype.get('test:int'):
+                    retn.extend([n.ndef for n in await core.nodes(f'{prop.full}=$valu', opts={'vars': {'valu': valu}})])
+                for prop in core.model.arraysbytype.get('test:int'):
+                    retn.extend([n.ndef for n in await core.nodes(f'{prop.full}*[=$valu]', opts={'vars': {'valu': valu}})])
+                return list(sorted(retn))
+
+            await core.nodes('[ test:int=10 test:int=20 ]')
+            await core.nodes('[ test:str=foo :_int=10 ]')
+            await core.nodes('[ test:arrayprop=* :ints=(10, 20, 10) ]')
+            await core.nodes('[ test:comp=(10, haha) test:comp=(20, haha) ]')
+            await core.nodes('[ _test:ints=(10, 30) ]')
+
+            refs = await getRefs(10)
+            self.len(4, refs)
+            self.eq(refs, await getRefsSlow(10))
+            self.eq(['_test:ints', 'test:arrayprop', 'test:comp', 'test:str'], [r[0] for r in refs])
+            self.len(2, await getRefs(20))
+
+            rows = [r async for r in layr.liftByRefs(s_common.buid(('test:int', 10)))]
+            self.eq({('_test:ints', None), ('test:arrayprop', 'ints'), ('test:comp', 'hehe'), ('test:str', '_int')},
+                    {(r[1], r[2]) for r in rows})
+
+            # prop changes and deletions update the index
+            await core.nodes('test:str=foo [ :_int=20 ]')
+            await core.nodes('test:arrayprop [ -:ints ]')
+            await core.nodes('_test:ints | delnode')
+            self.eq([('test:comp', (10, 'haha'))], await getRefs(10))
+            self.eq(await getRefsSlow(20), await getRefs(20))
+            self.len(2, await getRefs(20))
+
+            # upper layers which change the referencing prop hide the lower layer refs
+            view = await core.view.fork()
+            opts = {'view': view['iden']}
+            await core.nodes('test:str=foo [ :_int=10 ]', opts=opts)
+            nodes = await core.nodes('test:int=10 <- *', opts=opts)
+            self.eq({('test:comp', (10, 'haha')), ('test:str', 'foo')}, {n.ndef for n in nodes})
+            nodes = await core.nodes('test:int=20 <- *', opts=opts)
+            self.eq([('test:comp', (20, 'haha'))], [n.ndef for n in nodes])
+            self.len(2, await core.nodes('test:int=20 <- *'))
+
+            await core.nodes('[ test:arrayprop=* :ints=(20,) ]', opts=opts)
+            nodes = await core.nodes('test:int=20 <-- *', opts=opts)
+            self.eq(['test:arrayprop', 'test:comp'], sorted(n.ndef[0] for n in nodes))
+
+            # an older layer falls back to prop lifts until the index is rebuilt
+            layr.meta.set('refindex', False)
+            layr.layrslab.dropdb('byref')
+            layr.byref = layr.layrslab.initdb('byref', dupsort=True)
+            self.false(layr.hasRefIndex())
+            self.eq(await getRefsSlow(20), await getRefs(20))
+
+            async with core.getLocalProxy(f'*/layer/{layr.iden}') as layrprox:
+                self.eq(3, await layrprox.rebuildRefIndex())
+
+            self.true(layr.hasRefIndex())
+            rows = [r async for r in layr.liftByRefs(s_common.buid(('test:int', 20)))]
+            self.eq({('test:str', '_int'), ('test:comp', 'hehe')}, {(r[1], r[2]) for r in rows})
+            self.eq(await getRefsSlow(20), await getRefs(20))
+
+    async def test_layer_nodeedit_retention(self):
+
+        async with self.getTestCoreAndProxy() as (core, prox):
+
+            layr = core.getLayer()
+
+            self.eq(0, await layr.getEditStartIndx())
+            self.eq(0, await layr.cullNodeEditLog())
+
+            await core.nodes('for $i in $vals { [ test:int=$i ] }', opts={'vars': {'vals': list(range(10))}})
+            offsets = [offs for (offs, _) in layr.nodeeditlog.iter(0)]
+            self.ge(len(offsets), 10)
+
+            await layr.setNodeEditConsumer('foo', offsets[3])
+            await layr.setNodeEditConsumer('bar', offsets[5])
+            self.eq({'foo': offsets[3], 'bar': offsets[5]}, layr.getNodeEditConsumers())
+
+            # no retention options are set
+            self.eq(0, await layr.cullNodeEditLog())
+            self.eq(offsets[0], layr.nodeeditlog.first()[0])
+
+            q = '$layer = $lib.layer.get() $layer.set(logedits:consumers, $lib.true) return($layer.get(logedits:consumers))'
+            self.true(await core.callStorm(q))
+
+            self.eq(3, await layr.cullNodeEditLog())
+            self.eq(offsets[3], layr.nodeeditlog.first()[0])
+            self.eq(offsets[3], await layr.getEditStartIndx())
+
+            # a consumer at a culled offset must start from a snapshot
+            async with core.getLocalProxy(f'*/layer/{layr.iden}') as layrprox:
+                self.eq(offsets[3], await layrprox.getEditStartIndx())
+                await layrprox.delNodeEditConsumer('foo')
+
+            # consumers control log retention so they require admin
+            visi = await core.auth.addUser('visi')
+            await visi.addRule((True, ('layer', 'lift')))
+            async with core.getLocalProxy(f'*/layer/{layr.iden}', user='visi') as layrprox:
+                self.eq(offsets[3], await layrprox.getEditStartIndx())
+                with self.raises(s_exc.AuthDeny):
+                    await layrprox.setNodeEditConsumer('baz', 0)
+                with self.raises(s_exc.AuthDeny):
+                    await layrprox.delNodeEditConsumer('bar')
+
+            # consumers may not claim offsets past the end of the log
+            nextoffs = await layr.getEditIndx()
+            self.eq(nextoffs, await layr.setNodeEditConsumer('baz', nextoffs + 1000))
+            self.eq(nextoffs, layr.getNodeEditConsumers()['baz'])
+            await layr.delNodeEditConsumer('baz')
+            self.eq({'bar': offsets[5]}, layr.getNodeEditConsumers())
+
+            self.eq(2, await layr.cullNodeEditLog())
+            self.eq(offsets[5], await layr.getEditStartIndx())
+
+            # consumers may not silently resume past culled entries
+            with self.raises(s_exc.NoSuchIndx):
+                await alist(layr.syncNodeEdits2(offsets[4], wait=False))
+
+            with self.raises(s_exc.NoSuchIndx):
+                await alist(layr.syncNodeEdits(0, wait=False))
+
+            with self.raises(s_exc.NoSuchIndx):
+                await alist(layr.splices(offs=(offsets[4], 0, 0)))
+
+            items = await alist(layr.syncNodeEdits2(offsets[5], wait=False))
+            self.eq(offsets[5], items[0][0])
+
+            splices = await alist(layr.splices())
+            self.eq(offsets[5], splices[0][0][0])
+
+            await layr.delNodeEditConsumer('bar')
+            self.eq(0, await layr.cullNodeEditLog())
+
+            last = layr.nodeeditlog.last()[0]
+            self.eq(last, layr._getEditOffsBefore(s_common.now() + 1000))
+            self.none(layr._getEditOffsBefore(0))
+
+            with self.raises(s_exc.BadOptValu):
+                await core.callStorm('$lib.layer.get().set(logedits:maxage, (0))')
+
+            with self.raises(s_exc.BadOptValu):
+                await core.callStorm('$lib.layer.get().set(logedits:maxsize, (-1))')
+
+            await core.callStorm('$lib.layer.get().set(logedits:maxage, (3600000))')
+            self.eq(0, await layr.cullNodeEditLog())
+
+            await core.callStorm('$lib.layer.get().set(logedits:maxage, (1))')
+            await asyncio.sleep(0.01)
+            self.eq(len(offsets) - 5, await layr.cullNodeEditLog())
+            self.none(layr.nodeeditlog.first())
+            self.eq(last + 1, await layr.getEditStartIndx())
+
+            await core.callStorm('$lib.layer.get().set(logedits:maxage, $lib.null)')
+            self.none(layr.layrinfo.get('logedits:maxage'))
+
+            await core.nodes('for $i in $vals { [ test:str=$i ] }', opts={'vars': {'vals': list(range(2000))}})
+            entries = layr.nodeeditlog.stat()['entries']
+            size = layr.nodeeditlog.size()
+
+            await core.callStorm(f'$lib.layer.get().set(logedits:maxsize, ({size // 2}))')
+            self.gt(await layr.cullNodeEditLog(), 0)
+            self.lt(layr.nodeeditlog.stat()['entries'], entries)
+            self.le(layr.nodeeditlog.size(), size // 2)
+
+            # the layer snapshot recovers everything which was culled
+            snapindx = await layr.getEditIndx()
+            nodeedits = [nodeedit async for nodeedit in layr.iterLayerNodeEdits()]
+            self.len(2010, [ne for ne in nodeedits if ne[1] in ('test:int', 'test:str')])
+            self.lt(await layr.getEditStartIndx(), snapindx)
+
+    async def test_layer_flatten(self):
+
+        with self.getTestDir() as dirn:
+
+            async with self.getTestCore(dirn=dirn) as core:
+
+                await core.addTagProp('score', ('int', {}), {})
+
+                layr1 = (await core.addLayer())['iden']
+                layr2 = (await core.addLayer())['iden']
+
+                view1 = (await core.addView({'layers': (layr1,)}))['iden']
+                await core.nodes('''
+                    [ inet:ipv4=1.2.3.4 :asn=10 :loc=us .seen=(2010, 2011) +#foo=(2010, 2012) +#bar:score=10 ]
+                    [ +(refs)> { [ inet:fqdn=vertex.link ] } ]
+                    $node.data.set(hehe, haha)
+                ''', opts={'view': view1})
+                await core.nodes('[ inet:dns:a=(vertex.link, 1.2.3.4) ]', opts={'view': view1})
+                await core.nodes('[ test:arrayprop=* :ints=(1, 2, 3) ]', opts={'view': view1})
+                await core.nodes('[ inet:ipv4=5.6.7.8 :asn=20 ] $node.data.set(hehe, hoho)', opts={'view': view1})
+                await core.delView(view1)
+
+                view2 = (await core.addView({'layers': (layr2, layr1)}))['iden']
+                await core.nodes('''
+                    inet:ipv4=1.2.3.4 [ :asn=30 +#foo=(2015, 2016) +#baz +#bar:score=20 ]
+                    [ +(refs)> { [ inet:fqdn=woot.com ] } ]
+                ''', opts={'view': view2})
+                await core.nodes('inet:ipv4=5.6.7.8 $node.data.set(hehe, newp) [ +#baz ]', opts={'view': view2})
+                await core.nodes('[ inet:ipv4=9.9.9.9 ]', opts={'view': view2})
+                await core.delView(view2)
+
+                await core.getLayer(layr1).layrinfo.set('readonly', True)
+                await core.getLayer(layr2).layrinfo.set('readonly', True)
+
+            async with self.getTestCore(dirn=dirn) as core:
+
+                layr0 = (await core.addLayer())['iden']
+                view = (await core.addView({'layers': (layr0, layr2, layr1)}))['iden']
+                opts = {'view': view}
+
+                queries = (
+                    'inet:ipv4',
+                    'inet:ipv4:asn=30',
+                    'inet:ipv4:asn=10',
+                    'inet:ipv4:loc=us',
+                    '.seen',
+                    '#foo',
+                    '#foo@=2011',
+                    '#baz',
+                    '#bar:score=20',
+                    'inet:ipv4#bar:score',
+                    'test:arrayprop:ints*[=2]',
+                    'inet:ipv4=1.2.3.4 <- *',
+                    'inet:ipv4 -(refs)> *',
+                    'inet:fqdn <(refs)- *',
+                    'yield $lib.lift.byNodeData(hehe)',
+                    'inet:ipv4 +$($node.data.get(hehe) = "newp")',
+                    'inet:ipv4 +$($node.data.get(hehe) = "haha")',
+                )
+
+                async def run():
+                    retn = []
+                    for text in queries:
+                        nodes = await core.nodes(text, opts=opts)
+                        retn.append(sorted((n.ndef, n.props, n.tags, n.tagprops) for n in nodes))
+                    return retn
+
+                expect = await run()
+                counts = await core.callStorm('return($lib.view.get().getFormCounts())', opts=opts)
+
+                # only read-only layers may be flattened
+                await self.asyncraises(s_exc.BadArg, core.flattenLayers((layr0, layr2)))
+                await self.asyncraises(s_exc.BadArg, core.flattenLayers((layr2,)))
+
+                # views which use the layers must use them as a stack in the same order
+                view3 = (await core.addView({'layers': (layr0, layr1, layr2)}))['iden']
+                await self.asyncraises(s_exc.BadArg, core.flattenLayers((layr2, layr1)))
+                await core.delView(view3)
+
+                # the flattened layer is read-only so it may not be the write layer of a view
+                view3 = (await core.addView({'layers': (layr2, layr1)}))['iden']
+                await self.asyncraises(s_exc.BadArg, core.flattenLayers((layr2, layr1)))
+                await core.delView(view3)
+
+                nexsindx = await core.getNexsIndx()
+
+                async with core.getLocalProxy() as prox:
+                    ldef = await prox.flattenLayers((layr2, layr1), ldef={'name': 'flat'})
+
+                # the layer is built outside the nexus and swapped in by a single entry
+                self.eq(nexsindx + 2, await core.getNexsIndx())
+                self.len(0, core.flattasks)
+
+                flat = core.getLayer(ldef['iden'])
+                self.eq('flat', ldef.get('name'))
+                self.true(ldef.get('readonly'))
+                self.true(flat.readonly)
+                self.false(os.path.exists(s_common.genpath(core.dirn, 'layers', f'{flat.iden}.flatten')))
+                self.eq([layr0, flat.iden], [layr.iden for layr in core.getView(view).layers])
+
+                self.eq(expect, await run())
+                self.eq(counts, await core.callStorm('return($lib.view.get().getFormCounts())', opts=opts))
+                self.eq(counts, await flat.getFormCounts())
+
+                self.eq(2, await flat.getTagCount('baz'))
+                self.eq(2, await flat.getPropCount('inet:ipv4', 'asn'))
+                self.true(flat.hasRefIndex())
+
+                # the flattened layer has no edits of its own and the source layers are unchanged
+                self.len(0, await alist(flat.iterNodeEditLog()))
+                self.eq(1, await core.getLayer(layr2).getPropCount('inet:ipv4', 'asn'))
+                self.eq(2, await core.getLayer(layr1).getPropCount('inet:ipv4', 'asn'))
+
+                # a mirror which was restarted during the background build finishes it after the swap
+                ldef2 = dict(ldef, iden=s_common.guid())
+                await core._flattenLayers(ldef2, [layr2, layr1], (None, None))
+                await core.flattasks[ldef2['iden']]
+                self.len(0, core.flattasks)
+                self.eq(counts, await core.getLayer(ldef2['iden']).getFormCounts())
+
+            async with self.getTestCore(dirn=dirn) as core:
+                flat = core.getLayer(ldef['iden'])
+                self.true(flat.readonly)
+                self.eq(expect, await run())
+
+    async def test_layer_flatten_cleanup(self):
+
+        with self.getTestDir() as dirn:
+
+            async with self.getTestCore(dirn=dirn) as core:
+
+                layr1 = (await core.addLayer())['iden']
+                layr2 = (await core.addLayer())['iden']
+
+                view1 = (await core.addView({'layers': (layr2, layr1)}))['iden']
+                await core.nodes('[ inet:ipv4=1.2.3.4 ]', opts={'view': view1})
+                await core.delView(view1)
+
+                await core.getLayer(layr1).layrinfo.set('readonly', True)
+                await core.getLayer(layr2).layrinfo.set('readonly', True)
+
+            async with self.getTestCore(dirn=dirn) as core:
+
+                layr0 = (await core.addLayer())['iden']
+                view = (await core.addView({'layers': (layr0, layr2, layr1)}))['iden']
+
+                layrdirn = s_common.genpath(core.dirn, 'layers')
+                names = sorted(os.listdir(layrdirn))
+
+                # a failed build is removed from the Cortex and its mirrors
+                with mock.patch.object(s_layer.Layer, 'flattenLayers', side_effect=s_exc.SynErr(mesg='newp')):
+                    await self.asyncraises(s_exc.SynErr, core.flattenLayers((layr2, layr1)))
+
+                self.eq(names, sorted(os.listdir(layrdirn)))
+                self.len(0, core.flattasks)
+                self.len(0, core.flathive.items())
+
+                evnt = asyncio.Event()
+                flatLayers = s_layer.Layer.flattenLayers
+
+                async def slowFlatLayers(self, layers):
+                    await evnt.wait()
+                    return await flatLayers(self, layers)
+
+                def getLdef():
+                    return {'iden': s_common.guid(), 'creator': core.auth.rootuser.iden, 'lockmemory': False,
+                            'readonly': True}
+
+                with mock.patch.object(s_layer.Layer, 'flattenLayers', slowFlatLayers):
+
+                    # a mirror which has not finished the build swaps the layer in once it is complete
+                    ldef = getLdef()
+                    await core._initFlatLayer(ldef, [layr2, layr1])
+                    await core._flattenLayers(ldef, [layr2, layr1], (None, None))
+
+                    self.none(core.layers.get(ldef['iden']))
+                    self.eq([layr0, layr2, layr1], [layr.iden for layr in core.getView(view).layers])
+                    self.len(1, await core.nodes('inet:ipv4', opts={'view': view}))
+
+                    evnt.set()
+                    await core.flattasks[ldef['iden']]
+
+                    self.len(0, core.flattasks)
+                    self.len(0, core.flathive.items())
+                    self.eq([layr0, ldef['iden']], [layr.iden for layr in core.getView(view).layers])
+                    self.len(1, await core.nodes('inet:ipv4', opts={'view': view}))
+
+                    # a swap which is pending and a build which was abandoned across a restart
+                    evnt.clear()
+
+                    ldef2 = getLdef()
+                    await core._initFlatLayer(ldef2, [layr2, layr1])
+                    await core._flattenLayers(ldef2, [layr2, layr1], (None, None))
+
+                    ldef3 = getLdef()
+                    await core._initFlatLayer(ldef3, [layr2, layr1])
+
+                    self.len(2, core.flattasks)
+                    self.len(2, core.flathive.items())
+
+            async with self.getTestCore(dirn=dirn) as core:
+
+                task = core.flattasks.get(ldef2['iden'])
+                if task is not None:
+                    await task
+
+                counts = await core.getLayer(ldef2['iden']).getFormCounts()
+                self.eq(1, counts.get('inet:ipv4'))
+
+                self.none(core.layers.get(ldef3['iden']))
+                self.false(os.path.exists(s_common.genpath(core.dirn, 'layers', ldef3['iden'])))
+                self.false(os.path.exists(s_common.genpath(core.dirn, 'layers', f'{ldef3["iden"]}.flatten')))
+
+                self.len(0, core.flattasks)
+                self.len(0, core.flathive.items())
@@ -1,5 +1,8 @@
 import os
+import time
 import asyncio
+import logging
+import threading
 import pathlib
 import multiprocessing
 import synapse.exc as s_exc
@@ -16,6 +19,8 @@ import synapse.lib.thisplat as s_thisplat
 import synapse.tests.utils as s_t_utils
 from synapse.tests.utils import alist
 
+logger = logging.getLogger(__name__)
+
 def getFileMapCount(filename):
     filename = str(filename)
     count = 0
@@ -142,6 +147,10 @@ class LmdbSlabTest(s_t_utils.SynTest):
 
             self.eq(b'hehe', slab.get(b'\x00\x01', db=foo))
 
+            vals = slab.getmulti((b'\x01\x03', b'\x00\x09', b'\x00\x01', b'\x01\x03'), db=foo)
+            self.eq(vals, [b'hoho', None, b'hehe', b'hoho'])
+            self.eq([], slab.getmulti((), db=foo))
+
             items = list(slab.scanByPref(b'\x00', db=foo))
             self.eq(items, ((b'\x00\x01', b'hehe'), (b'\x00\x02', b'haha')))
 
@@ -1181,6 +1190,210 @@ class LmdbSlabTest(s_t_utils.SynTest):
                 correct = ((0, 'hehe'), (2, 'lol7'), (200, 'lol9'), (201, 'lol9'), (202, 'lol0'))
                 self.eq(correct, [x async for x in mque.gets('woot', 0)])
 
+    async def test_lmdb_multiqueue_bulk(self):
+
+        with self.getTestDir() as dirn:
+
+            path = os.path.join(dirn, 'test.lmdb')
+
+            async with await s_lmdbslab.Slab.anit(path) as slab:
+
+                mque = await slab.getMultiQueue('test')
+
+                await mque.add('woot', {})
+                await mque.add('blah', {})
+
+                # interleaved puts to queues which do not own the end of the db
+                for i in range(3):
+                    self.eq(i * 10, await mque.puts('woot', [f'woot{i}:{x}' for x in range(10)]))
+                    self.eq(i * 10, await mque.puts('blah', (f'blah{i}:{x}' for x in range(10))))
+
+                self.eq(30, await mque.puts('woot', ()))
+
+                self.eq(30, mque.size('woot'))
+                self.eq(30, mque.offset('woot'))
+                self.eq(30, mque.size('blah'))
+                self.eq(30, mque.offset('blah'))
+
+                items = [x async for x in mque.gets('woot', 0)]
+                self.eq(items[11], (11, 'woot1:1'))
+                self.eq([x[0] for x in items], list(range(30)))
+
+                items = [x async for x in mque.gets('blah', 0)]
+                self.eq(items[29], (29, 'blah2:9'))
+
+                with patch('synapse.lib.lmdbslab.CULL_CHUNKSIZE', 4):
+
+                    await mque.cull('woot', 21)
+                    self.eq(8, mque.size('woot'))
+                    self.eq((22, 'woot2:2'), await mque.get('woot', 0, cull=False))
+
+                    await mque.dele('blah', 5, 24)
+                    self.eq(10, mque.size('blah'))
+
+                    offs = [x[0] async for x in mque.gets('blah', 0)]
+                    self.eq(offs, [0, 1, 2, 3, 4, 25, 26, 27, 28, 29])
+
+                    abrv = mque.abrv.nameToAbrv('blah')
+                    await mque.rem('blah')
+                    self.false(slab.prefexists(abrv, db=mque.qdata))
+
+                self.eq(8, mque.size('woot'))
+
+            async with await s_lmdbslab.Slab.anit(path) as slab:
+
+                mque = await slab.getMultiQueue('test')
+
+                self.eq(8, mque.size('woot'))
+                self.eq(30, mque.offset('woot'))
+
+                foo = slab.initdb('foo')
+                slab.putmulti([(i.to_bytes(4, 'big'), b'') for i in range(10)], db=foo)
+
+                self.eq(3, slab.delrange(b'\x00\x00\x00\x02', b'\x00\x00\x00\x06', limit=3, db=foo))
+                self.eq(2, slab.delrange(b'\x00\x00\x00\x02', b'\x00\x00\x00\x06', db=foo))
+                self.eq(0, slab.delrange(b'\x00\x00\x00\x02', b'\x00\x00\x00\x06', db=foo))
+                self.eq(2, slab.delrange(b'\x00\x00\x00\x08', b'\xff', db=foo))
+                self.eq(0, slab.delrange(b'\xff', b'\xff\xff', db=foo))
+
+                keys = [int.from_bytes(lkey, 'big') for lkey, _ in slab.scanByFull(db=foo)]
+                self.eq(keys, [0, 1, 7])
+
+    async def test_lmdb_multiqueue_groups(self):
+
+        with self.getTestDir() as dirn:
+
+            path = os.path.join(dirn, 'test.lmdb')
+
+            async with await s_lmdbslab.Slab.anit(path) as slab:
+
+                mque = await slab.getMultiQueue('test')
+
+                with self.raises(s_exc.NoSuchName):
+                    await mque.addGroup('woot', 'enrich')
+
+                await mque.add('woot', {})
+                await mque.puts('woot', [f'item{i}' for i in range(10)])
+
+                with self.raises(s_exc.NoSuchName):
+                    await mque.lease('woot', 'enrich', 'visi', 3, 1000, 100)
+
+                await mque.addGroup('woot', 'enrich')
+                await mque.addGroup('woot', 'report')
+
+                with self.raises(s_exc.DupName):
+                    await mque.addGroup('woot', 'enrich')
+
+                # consumers in a group never receive the same item
+                items = await mque.lease('woot', 'enrich', 'visi', 3, 1000, 100)
+                self.eq(items, ((0, 'item0'), (1, 'item1'), (2, 'item2')))
+
+                items = await mque.lease('woot', 'enrich', 'vertex', 3, 1000, 100)
+                self.eq(items, ((3, 'item3'), (4, 'item4'), (5, 'item5')))
+
+                # each group gets its own copy of the queue
+                items = await mque.lease('woot', 'report', 'visi', 1, 1000, 100)
+                self.eq(items, ((0, 'item0'),))
+
+                self.eq(2, await mque.ack('woot', 'enrich', (0, 1)))
+                self.eq(0, await mque.ack('woot', 'enrich', (0, 1, 100)))
+
+                groups = {g['name']: g for g in mque.getGroups('woot')}
+                self.eq(groups['enrich'], {'name': 'enrich', 'offs': 6, 'low': 2, 'leased': 4})
+                self.eq(groups['report'], {'name': 'report', 'offs': 1, 'low': 0, 'leased': 1})
+
+                # expired leases are redelivered first
+                await mque.cull('woot', 3)
+                items = await mque.lease('woot', 'enrich', 'visi', 3, 1200, 100)
+                self.eq(items, ((4, 'item4'), (5, 'item5'), (6, 'item6')))
+
+                # redelivered leases are not expired again before their new timeout
+                items = await mque.lease('woot', 'enrich', 'visi', 10, 1250, 100)
+                self.eq(items, ((7, 'item7'), (8, 'item8'), (9, 'item9')))
+
+                self.eq((), await mque.lease('woot', 'enrich', 'visi', 10, 1250, 100))
+
+                self.eq(6, await mque.ack('woot', 'enrich', range(10)))
+
+                groups = {g['name']: g for g in mque.getGroups('woot')}
+                self.eq(groups['enrich'], {'name': 'enrich', 'offs': 10, 'low': 10, 'leased': 0})
+
+            async with await s_lmdbslab.Slab.anit(path) as slab:
+
+                mque = await slab.getMultiQueue('test')
+
+                groups = {g['name']: g for g in mque.getGroups('woot')}
+                self.eq(groups['enrich'], {'name': 'enrich', 'offs': 10, 'low': 10, 'leased': 0})
+                self.eq(groups['report'], {'name': 'report', 'offs': 1, 'low': 0, 'leased': 1})
+
+                # the report lease on a culled item is dropped
+                items = await mque.lease('woot', 'report', 'visi', 2, 5000, 100)
+                self.eq(items, ((4, 'item4'), (5, 'item5')))
+
+                await mque.delGroup('woot', 'report')
+                self.eq(('enrich',), [g['name'] for g in mque.getGroups('woot')])
+
+                with self.raises(s_exc.NoSuchName):
+                    await mque.delGroup('woot', 'report')
+
+                await mque.addGroup('woot', 'report')
+                items = await mque.lease('woot', 'report', 'visi', 1, 5000, 100)
+                self.eq(items, ((4, 'item4'),))
+
+                await mque.rem('woot')
+                self.len(0, list(slab.scanByFull(db=mque.qleases)))
+
+                with self.raises(s_exc.NoSuchName):
+                    mque.getGroups('woot')
+
+    async def test_lmdb_multiqueue_bench(self):
+        '''
+        Measure the MultiQueue put, gets and cull rate at several batch sizes.
+        '''
+        self.skipLongTest()
+
+        count = 10000
+
+        with self.getTestDir() as dirn:
+
+            path = os.path.join(dirn, 'test.lmdb')
+
+            async with await s_lmdbslab.Slab.anit(path) as slab:
+
+                mque = await slab.getMultiQueue('test')
+
+                for size in (1, 100, 10000):
+
+                    name = f'bench{size}'
+                    await mque.add(name, {})
+
+                    items = [{'iden': s_common.guid(), 'indx': i} for i in range(count)]
+
+                    tick = time.perf_counter()
+                    for offs in range(0, count, size):
+                        await mque.puts(name, items[offs:offs + size])
+                    putrate = count / (time.perf_counter() - tick)
+
+                    self.eq(count, mque.size(name))
+
+                    tick = time.perf_counter()
+                    offs = 0
+                    while offs < count:
+                        async for offs, item in mque.gets(name, offs, size=size):
+                            pass
+                        offs += 1
+                    getrate = count / (time.perf_counter() - tick)
+
+                    tick = time.perf_counter()
+                    for offs in range(size - 1, count, size):
+                        await mque.cull(name, offs)
+                    cullrate = count / (time.perf_counter() - tick)
+
+                    self.eq(0, mque.size(name))
+
+                    logger.warning(f'MultiQueue batch={size}: puts {putrate:.0f}/sec, gets {getrate:.0f}/sec, '
+                                   f'cull {cullrate:.0f}/sec')
+
     async def test_slababrv(self):
         with self.getTestDir() as dirn:
 
@@ -1339,6 +1552,81 @@ class LmdbSlabTest(s_t_utils.SynTest):
                 self.len(2, commitstats)
                 self.eq(2, commitstats[-1][1])
 
+    async def test_lmdbslab_commit_flush(self):
+
+        with self.getTestDir() as dirn:
+
+            path = os.path.join(dirn, 'test.lmdb')
+
+            async with await s_lmdbslab.Slab.anit(path) as slab:
+
+                foo = slab.initdb('foo')
+
+                # write transactions are only used by the loop thread
+                xact = slab.xact
+                slab.put(b'\x00\x01', b'hehe', db=foo)
+                self.true(slab.forcecommit())
+                self.true(slab.xact is not xact)
+                self.len(0, slab.xactops)
+                self.eq(b'hehe', slab.get(b'\x00\x01', db=foo))
+
+                slab.put(b'\x00\x02', b'haha', db=foo)
+                self.true(slab.dirty)
+
+                # the commit is flushed to disk by the flush thread
+                threads = []
+                flushEnv = slab._flushEnv
+
+                def flush():
+                    threads.append(threading.current_thread())
+                    return flushEnv()
+
+                with patch.object(slab, '_flushEnv', flush):
+                    await slab.sync()
+
+                self.len(1, threads)
+                self.true(threads[0] is not threading.current_thread())
+                self.false(slab.dirty)
+                self.false(slab.forcecommit())
+
+                # a clean slab has nothing to flush
+                await slab.sync()
+
+                info = slab.getCommitHist()
+                self.eq(3, info['count'])
+                self.eq(1, info['flushes'])
+                self.len(len(s_lmdbslab.COMMIT_HIST_BUCKETS) + 1, info['hist'])
+                self.eq(3, sum(c for (b, c) in info['hist']))
+                self.eq(1, sum(c for (b, c) in info['flushhist']))
+                self.none(info['hist'][-1][0])
+
+                stats = [s for s in await s_lmdbslab.Slab.getSlabStats() if s['path'] == path]
+                self.eq(info, stats[0]['commits'])
+
+            async with await s_lmdbslab.Slab.anit(path) as slab:
+                foo = slab.initdb('foo')
+                self.eq(b'haha', slab.get(b'\x00\x02', db=foo))
+
+            # each slab flushes in its own thread, so a long flush does not stall the others
+            path2 = os.path.join(dirn, 'test2.lmdb')
+            async with await s_lmdbslab.Slab.anit(path) as slab0, await s_lmdbslab.Slab.anit(path2) as slab1:
+
+                self.true(slab0._getFlushPool() is not slab1._getFlushPool())
+
+                evnt = threading.Event()
+                blocked = slab0._getFlushPool().submit(evnt.wait, 10)
+
+                try:
+                    bar = slab1.initdb('bar')
+                    slab1.put(b'\x00\x03', b'hoho', db=bar)
+                    await slab1.sync()
+                    self.eq(b'hoho', slab1.get(b'\x00\x03', db=bar))
+                    self.false(blocked.done())
+                finally:
+                    evnt.set()
+
+                self.true(await asyncio.wrap_future(blocked))
+
 class LmdbSlabMemLockTest(s_t_utils.SynTest):
 
     async def test_lmdbslabmemlock(self):
@@ -157,3 +157,58 @@ class ScrapeTest(s_t_utils.SynTest):
         # Test scrape without re-fang
         defanged = 'HXXP[:]//example.com?faz=hxxp and im talking about HXXP over here'
         self.eq({'example.com'}, {n[1] for n in s_scrape.scrape(defanged, refang=False)})
+
+    def test_scrape_context(self):
+
+        text = 'see hxxp[:]//foo[.]com[:]80/x and 1[.]2[.]3[.]4 or visi@vertex.link'
+        results = list(s_scrape.contextScrape(text))
+        self.eq(results, (
+            ('inet:url', 'http://foo.com:80/x', 4),
+            ('inet:fqdn', 'foo.com', 13),
+            ('inet:ipv4', '1.2.3.4', 34),
+            ('inet:fqdn', 'vertex.link', 56),
+            ('inet:email', 'visi@vertex.link', 51),
+        ))
+
+        for form, valu, offs in s_scrape.contextScrape(data0):
+            self.eq(valu, data0[offs:offs + len(valu)])
+
+        self.eq((), list(s_scrape.contextScrape(text, ptype='inet:ipv4', refang=False)))
+        self.eq((('inet:ipv4', '1.2.3.4', 3),), list(s_scrape.contextScrape('ip 1.2.3.4', ptype='inet:ipv4')))
+
+    def test_scrape_chunked(self):
+
+        expected = list(s_scrape.contextScrape(data0))
+
+        for size in (1, 3, 7, 64):
+            results = []
+            scraper = s_scrape.Scraper()
+            for offs in range(0, len(data0), size):
+                results.extend(scraper.feed(data0[offs:offs + size]))
+            results.extend(scraper.feed('', final=True))
+            self.eq(expected, results)
+
+        # a token is held until it is complete
+        scraper = s_scrape.Scraper()
+        self.eq((), scraper.feed('visi@vertex'))
+        self.eq((), scraper.feed('.lin'))
+        self.eq((('inet:fqdn', 'vertex.link', 5), ('inet:email', 'visi@vertex.link', 0)), scraper.feed('k '))
+        self.eq((), scraper.feed('', final=True))
+
+    def test_scrape_legacy(self):
+
+        # ensure the single pass scraper matches the per-type regexes
+        text = '\n'.join((
+            data0,
+            'hxxp[:]//foo.faz.com[:]12312/bam a.b.c.d.e.f.g.h.i.j.k.l.com x.com.evil foo[at]bar.com',
+            'a@b.com@c.com 1.2.3.4.5 256.1.1.1 "baz.io",woot.com. %s %s' % ('a' * 33, 'b' * 40),
+            '-foo.com .bar.com foo..com %s.com xn--p1ai.xn--p1ai' % ('x' * 64,),
+        ))
+
+        def legacy(text):
+            text = s_scrape.refang_text(text)
+            for ruletype, _, _ in s_scrape.scrape_types:
+                for valu in s_scrape.regexes.get(ruletype).findall(text):
+                    yield (ruletype, valu)
+
+        self.sorteq(list(legacy(text)), list(s_scrape.scrape(text)))
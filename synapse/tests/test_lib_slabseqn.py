@@ -117,3 +117,35 @@ class SlabSeqn(s_t_utils.SynTest):
             self.eq(((9, 'bar'), (10, None)), [x async for x in seqn.gets(8, wait=False)])
 
             await slab.fini()
+
+    async def test_slab_seqn_cull(self):
+
+        with self.getTestDir() as dirn:
+
+            path = os.path.join(dirn, 'test.lmdb')
+            async with await s_lmdbslab.Slab.anit(path, map_size=10000000) as slab:
+
+                seqn = s_slabseqn.SlabSeqn(slab, 'seqn:test')
+
+                self.none(seqn.first())
+                self.eq(0, await seqn.cull(10))
+
+                seqn.save(range(25000))
+                seqn.add('sparse', indx=30000)
+
+                self.eq((0, 0), seqn.first())
+                self.eq((30000, 'sparse'), seqn.first(25000))
+                self.gt(seqn.size(), 0)
+
+                self.eq(0, await seqn.cull(-1))
+                self.eq(20001, await seqn.cull(20000))
+                self.eq((20001, 20001), seqn.first())
+                self.eq(0, await seqn.cull(20000))
+
+                self.eq(4999, await seqn.cull(29999))
+                self.eq([(30000, 'sparse')], list(seqn.iter(0)))
+
+                self.true(seqn.trim(30000))
+                self.false(seqn.trim(30000))
+                self.none(seqn.first())
+                self.eq(0, seqn.index())
@@ -3,6 +3,7 @@ import random
 import asyncio
 import contextlib
 import collections
+import unittest.mock as mock
 
 import synapse.exc as s_exc
 
@@ -160,6 +161,60 @@ class SnapTest(s_t_utils.SynTest):
                 self.eq(node2, node)
                 self.nn(node2.get('baz'))
 
+    async def test_addNodeDefs(self):
+
+        async with self.getTestCore() as core:
+
+            await core.nodes('[ syn:tag=foo.bar syn:tag=baz inet:ipv4=1.2.3.4 test:str=exists +#foo=(2020, 2021) ]')
+            await core.addTagProp('score', ('int', {}), {})
+
+            nodedefs = [
+                (('test:str', f'str{i}'), {'props': {'tick': i}, 'tags': {'foo.bar': (None, None), 'baz': (i, i + 1)}})
+                for i in range(10)
+            ]
+            nodedefs.append((('test:str', 'exists'), {'tags': {'foo.bar': (None, None)}}))
+            nodedefs.append((('test:str', 'str0'), {'tagprops': {'baz': {'score': 10}}, 'nodedata': {'hehe': 'haha'},
+                                                    'edges': (('refs', ('inet:ipv4', '1.2.3.4')),)}))
+            nodedefs.append((('test:int', 'newp'), {}))
+
+            indx = await core.nexsroot.index()
+
+            async with await core.snap() as snap:
+                snap.strict = False
+                nodes = await snap.addNodeDefs(nodedefs)
+
+            # all the edits are applied as a single nexus entry
+            self.eq(indx + 1, await core.nexsroot.index())
+
+            self.len(13, nodes)
+            self.none(nodes[-1])
+            self.eq(('test:str', 'str9'), nodes[9].ndef)
+            self.eq(9, nodes[9].get('tick'))
+            self.eq((9, 10), nodes[9].getTag('baz'))
+            self.eq((None, None), nodes[9].getTag('foo'))
+
+            # existing parent tag values are not replaced
+            self.eq((1577836800000, 1609459200000), nodes[10].getTag('foo'))
+
+            self.eq(10, nodes[11].getTagProp('baz', 'score'))
+            self.eq('haha', await nodes[11].getData('hehe'))
+            self.len(1, await core.nodes('test:str=str0 -(refs)> inet:ipv4'))
+
+            nodedefs = [(('test:str', f'str{i}'), {'tags': {'baz': (i + 5, i + 6)}}) for i in range(20)]
+            async with await core.snap() as snap:
+                self.eq(20, await snap.addNodeDefs(nodedefs, retnodes=False))
+
+            self.len(20, await core.nodes('test:str#baz'))
+            self.eq([(9, 15)], [n.getTag('baz') for n in await core.nodes('test:str=str9')])
+
+            # props on existing nodes in a fork do not copy the node into the fork layer
+            view = await core.view.fork()
+            async with await core.snap(view=core.getView(view['iden'])) as snap:
+                nodes = await snap.addNodeDefs([(('test:str', 'str1'), {'props': {'tick': 2}, 'tags': {'hehe': (None, None)}})])
+                self.eq(2, nodes[0].get('tick'))
+                self.eq(core.getLayer().iden, nodes[0].bylayer['ndef'].iden)
+                self.eq(view['layers'][0]['iden'], nodes[0].bylayer['tags']['hehe'].iden)
+
     async def test_addNodesAuto(self):
         '''
         Secondary props that are forms when set make nodes
@@ -361,6 +416,59 @@ class SnapTest(s_t_utils.SynTest):
             self.len(1, await alist(view1.eval('inet:ipv4 +:asn=42')))
             self.len(1, await alist(view1.eval('inet:ipv4 +#woot')))
 
+    async def test_snap_nodes_by_buids(self):
+
+        async with self._getTestCoreMultiLayer() as (view0, view1):
+
+            nodes = await view0.nodes('[ test:int=10 :loc=us test:int=20 ]')
+            await view1.nodes('test:int=10 [ :loc=aa +#foo ]')
+
+            buids = [nodes[1].buid, b'\x00' * 32, nodes[0].buid]
+
+            async with await view1.snap(user=view1.core.auth.rootuser) as snap:
+                nodes = await snap.getNodesByBuids(buids)
+                self.len(3, nodes)
+                self.eq(nodes[0].ndef, ('test:int', 20))
+                self.none(nodes[1])
+                self.eq(nodes[2].ndef, ('test:int', 10))
+                self.eq(nodes[2].get('loc'), 'aa')
+                self.nn(nodes[2].getTag('foo'))
+
+                # live nodes are returned as is
+                again = await snap.getNodesByBuids(buids[::-1])
+                self.true(again[0] is nodes[2])
+                self.true(again[2] is nodes[0])
+
+            nodes = await view1.nodes('test:int=10 [ <(refs)+ { test:int=20 } +(refs)> { test:int=20 } ]')
+            self.len(1, await view1.nodes('test:int=10 -(refs)> *'))
+            self.len(1, await view1.nodes('test:int=10 <(refs)- *'))
+
+            # multi-layer lifts and pivots join their nodes with one storage node fetch per layer
+            opts = {'vars': {'vals': list(range(250))}}
+            await view0.nodes('for $i in $vals { [ test:int=$i :loc=us test:comp=(10, $i) ] }', opts=opts)
+            await view1.nodes('test:int [ +#bar ]')
+
+            layr0, layr1 = view0.layers[0], view1.layers[0]
+            with mock.patch.object(layr0, 'getStorNodeView', wraps=layr0.getStorNodeView) as getsode0:
+                with mock.patch.object(layr1, 'getStorNodeView', wraps=layr1.getStorNodeView) as getsode1:
+                    self.len(250, await view1.nodes('test:int#bar'))
+                    # the upper layer :loc=aa of test:int=10 hides its lower layer row
+                    self.len(249, await view1.nodes('test:int:loc=us'))
+                    self.len(250, await view1.nodes('test:int=10 <- * +test:comp'))
+                    getsode0.assert_not_called()
+                    getsode1.assert_not_called()
+
+            # nodes which are deleted before the rest of their chunk is yielded are skipped
+            await view1.nodes('[ test:str=aaa test:str=bar test:str=foo ]')
+            async with await view1.snap(user=view1.core.auth.rootuser) as snap:
+                ndefs = []
+                async for node in snap.nodesByProp('test:str'):
+                    ndefs.append(node.ndef)
+                    if node.ndef[1] == 'bar':
+                        foo = await snap.getNodeByNdef(('test:str', 'foo'))
+                        await foo.delete()
+                self.eq([('test:str', 'aaa'), ('test:str', 'bar')], ndefs)
+
     async def test_cortex_lift_layers_bad_filter(self):
         '''
         Test a two layer cortex where a lift operation gives the wrong result
@@ -476,3 +584,110 @@ class SnapTest(s_t_utils.SynTest):
             self.len(1, await view1.nodes('#woot:score=20'))
 
             self.len(1, await view0.nodes('[ test:int=10 +#woot:score=40 ]'))
+
+    async def test_cortex_lift_layers_ordersort(self):
+        '''
+        Test a two layer cortex where lifts are merge sorted across layers by index.
+        '''
+        async with self._getTestCoreMultiLayer() as (view0, view1):
+
+            await view0.core.addTagProp('score', ('int', {}), {'doc': 'hi there'})
+
+            await view0.nodes('[ test:int=10 :loc=us +#woot:score=20 ]')
+            await view0.nodes('[ test:int=30 :loc=us.va +#woot:score=10 ]')
+            await view1.nodes('[ test:int=20 :loc=us.ca +#woot:score=30 ]')
+            await view1.nodes('[ test:int=40 :loc=us +#woot:score=20 ]')
+            await view0.nodes('[ test:str=foo +#woot ]')
+
+            # present in both layers with the same values
+            await view1.nodes('[ test:int=10 :loc=us +#woot:score=20 ]')
+
+            nodes = await view1.nodes('test:int')
+            self.eq([10, 20, 30, 40], [n.ndef[1] for n in nodes])
+
+            nodes = await view1.nodes('test:int>15')
+            self.eq([20, 30, 40], [n.ndef[1] for n in nodes])
+
+            nodes = await view1.nodes('test:int:loc^=us')
+            self.eq([10, 40, 20, 30], [n.ndef[1] for n in nodes])
+
+            nodes = await view1.nodes('#woot:score')
+            self.eq([30, 10, 40, 20], [n.ndef[1] for n in nodes])
+
+            # tag rows without a form are merged directly and each node is yielded once
+            nodes = await view1.nodes('#woot')
+            self.len(5, nodes)
+            self.len(5, {n.buid for n in nodes})
+
+            nodes = await view1.nodes('test:int#woot')
+            self.eq(sorted(n.buid for n in nodes), [n.buid for n in nodes])
+
+            # one tag scan per layer rather than one per form
+            calls = []
+            for layr in view1.layers:
+                def wrap(func):
+                    def liftByTag(tag, form=None):
+                        calls.append(form)
+                        return func(tag, form=form)
+                    return liftByTag
+                layr.liftByTag = wrap(layr.liftByTag)
+
+            self.len(5, await view1.nodes('#woot'))
+            self.eq([None, None], calls)
+
+            nodes = await view1.nodes('test:int | limit 2')
+            self.eq([10, 20], [n.ndef[1] for n in nodes])
+
+            # a value changed in the top layer sorts by the new value
+            await view1.nodes('test:int=30 [ :loc=aa ]')
+            nodes = await view1.nodes('test:int:loc')
+            self.eq([30, 10, 40, 20], [n.ndef[1] for n in nodes])
+
+            # only the rows needed to satisfy the limit are lifted
+            layr1 = view1.layers[0]
+            origlift = layr1.liftByProp
+            count = 0
+
+            async def liftByProp(form, prop):
+                nonlocal count
+                async for item in origlift(form, prop):
+                    count += 1
+                    yield item
+
+            layr1.liftByProp = liftByProp
+
+            await view1.nodes('[ test:int=50 test:int=60 test:int=70 ]')
+            nodes = await view1.nodes('test:int | limit 1')
+            self.eq([10], [n.ndef[1] for n in nodes])
+            self.le(count, 3)
+
+    async def test_cortex_lift_layers_ordersort_negfloat(self):
+        '''
+        Test a two layer cortex where several nodes share the same negative float index value.
+        '''
+        async with self._getTestCoreMultiLayer() as (view0, view1):
+
+            await view0.core.addTagProp('fscore', ('float', {}), {})
+
+            await view0.nodes('for $i in $vals { [ test:int=$i +#woot:fscore=-1.5 ] }',
+                              opts={'vars': {'vals': list(range(0, 20, 2))}})
+            await view1.nodes('for $i in $vals { [ test:int=$i +#woot:fscore=-1.5 ] }',
+                              opts={'vars': {'vals': list(range(1, 20, 2))}})
+            await view0.nodes('[ test:int=100 +#woot:fscore=-2.5 ]')
+            await view1.nodes('[ test:int=101 +#woot:fscore=-2.5 ]')
+            await view1.nodes('[ test:int=102 +#woot:fscore=1.5 ]')
+
+            # present in both layers with the same value
+            await view1.nodes('[ test:int=0 +#woot:fscore=-1.5 ]')
+
+            for text in ('test:int#woot:fscore<0', 'test:int#woot:fscore<=-1.5', 'test:int#woot:fscore>=-2.5',
+                         'test:int#woot:fscore*range=(-3, -1)', 'test:int#woot:fscore*range=(-3, 2)'):
+                nodes = await view1.nodes(text)
+                fscores = [n.getTagProp('woot', 'fscore') for n in nodes]
+                self.eq(sorted(fscores), fscores)
+                self.eq(len(nodes), len({n.buid for n in nodes}))
+
+                for fscore in (-2.5, -1.5):
+                    buids = [n.buid for n in nodes if n.getTagProp('woot', 'fscore') == fscore]
+                    self.len(20 if fscore == -1.5 else 2, buids)
+                    self.eq(sorted(buids), buids)
@@ -1706,6 +1706,47 @@ class StormTest(s_t_utils.SynTest):
                 await asvisi.callStorm('test:str=test1 | edges.del *')
                 self.len(0, await core.nodes('test:str=test1 -(refs)> *'))
 
+    async def test_storm_parallel_procs(self):
+
+        async with self.getTestCore() as core:
+
+            await core.nodes('[ ' + ' '.join(f'test:int={i}' for i in range(20)) + ' ]')
+
+            q = 'test:int | parallel --procs 2 --batch 3 { +test:int>=$min $lib.print($node.value()) }'
+            msgs = await core.stormlist(q, opts={'vars': {'min': 5}})
+            nodes = [m[1] for m in msgs if m[0] == 'node']
+            self.sorteq(list(range(5, 20)), [n[0][1] for n in nodes])
+            self.len(15, [m for m in msgs if m[0] == 'print'])
+
+            # the spawned query is read-only
+            with self.raises(s_exc.IsReadOnly):
+                await core.nodes('test:int | parallel --procs 1 { [ +#foo ] }')
+
+            self.len(0, await core.nodes('test:int#foo'))
+
+            # errors percolate up from the spawned processes
+            with self.raises(s_exc.BadTypeValu):
+                await core.nodes('test:int | parallel --procs 1 { $lib.cast(int, newp) }')
+
+            with self.raises(s_exc.BadArg):
+                await core.nodes('test:int | parallel --procs -1 { }')
+
+            with self.raises(s_exc.BadArg):
+                await core.nodes('test:int | parallel --procs 2 --batch 0 { }')
+
+            # nodes added earlier in the same query are visible to the spawned processes
+            nodes = await core.nodes('[ test:int=100 ] | parallel --procs 2 { +test:int=100 }')
+            self.len(1, nodes)
+            self.eq(('test:int', 100), nodes[0].ndef)
+
+            # layers are only synced for the spawned processes when they have pending edits
+            layr = core.getLayer()
+            await layr.layrslab.sync()
+            with mock.patch.object(layr.layrslab, 'sync', mock.AsyncMock()) as sync:
+                nodes = await core.nodes('test:int | parallel --procs 2 --batch 3 { +test:int>=5 }')
+                self.len(16, nodes)
+                sync.assert_not_called()
+
     async def test_storm_pushpull(self):
 
         with self.getTestDir() as dirn:
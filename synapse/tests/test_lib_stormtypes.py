@@ -1494,6 +1494,103 @@ class StormTypesTest(s_test.SynTest):
                 self.eq((5, 'baz'), await core.callStorm('return($lib.queue.get(poptest).pop())'))
                 self.none(await core.callStorm('return($lib.queue.get(poptest).pop())'))
 
+    async def test_storm_lib_queue_groups(self):
+
+        async with self.getTestCore() as core:
+
+            await core.callStorm('''
+                $q = $lib.queue.add(work)
+                $q.puts((foo, bar, baz))
+                $q.addGroup(enrich)
+            ''')
+
+            with self.raises(s_exc.DupName):
+                await core.callStorm('$lib.queue.get(work).addGroup(enrich)')
+
+            with self.raises(s_exc.NoSuchName):
+                await core.callStorm('$lib.queue.get(work).lease(newp)')
+
+            with self.raises(s_exc.BadArg):
+                await core.callStorm('$lib.queue.get(work).lease(enrich, size=0)')
+
+            with self.raises(s_exc.BadArg):
+                await core.callStorm('$lib.queue.get(work).lease(enrich, timeout=0)')
+
+            retn = await core.callStorm('return($lib.queue.get(work).lease(enrich, size=2, consumer=visi))')
+            self.eq(retn, ((0, 'foo'), (1, 'bar')))
+
+            retn = await core.callStorm('return($lib.queue.get(work).lease(enrich, size=2))')
+            self.eq(retn, ((2, 'baz'),))
+
+            self.eq((), await core.callStorm('return($lib.queue.get(work).lease(enrich))'))
+
+            self.eq(2, await core.callStorm('return($lib.queue.get(work).ack(enrich, (0, 2)))'))
+
+            groups = await core.callStorm('return($lib.queue.get(work).groups())')
+            self.eq(groups, ({'name': 'enrich', 'offs': 3, 'low': 1, 'leased': 1},))
+
+            # a waiting consumer receives items as they are added
+            q = 'return($lib.queue.get(work).lease(enrich, size=10, wait=$lib.true))'
+            task = core.schedCoro(core.callStorm(q))
+
+            await asyncio.sleep(0.1)
+            self.false(task.done())
+
+            await core.callStorm('$lib.queue.get(work).put(hehe)')
+            self.eq(((3, 'hehe'),), await asyncio.wait_for(task, timeout=5))
+
+            # unacknowledged leases are redelivered once they time out
+            leases = await core.multiqueue.lease('work', 'enrich', None, 10, s_common.now() + 61000, 60000)
+            self.eq(leases, ((1, 'bar'), (3, 'hehe')))
+
+            await core.callStorm('$lib.queue.get(work).delGroup(enrich)')
+            self.eq((), await core.callStorm('return($lib.queue.get(work).groups())'))
+
+            with self.raises(s_exc.NoSuchName):
+                await core.callStorm('$lib.queue.get(work).delGroup(enrich)')
+
+            with self.raises(s_exc.NoSuchName):
+                await core.callStorm('$lib.queue.get(work).ack(enrich, (1,))')
+
+            visi = await core.auth.addUser('visi')
+
+            opts = {'user': visi.iden}
+            with self.raises(s_exc.AuthDeny):
+                await core.callStorm('$lib.queue.get(work).addGroup(report)', opts=opts)
+
+            # consumers may lease with get but creating or removing groups requires put
+            await visi.addRule((True, ('queue', 'get')), gateiden='queue:work')
+            with self.raises(s_exc.AuthDeny):
+                await core.callStorm('$lib.queue.get(work).addGroup(report)', opts=opts)
+
+            await core.callStorm('$lib.queue.get(work).addGroup(report)')
+            retn = await core.callStorm('return($lib.queue.get(work).lease(report))', opts=opts)
+            self.eq(retn, ((0, 'foo'),))
+
+            with self.raises(s_exc.AuthDeny):
+                await core.callStorm('$lib.queue.get(work).delGroup(report)', opts=opts)
+
+            await visi.addRule((True, ('queue', 'put')), gateiden='queue:work')
+            await core.callStorm('$lib.queue.get(work).addGroup(audit)', opts=opts)
+            await core.callStorm('$lib.queue.get(work).delGroup(audit)', opts=opts)
+
+            # leasing from a drained group does not make nexus entries, even while waiting
+            await core.callStorm('$lib.queue.get(work).addGroup(drain)')
+            retn = await core.callStorm('return($lib.queue.get(work).lease(drain, size=10))')
+            self.len(4, retn)
+
+            indx = await core.getNexsIndx()
+            self.eq((), await core.callStorm('return($lib.queue.get(work).lease(drain))'))
+
+            q = 'return($lib.queue.get(work).lease(drain, wait=$lib.true))'
+            task = core.schedCoro(core.callStorm(q))
+            await asyncio.sleep(1.5)
+            self.false(task.done())
+            self.eq(indx, await core.getNexsIndx())
+
+            await core.callStorm('$lib.queue.get(work).put(haha)')
+            self.eq(((4, 'haha'),), await asyncio.wait_for(task, timeout=5))
+
     async def test_storm_node_data(self):
 
         async with self.getTestCore() as core:
@@ -1618,6 +1715,32 @@ class StormTypesTest(s_test.SynTest):
             retn = await core.callStorm('return($lib.bytes.upload($chunks))', opts=opts)
             self.eq((8, '9ed8ffd0a11e337e6e461358195ebf8ea2e12a82db44561ae5d9e638f6f922c4'), retn)
 
+    async def test_storm_lib_axon_read(self):
+
+        async with self.getTestCore() as core:
+
+            visi = await core.auth.addUser('visi')
+
+            size, sha256 = await core.axon.put(b'asdfasdf')
+            opts = {'vars': {'sha256': s_common.ehex(sha256)}}
+
+            self.eq(b'dfas', await core.callStorm('return($lib.axon.read($sha256, offs=2, size=4))', opts=opts))
+            self.eq(b'asdfasdf', await core.callStorm('return($lib.axon.read($sha256))', opts=opts))
+
+            with self.raises(s_exc.BadArg):
+                await core.callStorm('return($lib.axon.read($sha256, size=$lib.cast(int, 20000000)))', opts=opts)
+
+            with self.raises(s_exc.NoSuchFile):
+                opts = {'vars': {'sha256': 'ff' * 32}}
+                await core.callStorm('return($lib.axon.read($sha256))', opts=opts)
+
+            opts = {'user': visi.iden, 'vars': {'sha256': s_common.ehex(sha256)}}
+            with self.raises(s_exc.AuthDeny):
+                await core.callStorm('return($lib.axon.read($sha256))', opts=opts)
+
+            await visi.addRule((True, ('storm', 'lib', 'axon', 'get')))
+            self.eq(b'as', await core.callStorm('return($lib.axon.read($sha256, size=2))', opts=opts))
+
     async def test_storm_lib_base64(self):
 
         async with self.getTestCore() as core:
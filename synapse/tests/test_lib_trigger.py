@@ -1,9 +1,15 @@
+import asyncio
+
+from unittest import mock
+
 import synapse.exc as s_exc
 import synapse.common as s_common
 
 from synapse.common import aspin
 
 import synapse.telepath as s_telepath
+
+import synapse.lib.trigger as s_trigger
 import synapse.tests.utils as s_t_utils
 
 class TrigTest(s_t_utils.SynTest):
@@ -220,6 +226,145 @@ class TrigTest(s_t_utils.SynTest):
             await self.asyncraises(s_exc.NoSuchIden, view.delTrigger('newp'))
             await self.asyncraises(s_exc.NoSuchIden, view.setTriggerInfo('newp', 'enabled', True))
 
+    async def test_trigger_async(self):
+
+        async with self.getTestCore() as core:
+
+            view = core.view
+
+            tdef = {'cond': 'node:add', 'form': 'test:int', 'storm': '[ +#nodeadd ]', 'async': True}
+            await view.addTrigger(tdef)
+
+            tdef = {'cond': 'tag:add', 'tag': 'foo.*', 'storm': '[ +#tagadd ]', 'async': True}
+            await view.addTrigger(tdef)
+
+            with self.raises(s_exc.BadOptValu):
+                await view.addTrigger({'cond': 'node:del', 'form': 'test:int', 'storm': '', 'async': True})
+
+            nodes = await core.nodes('[ test:int=0 test:int=1 test:int=2 test:int=3 test:int=4 test:int=5 test:int=6 test:int=7 test:int=8 test:int=9 ]')
+            self.len(10, nodes)
+
+            for _ in range(50):
+                if len(await core.nodes('test:int#nodeadd')) == 10:
+                    break
+                await asyncio.sleep(0.1)
+
+            self.len(10, await core.nodes('test:int#nodeadd'))
+
+            await core.nodes('test:int=1 [ +#foo.bar ]')
+            for _ in range(50):
+                if await core.nodes('test:int#tagadd'):
+                    break
+                await asyncio.sleep(0.1)
+
+            self.len(1, await core.nodes('test:int#tagadd'))
+            self.eq(0, view.getTrigQueueSize())
+
+            # queued nodes are coalesced into one runtime per trigger, view and vars
+            runs = []
+            origexec = s_trigger.Trigger.executeQueued
+
+            async def executeQueued(self, viewiden, buids, vars=None):
+                runs.append((self.iden, viewiden, len(buids), vars))
+                return await origexec(self, viewiden, buids, vars=vars)
+
+            trigs = {t.tdef['cond']: t for _, t in view.triggers.list()}
+            addtrig = trigs['node:add']
+            tagtrig = trigs['tag:add']
+
+            nodes = await core.nodes('test:int')
+            buids = [n.buid for n in nodes]
+
+            items = [(addtrig.iden, view.iden, buid, None, 0) for buid in buids + buids]
+            items.append((tagtrig.iden, view.iden, buids[0], {'tag': 'foo.bar'}, 0))
+            items.append((tagtrig.iden, view.iden, buids[1], {'tag': 'foo.baz'}, 0))
+            items.append(('newp', view.iden, buids[0], None, 0))
+
+            with mock.patch.object(s_trigger.Trigger, 'executeQueued', executeQueued):
+                await view.triggers.runQueued(items)
+
+            self.len(3, runs)
+            self.eq(runs[0], (addtrig.iden, view.iden, 10, None))
+            self.eq(runs[1], (tagtrig.iden, view.iden, 1, {'tag': 'foo.bar'}))
+            self.eq(runs[2], (tagtrig.iden, view.iden, 1, {'tag': 'foo.baz'}))
+
+            # a failed run is logged and does not prevent the others from running
+            runs.clear()
+
+            async def failQueued(self, viewiden, buids, vars=None):
+                if self.iden == addtrig.iden:
+                    raise s_exc.NoSuchUser(iden='newp')
+                runs.append((self.iden, viewiden, len(buids), vars))
+
+            with self.getAsyncLoggerStream('synapse.lib.trigger', 'failed to run') as stream:
+                with mock.patch.object(s_trigger.Trigger, 'executeQueued', failQueued):
+                    await view.triggers.runQueued(items)
+                self.true(await stream.wait(timeout=6))
+
+            self.len(2, runs)
+
+            # queued items which fail to run are still culled
+            await view.addTrigQueue((addtrig.iden, 'newp', buids[0], None, 0))
+            for _ in range(50):
+                if view.getTrigQueueSize() == 0:
+                    break
+                await asyncio.sleep(0.1)
+
+            self.eq(0, view.getTrigQueueSize())
+
+            # the cortex owns the queues which spawn processes forward to
+            await core.nodes('test:int#tagadd | [ -#tagadd ]')
+            await core.addTrigQueue(view.iden, (tagtrig.iden, view.iden, buids[2], {'tag': 'foo.bar'}, 0))
+            for _ in range(50):
+                if await core.nodes('test:int#tagadd'):
+                    break
+                await asyncio.sleep(0.1)
+
+            nodes = await core.nodes('test:int#tagadd')
+            self.len(1, nodes)
+            self.eq(buids[2], nodes[0].buid)
+
+            with self.raises(s_exc.NoSuchView):
+                await core.addTrigQueue('newp', (tagtrig.iden, view.iden, buids[2], None, 0))
+
+            # async triggers are bounded by the recursion limit
+            with self.getAsyncLoggerStream('synapse.lib.trigger', 'hit the recursion limit') as stream:
+                tdef = {'cond': 'node:add', 'form': 'test:guid', 'storm': '[ test:guid="*" ]', 'async': True}
+                await view.addTrigger(tdef)
+                await core.nodes('[ test:guid="*" ]')
+                self.true(await stream.wait(timeout=20))
+
+            msgs = await core.stormlist('trigger.add node:add --form test:str --async --query {[ +#foo ]}')
+            self.stormIsInPrint('Added trigger', msgs)
+            trigs = [t for _, t in view.triggers.list() if t.tdef['cond'] == 'node:add' and t.tdef['form'] == 'test:str']
+            self.true(trigs[0].tdef['async'])
+
+    async def test_trigger_async_restart(self):
+
+        with self.getTestDir() as dirn:
+
+            async with self.getTestCore(dirn=dirn) as core:
+
+                tdef = {'cond': 'node:add', 'form': 'test:int', 'storm': '[ +#nodeadd ]', 'async': True}
+                await core.view.addTrigger(tdef)
+
+                # queue the items without running them to simulate a shutdown
+                with mock.patch('synapse.lib.view.View.startTrigQueue', lambda self: None):
+                    await core.nodes('[ test:int=1 test:int=2 ]')
+
+                self.eq(2, core.view.getTrigQueueSize())
+                self.len(0, await core.nodes('test:int#nodeadd'))
+
+            async with self.getTestCore(dirn=dirn) as core:
+
+                for _ in range(50):
+                    if len(await core.nodes('test:int#nodeadd')) == 2:
+                        break
+                    await asyncio.sleep(0.1)
+
+                self.len(2, await core.nodes('test:int#nodeadd'))
+                self.eq(0, core.view.getTrigQueueSize())
+
     async def test_trigger_delete(self):
 
         async with self.getTestCore() as core:
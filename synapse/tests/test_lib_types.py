@@ -20,6 +20,98 @@ class TypesTest(s_t_utils.SynTest):
         self.none(t.getCompOffs('newp'))
         self.raises(s_exc.NoSuchCmpr, t.cmpr, val1=1, name='newp', val2=0)
 
+    async def test_type_normcache(self):
+
+        model = s_datamodel.Model()
+        self.raises(s_exc.NoSuchType, model.setNormCache, 'newp', 10)
+        self.raises(s_exc.BadArg, model.setNormCache, 'time', 10)
+        self.raises(s_exc.BadArg, model.setNormCache, 'guid', 10)
+
+        # non-deterministic values are not de-duplicated
+        norms = model.type('guid').normMany(('*', '*'))
+        self.ne(norms[0][0], norms[1][0])
+
+        norms = model.type('int').normMany(('10', 10, '10', 'newp'))
+        self.eq(norms, [(10, {}), (10, {}), (10, {}), None])
+
+        conf = {'model:normcache': {'inet:fqdn': 2, 'inet:ipv4': 100}}
+        async with self.getTestCore(conf=conf) as core:
+
+            fqdn = core.model.type('inet:fqdn')
+            self.eq(fqdn.norm('WOOT.com'), fqdn.norm('WOOT.com'))
+
+            info = fqdn.getNormCacheInfo()
+            self.eq(1, info['hits'])
+            self.eq(1, info['misses'])
+            self.eq(2, info['maxsize'])
+
+            # errors are not cached
+            self.raises(s_exc.BadTypeValu, fqdn.norm, '!@#$')
+            self.raises(s_exc.BadTypeValu, fqdn.norm, '!@#$')
+            self.eq(1, fqdn.getNormCacheInfo()['size'])
+
+            # values which may not be used as keys skip the cache
+            self.raises(s_exc.BadTypeValu, fqdn.norm, ('vertex.link',))
+            self.eq(1, fqdn.getNormCacheInfo()['size'])
+
+            fqdn.norm('c.com')
+            fqdn.norm('d.com')
+            self.eq(2, fqdn.getNormCacheInfo()['size'])
+
+            # props of the type share the cache
+            self.true(core.model.prop('inet:dns:a:fqdn').type.normcache is fqdn.normcache)
+            self.none(core.model.prop('inet:email:user').type.normcache)
+
+            ptyp = core.model.getTypeClone(('inet:fqdn', {}))
+            self.true(ptyp.normcache is fqdn.normcache)
+
+            # cached info dicts may not be changed by callers
+            norm, info = fqdn.norm('woot.com')
+            info['newp'] = 'newp'
+            norm, info = fqdn.norm('woot.com')
+            self.notin('newp', info)
+
+            norms = fqdn.normMany(['woot.com', 'woot.com'])
+            self.false(norms[0][1] is norms[1][1])
+
+            norms = fqdn.normMany(['vertex.link', 'VERTEX.LINK', 'vertex.link', '!@#$'])
+            self.eq(norms[0][0], 'vertex.link')
+            self.eq(norms[1][0], 'vertex.link')
+            self.eq(norms[2][0], 'vertex.link')
+            self.none(norms[3])
+
+            data = [
+                (('inet:ipv4', '1.2.3.4'), {'tags': {'foo': (None, None)}}),
+                (('inet:ipv4', '1.2.3.4'), {'props': {'asn': 10}}),
+                (('inet:ipv4', 'newp'), {}),
+                (('inet:fqdn', 'VERTEX.LINK'), {}),
+            ]
+            await core.nodes('$lib.feed.ingest(syn.nodes, $data)', opts={'vars': {'data': data}})
+
+            nodes = await core.nodes('inet:ipv4=1.2.3.4 +#foo')
+            self.len(1, nodes)
+            self.eq(10, nodes[0].get('asn'))
+            self.len(1, await core.nodes('inet:fqdn=vertex.link'))
+
+            stats = (await core.stat())['normcache']
+            self.eq(('inet:fqdn', 'inet:ipv4'), tuple(sorted(stats.keys())))
+            self.eq(1, stats['inet:ipv4']['size'])
+            self.gt(stats['inet:ipv4']['hits'], 0)
+            self.ge(stats['inet:ipv4']['saved'], 0)
+
+            core.model.setNormCache('inet:fqdn', 0)
+            self.none(fqdn.getNormCacheInfo())
+            self.none(core.model.prop('inet:dns:a:fqdn').type.normcache)
+            self.none(ptyp.normcache)
+            self.notin('norm', vars(ptyp))
+            self.notin('inet:fqdn', core.model.getNormCacheInfo())
+            self.eq(('vertex.link', {'subs': {'domain': 'link', 'host': 'vertex'}}), fqdn.norm('vertex.link'))
+
+            # clones follow the cache when it is enabled again
+            core.model.setNormCache('inet:fqdn', 10)
+            self.true(ptyp.normcache is fqdn.normcache)
+            self.true(core.model.prop('inet:dns:a:fqdn').type.normcache is fqdn.normcache)
+
     def test_bool(self):
         model = s_datamodel.Model()
         t = model.type('bool')
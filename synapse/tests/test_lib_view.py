@@ -1,5 +1,8 @@
+import asyncio
 import collections
 
+from unittest import mock
+
 import synapse.exc as s_exc
 
 import synapse.tests.utils as s_t_utils
@@ -173,6 +176,111 @@ class ViewTest(s_t_utils.SynTest):
             # But not the same layer twice
             await self.asyncraises(s_exc.DupIden, core.view.addLayer(layriden))
 
+    async def test_view_merge_resume(self):
+
+        with self.getTestDir() as dirn:
+
+            async with self.getTestCore(dirn=dirn) as core:
+
+                forkiden = (await core.view.fork()).get('iden')
+                view = core.getView(forkiden)
+
+                async with await view.snap(core.auth.rootuser) as snap:
+                    for i in range(100):
+                        node = await snap.addNode('test:int', i)
+                        await node.addTag('foo')
+
+                total = await view.layers[0].getStorNodeCount()
+
+                chunks = []
+                hung = asyncio.Event()
+
+                parentlayr = core.view.layers[0]
+                basecount = await parentlayr.getStorNodeCount()
+                storNodeEditsNoLift = parentlayr.storNodeEditsNoLift
+
+                async def stor(nodeedits, meta):
+                    if len(chunks) == 3:
+                        hung.set()
+                        await asyncio.Future()
+                    chunks.append(len(nodeedits))
+                    return await storNodeEditsNoLift(nodeedits, meta)
+
+                with mock.patch.object(parentlayr, 'storNodeEditsNoLift', stor):
+
+                    task = core.schedCoro(view.merge(chunksize=10))
+                    await asyncio.wait_for(hung.wait(), timeout=10)
+
+                    # progress is reported by the boss task
+                    tasks = [t for t in core.boss.ps() if t.info.get('merging') == forkiden]
+                    self.len(1, tasks)
+                    self.eq(30, tasks[0].info.get('merge:nodes'))
+                    self.eq(total, tasks[0].info.get('merge:total'))
+
+                    task.cancel()
+                    with self.raises(asyncio.CancelledError):
+                        await task
+
+                # each chunk is a single set of node edits
+                self.eq(chunks, [10, 10, 10])
+                self.eq(basecount + 30, await parentlayr.getStorNodeCount())
+                self.eq(30, view.info.get('merging').get('nodes'))
+
+                # the fork is not truncated by an interrupted merge
+                self.eq(total, await view.layers[0].getStorNodeCount())
+
+                # and may not be edited until the merge completes
+                self.true(view.isMerging())
+                await self.asyncraises(s_exc.IsReadOnly, core.nodes('[ test:int=1000 ]', opts={'view': forkiden}))
+                self.len(0, await core.nodes('test:int=1000', opts={'view': forkiden}))
+
+                async with core.getLocalProxy(f'*/layer/{view.layers[0].iden}') as layrprox:
+                    await self.asyncraises(s_exc.IsReadOnly, layrprox.storNodeEditsNoLift([]))
+
+                # only the interrupted merge may be resumed
+                await self.asyncraises(s_exc.CantMergeView, view.merge())
+                self.eq(30, view.info.get('merging').get('nodes'))
+
+            async with self.getTestCore(dirn=dirn) as core:
+
+                # the merge is resumed when the cortex starts
+                view = core.getView(forkiden)
+                for _ in range(100):
+                    if view.info.get('merging') is None:
+                        break
+                    await asyncio.sleep(0.1)
+
+                self.none(view.info.get('merging'))
+                self.eq(basecount + total, await core.view.layers[0].getStorNodeCount())
+                self.eq(0, await view.layers[0].getStorNodeCount())
+
+                self.len(100, await core.nodes('test:int +#foo'))
+                self.len(100, await core.nodes('test:int +#foo', opts={'view': forkiden}))
+
+                # a merge which fails is not resumed
+                async with await view.snap(core.auth.rootuser) as snap:
+                    await snap.addNode('test:str', 'newp')
+
+                visi = await core.auth.addUser('visi')
+                await visi.addRule((True, ('view', 'read')))
+                await self.asyncraises(s_exc.AuthDeny, view.merge(useriden=visi.iden))
+                self.none(view.info.get('merging'))
+                self.len(0, await core.nodes('test:str=newp'))
+
+                # every edit in a chunk is permission checked before the chunk is applied
+                await core.nodes('for $i in (1000, 1001, 1002, 1003) { [ test:int=$i ] }', opts={'view': forkiden})
+
+                await visi.addRule((False, ('node', 'add', 'test:str')))
+                await visi.addRule((True, ('node',)))
+                parentlayr = core.view.layers[0]
+                with mock.patch.object(parentlayr, 'storNodeEditsNoLift', mock.AsyncMock()) as stor:
+                    await self.asyncraises(s_exc.AuthDeny, view.merge(useriden=visi.iden))
+                    stor.assert_not_called()
+
+                self.none(view.info.get('merging'))
+                self.len(0, await core.nodes('test:int>=1000'))
+                self.len(4, await core.nodes('test:int>=1000', opts={'view': forkiden}))
+
     async def test_view_trigger(self):
         async with self.getTestCore() as core:
 
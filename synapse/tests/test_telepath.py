@@ -18,6 +18,7 @@ import synapse.telepath as s_telepath
 
 import synapse.lib.cell as s_cell
 import synapse.lib.coro as s_coro
+import synapse.lib.link as s_link
 import synapse.lib.share as s_share
 import synapse.lib.httpapi as s_httpapi
 import synapse.lib.version as s_version
@@ -89,6 +90,9 @@ class Foo:
         yield 20
         yield 30
 
+    def rangegenr(self, x):
+        yield from range(x)
+
     def genrboom(self):
         yield 10
         yield 20
@@ -512,6 +516,59 @@ class TeleTest(s_t_utils.SynTest):
 
                 self.eq(retn, [0, 1, 2])
 
+    async def test_telepath_batch_yields(self):
+
+        foo = Foo()
+
+        mesgs = []
+        origtx = s_link.Link.tx
+
+        async def tx(self, mesg):
+            if mesg[0] == 't2:yield':
+                mesgs.append(mesg)
+            return await origtx(self, mesg)
+
+        async with self.getTestDmon() as dmon:
+
+            dmon.share('foo', foo)
+
+            async with await s_telepath.openurl('tcp://127.0.0.1/foo', port=dmon.addr[1]) as prox:
+
+                with mock.patch.object(s_link.Link, 'tx', tx):
+
+                    with mock.patch.object(s_daemon, 'T2_BATCH_COUNT', 10):
+                        self.eq(list(range(25)), [x async for x in await prox.rangegenr(25)])
+
+                    # 25 items and the fini in 3 batched messages
+                    self.len(3, mesgs)
+                    self.eq([10, 10, 6], [len(m[1]['retns']) for m in mesgs])
+
+                    mesgs.clear()
+                    with mock.patch.object(s_daemon, 'T2_BATCH_BYTES', 1):
+                        self.eq([0, 1, 2], [x async for x in await prox.rangegenr(3)])
+                    self.len(4, mesgs)
+
+                    # slow generators are flushed after the timeout
+                    mesgs.clear()
+                    self.eq([0, 1, 2], await alist(prox.corogenr(3)))
+                    self.len(4, mesgs)
+
+                    # errors are delivered after the batched results
+                    with self.raises(s_exc.SynErr):
+                        retn = []
+                        async for item in prox.agenrboom():
+                            retn.append(item)
+                    self.eq(retn, [10, 20])
+
+                    # clients which do not request batching get one message per item
+                    mesgs.clear()
+                    link = await prox.getPoolLink()
+                    await link.tx(('t2:init', {'todo': ('rangegenr', (3,), {}), 'name': None, 'sess': prox.sess}))
+                    self.eq('t2:genr', (await link.rx())[0])
+                    retns = [(await link.rx())[1]['retn'] for i in range(4)]
+                    self.eq(retns, [(True, 0), (True, 1), (True, 2), None])
+                    await link.fini()
+
     async def test_telepath_blocking(self):
         ''' Make sure that async methods on the same proxy don't block each other '''
 
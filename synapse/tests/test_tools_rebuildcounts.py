@@ -0,0 +1,33 @@
+import synapse.exc as s_exc
+
+import synapse.tests.utils as s_t_utils
+import synapse.tools.rebuildcounts as s_rebuildcounts
+
+class RebuildCountsTest(s_t_utils.SynTest):
+
+    async def test_tools_rebuildcounts(self):
+
+        async with self.getTestCore() as core:
+
+            await core.nodes('[ inet:ipv4=1.2.3.4 inet:ipv4=5.6.7.8 +#foo.bar ]')
+
+            layr = core.getLayer()
+            layr.meta.set('rowcounts', False)
+
+            url = core.getLocalUrl(f'*/layer/{layr.iden}')
+
+            outp = self.getTestOutp()
+            self.eq(0, await s_rebuildcounts.main([url], outp=outp))
+            outp.expect(f'Rebuilding row counters for layer {layr.iden}')
+            outp.expect('tag counters')
+
+            self.true(layr.meta.get('rowcounts'))
+            self.eq(2, await layr.getTagCount('foo.bar'))
+            self.eq(2, await layr.getPropCount('inet:ipv4'))
+
+            visi = await core.auth.addUser('visi')
+            await visi.addRule((True, ('layer', 'lift')))
+
+            async with core.getLocalProxy(f'*/layer/{layr.iden}', user='visi') as prox:
+                with self.raises(s_exc.AuthDeny):
+                    await prox.rebuildRowCounts()
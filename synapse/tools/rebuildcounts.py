@@ -0,0 +1,47 @@
+import sys
+import asyncio
+import argparse
+
+import synapse.common as s_common
+import synapse.telepath as s_telepath
+
+import synapse.lib.output as s_output
+
+'''
+Rebuild the tag and prop row counters for layers which were created before the counters were maintained.
+'''
+
+async def main(argv, outp=None):
+
+    pars = setup()
+    opts = pars.parse_args(argv)
+
+    if outp is None:  # pragma: no cover
+        outp = s_output.OutPut()
+
+    path = s_common.getSynPath('telepath.yaml')
+    telefini = await s_telepath.loadTeleEnv(path)
+
+    for url in opts.layers:
+
+        async with await s_telepath.openurl(url) as layr:
+
+            iden = await layr.getIden()
+            outp.printf(f'Rebuilding row counters for layer {iden}')
+
+            retn = await layr.rebuildRowCounts()
+            outp.printf(f'...rebuilt {retn["tags"]} tag counters and {retn["props"]} prop counters')
+
+    if telefini:  # pragma: no cover
+        await telefini()
+
+    return 0
+
+def setup():
+    desc = 'Rebuild the tag and prop row counters of one or more layers.'
+    pars = argparse.ArgumentParser('synapse.tools.rebuildcounts', description=desc)
+    pars.add_argument('layers', nargs='+', help='Telepath URLs of the layers (ie. tcp://host/*/layer/<iden>).')
+    return pars
+
+if __name__ == '__main__':  # pragma: no cover
+    sys.exit(asyncio.run(main(sys.argv[1:])))